@@ -4,7 +4,7 @@ Configuración del Sistema HidroAliaga
 
 import os
 from pathlib import Path
-from typing import List
+from typing import List, Optional
 from functools import lru_cache
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -46,6 +46,24 @@ class Settings(BaseSettings):
     # Motor Hidráulico
     HARDY_CROSS_TOLERANCE: float = 1e-7
     MAX_ITERATIONS: int = 1000
+    # Fracción mínima de tramos con caudal previo para arrancar en caliente
+    COBERTURA_MINIMA_ARRANQUE: float = 0.5
+
+    # Cache de resultados de /calcular (por contenido de la red y parámetros)
+    CACHE_CALCULOS_TAMANO: int = 256  # entradas en memoria (0 = desactivada)
+    CACHE_CALCULOS_TTL: float = 3600.0  # s
+    CACHE_CALCULOS_BD: bool = False  # respaldo en la tabla cache_calculos
+
+    # Capa de cómputo (pool de procesos para el motor y el optimizador)
+    COMPUTO_WORKERS: int = 2  # 0 = hilos dentro del proceso del servidor
+    COMPUTO_TIMEOUT: float = 600.0  # s por trabajo
+    COMPUTO_MAX_TAREAS: int = 64  # trabajos en cola + en ejecución
+
+    # Trabajos en segundo plano (/calcular y /optimizar con asincrono=true)
+    TRABAJOS_BROKER: str = "memoria"  # "archivos" = compartido entre workers del host
+    TRABAJOS_DIRECTORIO: Path = Path("./trabajos")
+    TRABAJOS_TIMEOUT: float = 3600.0  # s por trabajo
+    TRABAJOS_RETENCION: float = 3600.0  # s que se conservan los trabajos terminados
 
     # Hazen-Williams
     HAZEN_WILLIAMS_EXPONENT: float = 1.852
@@ -61,6 +79,11 @@ class Settings(BaseSettings):
     DIAMETRO_MINIMO_RURAL: float = 25.0  # mm (1 pulgada)
     PRESION_ESTATICA_MAXIMA: float = 50.0  # m.c.a.
 
+    # Escenarios de demanda (factores sobre la demanda base)
+    FACTOR_MAXIMO_DIARIO: float = 1.3  # K1 (RNE OS.100)
+    FACTOR_MAXIMO_HORARIO: float = 2.0  # K2 (RNE OS.100: 1.8 - 2.5)
+    FACTOR_MINIMO_NOCTURNO: float = 0.5
+
     # Dotaciones (lppd - litros por persona por día)
     DOTACION_CLIMA_CALIDO: float = 169.0
     DOTACION_CLIMA_TEMPLADO: float = 155.0
@@ -71,6 +94,15 @@ class Settings(BaseSettings):
     GA_GENERACIONES: int = 50
     GA_CROSSOVER_RATE: float = 0.8
     GA_MUTATION_RATE: float = 0.1
+    OPTIMIZACION_WORKERS_MAX: int = 4  # procesos de evaluación por optimización
+    # Puntos de control del AG y NSGA-II para reanudar optimizaciones interrumpidas
+    PUNTO_CONTROL_CADA: int = 10  # generaciones (0 = desactivados)
+    PUNTOS_CONTROL_DIRECTORIO: Path = Path("./puntos_control")
+
+    # Costos de tubería: catálogo CSV/JSON (material, clase_tuberia, diametro,
+    # precio en Soles por metro); lo que no trae usa COSTO_POR_METRO · (D / D_min)^1.5
+    CATALOGO_PRECIOS: Optional[Path] = None
+    COSTO_POR_METRO: float = 100.0  # Soles por metro del menor diámetro comercial
 
     # Diámetros Comerciales (mm)
     DIAMETROS_COMERCIALES: List[float] = [
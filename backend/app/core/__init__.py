@@ -1,7 +1,8 @@
 """Core modules"""
 
-from app.core.hidraulico import MotorHidraulico, Nudo, Tramo, Malla
-from app.core.optimizador import OptimizadorGA, Individuo
+from app.core.hidraulico import MotorHidraulico, Nudo, Tramo, Malla, SolverGradiente, EvaluadorDiametros
+from app.core.red_compacta import RedCompacta, IndiceAdyacencia
+from app.core.optimizador import OptimizadorGA, OptimizadorRamificado, Individuo
 from app.core.normativa import CopilotoNormativo, BaseConocimientoNormativo
 from app.core.auth import (
     UserAuth,
@@ -16,7 +17,12 @@ __all__ = [
     "Nudo",
     "Tramo",
     "Malla",
+    "SolverGradiente",
+    "EvaluadorDiametros",
+    "RedCompacta",
+    "IndiceAdyacencia",
     "OptimizadorGA",
+    "OptimizadorRamificado",
     "Individuo",
     "CopilotoNormativo",
     "BaseConocimientoNormativo",
@@ -0,0 +1,98 @@
+"""
+Cache de Resultados - H-Redes Perú
+Resultados de cálculo direccionados por contenido: la clave es un hash de la
+red y de los parámetros, de modo que repetir un cálculo sin cambios no vuelve
+a resolver la red
+"""
+
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+from uuid import UUID
+
+from app.core.red_compacta import RedCompacta
+
+
+def huella_calculo(proyecto_id: UUID, red: RedCompacta, parametros: Dict[str, Any]) -> str:
+    """
+    Clave de cache de un cálculo: proyecto, contenido de la red y parámetros
+
+    `parametros` debe incluir todo lo que cambia el resultado (método,
+    tolerancia, constantes de `settings`...); se serializa en JSON con
+    claves ordenadas. El proyecto entra en la clave porque la respuesta
+    cacheada apunta a un Calculo de ese proyecto.
+    """
+    h = hashlib.sha256()
+    h.update(proyecto_id.bytes)
+    h.update(red.huella().encode())
+    h.update(json.dumps(parametros, sort_keys=True, default=str).encode())
+    return h.hexdigest()
+
+
+class CacheResultados:
+    """
+    Cache LRU en memoria con vencimiento (TTL)
+
+    Al superar `capacidad` se descarta la entrada usada hace más tiempo; las
+    entradas con más de `ttl` segundos se descartan al consultarlas. Con
+    `capacidad = 0` la cache queda desactivada. Los aciertos y fallos los
+    cuenta quien consulta (con `contar`), ya que puede haber otros niveles
+    de respaldo detrás de esta cache.
+    """
+
+    def __init__(self, capacidad: int = 256, ttl: float = 3600.0):
+        self.capacidad = capacidad
+        self.ttl = ttl
+        self._entradas: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self.aciertos = 0
+        self.fallos = 0
+
+    def configurar(self, capacidad: Optional[int] = None, ttl: Optional[float] = None):
+        """Ajusta la cache (se llama desde el lifespan de la aplicación)"""
+        if capacidad is not None:
+            self.capacidad = capacidad
+        if ttl is not None:
+            self.ttl = ttl
+        while len(self._entradas) > self.capacidad:
+            self._entradas.popitem(last=False)
+
+    def obtener(self, clave: Hashable) -> Optional[Any]:
+        entrada = self._entradas.get(clave)
+        if entrada is None:
+            return None
+        guardado, valor = entrada
+        if time.monotonic() - guardado > self.ttl:
+            del self._entradas[clave]
+            return None
+        self._entradas.move_to_end(clave)
+        return valor
+
+    def guardar(self, clave: Hashable, valor: Any):
+        if self.capacidad <= 0:
+            return
+        self._entradas[clave] = (time.monotonic(), valor)
+        self._entradas.move_to_end(clave)
+        while len(self._entradas) > self.capacidad:
+            self._entradas.popitem(last=False)
+
+    def contar(self, acierto: bool):
+        if acierto:
+            self.aciertos += 1
+        else:
+            self.fallos += 1
+
+    def limpiar(self):
+        self._entradas.clear()
+        self.aciertos = self.fallos = 0
+
+    @property
+    def estadisticas(self) -> Dict[str, int]:
+        return {"aciertos": self.aciertos, "fallos": self.fallos, "entradas": len(self._entradas)}
+
+    def __len__(self) -> int:
+        return len(self._entradas)
+
+
+cache_calculos = CacheResultados()
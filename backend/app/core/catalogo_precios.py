@@ -0,0 +1,145 @@
+"""
+Catálogo de Precios de Tuberías - H-Redes Perú
+Precio por metro según material, clase de tubería y diámetro comercial,
+compilado en un arreglo denso para el optimizador y el cálculo de costos
+"""
+
+import csv
+import json
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+
+def _material(valor) -> str:
+    return str(getattr(valor, "value", valor)).strip().lower()
+
+
+def _clase(valor) -> str:
+    return str(valor).strip().upper()
+
+
+class CatalogoPrecios:
+    """
+    Precios por metro (Soles) por material, clase de tubería y diámetro comercial
+
+    Al compilarse queda el arreglo denso `precios` (materiales × clases ×
+    diámetros), con un material y una clase extra al final para lo que el
+    catálogo no trae. Las combinaciones sin precio usan el modelo
+    paramétrico costo_por_metro · (D / D_min)^1.5, de modo que sin archivo
+    el costo es el de siempre.
+
+    Material y clase de cada tramo se traducen a índices una sola vez por
+    red (`precios_tramos`); el costo de cada individuo es luego un gather
+    sobre esa tabla, sin diccionarios.
+    """
+
+    def __init__(
+        self,
+        diametros: Sequence[float] = (),
+        costo_por_metro: float = 100.0,
+        registros: Iterable[Dict] = ()
+    ):
+        self.compilar(diametros, costo_por_metro, registros)
+
+    def configurar(
+        self,
+        diametros: Sequence[float],
+        costo_por_metro: float,
+        archivo: Optional[Union[str, Path]] = None
+    ):
+        """Compila el catálogo (se llama desde el lifespan de la aplicación)"""
+        registros = self.leer(archivo) if archivo else ()
+        self.compilar(diametros, costo_por_metro, registros)
+
+    @staticmethod
+    def leer(archivo: Union[str, Path]) -> List[Dict]:
+        """
+        Registros {material, clase_tuberia, diametro, precio} de un CSV
+        (con esa cabecera) o de un JSON (lista de registros)
+        """
+        ruta = Path(archivo)
+        if ruta.suffix.lower() == ".csv":
+            with ruta.open(newline="", encoding="utf-8") as f:
+                return list(csv.DictReader(f))
+        if ruta.suffix.lower() == ".json":
+            registros = json.loads(ruta.read_text(encoding="utf-8"))
+            if not isinstance(registros, list):
+                raise ValueError(f"{ruta.name}: se esperaba una lista de precios")
+            return registros
+        raise ValueError(f"Formato de catálogo de precios no soportado: {ruta.suffix or ruta.name}")
+
+    def compilar(self, diametros: Sequence[float], costo_por_metro: float, registros: Iterable[Dict] = ()):
+        """Arma el arreglo denso de precios a partir de los registros"""
+        registros = list(registros)
+        self.diametros = np.array(sorted(diametros), dtype=np.float64)
+        self.costo_por_metro = costo_por_metro
+
+        try:
+            filas = [
+                (_material(r["material"]), _clase(r["clase_tuberia"]), float(r["diametro"]), float(r["precio"]))
+                for r in registros
+            ]
+        except (KeyError, TypeError, ValueError) as e:
+            raise ValueError(
+                f"Registro de precio inválido ({e}): se esperan material, clase_tuberia, diametro y precio"
+            )
+
+        self.materiales = sorted({material for material, _, _, _ in filas})
+        self.clases = sorted({clase for _, clase, _, _ in filas})
+        self._indice_material = {m: i for i, m in enumerate(self.materiales)}
+        self._indice_clase = {c: i for i, c in enumerate(self.clases)}
+
+        parametrico = (
+            costo_por_metro * (self.diametros / self.diametros[0]) ** 1.5
+            if len(self.diametros) else self.diametros
+        )
+        self.precios = np.empty((len(self.materiales) + 1, len(self.clases) + 1, len(self.diametros)))
+        self.precios[...] = parametrico
+
+        for material, clase, diametro, precio in filas:
+            k = int(np.searchsorted(self.diametros, diametro))
+            if k == len(self.diametros) or not np.isclose(self.diametros[k], diametro):
+                raise ValueError(
+                    f"El diámetro {diametro:g} mm del catálogo de precios no es un diámetro comercial"
+                )
+            if precio < 0:
+                raise ValueError(f"Precio negativo para {material} {clase} {diametro:g} mm")
+            self.precios[self._indice_material[material], self._indice_clase[clase], k] = precio
+
+    def _indices(self, materiales: Sequence, clases: Sequence) -> Tuple[np.ndarray, np.ndarray]:
+        """Índices de material y clase de cada tramo (los desconocidos, al paramétrico)"""
+        otro_material, otra_clase = len(self.materiales), len(self.clases)
+        return (
+            np.array([self._indice_material.get(_material(m), otro_material) for m in materiales], dtype=np.intp),
+            np.array([self._indice_clase.get(_clase(c), otra_clase) for c in clases], dtype=np.intp),
+        )
+
+    def precios_tramos(self, materiales: Sequence, clases: Sequence) -> np.ndarray:
+        """Precio por metro de cada diámetro comercial en cada tramo (tramos × diámetros)"""
+        material, clase = self._indices(materiales, clases)
+        return self.precios[material, clase]
+
+    def costo(
+        self,
+        materiales: Sequence,
+        clases: Sequence,
+        longitudes: Sequence[float],
+        diametros: Sequence[float]
+    ) -> float:
+        """
+        Costo de tramos con diámetros dados, cada uno al precio del comercial
+        más cercano (los tramos sin diámetro no suman)
+        """
+        diametros = np.asarray(diametros, dtype=np.float64)
+        if not len(diametros):
+            return 0.0
+        material, clase = self._indices(materiales, clases)
+        cercano = np.abs(diametros[:, None] - self.diametros[None, :]).argmin(axis=1)
+        precio = np.where(diametros > 0, self.precios[material, clase, cercano], 0.0)
+        return float((np.asarray(longitudes, dtype=np.float64) * precio).sum())
+
+
+# Catálogo de la aplicación
+catalogo_precios = CatalogoPrecios()
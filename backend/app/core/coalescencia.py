@@ -0,0 +1,105 @@
+"""
+Coalescencia de Cálculos - H-Redes Perú
+Peticiones idénticas y simultáneas (varias pestañas o usuarios del mismo
+proyecto) comparten una sola ejecución en lugar de resolver la red cada una
+"""
+
+import asyncio
+import contextvars
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Tuple
+
+from app.core.computo import Tarea, al_enviar_tarea
+
+
+@dataclass
+class _Vuelo:
+    tarea: Optional[asyncio.Task] = None
+    esperando: int = 0
+    # Tareas del pool que envió la ejecución y `al_enviar_tarea` de cada
+    # petición que la espera, para que todas lean su progreso
+    tareas_pool: List[Tarea] = field(default_factory=list)
+    seguidores: List[Callable[[Tarea], None]] = field(default_factory=list)
+
+    def registrar(self, tarea: Tarea):
+        self.tareas_pool.append(tarea)
+        for seguidor in self.seguidores:
+            seguidor(tarea)
+
+    def seguir(self, seguidor: Callable[[Tarea], None]):
+        self.seguidores.append(seguidor)
+        for tarea in self.tareas_pool:
+            seguidor(tarea)
+
+
+class Coalescedor:
+    """
+    Ejecución única por clave ("single-flight")
+
+    Mientras una clave está en curso, las nuevas peticiones con la misma
+    clave esperan su resultado (o su excepción) en vez de ejecutar otra vez.
+    Si todas las peticiones que esperan se cancelan, la ejecución compartida
+    también se cancela. La función no debe depender de recursos de una
+    petición en particular (p. ej. su sesión de BD), porque la comparten
+    todas.
+
+    Las tareas que la ejecución envía al pool se entregan al
+    `al_enviar_tarea` de cada petición que la espera (también a las que se
+    unen después), así cada trabajo en segundo plano ve el progreso.
+    """
+
+    def __init__(self):
+        self._vuelos: Dict[Tuple[str, Hashable], _Vuelo] = {}
+        self._ejecutados: Dict[str, int] = {}
+        self._ahorrados: Dict[str, int] = {}
+
+    async def ejecutar(self, tipo: str, clave: Hashable, funcion: Callable[[], Awaitable[Any]]) -> Any:
+        """Ejecuta funcion() o se une a la ejecución en curso de (tipo, clave)"""
+        llave = (tipo, clave)
+        vuelo = self._vuelos.get(llave)
+
+        if vuelo is None:
+            vuelo = _Vuelo()
+            # La ejecución registra sus tareas del pool en el vuelo, no solo
+            # en el contexto de la primera petición
+            contexto = contextvars.copy_context()
+            contexto.run(al_enviar_tarea.set, vuelo.registrar)
+            vuelo.tarea = asyncio.get_running_loop().create_task(funcion(), context=contexto)
+            self._vuelos[llave] = vuelo
+            vuelo.tarea.add_done_callback(lambda _: self._terminar(llave, vuelo))
+            self._ejecutados[tipo] = self._ejecutados.get(tipo, 0) + 1
+        else:
+            self._ahorrados[tipo] = self._ahorrados.get(tipo, 0) + 1
+
+        seguidor = al_enviar_tarea.get()
+        if seguidor is not None:
+            vuelo.seguir(seguidor)
+
+        vuelo.esperando += 1
+        try:
+            return await asyncio.shield(vuelo.tarea)
+        finally:
+            if seguidor is not None:
+                vuelo.seguidores.remove(seguidor)
+            vuelo.esperando -= 1
+            if vuelo.esperando == 0 and not vuelo.tarea.done():
+                vuelo.tarea.cancel()
+
+    def _terminar(self, llave: Tuple[str, Hashable], vuelo: _Vuelo):
+        if self._vuelos.get(llave) is vuelo:
+            del self._vuelos[llave]
+
+    @property
+    def en_curso(self) -> int:
+        return len(self._vuelos)
+
+    @property
+    def estadisticas(self) -> Dict[str, Dict[str, int]]:
+        """Por tipo: ejecuciones reales y ejecuciones ahorradas por coalescencia"""
+        return {
+            tipo: {"ejecutados": ejecutados, "ahorrados": self._ahorrados.get(tipo, 0)}
+            for tipo, ejecutados in self._ejecutados.items()
+        }
+
+
+coalescedor = Coalescedor()
@@ -0,0 +1,425 @@
+"""
+Capa de Cómputo - H-Redes Perú
+Ejecuta los cálculos pesados (motor hidráulico, algoritmo genético) en un pool
+de procesos, fuera del event loop de asyncio
+"""
+
+import array
+import asyncio
+import contextvars
+import itertools
+import multiprocessing
+import threading
+import time
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+from uuid import UUID
+
+import numpy as np
+
+from app.core.hidraulico import MotorHidraulico, PasoSimulacion
+from app.core.optimizador import OptimizadorGA, OptimizadorRamificado
+from app.core.optimizador_islas import OptimizadorIslas
+from app.core.optimizador_nsga2 import OptimizadorNSGA2
+from app.core.puntos_control import escribir_punto_control, leer_punto_control
+from app.core.red_compacta import RedCompacta
+
+
+class CalculoCancelado(Exception):
+    """El trabajo se canceló durante su ejecución"""
+
+
+class TiempoAgotado(CalculoCancelado):
+    """El trabajo superó el tiempo máximo permitido"""
+
+
+class PoolOcupado(Exception):
+    """No quedan cupos para encolar más trabajos"""
+
+
+# Banderas de cancelación y progreso compartidos (uno por cupo). En cada
+# proceso del pool los asigna el inicializador; en modo hilos, el propio
+# PoolCalculo.
+_banderas = None
+_progreso = None
+_local = threading.local()
+
+# Si está definido en el contexto de quien llama a `ejecutar`, recibe cada
+# Tarea enviada (lo usa el gestor de trabajos para leer su progreso)
+al_enviar_tarea: contextvars.ContextVar[Optional[Callable[["Tarea"], None]]] = (
+    contextvars.ContextVar("al_enviar_tarea", default=None)
+)
+
+
+def _inicializar_proceso(banderas, progreso):
+    global _banderas, _progreso
+    _banderas = banderas
+    _progreso = progreso
+
+
+def _ejecutar_en_cupo(cupo: int, funcion: Callable, args: Tuple):
+    _local.cupo = cupo
+    try:
+        return funcion(*args)
+    finally:
+        _local.cupo = None
+
+
+def verificar_cancelacion(*_):
+    """
+    Lanza CalculoCancelado si se pidió cancelar el trabajo en curso
+
+    Acepta cualquier argumento para usarse directamente como `al_iterar`
+    del motor o `al_generacion` del optimizador.
+    """
+    cupo = getattr(_local, "cupo", None)
+    if cupo is not None and _banderas is not None and _banderas[cupo]:
+        raise CalculoCancelado("Cálculo cancelado")
+
+
+def reportar_progreso(fraccion: float):
+    """Publica el avance (0 a 1) del trabajo en curso; fuera del pool no hace nada"""
+    cupo = getattr(_local, "cupo", None)
+    if cupo is not None and _progreso is not None:
+        _progreso[cupo] = min(max(fraccion, 0.0), 1.0)
+
+
+@dataclass
+class Tarea:
+    """Trabajo enviado al pool"""
+    future: Future
+    cupo: int
+    pool: "PoolCalculo"
+    envio: int = 0  # número de envío que ocupa el cupo
+
+    def cancelar(self):
+        """Cancela el trabajo: si aún no empezó no se ejecuta; si está en curso, se detiene en la siguiente iteración"""
+        with self.pool._lock:
+            # Si ya terminó su cupo puede ser de otro trabajo: no se toca su bandera
+            if not self.future.done() and self.pool._envios_cupo[self.cupo] == self.envio:
+                self.pool._banderas[self.cupo] = 1
+        self.future.cancel()
+
+    @property
+    def progreso(self) -> float:
+        """Avance reportado por el trabajo (1.0 al terminar sin errores)"""
+        if self.future.done():
+            return 0.0 if self.future.cancelled() or self.future.exception() else 1.0
+        return self.pool._progreso[self.cupo]
+
+
+class PoolCalculo:
+    """
+    Pool de cómputo de la aplicación
+
+    Con `workers > 0` usa un ProcessPoolExecutor (contexto spawn); con
+    `workers = 0`, hilos del propio proceso. Cada trabajo ocupa un cupo con
+    su bandera de cancelación, que los solvers revisan en cada iteración
+    (cancelación cooperativa), y su casilla de progreso; `max_tareas` limita los trabajos en cola más
+    los en ejecución.
+    """
+
+    def __init__(self):
+        self._executor: Optional[Executor] = None
+        self._banderas = None
+        self._progreso = None
+        self._libres: List[int] = []
+        self._lock = threading.Lock()
+        # Envío que ocupa cada cupo: una Tarea vieja no cancela al trabajo
+        # que reutiliza su cupo
+        self._envios = itertools.count(1)
+        self._envios_cupo: List[int] = []
+        self.workers = 0
+        self.timeout: Optional[float] = None
+
+    @property
+    def activo(self) -> bool:
+        return self._executor is not None
+
+    def iniciar(self, workers: int = 0, timeout: Optional[float] = None, max_tareas: int = 64):
+        """Crea el executor (se llama desde el lifespan de la aplicación)"""
+        global _banderas, _progreso
+
+        if self.activo:
+            self.cerrar()
+
+        if workers > 0:
+            contexto = multiprocessing.get_context("spawn")
+            self._banderas = contexto.Array("b", max_tareas, lock=False)
+            self._progreso = contexto.Array("d", max_tareas, lock=False)
+            self._executor = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=contexto,
+                initializer=_inicializar_proceso,
+                initargs=(self._banderas, self._progreso),
+            )
+        else:
+            self._banderas = _banderas = bytearray(max_tareas)
+            self._progreso = _progreso = array.array("d", bytes(8 * max_tareas))
+            self._executor = ThreadPoolExecutor(thread_name_prefix="computo")
+
+        self._libres = list(range(max_tareas))
+        self._envios_cupo = [0] * max_tareas
+        self.workers = workers
+        self.timeout = timeout
+
+    def cerrar(self):
+        """Cancela los trabajos pendientes, pide detener los en curso y libera el executor"""
+        if not self.activo:
+            return
+        for cupo in range(len(self._banderas)):
+            self._banderas[cupo] = 1
+        self._executor.shutdown(wait=True, cancel_futures=True)
+        self._executor = None
+
+    def enviar(self, funcion: Callable, *args) -> Tarea:
+        """
+        Encola funcion(*args) y retorna la tarea
+
+        La función y sus argumentos deben ser serializables (pickle) si el
+        pool usa procesos. Lanza PoolOcupado si no quedan cupos.
+        """
+        if not self.activo:
+            self.iniciar()
+
+        with self._lock:
+            if not self._libres:
+                raise PoolOcupado("Demasiados cálculos en curso, intente nuevamente en unos momentos")
+            cupo = self._libres.pop()
+            envio = self._envios_cupo[cupo] = next(self._envios)
+            self._banderas[cupo] = 0
+            self._progreso[cupo] = 0.0
+
+        future = self._executor.submit(_ejecutar_en_cupo, cupo, funcion, args)
+        future.add_done_callback(lambda _: self._liberar(cupo))
+        return Tarea(future=future, cupo=cupo, pool=self, envio=envio)
+
+    def _liberar(self, cupo: int):
+        with self._lock:
+            self._libres.append(cupo)
+
+    async def ejecutar(self, funcion: Callable, *args, timeout: Optional[float] = None):
+        """
+        Ejecuta funcion(*args) en el pool y espera su resultado sin bloquear el event loop
+
+        Si se supera el tiempo máximo (`timeout` o el del pool) o se cancela
+        la corrutina (p. ej. el cliente se desconecta), el trabajo se cancela.
+        Lanza TiempoAgotado, PoolOcupado o la excepción de la propia función.
+        """
+        tarea = self.enviar(funcion, *args)
+        registrar = al_enviar_tarea.get()
+        if registrar is not None:
+            registrar(tarea)
+        limite = timeout if timeout is not None else self.timeout
+
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(tarea.future), limite)
+        except asyncio.TimeoutError:
+            tarea.cancelar()
+            raise TiempoAgotado(f"El cálculo superó el tiempo máximo de {limite:g} s")
+        except asyncio.CancelledError:
+            tarea.cancelar()
+            raise
+
+
+pool_calculo = PoolCalculo()
+
+
+# ============ TAREAS ============
+
+
+def ejecutar_metodo(motor: MotorHidraulico, metodo: str) -> Tuple[bool, float]:
+    """Ejecuta el método de cálculo pedido y retorna (convergencia, error)"""
+    if metodo == "hardy_cross":
+        return motor.metodo_hardy_cross()
+    elif metodo == "gradiente":
+        return motor.metodo_gradiente()
+    elif metodo == "deterministico":
+        motor.calcular_red_abierta()
+        return True, 0.0
+    else:  # hibrido
+        return motor.calcular_hibrido()
+
+
+def _crear_motor(red: RedCompacta, parametros: Dict) -> MotorHidraulico:
+    motor = MotorHidraulico(
+        tolerancia=parametros["tolerancia"],
+        max_iteraciones=parametros["max_iteraciones"],
+        coef_hazen_williams=parametros["coef_hazen_williams"],
+        exponente_hw=parametros["exponente_hw"],
+        modo_mallas=parametros["modo_mallas"],
+        red=red,
+    )
+    max_iteraciones = parametros["max_iteraciones"]
+
+    def al_iterar(iteracion: int):
+        verificar_cancelacion()
+        reportar_progreso(iteracion / max_iteraciones)
+
+    motor.al_iterar = al_iterar
+    return motor
+
+
+def tarea_calculo_hidraulico(
+    red: RedCompacta,
+    parametros: Dict,
+    caudales_previos: Optional[Dict[UUID, float]] = None,
+    cotas_previas: Optional[Dict[UUID, float]] = None,
+) -> Dict:
+    """
+    Cálculo hidráulico completo de /calcular
+
+    - parametros: metodo, tolerancia, max_iteraciones, modo_mallas,
+      coef_hazen_williams, exponente_hw, cobertura_minima, medir_ahorro
+    - caudales_previos / cotas_previas: resultados del último cálculo para
+      el arranque en caliente (opcional)
+    """
+    inicio = time.time()
+    motor = _crear_motor(red, parametros)
+
+    arranque_en_caliente, cobertura = False, None
+    if caudales_previos:
+        cobertura = motor.arranque_en_caliente(
+            caudales_previos, cotas_previas, cobertura_minima=parametros["cobertura_minima"]
+        )
+        arranque_en_caliente = cobertura >= parametros["cobertura_minima"]
+
+    convergencia, error = ejecutar_metodo(motor, parametros["metodo"])
+    tiempo_calculo = time.time() - inicio
+
+    # Mismo cálculo desde el reparto uniforme, solo para medir el ahorro
+    iteraciones_en_frio = None
+    if arranque_en_caliente and parametros["medir_ahorro"]:
+        motor_frio = _crear_motor(red, parametros)
+        ejecutar_metodo(motor_frio, parametros["metodo"])
+        iteraciones_en_frio = len(motor_frio.historial_iteraciones)
+
+    resultados_nudos, resultados_tramos = motor.exportar_resultados()
+    return {
+        "convergencia": convergencia,
+        "error": error,
+        "tiempo_calculo": tiempo_calculo,
+        "resumen": motor.obtener_resumen_resultados(),
+        "tabla_iteraciones": motor.generar_tabla_iteraciones(),
+        "resultados_nudos": resultados_nudos,
+        "resultados_tramos": resultados_tramos,
+        "arranque_en_caliente": arranque_en_caliente,
+        "cobertura_arranque": cobertura,
+        "iteraciones_en_frio": iteraciones_en_frio,
+    }
+
+
+def tarea_escenarios(red: RedCompacta, parametros: Dict, factores: List[float]) -> List[Dict]:
+    """Cálculo en lote de varios escenarios de demanda; retorna el resumen de cada uno"""
+    motor = _crear_motor(red, parametros)
+    resultado = motor.calcular_escenarios(factores, metodo=parametros["metodo"])
+    return [resultado.resumen(s) for s in range(len(factores))]
+
+
+def tarea_periodo_extendido(
+    red: RedCompacta,
+    parametros: Dict,
+    duracion: float,
+    intervalo: float,
+    patron: Optional[List[float]] = None,
+) -> List[PasoSimulacion]:
+    """
+    Simulación en periodo extendido; retorna los pasos con sus arreglos
+    por nudo y tramo (el router los transmite como NDJSON)
+
+    El progreso se reporta por paso y la cancelación se verifica también
+    en cada iteración de cada paso.
+    """
+    motor = _crear_motor(red, parametros)
+    motor.al_iterar = verificar_cancelacion
+    pasos = motor.simular_periodo_extendido(
+        duracion=duracion,
+        intervalo=intervalo,
+        metodo=parametros["metodo"],
+        patron_defecto=patron,
+    )
+
+    n_pasos = len(np.arange(0.0, duracion, intervalo))
+    resultado = []
+    for paso in pasos:
+        verificar_cancelacion()
+        resultado.append(paso)
+        reportar_progreso(len(resultado) / n_pasos)
+    return resultado
+
+
+def _optimizar_evolutivo(clase, red: RedCompacta, parametros: Dict) -> Dict:
+    """
+    Ejecuta un OptimizadorGA (o subclase) con progreso, cancelación y
+    puntos de control
+
+    - parametros["punto_control"]: archivo donde se escribe el estado cada
+      `punto_control_cada` generaciones
+    - parametros["reanudar"]: continúa desde ese archivo en lugar de empezar
+    """
+    parametros = dict(parametros)
+    ruta = parametros.pop("punto_control", None)
+    reanudar = parametros.pop("reanudar", False)
+    generaciones = parametros.get("generaciones", 50)
+
+    def al_generacion(generacion: int, _):
+        verificar_cancelacion()
+        reportar_progreso(generacion / generaciones)
+
+    if ruta is not None:
+        parametros["al_punto_control"] = lambda _, blob: escribir_punto_control(ruta, blob)
+
+    optimizador = clase.desde_red(red, al_generacion=al_generacion, **parametros)
+    if reanudar:
+        optimizador.restaurar(leer_punto_control(ruta))
+    return optimizador.optimizar()
+
+
+def tarea_optimizacion(red: RedCompacta, parametros: Dict) -> Dict:
+    """
+    Optimización de diámetros con el algoritmo genético
+
+    - parametros: argumentos de OptimizadorGA (diametros_comerciales,
+      presion_minima, poblacion_size, ...) y de puntos de control
+      (ver `_optimizar_evolutivo`)
+    """
+    return _optimizar_evolutivo(OptimizadorGA, red, parametros)
+
+
+def tarea_optimizacion_nsga2(red: RedCompacta, parametros: Dict) -> Dict:
+    """
+    Optimización multiobjetivo (costo vs. excedente de presión) con NSGA-II
+
+    - parametros: argumentos de OptimizadorGA y de puntos de control; el
+      resultado incluye el frente de Pareto
+    """
+    return _optimizar_evolutivo(OptimizadorNSGA2, red, parametros)
+
+
+def tarea_optimizacion_islas(red: RedCompacta, parametros: Dict) -> Dict:
+    """
+    Optimización de diámetros con el modelo de islas ("ga_islas")
+
+    - parametros: argumentos de OptimizadorIslas (islas, migracion_cada,
+      migrantes) y de OptimizadorGA para cada isla
+    """
+    generaciones = parametros.get("generaciones", 50)
+
+    def al_generacion(generacion: int, _):
+        verificar_cancelacion()
+        reportar_progreso(generacion / generaciones)
+
+    optimizador = OptimizadorIslas(red, al_generacion=al_generacion, **parametros)
+    return optimizador.optimizar()
+
+
+def tarea_optimizacion_ramificada(red: RedCompacta, parametros: Dict) -> Dict:
+    """
+    Optimización exacta de diámetros de una red abierta ("lp_ramificada")
+
+    - parametros: argumentos de OptimizadorRamificado (diametros_comerciales,
+      costo_por_metro, presion_minima)
+    """
+    verificar_cancelacion()
+    return OptimizadorRamificado(red, **parametros).optimizar()
@@ -0,0 +1,167 @@
+"""
+Evaluación Paralela del Algoritmo Genético - H-Redes Perú
+Reparte las presiones de los individuos de cada generación entre procesos;
+los arreglos de la red viven una sola vez en memoria compartida
+"""
+
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.core.hidraulico import EvaluadorDiametros
+from app.core.red_compacta import RedCompacta
+
+
+# Arreglos de la red que necesita el evaluador (nombre, dtype)
+_CAMPOS = (
+    ("elevacion", np.float64),
+    ("demanda", np.float64),
+    ("longitud", np.float64),
+    ("coef_hw", np.float64),
+    ("origen", np.int32),
+    ("destino", np.int32),
+    ("es_fuente", np.bool_),
+)
+
+# Estado de cada proceso de evaluación (lo asigna el inicializador)
+_memoria: Optional[shared_memory.SharedMemory] = None
+_evaluador: Optional[EvaluadorDiametros] = None
+_diametros: Optional[np.ndarray] = None
+
+
+class RedCompartida:
+    """
+    Arreglos numéricos de una RedCompacta en un bloque de memoria compartida
+
+    El descriptor (nombre del bloque y posición de cada arreglo) es lo único
+    que viaja a los procesos; cada uno abre el bloque y reconstruye la red
+    sobre vistas sin copiar los datos. El bloque se libera con `cerrar`.
+    """
+
+    def __init__(self, red: RedCompacta):
+        arreglos = [np.ascontiguousarray(getattr(red, nombre), dtype=dtype) for nombre, dtype in _CAMPOS]
+
+        self.disposicion: List[Tuple[str, str, int, int]] = []
+        posicion = 0
+        for (nombre, dtype), arreglo in zip(_CAMPOS, arreglos):
+            posicion = -(-posicion // 8) * 8  # alinear a 8 bytes
+            self.disposicion.append((nombre, np.dtype(dtype).str, len(arreglo), posicion))
+            posicion += arreglo.nbytes
+
+        self.memoria = shared_memory.SharedMemory(create=True, size=max(posicion, 1))
+        for (nombre, dtype, n, inicio), arreglo in zip(self.disposicion, arreglos):
+            np.ndarray(n, dtype=dtype, buffer=self.memoria.buf, offset=inicio)[:] = arreglo
+
+        self.n_nudos = red.n_nudos
+        self.n_tramos = red.n_tramos
+
+    @property
+    def descriptor(self) -> Dict:
+        return {"nombre": self.memoria.name, "disposicion": self.disposicion}
+
+    @staticmethod
+    def abrir(descriptor: Dict) -> Tuple[shared_memory.SharedMemory, RedCompacta]:
+        """Abre el bloque y construye una RedCompacta cuyos arreglos son vistas del bloque"""
+        memoria = shared_memory.SharedMemory(name=descriptor["nombre"])
+        arreglos = {
+            nombre: np.ndarray(n, dtype=dtype, buffer=memoria.buf, offset=inicio)
+            for nombre, dtype, n, inicio in descriptor["disposicion"]
+        }
+        n_nudos, n_tramos = len(arreglos["elevacion"]), len(arreglos["longitud"])
+        red = RedCompacta(
+            ids_nudos=list(range(n_nudos)),
+            codigos_nudos=[str(i) for i in range(n_nudos)],
+            coordenadas=np.full((n_nudos, 2), np.nan),
+            ids_tramos=list(range(n_tramos)),
+            codigos_tramos=[str(j) for j in range(n_tramos)],
+            diametro=np.zeros(n_tramos),
+            **arreglos
+        )
+        return memoria, red
+
+    def cerrar(self):
+        self.memoria.close()
+        self.memoria.unlink()
+
+
+def _inicializar_proceso(descriptor: Dict, diametros: np.ndarray, parametros: Dict):
+    global _memoria, _evaluador, _diametros
+    _memoria, red = RedCompartida.abrir(descriptor)
+    _evaluador = EvaluadorDiametros(red, **parametros)
+    _diametros = diametros
+
+
+def _resolver_lote(genes: np.ndarray, caudales: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Resuelve un lote de cromosomas (índices de diámetro) en el proceso
+
+    Arranca desde `caudales` para que el resultado dependa solo del lote y
+    no de qué proceso lo recibe. Retorna (cargas, convergencia, caudales
+    para el arranque en caliente siguiente).
+    """
+    _evaluador.caudales_arranque = caudales
+    cargas, convergencia = _evaluador.resolver(_diametros[genes])
+    return cargas, convergencia, _evaluador.caudales_arranque
+
+
+class EvaluadorParalelo:
+    """
+    EvaluadorDiametros repartido entre `workers` procesos
+
+    Cada generación se divide en `workers` bloques contiguos; a los
+    procesos solo viajan los cromosomas (índices uint8) y los caudales de
+    arranque, y vuelven las cargas y la convergencia. El arranque en
+    caliente de cada llamada se toma del primer bloque, de modo que con la
+    misma semilla y el mismo número de workers el resultado es
+    reproducible. Se usa como context manager.
+    """
+
+    def __init__(
+        self,
+        red: RedCompacta,
+        diametros: np.ndarray,
+        workers: int,
+        caudales_iniciales: np.ndarray,
+        **parametros
+    ):
+        self.workers = workers
+        self._caudales = np.array(caudales_iniciales, dtype=np.float64)
+        self._red = RedCompartida(red)
+        try:
+            self._executor = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_inicializar_proceso,
+                initargs=(self._red.descriptor, np.asarray(diametros, dtype=np.float64), parametros),
+            )
+        except Exception:
+            self._red.cerrar()
+            raise
+
+    def resolver(self, genes: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Cargas (individuos, nudos) y convergencia de cada fila de `genes`"""
+        bloques = [b for b in np.array_split(genes, self.workers) if len(b)]
+        resultados = list(self._executor.map(
+            _resolver_lote, bloques, [self._caudales] * len(bloques)
+        ))
+        if not resultados:
+            return np.empty((0, self._red.n_nudos)), np.empty(0, dtype=bool)
+
+        self._caudales = resultados[0][2]
+        return (
+            np.concatenate([cargas for cargas, _, _ in resultados]),
+            np.concatenate([convergencia for _, convergencia, _ in resultados]),
+        )
+
+    def cerrar(self):
+        self._executor.shutdown(wait=True, cancel_futures=True)
+        self._red.cerrar()
+
+    def __enter__(self) -> "EvaluadorParalelo":
+        return self
+
+    def __exit__(self, *_):
+        self.cerrar()
@@ -1,13 +1,18 @@
 """
 Motor de Cálculo Hidráulico - H-Redes Perú
-Implementación del Método de Hardy Cross y algoritmos híbridos
+Implementación del Método de Hardy Cross, Gradiente Global y algoritmos híbridos
 """
 
 from dataclasses import dataclass, field
-from typing import List, Dict, Optional, Tuple
+from typing import Callable, List, Dict, Iterator, Optional, Sequence, Tuple
 from uuid import UUID
 import numpy as np
 from math import sqrt, pow
+from scipy.sparse import csr_matrix
+from scipy.sparse.linalg import spsolve
+
+from app.core.mallas import base_caras_planares, base_horton, rango_ciclos
+from app.core.red_compacta import RedCompacta
 
 
 @dataclass
@@ -20,6 +25,9 @@ class Nudo:
     demanda: float = 0.0  # l/s
     presion_calc: float = 0.0  # m.c.a.
     cota_agua: float = 0.0  # m
+    longitud: Optional[float] = None  # grados
+    latitud: Optional[float] = None  # grados
+    demanda_pattern: Optional[List[float]] = None  # multiplicadores horarios
 
 
 @dataclass
@@ -44,7 +52,9 @@ class Malla:
     """Representación de una malla"""
     id: str
     tramos: List[str]  # Códigos de tramos
-    nudos_circunferenciales: List[str]  # Códigos de nudos
+    nudos_circunferenciales: List[UUID]  # IDs de nudos, el tramo k une el nudo k con el k + 1
+    indices_tramos: List[int] = field(default_factory=list)  # Posiciones en la RedCompacta
+    indices_nudos: List[int] = field(default_factory=list)
 
 
 @dataclass
@@ -57,6 +67,438 @@ class ResultadoIteracion:
     correcciones_por_malla: Dict[str, float] = field(default_factory=dict)
 
 
+@dataclass
+class ResultadoGradiente:
+    """Resultado del solver de Gradiente Global"""
+    caudales: np.ndarray  # l/s por tramo (signo según origen -> destino)
+    cargas: np.ndarray  # m por nudo
+    convergencia: bool
+    historial: List[Tuple[float, float]] = field(default_factory=list)  # (Σ|ΔQ|, max|ΔQ|)
+
+
+@dataclass
+class ResultadoEscenarios:
+    """Resultados de varios escenarios de demanda resueltos en lote"""
+    factores: np.ndarray  # multiplicador de demanda por escenario
+    caudales: np.ndarray  # (escenarios, tramos) l/s
+    cotas: np.ndarray  # (escenarios, nudos) m
+    presiones: np.ndarray  # (escenarios, nudos) m.c.a.
+    velocidades: np.ndarray  # (escenarios, tramos) m/s
+    perdidas: np.ndarray  # (escenarios, tramos) m
+    convergencia: np.ndarray  # bool por escenario
+    iteraciones: np.ndarray  # iteraciones realizadas por escenario
+    errores: np.ndarray  # error final por escenario
+
+    def resumen(self, escenario: int) -> Dict:
+        """Resumen de un escenario con las mismas claves que el cálculo individual"""
+        return {
+            "factor": float(self.factores[escenario]),
+            "convergencia": bool(self.convergencia[escenario]),
+            "iteraciones_realizadas": int(self.iteraciones[escenario]),
+            "error_final": float(self.errores[escenario]),
+            **resumen_presiones_velocidades(
+                self.presiones[escenario], self.velocidades[escenario]
+            ),
+        }
+
+
+@dataclass
+class PasoSimulacion:
+    """Resultado de un paso de la simulación en periodo extendido"""
+    periodo: int
+    hora: float  # horas desde el inicio
+    demanda_total: float  # l/s
+    caudales: np.ndarray  # l/s por tramo
+    cotas: np.ndarray  # m por nudo
+    presiones: np.ndarray  # m.c.a. por nudo
+    velocidades: np.ndarray  # m/s por tramo
+    convergencia: bool
+    iteraciones: int
+    error: float
+
+
+def resumen_presiones_velocidades(presiones: np.ndarray, velocidades: np.ndarray) -> Dict:
+    """Presiones y velocidades extremas (solo valores positivos)"""
+    presiones = presiones[presiones > 0]
+    velocidades = velocidades[velocidades > 0]
+    return {
+        "presion_minima": float(presiones.min()) if len(presiones) else 0,
+        "presion_maxima": float(presiones.max()) if len(presiones) else 0,
+        "velocidad_minima": float(velocidades.min()) if len(velocidades) else 0,
+        "velocidad_maxima": float(velocidades.max()) if len(velocidades) else 0,
+    }
+
+
+class SolverGradiente:
+    """
+    Método del Gradiente Global (Todini-Pilati) sobre la matriz de incidencia
+
+    Resuelve simultáneamente caudales Q y cargas H de todos los nudos:
+
+        A11(Q)·Q + A12·H + A10·H0 = 0   (energía en cada tramo)
+        A21·Q = q                        (continuidad en cada nudo)
+
+    La topología (incidencia y patrón disperso de A21·D⁻¹·A12) se construye
+    una sola vez; cada iteración de Newton solo recalcula los valores. Varios
+    escenarios de demanda se resuelven juntos en un sistema diagonal por
+    bloques que reutiliza el mismo patrón.
+    """
+
+    CAUDAL_MINIMO = 1e-6  # l/s, evita D singular en tramos sin flujo
+
+    def __init__(
+        self,
+        n_nudos: int,
+        origen: np.ndarray,
+        destino: np.ndarray,
+        fijos: np.ndarray,
+        exponente: float = 1.852
+    ):
+        self.n_nudos = n_nudos
+        self.origen = np.asarray(origen, dtype=np.int64)
+        self.destino = np.asarray(destino, dtype=np.int64)
+        self.fijos = np.asarray(fijos, dtype=bool)
+        self.exponente = exponente
+
+        # Numeración compacta de nudos de carga desconocida
+        self.incognitas = np.flatnonzero(~self.fijos)
+        self.n_incognitas = len(self.incognitas)
+        self._indice_incognita = np.full(n_nudos, -1, dtype=np.int64)
+        self._indice_incognita[self.incognitas] = np.arange(self.n_incognitas)
+
+        self._construir_patron()
+
+    def _construir_patron(self):
+        """Precalcula el patrón CSR de A21·D⁻¹·A12 y el mapeo tramo -> dato"""
+        n_tramos = len(self.origen)
+        self._a21 = csr_matrix(
+            (
+                np.concatenate((np.ones(n_tramos), -np.ones(n_tramos))),
+                (np.concatenate((self.destino, self.origen)), np.tile(np.arange(n_tramos), 2))
+            ),
+            shape=(self.n_nudos, n_tramos)
+        )
+
+        io = self._indice_incognita[self.origen]
+        id_ = self._indice_incognita[self.destino]
+        tramos = np.arange(len(self.origen))
+
+        filas, columnas, signos, tramos_entrada = [], [], [], []
+
+        for f, c, signo, mascara in (
+            (io, io, 1.0, io >= 0),
+            (id_, id_, 1.0, id_ >= 0),
+            (io, id_, -1.0, (io >= 0) & (id_ >= 0)),
+            (id_, io, -1.0, (io >= 0) & (id_ >= 0)),
+        ):
+            filas.append(f[mascara])
+            columnas.append(c[mascara])
+            signos.append(np.full(mascara.sum(), signo))
+            tramos_entrada.append(tramos[mascara])
+
+        filas = np.concatenate(filas)
+        columnas = np.concatenate(columnas)
+        self._signos = np.concatenate(signos)
+        self._tramos_patron = np.concatenate(tramos_entrada)
+
+        claves = filas * max(self.n_incognitas, 1) + columnas
+        unicas, self._mapa_datos = np.unique(claves, return_inverse=True)
+        self._nnz = len(unicas)
+
+        filas_unicas = unicas // max(self.n_incognitas, 1)
+        self._indices = (unicas % max(self.n_incognitas, 1)).astype(np.int32)
+        self._indptr = np.zeros(self.n_incognitas + 1, dtype=np.int32)
+        np.cumsum(
+            np.bincount(filas_unicas, minlength=self.n_incognitas),
+            out=self._indptr[1:]
+        )
+
+    def _matriz(self, pesos: np.ndarray) -> csr_matrix:
+        """
+        Ensambla A21·diag(pesos)·A12 reutilizando el patrón precalculado
+
+        Con pesos de forma (escenarios, tramos) ensambla la matriz diagonal
+        por bloques de todos los escenarios (un bloque por escenario).
+        """
+        pesos = np.atleast_2d(pesos)
+        n_bloques = pesos.shape[0]
+        bloques = np.arange(n_bloques)[:, None]
+
+        datos = np.bincount(
+            (self._mapa_datos[None, :] + bloques * self._nnz).ravel(),
+            weights=(self._signos * pesos[:, self._tramos_patron]).ravel(),
+            minlength=n_bloques * self._nnz
+        )
+        if n_bloques == 1:
+            indices, indptr = self._indices, self._indptr
+        else:
+            indices = (self._indices[None, :] + bloques * self.n_incognitas).ravel()
+            indptr = np.append(
+                (self._indptr[:-1][None, :] + bloques * self._nnz).ravel(),
+                n_bloques * self._nnz
+            )
+        n = n_bloques * self.n_incognitas
+        return csr_matrix((datos, indices, indptr), shape=(n, n))
+
+    def _balance(self, valores: np.ndarray) -> np.ndarray:
+        """A21·valores: entradas menos salidas de cada nudo (por escenario)"""
+        return self._a21 @ valores.T
+
+    def resolver(
+        self,
+        resistencias: np.ndarray,
+        demandas: np.ndarray,
+        cargas_fijas: np.ndarray,
+        caudales_iniciales: np.ndarray,
+        tolerancia: float = 1e-7,
+        max_iteraciones: int = 1000,
+        cargas_iniciales: Optional[np.ndarray] = None,
+        al_iterar: Optional[Callable[[int], None]] = None
+    ) -> ResultadoGradiente:
+        """
+        Itera Newton-Raphson hasta que max|ΔQ| < tolerancia
+
+        - resistencias: r de cada tramo (h_f = r·|Q|^(n-1)·Q)
+        - demandas: q de cada nudo (l/s, solo se usan los de carga desconocida)
+        - cargas_fijas: H0 de cada nudo (m, solo se usan los fijos)
+        - cargas_iniciales: H de partida de los nudos de carga desconocida
+          (arranque en caliente); por defecto, la mayor carga fija
+        - al_iterar: se llama con el número de cada iteración (progreso,
+          cancelación)
+        """
+        return self.resolver_escenarios(
+            resistencias,
+            np.asarray(demandas, dtype=np.float64)[None, :],
+            cargas_fijas,
+            np.asarray(caudales_iniciales, dtype=np.float64)[None, :],
+            tolerancia,
+            max_iteraciones,
+            None if cargas_iniciales is None
+            else np.asarray(cargas_iniciales, dtype=np.float64)[None, :],
+            al_iterar
+        )[0]
+
+    def resolver_escenarios(
+        self,
+        resistencias: np.ndarray,
+        demandas: np.ndarray,
+        cargas_fijas: np.ndarray,
+        caudales_iniciales: np.ndarray,
+        tolerancia: float = 1e-7,
+        max_iteraciones: int = 1000,
+        cargas_iniciales: Optional[np.ndarray] = None,
+        al_iterar: Optional[Callable[[int], None]] = None
+    ) -> List[ResultadoGradiente]:
+        """
+        Resuelve varios escenarios de demanda a la vez sobre la misma topología
+
+        - resistencias: (tramos,) común o (escenarios, tramos)
+        - demandas: (escenarios, nudos)
+        - cargas_fijas: (nudos,) común o (escenarios, nudos)
+        - caudales_iniciales: (escenarios, tramos)
+        - cargas_iniciales: (escenarios, nudos), opcional
+
+        Cada iteración resuelve un único sistema diagonal por bloques con los
+        escenarios que aún no convergen; los que convergen quedan congelados.
+        """
+        n = self.exponente
+        q = np.asarray(demandas, dtype=np.float64)[:, self.incognitas]
+        n_escenarios = q.shape[0]
+        r = np.broadcast_to(
+            np.asarray(resistencias, dtype=np.float64), (n_escenarios, len(self.origen))
+        )
+        cargas_fijas = np.broadcast_to(
+            np.asarray(cargas_fijas, dtype=np.float64), (n_escenarios, self.n_nudos)
+        )
+
+        Q = np.array(caudales_iniciales, dtype=np.float64).reshape(n_escenarios, -1)
+
+        # Se itera con cargas relativas a la mayor carga fija: las pérdidas son
+        # mucho menores que las cotas y así no se pierden en el redondeo
+        referencia = cargas_fijas[:, self.fijos].max(axis=1, initial=0.0)[:, None]
+        H = np.where(self.fijos, cargas_fijas - referencia, 0.0)
+
+        if cargas_iniciales is not None:
+            H[:, self.incognitas] = np.asarray(cargas_iniciales).reshape(
+                n_escenarios, -1
+            )[:, self.incognitas] - referencia
+
+        historiales: List[List[Tuple[float, float]]] = [[] for _ in range(n_escenarios)]
+        convergencia = np.zeros(n_escenarios, dtype=bool)
+        activos = np.arange(n_escenarios)
+
+        for iteracion in range(1, max_iteraciones + 1):
+            if al_iterar is not None:
+                al_iterar(iteracion)
+
+            Qa, Ha = Q[activos], H[activos]
+            Q_abs = np.maximum(np.abs(Qa), self.CAUDAL_MINIMO)
+            potencia = r[activos] * np.power(Q_abs, n - 1)
+
+            # F1 = A11·Q + A12·H + A10·H0  (residuo de energía por tramo)
+            F1 = potencia * Qa + Ha[:, self.destino] - Ha[:, self.origen]
+            # D = ∂(A11·Q)/∂Q
+            D_inv = 1.0 / (n * potencia)
+
+            dH = np.zeros_like(Ha)
+            if self.n_incognitas:
+                # F2 = A21·Q - q  (residuo de continuidad por nudo)
+                F2 = self._balance(Qa)[self.incognitas].T - q[activos]
+                A21_DF1 = self._balance(F1 * D_inv)[self.incognitas].T
+
+                # (A21·D⁻¹·A12)·ΔH = F2 - A21·D⁻¹·F1
+                dH[:, self.incognitas] = spsolve(
+                    self._matriz(D_inv), (F2 - A21_DF1).ravel()
+                ).reshape(len(activos), self.n_incognitas)
+
+            # ΔQ = -D⁻¹·(F1 + A12·ΔH)
+            dQ = -(F1 + dH[:, self.destino] - dH[:, self.origen]) * D_inv
+
+            H[activos] = Ha + dH
+            Q[activos] = Qa + dQ
+
+            abs_dQ = np.abs(dQ)
+            errores = abs_dQ.max(axis=1, initial=0.0)
+            for s, suma, error in zip(activos.tolist(), abs_dQ.sum(axis=1).tolist(), errores.tolist()):
+                historiales[s].append((suma, error))
+
+            convergidos = errores < tolerancia
+            convergencia[activos[convergidos]] = True
+            activos = activos[~convergidos]
+            if not len(activos):
+                break
+
+        H += referencia
+        return [
+            ResultadoGradiente(
+                caudales=Q[s],
+                cargas=H[s],
+                convergencia=bool(convergencia[s]),
+                historial=historiales[s]
+            )
+            for s in range(n_escenarios)
+        ]
+
+
+def verificar_conexion_fuentes(red: RedCompacta):
+    """
+    Verifica que todo nudo esté conectado a alguna fuente de carga fija
+
+    Lanza ValueError con los códigos de los nudos aislados.
+    """
+    from scipy.sparse.csgraph import connected_components
+
+    grafo = csr_matrix(
+        (np.ones(red.n_tramos), (red.origen, red.destino)),
+        shape=(red.n_nudos, red.n_nudos)
+    )
+    _, componente = connected_components(grafo, directed=False)
+
+    con_fuente = np.zeros(componente.max(initial=0) + 1, dtype=bool)
+    con_fuente[componente[red.es_fuente]] = True
+
+    aislados = [red.codigos_nudos[i] for i in np.flatnonzero(~con_fuente[componente]).tolist()]
+    if aislados:
+        raise ValueError(
+            f"Nudos sin conexión a una fuente de carga fija: {', '.join(aislados)}"
+        )
+
+
+class EvaluadorDiametros:
+    """
+    Cargas piezométricas de muchas variantes de diámetros de una misma red
+
+    Pensado para el algoritmo genético, que evalúa miles de combinaciones de
+    diámetros sobre la misma topología y las mismas demandas. El
+    SolverGradiente (incidencia y patrón disperso) se construye una sola vez;
+    cada lote de variantes se resuelve como un sistema diagonal por bloques
+    (una variante por bloque) y arranca en caliente desde los caudales de la
+    última variante que convergió. En el gradiente las cargas de cada
+    iteración dependen solo de los caudales, así que basta con arrancar
+    desde ellos: en redes abiertas los caudales no dependen de los diámetros
+    y cada variante converge en una o dos iteraciones.
+    """
+
+    def __init__(
+        self,
+        red: RedCompacta,
+        coef_hazen_williams: float = 10.674,
+        exponente_hw: float = 1.852,
+        tolerancia: float = 1e-6,
+        max_iteraciones: int = 50,
+        lote: int = 64
+    ):
+        if not red.es_fuente.any():
+            raise ValueError(
+                "La evaluación hidráulica requiere al menos un nudo de carga fija "
+                "(cisterna, reservorio o tanque elevado)"
+            )
+        verificar_conexion_fuentes(red)
+
+        self.red = red
+        self.tolerancia = tolerancia
+        self.max_iteraciones = max_iteraciones
+        self.lote = max(1, lote)
+        self.solver = SolverGradiente(
+            n_nudos=red.n_nudos,
+            origen=red.origen,
+            destino=red.destino,
+            fijos=red.es_fuente,
+            exponente=exponente_hw
+        )
+
+        # r = r_unitaria / D^4.8704 (Hazen-Williams, igual que el motor)
+        self._r_unitaria = coef_hazen_williams * red.longitud / np.power(red.coef_hw, exponente_hw)
+
+        # Arranque en frío: caudal uniforme, demanda total / número de tramos
+        self.caudales_arranque = np.full(
+            red.n_tramos, red.demanda.sum() / max(red.n_tramos, 1), dtype=np.float64
+        )
+
+        # Métricas
+        self.variantes = 0
+        self.iteraciones = 0
+
+    def resolver(self, diametros: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Resuelve cada fila de `diametros` (variantes, tramos), en mm
+
+        Returns:
+        - cargas: (variantes, nudos) m
+        - convergencia: bool por variante
+        """
+        diametros = np.atleast_2d(np.asarray(diametros, dtype=np.float64))
+        n_variantes = diametros.shape[0]
+        cargas = np.empty((n_variantes, self.red.n_nudos))
+        convergencia = np.zeros(n_variantes, dtype=bool)
+
+        for inicio in range(0, n_variantes, self.lote):
+            bloque = diametros[inicio:inicio + self.lote]
+            n = len(bloque)
+            with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+                resultados = self.solver.resolver_escenarios(
+                    resistencias=self._r_unitaria / np.power(bloque, 4.8704),
+                    demandas=np.broadcast_to(self.red.demanda, (n, self.red.n_nudos)),
+                    cargas_fijas=self.red.elevacion,
+                    caudales_iniciales=np.broadcast_to(self.caudales_arranque, (n, self.red.n_tramos)),
+                    tolerancia=self.tolerancia,
+                    max_iteraciones=self.max_iteraciones
+                )
+
+            for k, resultado in enumerate(resultados):
+                cargas[inicio + k] = resultado.cargas
+                convergencia[inicio + k] = resultado.convergencia and np.isfinite(resultado.cargas).all()
+                self.iteraciones += len(resultado.historial)
+
+            # Arranque en caliente del siguiente lote
+            convergidos = np.flatnonzero(convergencia[inicio:inicio + n])
+            if len(convergidos):
+                self.caudales_arranque = resultados[convergidos[0]].caudales.copy()
+
+        self.variantes += n_variantes
+        return cargas, convergencia
+
+
 class MotorHidraulico:
     """
     Motor de Cálculo Hidráulico Híbrido
@@ -65,43 +507,62 @@ class MotorHidraulico:
     - Redes Cerradas (Mallas): Método de Hardy Cross
     - Redes Abiertas: Balance de masa y energía
     - Redes Mixtas: Algoritmo híbrido
+
+    Todos los solvers trabajan sobre una RedCompacta (arreglos por nudo y por
+    tramo). Si el motor se crea con diccionarios de Nudo/Tramo, la red se
+    construye a partir de ellos y los resultados se vuelcan de vuelta al
+    terminar cada cálculo.
     """
     
     def __init__(
         self,
-        nudos: Dict[UUID, Nudo],
-        tramos: Dict[UUID, Tramo],
+        nudos: Optional[Dict[UUID, Nudo]] = None,
+        tramos: Optional[Dict[UUID, Tramo]] = None,
         tolerancia: float = 1e-7,
         max_iteraciones: int = 1000,
         coef_hazen_williams: float = 10.674,
-        exponente_hw: float = 1.852
+        exponente_hw: float = 1.852,
+        modo_mallas: str = "fundamental",
+        red: Optional[RedCompacta] = None
     ):
-        self.nudos = nudos
-        self.tramos = tramos
+        self.nudos = nudos if nudos is not None else {}
+        self.tramos = tramos if tramos is not None else {}
+        self.red = red if red is not None else RedCompacta.desde_dataclasses(self.nudos, self.tramos)
+        self.adyacencia = self.red.adyacencia
         self.tolerancia = tolerancia
         self.max_iteraciones = max_iteraciones
         self.coef_hazen_williams = coef_hazen_williams
         self.exponente_hw = exponente_hw
+        self.modo_mallas = modo_mallas
+        self.base_mallas = "fundamental"
+
+        # Resultados por nudo y por tramo
+        self.cotas = np.zeros(self.red.n_nudos)  # m
+        self.presiones = np.zeros(self.red.n_nudos)  # m.c.a.
+        self.caudales = np.zeros(self.red.n_tramos)  # l/s
+        self.velocidades = np.zeros(self.red.n_tramos)  # m/s
+        self.perdidas = np.zeros(self.red.n_tramos)  # m
         
         # Detectar tipo de red
         self.tipo_red = self._detectar_tipo_red()
-        
+
         # Identificar mallas
         self.mallas = self._identificar_mallas()
+        self._construir_incidencia_mallas()
+        self.peso_mallas = self._calcular_peso_mallas()
         
         # Historial de iteraciones
         self.historial_iteraciones: List[ResultadoIteracion] = []
-        
+
+        # Se llama con el número de cada iteración de los solvers (progreso, cancelación)
+        self.al_iterar: Optional[Callable[[int], None]] = None
+
+        # Arranque en caliente: caudales (y máscara de tramos con valor) y cotas previas
+        self._caudales_arranque: Optional[Tuple[np.ndarray, np.ndarray]] = None
+        self._cotas_arranque: Optional[np.ndarray] = None
+
     def _detectar_tipo_red(self) -> str:
         """Detecta el tipo de red basado en la topología"""
-        # Usar teoría de grafos para detectar ciclos
-        nudos_ids = set(self.nudos.keys())
-        tramos_conectados = set()
-        
-        for tramo in self.tramos.values():
-            tramos_conectados.add(tramo.nudo_origen_id)
-            tramos_conectados.add(tramo.nudo_destino_id)
-        
         # Si todos los nudos están conectados pero hay ciclos -> cerrada
         # Si hay nudos de demanda terminal -> abierta
         # Si ambas -> mixta
@@ -113,61 +574,119 @@ class MotorHidraulico:
         """
         Identifica las mallas en la red usando teoría de grafos
         Elimina necesidad de entrada manual de "otros circuitos"
+
+        Modos:
+        - "fundamental": base fundamental sobre un árbol generador, O(N + E)
+        - "corta": base de mallas cortas (menor peso total en longitud),
+          que acelera la convergencia de Hardy Cross. Usa las caras del
+          trazado planar si todos los nudos tienen coordenadas; si no,
+          o si el trazado no es planar, la base de peso mínimo de Horton
+          (hasta HORTON_TRABAJO_MAXIMO nudos × tramos; en redes mayores,
+          la fundamental)
         """
-        # Construir grafo
-        from collections import defaultdict, deque
-        
-        grafo = defaultdict(list)
-        for tramo in self.tramos.values():
-            grafo[tramo.nudo_origen_id].append(tramo.nudo_destino_id)
-            grafo[tramo.nudo_destino_id].append(tramo.nudo_origen_id)
-        
-        # Encontrar ciclos usando DFS
-        visitados = set()
+        if self.modo_mallas == "corta":
+            mallas = self._base_mallas_corta()
+            if mallas is not None:
+                return mallas
+
+        self.base_mallas = "fundamental"
+        return self._base_mallas_fundamental()
+
+    def _base_mallas_corta(self) -> Optional[List[Malla]]:
+        """Base de mallas cortas: caras planares o Horton"""
+        red = self.red
+        aristas = list(zip(red.origen.tolist(), red.destino.tolist()))
+        esperadas = rango_ciclos(aristas)
+
+        ciclos = None
+        if red.tiene_coordenadas:
+            coordenadas = dict(enumerate(map(tuple, red.coordenadas.tolist())))
+            ciclos = base_caras_planares(aristas, coordenadas, esperadas)
+            self.base_mallas = "caras_planares"
+
+        if ciclos is None:
+            ciclos = base_horton(aristas, red.longitud.tolist(), esperadas)
+            self.base_mallas = "horton"
+            if ciclos is None or len(ciclos) != esperadas:
+                return None
+
+        return [self._crear_malla(i, nudos, indices) for i, (nudos, indices) in enumerate(ciclos)]
+
+    def _crear_malla(self, numero: int, nudos: List[int], indices: List[int]) -> Malla:
+        """Malla a partir de índices enteros de nudos y tramos"""
+        return Malla(
+            id=f"M-{numero}",
+            tramos=[self.red.codigos_tramos[j] for j in indices],
+            nudos_circunferenciales=[self.red.ids_nudos[i] for i in nudos],
+            indices_tramos=list(indices),
+            indices_nudos=list(nudos)
+        )
+
+    def _calcular_peso_mallas(self) -> float:
+        """Peso de la base de mallas: suma de longitudes de sus tramos (m)"""
+        return float(self.red.longitud[self._tramos_mallas].sum())
+
+    def _base_mallas_fundamental(self) -> List[Malla]:
+        """
+        Construye una base fundamental de ciclos: un árbol generador (BFS)
+        por componente y una malla por cada tramo que no pertenece al árbol.
+        Se obtienen exactamente E - N + C mallas independientes en
+        O(N + E) más el tamaño de las mallas generadas.
+        """
+        from collections import deque
+
+        # Vecindad CSR sin sentido: nudo -> (vecino, tramo)
+        ptr, vecinos, via = (a.tolist() for a in self.red.adyacencia.no_dirigida())
+        origen = self.red.origen.tolist()
+        destino = self.red.destino.tolist()
+        n = self.red.n_nudos
+
+        # Árbol generador por BFS: padre, tramo hacia el padre y profundidad
+        padre = [-1] * n
+        tramo_padre = [-1] * n
+        profundidad = [-1] * n
+        en_arbol = [False] * len(origen)
+
+        for raiz in range(n):
+            if profundidad[raiz] >= 0:
+                continue
+            profundidad[raiz] = 0
+            cola = deque([raiz])
+            while cola:
+                vertice = cola.popleft()
+                for k in range(ptr[vertice], ptr[vertice + 1]):
+                    vecino = vecinos[k]
+                    if profundidad[vecino] < 0:
+                        padre[vecino] = vertice
+                        tramo_padre[vecino] = via[k]
+                        profundidad[vecino] = profundidad[vertice] + 1
+                        en_arbol[via[k]] = True
+                        cola.append(vecino)
+
+        # Cada tramo fuera del árbol cierra una malla fundamental
         mallas = []
-        malla_id = 0
-        
-        def dfs(vertice, padre, camino):
-            nonlocal malla_id
-            visitados.add(vertice)
-            camino.append(vertice)
-            
-            for vecino in grafo[vertice]:
-                if vecino == padre:
-                    continue
-                if vecino in camino:
-                    # Encontró un ciclo
-                    idx_inicio = camino.index(vecino)
-                    ciclo = camino[idx_inicio:]
-                    
-                    if len(ciclo) >= 3:  # Malla válida
-                        codigos_tramos = []
-                        for i in range(len(ciclo)):
-                            origen = ciclo[i]
-                            destino = ciclo[(i + 1) % len(ciclo)]
-                            
-                            # Buscar tramo
-                            for t in self.tramos.values():
-                                if (t.nudo_origen_id == origen and t.nudo_destino_id == destino) or \
-                                   (t.nudo_destino_id == origen and t.nudo_origen_id == destino):
-                                    codigos_tramos.append(t.codigo)
-                                    break
-                        
-                        mallas.append(Malla(
-                            id=f"M-{malla_id}",
-                            tramos=codigos_tramos,
-                            nudos_circunferenciales=ciclo
-                        ))
-                        malla_id += 1
-                elif vecino not in visitados:
-                    dfs(vecino, vertice, camino)
-            
-            camino.pop()
-        
-        for nudo in self.nudos.keys():
-            if nudo not in visitados:
-                dfs(nudo, None, [])
-        
+        for j, (u, v) in enumerate(zip(origen, destino)):
+            if en_arbol[j] or u == v:
+                continue
+
+            subida_u, tramos_u = [u], []
+            subida_v, tramos_v = [v], []
+
+            # Subir ambos extremos hasta el ancestro común
+            while subida_u[-1] != subida_v[-1]:
+                if profundidad[subida_u[-1]] >= profundidad[subida_v[-1]]:
+                    tramos_u.append(tramo_padre[subida_u[-1]])
+                    subida_u.append(padre[subida_u[-1]])
+                else:
+                    tramos_v.append(tramo_padre[subida_v[-1]])
+                    subida_v.append(padre[subida_v[-1]])
+
+            # Recorrido u -> ancestro -> v, cerrando con el tramo v -> u
+            ciclo = subida_u + subida_v[-2::-1]
+            indices = tramos_u + tramos_v[::-1] + [j]
+
+            mallas.append(self._crear_malla(len(mallas), ciclo, indices))
+
         return mallas
     
     def calcular_perdida_hazen_williams(
@@ -229,11 +748,30 @@ class MotorHidraulico:
             return 0.0
         
         return Q_m3s / area
+
+    def _perdidas_hazen_williams(self, caudales: np.ndarray) -> np.ndarray:
+        """Versión vectorial de calcular_perdida_hazen_williams (nula si Q <= 0)"""
+        red = self.red
+        with np.errstate(over="ignore", invalid="ignore", divide="ignore"):
+            hf = 10.674 * np.power(np.maximum(caudales, 0.0), 1.852) * red.longitud / (
+                np.power(red.coef_hw, 1.852) * np.power(red.diametro, 4.8704)
+            )
+        return np.where(caudales > 0, hf, 0.0)
+
+    def _velocidades(self, caudales: np.ndarray) -> np.ndarray:
+        """Versión vectorial de calcular_velocidad (nula si D <= 0)"""
+        D_m = self.red.diametro / 1000.0
+        with np.errstate(over="ignore", invalid="ignore", divide="ignore"):
+            velocidad = (caudales / 1000.0) / (3.14159 * D_m * D_m / 4.0)
+        return np.where(self.red.diametro > 0, velocidad, 0.0)
     
     def metodo_hardy_cross(self) -> Tuple[bool, float]:
         """
         Implementa el Método de Hardy Cross para redes cerradas
-        
+
+        Cada iteración corrige todas las mallas a la vez con operaciones
+        vectoriales sobre la matriz de incidencia malla-tramo.
+
         Retorna:
         - convergencia: bool
         - error_final: float
@@ -246,129 +784,400 @@ class MotorHidraulico:
         for malla in self.mallas:
             print(f"  - {malla.id}: {len(malla.tramos)} tramos")
         print()
-        
+
         # Inicializar caudales (distribución inicial)
-        self._distribuir_caudales_iniciales()
-        
-        # Iteraciones
-        for iteracion in range(self.max_iteraciones):
-            print(f"Iteración {iteracion + 1}...")
-            
-            correcciones_mallas = {}
-            error_maximo = 0.0
-            
-            # Para cada malla, calcular corrección
-            for malla in self.mallas:
-                Q_correccion = self._calcular_correccion_malla(malla)
-                correcciones_mallas[malla.id] = Q_correccion
-                
-                error_maximo = max(error_maximo, abs(Q_correccion))
-            
-            # Aplicar correcciones
-            self._aplicar_correcciones(correcciones_mallas)
-            
+        self._distribuir_caudales_iniciales(solo_mallas=True)
+
+        def registrar(iteracion: int, correcciones: np.ndarray, errores: np.ndarray):
+            print(f"Iteración {iteracion}...")
+            valores = correcciones[0].tolist()
+            error_maximo = float(errores[0])
+
             # Guardar iteración
-            resultado = ResultadoIteracion(
-                iteracion=iteracion + 1,
-                delta_q=sum(abs(c) for c in correcciones_mallas.values()),
+            self.historial_iteraciones.append(ResultadoIteracion(
+                iteracion=iteracion,
+                delta_q=sum(abs(c) for c in valores),
                 error_maximo=error_maximo,
                 convergencia_alcanzada=error_maximo < self.tolerancia,
-                correcciones_por_malla=correcciones_mallas
-            )
-            self.historial_iteraciones.append(resultado)
-            
+                correcciones_por_malla={
+                    malla.id: valor for malla, valor in zip(self.mallas, valores)
+                }
+            ))
             print(f"  Error máximo: {error_maximo:.10f}")
-            
-            if error_maximo < self.tolerancia:
-                print(f"\n✓ CONVERGENCIA ALCANZADA en {iteracion + 1} iteraciones")
-                return True, error_maximo
-        
-        print(f"\n✗ NO SE ALCANZÓ CONVERGENCIA después de {self.max_iteraciones} iteraciones")
-        return False, error_maximo
-    
-    def _distribuir_caudales_iniciales(self):
-        """Distribuye caudales iniciales por balance de masa"""
+
+        Q = self.caudales[None, :]
+        convergencia, _, errores = self._iterar_hardy_cross(Q, registrar)
+        convergencia, error_maximo = bool(convergencia[0]), float(errores[0])
+
+        self._parametros_mallas(Q, self.perdidas[None, :], self.velocidades[None, :])
+        self._volcar_resultados()
+
+        if convergencia:
+            print(f"\n✓ CONVERGENCIA ALCANZADA en {len(self.historial_iteraciones)} iteraciones")
+        else:
+            print(f"\n✗ NO SE ALCANZÓ CONVERGENCIA después de {self.max_iteraciones} iteraciones")
+        return convergencia, error_maximo
+
+    def _iterar_hardy_cross(
+        self,
+        Q: np.ndarray,
+        registrar: Optional[Callable[[int, np.ndarray, np.ndarray], None]] = None
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Itera Hardy Cross sobre Q de forma (escenarios, tramos), in-place
+
+        Los escenarios que convergen dejan de corregirse, de modo que cada uno
+        termina igual que si se resolviera por separado.
+
+        Retorna (convergencia, iteraciones, error_final) por escenario.
+        """
+        red = self.red
+        L = red.longitud
+
+        # Constantes por tramo: K = L / (C^1.852 * D^4.8704)
+        denominador = np.power(red.coef_hw, 1.852) * np.power(red.diametro, 4.8704)
+        K = L / denominador
+
+        n_escenarios = Q.shape[0]
+        activos = np.ones(n_escenarios, dtype=bool)
+        iteraciones = np.zeros(n_escenarios, dtype=np.int64)
+        errores = np.zeros(n_escenarios)
+
+        # Iteraciones
+        for iteracion in range(1, self.max_iteraciones + 1):
+            if self.al_iterar is not None:
+                self.al_iterar(iteracion)
+
+            # Para cada malla, calcular corrección
+            correcciones = self._calcular_correcciones(Q, L, K, denominador)
+            correcciones[~activos] = 0.0
+            error = np.abs(correcciones).max(axis=1, initial=0.0)
+
+            # Aplicar correcciones
+            self._aplicar_correcciones(Q, correcciones)
+
+            errores[activos] = error[activos]
+            iteraciones[activos] = iteracion
+            if registrar is not None:
+                registrar(iteracion, correcciones, error)
+
+            activos &= ~(error < self.tolerancia)
+            if not activos.any():
+                break
+
+        return ~activos, iteraciones, errores
+
+    def arranque_en_caliente(
+        self,
+        caudales: Dict[UUID, float],
+        cotas: Optional[Dict[UUID, float]] = None,
+        cobertura_minima: float = 0.0
+    ) -> float:
+        """
+        Toma los resultados de un cálculo anterior como punto de partida
+
+        Los caudales (y cotas) se asignan por id de tramo (y de nudo); los ids
+        que ya no existen se ignoran y los tramos nuevos parten del reparto
+        uniforme. Solo se aplica si la fracción de tramos con caudal previo
+        alcanza `cobertura_minima`.
+
+        Retorna la cobertura (fracción de tramos con caudal previo).
+        """
+        red = self.red
+        previos = np.zeros(red.n_tramos)
+        con_valor = np.zeros(red.n_tramos, dtype=bool)
+        for tramo_id, caudal in caudales.items():
+            j = red.indice_tramo.get(tramo_id)
+            if j is not None:
+                previos[j] = caudal
+                con_valor[j] = True
+
+        cobertura = float(con_valor.mean()) if red.n_tramos else 0.0
+        if not con_valor.any() or cobertura < cobertura_minima:
+            self._caudales_arranque = self._cotas_arranque = None
+            return cobertura
+
+        self._caudales_arranque = (previos, con_valor)
+        self._cotas_arranque = None
+        if cotas:
+            self._cotas_arranque = np.full(red.n_nudos, np.nan)
+            for nudo_id, cota in cotas.items():
+                i = red.indice_nudo.get(nudo_id)
+                if i is not None:
+                    self._cotas_arranque[i] = cota
+
+        return cobertura
+
+    def _distribuir_caudales_iniciales(self, solo_mallas: bool = False):
+        """
+        Distribuye caudales iniciales por balance de masa
+
+        Con arranque en caliente se parte de los caudales previos. Hardy Cross
+        solo modifica caudales a lo largo de las mallas, por lo que con
+        `solo_mallas` se toma únicamente la parte de la diferencia con el
+        reparto uniforme que es combinación de mallas (mínimos cuadrados):
+        converge a la misma solución que sin arranque, en menos iteraciones.
+        """
         # Por ahora, distribución uniforme basada en demanda total
         # TODO: Implementar distribución más sofisticada
-        
-        total_demanda = sum(n.demanda for n in self.nudos.values())
-        
-        for tramo in self.tramos.values():
+        self.caudales[:] = self._caudales_iniciales(self.red.demanda[None, :])[0]
+
+        if self._caudales_arranque is None:
+            return
+
+        previos, con_valor = self._caudales_arranque
+        diferencia = np.where(con_valor, previos - self.caudales, 0.0)
+        if not solo_mallas:
+            self.caudales += diferencia
+        elif self.mallas:
+            # min ||Mᵀ·c - d||  =>  (M·Mᵀ)·c = M·d
+            M = self._incidencia_mallas
+            circulacion = np.atleast_1d(spsolve((M @ M.T).tocsc(), M @ diferencia))
+            if np.isfinite(circulacion).all():
+                self.caudales += M.T @ circulacion
+
+    def _caudales_iniciales(self, demandas: np.ndarray) -> np.ndarray:
+        """Caudal inicial uniforme por escenario: demanda total / número de tramos"""
+        caudales = np.zeros((demandas.shape[0], self.red.n_tramos))
+        if self.red.n_tramos:
             # Asumir caudal inicial proporcional a demanda
-            tramo.caudal = total_demanda / len(self.tramos)
-    
-    def _calcular_correccion_malla(self, malla: Malla) -> float:
+            caudales[:] = demandas.sum(axis=1)[:, None] / self.red.n_tramos
+        return caudales
+
+    def _construir_incidencia_mallas(self):
         """
-        Calcula la corrección de caudal para una malla
-        
+        Construye la incidencia malla-tramo en formato CSR
+
+        Las entradas de cada malla conservan el orden de `malla.tramos`, de modo
+        que las sumas por malla se acumulan en el mismo orden que la tabla
+        académica. `_signos_mallas` guarda el sentido de cada tramo respecto
+        al recorrido de la malla (+1 si coincide con origen -> destino).
+        """
+        red = self.red
+        indice_codigo: Dict[str, int] = {}
+        for j, codigo in enumerate(red.codigos_tramos):
+            indice_codigo.setdefault(codigo, j)
+
+        indptr = [0]
+        indices: List[int] = []
+        nudos_recorrido: List[int] = []
+
+        for malla in self.mallas:
+            if malla.indices_tramos:
+                indices.extend(malla.indices_tramos)
+                nudos_recorrido.extend(malla.indices_nudos)
+            else:
+                ciclo = malla.nudos_circunferenciales
+                for k, codigo in enumerate(malla.tramos):
+                    j = indice_codigo.get(codigo)
+                    if j is None:
+                        continue
+                    indices.append(j)
+                    nudos_recorrido.append(
+                        red.indice_nudo.get(ciclo[k], -1) if k < len(ciclo) else -1
+                    )
+            indptr.append(len(indices))
+
+        self._tramos_mallas = np.array(indices, dtype=np.int64)
+        signos = np.where(
+            red.origen[self._tramos_mallas] == np.array(nudos_recorrido, dtype=np.int64), 1.0, -1.0
+        )
+
+        forma = (len(self.mallas), red.n_tramos)
+        self._indptr_mallas = np.array(indptr, dtype=np.int64)
+        self._mallas_entrada = np.repeat(
+            np.arange(len(self.mallas)), np.diff(self._indptr_mallas)
+        )
+        self._incidencia_mallas = csr_matrix(
+            (np.ones(len(indices)), self._tramos_mallas, self._indptr_mallas), shape=forma
+        )
+        self._signos_mallas = csr_matrix(
+            (signos, self._tramos_mallas, self._indptr_mallas), shape=forma
+        )
+
+    def _calcular_correcciones(
+        self,
+        Q: np.ndarray,
+        L: np.ndarray,
+        K: np.ndarray,
+        denominador: np.ndarray
+    ) -> np.ndarray:
+        """
+        Calcula la corrección de caudal de todas las mallas (y escenarios) a la vez
+
         ΔQ = - Σ(h_f) / Σ(n * Q^(n-1) * K)
-        
+
         Donde:
         - h_f = pérdida de carga en el tramo
-        - Q = caudal en el tramo
+        - Q = caudal en el tramo, de forma (escenarios, tramos)
         - n = 1.852 para Hazen-Williams
         - K = constante del tramo (L / (C^1.852 * D^4.8704))
         """
-        suma_hf = 0.0
-        suma_nQ_n1K = 0.0
-        
-        for codigo_tramo in malla.tramos:
-            tramo = next((t for t in self.tramos.values() if t.codigo == codigo_tramo), None)
-            if tramo is None:
-                continue
-            
-            Q = abs(tramo.caudal)
-            D = tramo.diametro
-            L = tramo.longitud
-            C = tramo.coef_hazen_williams
-            
-            # Pérdida de carga (considerar signo)
-            hf = self.calcular_perdida_hazen_williams(Q, D, L, C)
-            
-            # Determinar dirección del flujo para el signo
-            # (simplificado: asumir flujo en dirección de la malla)
-            suma_hf += hf
-            
+        Q_abs = np.abs(Q)
+        n = self.exponente_hw
+
+        with np.errstate(over="ignore", invalid="ignore"):
+            # Pérdida de carga (simplificado: asumir flujo en dirección de la malla)
+            hf = 10.674 * np.power(Q_abs, 1.852) * L / denominador
             # Denominador: n * Q^(n-1) * K
-            K = L / (pow(C, 1.852) * pow(D, 4.8704))
-            n = self.exponente_hw
-            suma_nQ_n1K += n * pow(Q, n - 1) * K
-        
-        if suma_nQ_n1K == 0:
-            return 0.0
-        
-        # Corrección
-        delta_q = -suma_hf / suma_nQ_n1K
-        
-        return delta_q
-    
-    def _aplicar_correcciones(self, correcciones: Dict[str, float]):
-        """Aplica las correcciones de caudal a los tramos"""
-        for malla in self.mallas:
-            delta_q = correcciones.get(malla.id, 0.0)
-            
-            for codigo_tramo in malla.tramos:
-                tramo = next((t for t in self.tramos.values() if t.codigo == codigo_tramo), None)
-                if tramo is None:
-                    continue
-                
-                # Actualizar caudal (signo según dirección de la malla)
-                tramo.caudal += delta_q
-                
-                # Recalcular pérdida de carga y velocidad
-                if tramo.caudal != 0:
-                    tramo.perdida_carga = self.calcular_perdida_hazen_williams(
-                        tramo.caudal, tramo.diametro, tramo.longitud, tramo.coef_hazen_williams
-                    )
-                    tramo.velocidad = self.calcular_velocidad(
-                        abs(tramo.caudal), tramo.diametro
-                    )
-                else:
-                    tramo.velocidad = 0.0
-    
+            nQ_n1K = n * np.power(Q_abs, n - 1) * K
+
+            suma_hf = (self._incidencia_mallas @ hf.T).T
+            suma_nQ_n1K = (self._incidencia_mallas @ nQ_n1K.T).T
+
+            correcciones = np.zeros(suma_hf.shape)
+            validas = suma_nQ_n1K != 0
+            correcciones[validas] = -suma_hf[validas] / suma_nQ_n1K[validas]
+
+        return correcciones
+
+    def _aplicar_correcciones(self, Q: np.ndarray, correcciones: np.ndarray):
+        """
+        Aplica las correcciones de caudal a los tramos (in-place)
+
+        `np.add.at` suma malla por malla en orden, igual que la corrección
+        secuencial de la tabla académica.
+        """
+        np.add.at(Q.T, self._tramos_mallas, correcciones[:, self._mallas_entrada].T)
+
+    def _parametros_mallas(self, Q: np.ndarray, perdidas: np.ndarray, velocidades: np.ndarray):
+        """Actualiza pérdida de carga y velocidad de los tramos de malla (in-place)"""
+        en_malla = np.zeros(self.red.n_tramos, dtype=bool)
+        en_malla[self._tramos_mallas] = True
+
+        # Pérdida de carga con el caudal con signo (nula si Q <= 0)
+        hf = self._perdidas_hazen_williams(Q)
+        velocidad = self._velocidades(np.abs(Q))
+
+        con_flujo = en_malla & (Q != 0)
+        perdidas[con_flujo] = hf[con_flujo]
+        velocidades[:, en_malla] = np.where(con_flujo, velocidad, 0.0)[:, en_malla]
+
+    def _volcar_resultados(self):
+        """Vuelca los arreglos de resultados a los dataclasses Nudo/Tramo, si existen"""
+        if self.nudos:
+            for nudo_id, cota, presion in zip(
+                self.red.ids_nudos, self.cotas.tolist(), self.presiones.tolist()
+            ):
+                nudo = self.nudos[nudo_id]
+                nudo.cota_agua = cota
+                nudo.presion_calc = presion
+
+        if self.tramos:
+            for tramo_id, caudal, velocidad, perdida in zip(
+                self.red.ids_tramos,
+                self.caudales.tolist(),
+                self.velocidades.tolist(),
+                self.perdidas.tolist()
+            ):
+                tramo = self.tramos[tramo_id]
+                tramo.caudal = caudal
+                tramo.velocidad = velocidad
+                tramo.perdida_carga = perdida
+
+    def metodo_gradiente(self) -> Tuple[bool, float]:
+        """
+        Implementa el Método del Gradiente Global (Todini-Pilati)
+
+        Resuelve todas las cargas y caudales a la vez mediante Newton-Raphson
+        sobre la matriz de incidencia nudo-tramo (convergencia cuadrática).
+        Los nudos fuente (cisterna, reservorio, tanque elevado) son de carga fija.
+
+        Retorna:
+        - convergencia: bool
+        - error_final: float
+        """
+        print("=" * 60)
+        print("MÉTODO DEL GRADIENTE GLOBAL (Todini-Pilati)")
+        print("=" * 60)
+        print(f"Tolerancia: {self.tolerancia}")
+        print(f"Nudos: {self.red.n_nudos}, Tramos: {self.red.n_tramos}")
+        print()
+
+        red = self.red
+        if not red.es_fuente.any():
+            raise ValueError(
+                "El método del gradiente requiere al menos un nudo de carga fija "
+                "(cisterna, reservorio o tanque elevado)"
+            )
+
+        self._verificar_conexion_fuentes()
+
+        self._distribuir_caudales_iniciales()
+
+        solver = SolverGradiente(
+            n_nudos=red.n_nudos,
+            origen=red.origen,
+            destino=red.destino,
+            fijos=red.es_fuente,
+            exponente=self.exponente_hw
+        )
+        cargas_iniciales = None
+        if self._cotas_arranque is not None:
+            cargas_iniciales = np.where(
+                np.isnan(self._cotas_arranque),
+                red.elevacion[red.es_fuente].max(),
+                self._cotas_arranque
+            )
+
+        resultado = solver.resolver(
+            resistencias=self._resistencias(),
+            demandas=red.demanda,
+            cargas_fijas=red.elevacion,
+            caudales_iniciales=self.caudales,
+            tolerancia=self.tolerancia,
+            max_iteraciones=self.max_iteraciones,
+            cargas_iniciales=cargas_iniciales,
+            al_iterar=self.al_iterar
+        )
+
+        for numero, (delta_q, error_maximo) in enumerate(resultado.historial, start=1):
+            self.historial_iteraciones.append(ResultadoIteracion(
+                iteracion=numero,
+                delta_q=delta_q,
+                error_maximo=error_maximo,
+                convergencia_alcanzada=error_maximo < self.tolerancia
+            ))
+            print(f"Iteración {numero}: Error máximo: {error_maximo:.10f}")
+
+        # Volcar resultados a las estructuras del motor
+        self.caudales[:] = resultado.caudales
+        self.cotas[:] = resultado.cargas
+
+        self._recalcular_parametros()
+        self._volcar_resultados()
+
+        error = resultado.historial[-1][1] if resultado.historial else 0.0
+        if resultado.convergencia:
+            print(f"\n✓ CONVERGENCIA ALCANZADA en {len(resultado.historial)} iteraciones")
+        else:
+            print(f"\n✗ NO SE ALCANZÓ CONVERGENCIA después de {self.max_iteraciones} iteraciones")
+
+        return resultado.convergencia, error
+
+    def _resistencias(self) -> np.ndarray:
+        """
+        Resistencia r de cada tramo para h_f = r·Q^n (Hazen-Williams)
+
+        r = 10.674 · L / (C^1.852 · D^4.8704)
+        """
+        red = self.red
+        return self.coef_hazen_williams * red.longitud / (
+            np.power(red.coef_hw, self.exponente_hw) * np.power(red.diametro, 4.8704)
+        )
+
+    def _verificar_conexion_fuentes(self):
+        """Verifica que todo nudo esté conectado a alguna fuente de carga fija"""
+        verificar_conexion_fuentes(self.red)
+
     def calcular_red_abierta(self) -> Dict:
         """
         Calcula una red abierta (ramales) por balance determinístico
+
+        Sobre el árbol BFS desde las fuentes:
+        1. Recorrido inverso: el caudal de cada tramo es la demanda
+           acumulada del subárbol aguas abajo
+        2. Recorrido directo: cota piezométrica = cota del nudo anterior - h_f
         
         Returns:
         - Dict con resultados de presiones y caudales
@@ -376,86 +1185,103 @@ class MotorHidraulico:
         print("=" * 60)
         print("CÁLCULO DE RED ABIERTA")
         print("=" * 60)
-        
-        # Ordenar nudos por distancia desde la fuente (BFS)
-        nudos_ordenados = self._ordenar_nudos_bfs()
-        
-        # Calcular desde la fuente hacia los terminales
-        resultados = {}
-        
-        for nudo_id in nudos_ordenados:
-            nudo = self.nudos[nudo_id]
-            
-            # Encontrar tramos conectados
-            tramos_entrada = [t for t in self.tramos.values() if t.nudo_destino_id == nudo_id]
-            tramos_salida = [t for t in self.tramos.values() if t.nudo_origen_id == nudo_id]
-            
-            if not tramos_entrada:
-                # Nudo fuente - usar elevación已知
-                nudo.cota_agua = nudo.elevacion
-            else:
-                # Calcular basándose en el tramo de entrada
-                tramo_ent = tramos_entrada[0]
-                
-                # Pérdida de carga
-                hf = self.calcular_perdida_hazen_williams(
-                    tramo_ent.caudal, tramo_ent.diametro, 
-                    tramo_ent.longitud, tramo_ent.coef_hazen_williams
-                )
-                
-                # Cota de agua = cota del nudo anterior - pérdida
-                nudo_anterior = self.nudos[tramo_ent.nudo_origen_id]
-                nudo.cota_agua = nudo_anterior.cota_agua - hf
-            
-            # Presión = cota de agua - elevación
-            nudo.presion_calc = nudo.cota_agua - nudo.elevacion
-            
-            # Calcular caudales de salida
-            for tramo in tramos_salida:
-                if nudo.tipo == "consumo":
-                    tramo.caudal = nudo.demanda
-                else:
-                    tramo.caudal = sum(
-                        t.caudal for t in tramos_salida if t != tramo
-                    ) + sum(
-                        n.demanda for n in self.nudos.values() 
-                        if n.id in [tt.nudo_destino_id for tt in self.tramos.values() if tt.nudo_origen_id == nudo_id]
-                    )
-            
-            resultados[nudo_id] = {
-                "cota_agua": nudo.cota_agua,
-                "presion": nudo.presion_calc
-            }
-        
-        return resultados
-    
-    def _ordenar_nudos_bfs(self) -> List[UUID]:
-        """Ordena nudos usando BFS desde la fuente"""
+
+        red = self.red
+        orden, caudal, hf, cota = self._red_abierta(red.demanda[None, :])
+
+        self.caudales[:] = caudal[0]
+        self.perdidas[:] = hf[0]
+        self.velocidades[:] = self._velocidades(caudal[0])
+
+        # Presión = cota de agua - elevación
+        self.cotas[orden] = cota[0, orden]
+        self.presiones[orden] = cota[0, orden] - red.elevacion[orden]
+        self._volcar_resultados()
+
+        return {
+            red.ids_nudos[i]: {"cota_agua": c, "presion": p}
+            for i, c, p in zip(
+                orden.tolist(), self.cotas[orden].tolist(), self.presiones[orden].tolist()
+            )
+        }
+
+    def _red_abierta(self, demandas: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Balance determinístico sobre el árbol BFS para demandas (escenarios, nudos)
+
+        Retorna (orden, caudal, h_f, cota): el orden BFS de los nudos alcanzados
+        y, por escenario, caudales y pérdidas por tramo y cotas por nudo.
+        """
+        # Árbol BFS desde la fuente: orden, nivel y tramo de llegada
+        orden, nivel, tramo_padre = self._arbol_bfs()
+        red = self.red
+        origen = red.origen
+
+        en_arbol = orden[tramo_padre[orden] >= 0]
+        niveles = [en_arbol[nivel[en_arbol] == k] for k in range(1, int(nivel.max(initial=0)) + 1)]
+
+        # Recorrido inverso: acumular demanda de cada subárbol en su padre
+        acumulada = np.array(demandas, dtype=np.float64)
+        for nudos_nivel in reversed(niveles):
+            np.add.at(acumulada.T, origen[tramo_padre[nudos_nivel]], acumulada[:, nudos_nivel].T)
+
+        caudal = np.zeros((acumulada.shape[0], red.n_tramos))
+        caudal[:, tramo_padre[en_arbol]] = acumulada[:, en_arbol]
+
+        # Pérdida de carga de cada tramo con su caudal
+        hf = 10.674 * np.power(caudal, 1.852) * red.longitud / (
+            np.power(red.coef_hw, 1.852) * np.power(red.diametro, 4.8704)
+        )
+
+        # Recorrido directo: cotas piezométricas desde la fuente
+        cota = np.tile(red.elevacion, (acumulada.shape[0], 1))
+        for nudos_nivel in niveles:
+            entrada = tramo_padre[nudos_nivel]
+            cota[:, nudos_nivel] = cota[:, origen[entrada]] - hf[:, entrada]
+
+        return orden, caudal, hf, cota
+
+    def _arbol_bfs(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        BFS por el índice CSR (sentido origen -> destino) desde las fuentes
+
+        Si no hay fuentes, parte de los nudos sin tramos de entrada.
+
+        Returns:
+        - orden: índices de nudos alcanzados en orden BFS
+        - nivel: profundidad de cada nudo (-1 si no se alcanza)
+        - tramo_padre: tramo por el que se alcanzó cada nudo (-1 en raíces)
+        """
         from collections import deque
-        
-        # Encontrar nudos fuente
-        fuentes = [n for n in self.nudos.values() 
-                  if n.tipo in ["cisterna", "reservorio", "tanque_elevado"]]
-        
+
+        n = self.red.n_nudos
+        fuentes = np.flatnonzero(self.red.es_fuente).tolist()
         if not fuentes:
-            return list(self.nudos.keys())
-        
-        visitados = set()
-        cola = deque([f.id for f in fuentes])
+            fuentes = np.flatnonzero(self.adyacencia.grado_entrada() == 0).tolist()
+
+        nivel = np.full(n, -1, dtype=np.int32)
+        tramo_padre = np.full(n, -1, dtype=np.int32)
         orden = []
-        
+
+        cola = deque(fuentes)
+        nivel[fuentes] = 0
+        destino = self.adyacencia.destino
         while cola:
-            nudo_id = cola.popleft()
-            if nudo_id not in visitados:
-                visitados.add(nudo_id)
-                orden.append(nudo_id)
-                
-                # Agregar nudos conectados
-                for tramo in self.tramos.values():
-                    if tramo.nudo_origen_id == nudo_id and tramo.nudo_destino_id not in visitados:
-                        cola.append(tramo.nudo_destino_id)
-        
-        return orden
+            i = cola.popleft()
+            orden.append(i)
+            for j in self.adyacencia.salientes(i).tolist():
+                k = destino[j]
+                if nivel[k] < 0:
+                    nivel[k] = nivel[i] + 1
+                    tramo_padre[k] = j
+                    cola.append(k)
+
+        return np.array(orden, dtype=np.int32), nivel, tramo_padre
+
+    def _ordenar_nudos_bfs(self) -> List[UUID]:
+        """Ordena nudos usando BFS desde la fuente"""
+        orden, _, _ = self._arbol_bfs()
+        return [self.red.ids_nudos[i] for i in orden.tolist()]
     
     def calcular_hibrido(self) -> Tuple[bool, float]:
         """
@@ -479,44 +1305,301 @@ class MotorHidraulico:
         
         # Recalcular parámetros finales
         self._recalcular_parametros()
+        self._volcar_resultados()
         
         return convergencia, error
     
     def _propagar_presiones_mallas(self):
         """Propaga las presiones desde las mallas hacia los ramales"""
+        self._propagar_cotas(self.caudales[None, :], self.cotas[None, :])
+        self.presiones[:] = self.cotas - self.red.elevacion
+
+    def _propagar_cotas(self, caudales: np.ndarray, cotas: np.ndarray):
+        """Propaga cotas (escenarios, nudos) desde las mallas hacia los ramales, in-place"""
+        red = self.red
+
         # Identificar ramales conectados a mallas
-        nudos_malla = set()
-        for malla in self.mallas:
-            nudos_malla.update(malla.nudos_circunferenciales)
-        
-        # Propagar hacia nudos no-malla
-        for nudo in self.nudos.values():
-            if nudo.id not in nudos_malla:
-                # Buscar tramo conectado a malla
-                for tramo in self.tramos.values():
-                    if tramo.nudo_destino_id == nudo.id:
-                        nudo_origen = self.nudos[tramo.nudo_origen_id]
-                        hf = self.calcular_perdida_hazen_williams(
-                            tramo.caudal, tramo.diametro, 
-                            tramo.longitud, tramo.coef_hazen_williams
-                        )
-                        nudo.cota_agua = nudo_origen.cota_agua - hf
-                        nudo.presion_calc = nudo.cota_agua - nudo.elevacion
-                        break
-    
+        en_malla = np.zeros(red.n_nudos, dtype=bool)
+        en_malla[red.origen[self._tramos_mallas]] = True
+        en_malla[red.destino[self._tramos_mallas]] = True
+
+        # Tramo de llegada de cada nudo y su pérdida de carga
+        ptr = self.adyacencia.entrada_ptr
+        con_entrada = np.diff(ptr) > 0
+        llegada = np.full(red.n_nudos, -1, dtype=np.int64)
+        llegada[con_entrada] = self.adyacencia.entrada_tramos[ptr[:-1][con_entrada]]
+        hf = self._perdidas_hazen_williams(caudales).T
+
+        # Propagar hacia nudos no-malla, en orden de nudos
+        cotas_nudo = cotas.T
+        origen = red.origen.tolist()
+        for i in np.flatnonzero(~en_malla & con_entrada).tolist():
+            j = llegada[i]
+            cotas_nudo[i] = cotas_nudo[origen[j]] - hf[j]
+
+    def _parametros_finales(
+        self,
+        caudales: np.ndarray,
+        cotas: np.ndarray,
+        velocidades: np.ndarray,
+        perdidas: np.ndarray,
+        presiones: np.ndarray
+    ):
+        """Velocidad, pérdida y presión finales por escenario (in-place)"""
+        con_diametro = self.red.diametro > 0
+        caudal = np.abs(caudales)
+        velocidades[:, con_diametro] = self._velocidades(caudal)[:, con_diametro]
+        perdidas[:, con_diametro] = self._perdidas_hazen_williams(caudal)[:, con_diametro]
+
+        presiones[:] = cotas - self.red.elevacion
+
     def _recalcular_parametros(self):
         """Recalcula velocidades y presiones finales"""
-        for tramo in self.tramos.values():
-            if tramo.diametro > 0:
-                tramo.velocidad = self.calcular_velocidad(abs(tramo.caudal), tramo.diametro)
-                tramo.perdida_carga = self.calcular_perdida_hazen_williams(
-                    abs(tramo.caudal), tramo.diametro, 
-                    tramo.longitud, tramo.coef_hazen_williams
+        self._parametros_finales(
+            self.caudales[None, :],
+            self.cotas[None, :],
+            self.velocidades[None, :],
+            self.perdidas[None, :],
+            self.presiones[None, :]
+        )
+
+    def calcular_escenarios(
+        self,
+        factores: Sequence[float],
+        metodo: str = "gradiente"
+    ) -> "ResultadoEscenarios":
+        """
+        Resuelve la red para varios multiplicadores de demanda en una sola pasada
+
+        Los escenarios (p. ej. máximo diario, máximo horario, mínimo nocturno)
+        comparten la topología, la base de mallas y las matrices de incidencia;
+        cada método itera todos los escenarios a la vez sobre arreglos de forma
+        (escenarios, nudos) y (escenarios, tramos). El resultado de cada
+        escenario coincide con el del método individual con la demanda escalada.
+
+        No modifica los resultados del motor (caudales, cotas, historial).
+        """
+        factores = np.asarray(factores, dtype=np.float64)
+        if factores.ndim != 1 or not len(factores):
+            raise ValueError("Se requiere al menos un factor de demanda")
+        if (factores < 0).any():
+            raise ValueError("Los factores de demanda no pueden ser negativos")
+
+        red = self.red
+        n_escenarios = len(factores)
+        demandas = factores[:, None] * red.demanda[None, :]
+
+        cotas = np.zeros((n_escenarios, red.n_nudos))
+        presiones = np.zeros((n_escenarios, red.n_nudos))
+        velocidades = np.zeros((n_escenarios, red.n_tramos))
+        perdidas = np.zeros((n_escenarios, red.n_tramos))
+        convergencia = np.ones(n_escenarios, dtype=bool)
+        iteraciones = np.zeros(n_escenarios, dtype=np.int64)
+        errores = np.zeros(n_escenarios)
+
+        print(f"ESCENARIOS ({metodo}): {n_escenarios} factores de demanda")
+
+        if metodo == "gradiente":
+            if not red.es_fuente.any():
+                raise ValueError(
+                    "El método del gradiente requiere al menos un nudo de carga fija "
+                    "(cisterna, reservorio o tanque elevado)"
                 )
-        
-        for nudo in self.nudos.values():
-            nudo.presion_calc = nudo.cota_agua - nudo.elevacion
-    
+            self._verificar_conexion_fuentes()
+
+            solver = SolverGradiente(
+                n_nudos=red.n_nudos,
+                origen=red.origen,
+                destino=red.destino,
+                fijos=red.es_fuente,
+                exponente=self.exponente_hw
+            )
+            resultados = solver.resolver_escenarios(
+                resistencias=self._resistencias(),
+                demandas=demandas,
+                cargas_fijas=red.elevacion,
+                caudales_iniciales=self._caudales_iniciales(demandas),
+                tolerancia=self.tolerancia,
+                max_iteraciones=self.max_iteraciones,
+                al_iterar=self.al_iterar
+            )
+            caudales = np.array([r.caudales for r in resultados])
+            cotas[:] = [r.cargas for r in resultados]
+            convergencia[:] = [r.convergencia for r in resultados]
+            iteraciones[:] = [len(r.historial) for r in resultados]
+            errores[:] = [r.historial[-1][1] if r.historial else 0.0 for r in resultados]
+            self._parametros_finales(caudales, cotas, velocidades, perdidas, presiones)
+
+        elif metodo == "deterministico":
+            orden, caudales, hf, cota = self._red_abierta(demandas)
+            perdidas[:] = hf
+            velocidades[:] = self._velocidades(caudales)
+            cotas[:, orden] = cota[:, orden]
+            presiones[:, orden] = cota[:, orden] - red.elevacion[orden]
+
+        elif metodo in ("hardy_cross", "hibrido"):
+            caudales = self._caudales_iniciales(demandas)
+            convergencia, iteraciones, errores = self._iterar_hardy_cross(caudales)
+            self._parametros_mallas(caudales, perdidas, velocidades)
+            if metodo == "hibrido":
+                self._propagar_cotas(caudales, cotas)
+                self._parametros_finales(caudales, cotas, velocidades, perdidas, presiones)
+
+        else:
+            raise ValueError(f"Método no soportado para escenarios: {metodo}")
+
+        return ResultadoEscenarios(
+            factores=factores,
+            caudales=caudales,
+            cotas=cotas,
+            presiones=presiones,
+            velocidades=velocidades,
+            perdidas=perdidas,
+            convergencia=convergencia,
+            iteraciones=iteraciones,
+            errores=errores
+        )
+
+    def simular_periodo_extendido(
+        self,
+        duracion: float = 24.0,
+        intervalo: float = 1.0,
+        metodo: str = "gradiente",
+        patron_defecto: Optional[Sequence[float]] = None
+    ) -> Iterator[PasoSimulacion]:
+        """
+        Simulación en periodo extendido (p. ej. 24 h) con patrones de demanda
+
+        En cada paso la demanda de cada nudo es su demanda base por el
+        multiplicador de su patrón horario (`Nudo.demanda_pattern`, o
+        `patron_defecto` para los nudos sin patrón) en esa hora. Cada paso
+        arranca desde los caudales y cargas del paso anterior, de modo que
+        después del primero bastan pocas iteraciones.
+
+        Las validaciones se hacen al llamar (ValueError); los pasos se generan
+        uno a uno para poder transmitirlos sin acumular toda la serie.
+        No modifica los resultados del motor.
+        """
+        if duracion <= 0 or intervalo <= 0:
+            raise ValueError("La duración y el intervalo deben ser positivos")
+        if metodo not in ("gradiente", "deterministico", "hardy_cross", "hibrido"):
+            raise ValueError(f"Método no soportado para periodo extendido: {metodo}")
+
+        red = self.red
+        horas = np.arange(0.0, duracion, intervalo)
+        demandas = red.multiplicadores_demanda(horas, patron_defecto) * red.demanda
+
+        solver = None
+        if metodo == "gradiente":
+            if not red.es_fuente.any():
+                raise ValueError(
+                    "El método del gradiente requiere al menos un nudo de carga fija "
+                    "(cisterna, reservorio o tanque elevado)"
+                )
+            self._verificar_conexion_fuentes()
+
+            solver = SolverGradiente(
+                n_nudos=red.n_nudos,
+                origen=red.origen,
+                destino=red.destino,
+                fijos=red.es_fuente,
+                exponente=self.exponente_hw
+            )
+
+        print(f"PERIODO EXTENDIDO ({metodo}): {len(horas)} pasos de {intervalo} h")
+        return self._pasos_periodo_extendido(horas, demandas, metodo, solver)
+
+    def _pasos_periodo_extendido(
+        self,
+        horas: np.ndarray,
+        demandas: np.ndarray,
+        metodo: str,
+        solver: Optional[SolverGradiente]
+    ) -> Iterator[PasoSimulacion]:
+        """Genera los pasos del periodo extendido para demandas (periodos, nudos)"""
+        red = self.red
+
+        if metodo == "deterministico":
+            # Sin iteraciones: todos los periodos en una sola pasada
+            orden, caudales, _, cota = self._red_abierta(demandas)
+            cotas = np.zeros_like(demandas)
+            presiones = np.zeros_like(demandas)
+            cotas[:, orden] = cota[:, orden]
+            presiones[:, orden] = cota[:, orden] - red.elevacion[orden]
+            velocidades = self._velocidades(caudales)
+            for periodo, hora in enumerate(horas.tolist()):
+                yield PasoSimulacion(
+                    periodo=periodo,
+                    hora=hora,
+                    demanda_total=float(demandas[periodo].sum()),
+                    caudales=caudales[periodo],
+                    cotas=cotas[periodo],
+                    presiones=presiones[periodo],
+                    velocidades=velocidades[periodo],
+                    convergencia=True,
+                    iteraciones=0,
+                    error=0.0
+                )
+            return
+
+        resistencias = self._resistencias() if solver is not None else None
+        Q = H = None
+
+        for periodo, hora in enumerate(horas.tolist()):
+            demanda = demandas[periodo:periodo + 1]
+            cotas = np.zeros((1, red.n_nudos))
+            presiones = np.zeros((1, red.n_nudos))
+            velocidades = np.zeros((1, red.n_tramos))
+            perdidas = np.zeros((1, red.n_tramos))
+
+            if solver is not None:
+                # Gradiente: no exige continuidad en el punto de partida
+                resultado = solver.resolver(
+                    resistencias=resistencias,
+                    demandas=demanda[0],
+                    cargas_fijas=red.elevacion,
+                    caudales_iniciales=self._caudales_iniciales(demanda)[0] if Q is None else Q[0],
+                    tolerancia=self.tolerancia,
+                    max_iteraciones=self.max_iteraciones,
+                    cargas_iniciales=None if H is None else H[0],
+                    al_iterar=self.al_iterar
+                )
+                Q, H = resultado.caudales[None, :], resultado.cargas[None, :]
+                cotas[:] = H
+                convergencia = resultado.convergencia
+                iteraciones = len(resultado.historial)
+                error = resultado.historial[-1][1] if resultado.historial else 0.0
+                self._parametros_finales(Q, cotas, velocidades, perdidas, presiones)
+            else:
+                # Hardy Cross: caudales del paso anterior más el reparto
+                # inicial del cambio de demanda
+                inicial = self._caudales_iniciales(demanda)
+                if Q is None:
+                    Q = inicial
+                else:
+                    Q = Q + inicial - self._caudales_iniciales(demandas[periodo - 1:periodo])
+                convergidos, realizadas, errores = self._iterar_hardy_cross(Q)
+                convergencia = bool(convergidos[0])
+                iteraciones = int(realizadas[0])
+                error = float(errores[0])
+                self._parametros_mallas(Q, perdidas, velocidades)
+                if metodo == "hibrido":
+                    self._propagar_cotas(Q, cotas)
+                    self._parametros_finales(Q, cotas, velocidades, perdidas, presiones)
+
+            yield PasoSimulacion(
+                periodo=periodo,
+                hora=hora,
+                demanda_total=float(demanda.sum()),
+                caudales=Q[0],
+                cotas=cotas[0],
+                presiones=presiones[0],
+                velocidades=velocidades[0],
+                convergencia=convergencia,
+                iteraciones=iteraciones,
+                error=error
+            )
+
     def generar_tabla_iteraciones(self) -> List[Dict]:
         """
         Genera la tabla de iteraciones para transparencia académica
@@ -541,19 +1624,53 @@ class MotorHidraulico:
     
     def obtener_resumen_resultados(self) -> Dict:
         """Obtiene un resumen de los resultados"""
-        presiones = [n.presion_calc for n in self.nudos.values() if n.presion_calc > 0]
-        velocidades = [t.velocidad for t in self.tramos.values() if t.velocidad > 0]
-        
         return {
             "tipo_red": self.tipo_red,
             "numero_mallas": len(self.mallas),
-            "numero_nudos": len(self.nudos),
-            "numero_tramos": len(self.tramos),
+            "modo_mallas": self.modo_mallas,
+            "base_mallas": self.base_mallas,
+            "peso_base_mallas": self.peso_mallas,
+            "numero_nudos": self.red.n_nudos,
+            "numero_tramos": self.red.n_tramos,
             "iteraciones_realizadas": len(self.historial_iteraciones),
-            "presion_minima": min(presiones) if presiones else 0,
-            "presion_maxima": max(presiones) if presiones else 0,
-            "velocidad_minima": min(velocidades) if velocidades else 0,
-            "velocidad_maxima": max(velocidades) if velocidades else 0,
+            **resumen_presiones_velocidades(self.presiones, self.velocidades),
             "convergencia_final": self.historial_iteraciones[-1].convergencia_alcanzada if self.historial_iteraciones else False,
             "error_final": self.historial_iteraciones[-1].error_maximo if self.historial_iteraciones else None
         }
+
+    def exportar_resultados(self) -> Tuple[List[Dict], List[Dict]]:
+        """
+        Resultados por nudo y por tramo para guardar en el cálculo
+
+        Mismo formato que `resultados_nudos` / `resultados_tramos` del
+        frontend: listas de diccionarios con el id (texto) de cada elemento.
+        Los valores no finitos (cálculo divergente) se guardan como None.
+        """
+        red = self.red
+
+        def valores(arreglo: np.ndarray) -> List[Optional[float]]:
+            return np.where(np.isfinite(arreglo), arreglo, None).tolist()
+
+        nudos = [
+            {"id": str(nudo_id), "codigo": codigo, "cota_agua": cota, "presion_calc": presion}
+            for nudo_id, codigo, cota, presion in zip(
+                red.ids_nudos, red.codigos_nudos, valores(self.cotas), valores(self.presiones)
+            )
+        ]
+        tramos = [
+            {
+                "id": str(tramo_id),
+                "codigo": codigo,
+                "caudal": caudal,
+                "velocidad": velocidad,
+                "perdida_carga": perdida,
+            }
+            for tramo_id, codigo, caudal, velocidad, perdida in zip(
+                red.ids_tramos,
+                red.codigos_tramos,
+                valores(self.caudales),
+                valores(self.velocidades),
+                valores(self.perdidas),
+            )
+        ]
+        return nudos, tramos
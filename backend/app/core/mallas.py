@@ -0,0 +1,295 @@
+"""
+Bases de Mallas Cortas - H-Redes Perú
+Bases de ciclos de peso mínimo para mejorar la convergencia de Hardy Cross
+"""
+
+from collections import defaultdict, deque
+from math import atan2, cos, radians
+from typing import Dict, Hashable, List, Optional, Sequence, Tuple
+import heapq
+
+
+# Un ciclo se representa como (nudos, tramos), alineados de modo que el
+# tramo k une nudos[k] con nudos[k + 1] (y el último cierra en nudos[0])
+Ciclo = Tuple[List[Hashable], List[int]]
+
+# Tope de nudos × tramos para la base de Horton (un Dijkstra por nudo y un
+# candidato por nudo y tramo): ~0.6 s en una cuadrícula de 400 nudos; sobre
+# el tope la red usa la base fundamental
+HORTON_TRABAJO_MAXIMO = 400_000
+
+
+def rango_ciclos(aristas: Sequence[Tuple[Hashable, Hashable]]) -> int:
+    """Número de mallas independientes: E - N + C (sin contar tramos en bucle)"""
+    padre: Dict[Hashable, Hashable] = {}
+
+    def raiz(x):
+        padre.setdefault(x, x)
+        while padre[x] != x:
+            padre[x] = padre[padre[x]]
+            x = padre[x]
+        return x
+
+    aristas_validas = 0
+    for u, v in aristas:
+        raiz(u)
+        raiz(v)
+        if u == v:
+            continue
+        aristas_validas += 1
+        padre[raiz(u)] = raiz(v)
+
+    componentes = len({raiz(n) for n in padre})
+    return aristas_validas - len(padre) + componentes
+
+
+def base_caras_planares(
+    aristas: Sequence[Tuple[Hashable, Hashable]],
+    coordenadas: Dict[Hashable, Tuple[float, float]],
+    esperadas: int
+) -> Optional[List[Ciclo]]:
+    """
+    Base de mallas formada por las caras acotadas del trazado planar
+
+    Usa las coordenadas (longitud, latitud) de los nudos para ordenar los
+    tramos alrededor de cada nudo y recorrer cada cara. Los tramos paralelos
+    se agregan como mallas de dos tramos.
+
+    Retorna None si el trazado no es planar (cruces sin nudo), si alguna cara
+    no es un ciclo simple o si no se obtienen `esperadas` mallas.
+    """
+    latitud_media = sum(c[1] for c in coordenadas.values()) / max(len(coordenadas), 1)
+    escala_x = cos(radians(latitud_media))
+    xy = {n: (c[0] * escala_x, c[1]) for n, c in coordenadas.items()}
+
+    # Colapsar tramos paralelos: el primero participa en las caras
+    ciclos: List[Ciclo] = []
+    representante: Dict[frozenset, int] = {}
+    aristas_planas: List[int] = []
+    for j, (u, v) in enumerate(aristas):
+        if u == v:
+            continue
+        if u not in xy or v not in xy or xy[u] == xy[v]:
+            return None
+        clave = frozenset((u, v))
+        if clave in representante:
+            ciclos.append(([u, v], [j, representante[clave]]))
+            continue
+        representante[clave] = j
+        aristas_planas.append(j)
+
+    # Semiaristas ordenadas por ángulo alrededor de cada nudo
+    salientes: Dict[Hashable, List[Tuple[float, Hashable, int]]] = defaultdict(list)
+    for j in aristas_planas:
+        u, v = aristas[j]
+        for a, b in ((u, v), (v, u)):
+            angulo = atan2(xy[b][1] - xy[a][1], xy[b][0] - xy[a][0])
+            salientes[a].append((angulo, b, j))
+
+    posicion: Dict[Tuple[Hashable, Hashable, int], int] = {}
+    for nudo, lista in salientes.items():
+        lista.sort(key=lambda s: s[0])
+        for k, (_, b, j) in enumerate(lista):
+            posicion[(nudo, b, j)] = k
+
+    # Recorrido de caras: al llegar a v por (u, v) se sigue por la semiarista
+    # anterior a (v, u) en sentido antihorario
+    visitadas = set()
+    caras: List[List[Tuple[Hashable, Hashable, int]]] = []
+    for nudo, lista in salientes.items():
+        for _, b, j in lista:
+            inicio = (nudo, b, j)
+            if inicio in visitadas:
+                continue
+            cara = []
+            actual = inicio
+            while actual not in visitadas:
+                visitadas.add(actual)
+                cara.append(actual)
+                u, v, t = actual
+                alrededor = salientes[v]
+                k = posicion[(v, u, t)]
+                _, w, s = alrededor[k - 1]
+                actual = (v, w, s)
+            caras.append(cara)
+
+    # Componente de cada nudo (una cara exterior por componente)
+    componente: Dict[Hashable, int] = {}
+    for nudo in salientes:
+        if nudo in componente:
+            continue
+        componente[nudo] = len(componente)
+        etiqueta = componente[nudo]
+        cola = deque([nudo])
+        while cola:
+            a = cola.popleft()
+            for _, b, _ in salientes[a]:
+                if b not in componente:
+                    componente[b] = etiqueta
+                    cola.append(b)
+
+    acotadas: List[Ciclo] = []
+    exteriores = defaultdict(int)
+    for cara in caras:
+        area = 0.0
+        for u, v, _ in cara:
+            area += xy[u][0] * xy[v][1] - xy[v][0] * xy[u][1]
+
+        if area <= 0:
+            exteriores[componente[cara[0][0]]] += 1
+            continue
+
+        ciclo = _reducir_recorrido(cara)
+        if ciclo is None:
+            return None
+        if ciclo[1]:
+            acotadas.append(ciclo)
+
+    if any(n != 1 for n in exteriores.values()):
+        return None
+
+    ciclos = acotadas + ciclos
+    if len(ciclos) != esperadas:
+        return None
+
+    return ciclos
+
+
+def _reducir_recorrido(cara: List[Tuple[Hashable, Hashable, int]]) -> Optional[Ciclo]:
+    """
+    Elimina de un recorrido de cara los ramales muertos (tramos recorridos
+    de ida y vuelta). Retorna None si lo que queda no es un ciclo simple.
+    """
+    pila: List[Tuple[Hashable, Hashable, int]] = []
+    for semiarista in cara:
+        if pila and pila[-1][2] == semiarista[2]:
+            pila.pop()
+        else:
+            pila.append(semiarista)
+
+    while len(pila) >= 2 and pila[0][2] == pila[-1][2]:
+        pila = pila[1:-1]
+
+    nudos = [u for u, _, _ in pila]
+    if len(set(nudos)) != len(nudos):
+        return None
+
+    return nudos, [t for _, _, t in pila]
+
+
+def base_horton(
+    aristas: Sequence[Tuple[Hashable, Hashable]],
+    pesos: Sequence[float],
+    esperadas: int,
+    trabajo_maximo: Optional[int] = HORTON_TRABAJO_MAXIMO
+) -> Optional[List[Ciclo]]:
+    """
+    Base de mallas de peso mínimo (Horton)
+
+    Genera los ciclos candidatos P(v, x) + (x, y) + P(y, v) a partir del árbol
+    de caminos mínimos de cada nudo v, los ordena por peso y selecciona
+    greedy los independientes (eliminación gaussiana en GF(2) con enteros
+    como vectores de bits). Costo O(N · E · log N) en tiempo y O(N · E) en
+    candidatos: si N · E supera `trabajo_maximo` retorna None sin
+    calcularla (None = sin tope).
+    """
+    adyacencia: Dict[Hashable, List[Tuple[Hashable, int]]] = defaultdict(list)
+    for j, (u, v) in enumerate(aristas):
+        if u == v:
+            continue
+        adyacencia[u].append((v, j))
+        adyacencia[v].append((u, j))
+
+    if trabajo_maximo is not None and len(adyacencia) * len(aristas) > trabajo_maximo:
+        return None
+
+    arboles: Dict[Hashable, Tuple[Dict, Dict]] = {}
+    candidatos: List[Tuple[float, int, Hashable, int]] = []
+    orden = 0
+
+    for v in adyacencia:
+        distancia, predecesor = _dijkstra(adyacencia, pesos, v)
+        arboles[v] = (distancia, predecesor)
+        for j, (x, y) in enumerate(aristas):
+            if x == y or x not in distancia or y not in distancia:
+                continue
+            if predecesor.get(x, (None, None))[1] == j or predecesor.get(y, (None, None))[1] == j:
+                continue
+            peso = distancia[x] + pesos[j] + distancia[y]
+            candidatos.append((peso, orden, v, j))
+            orden += 1
+
+    candidatos.sort()
+
+    base: Dict[int, int] = {}
+    ciclos: List[Ciclo] = []
+    for _, _, v, j in candidatos:
+        if len(ciclos) == esperadas:
+            break
+
+        ciclo = _ciclo_horton(arboles[v][1], v, aristas[j], j)
+        if ciclo is None:
+            continue
+
+        vector = 0
+        for t in ciclo[1]:
+            vector ^= 1 << t
+        while vector:
+            pivote = vector.bit_length() - 1
+            if pivote not in base:
+                base[pivote] = vector
+                ciclos.append(ciclo)
+                break
+            vector ^= base[pivote]
+
+    return ciclos
+
+
+def _dijkstra(
+    adyacencia: Dict[Hashable, List[Tuple[Hashable, int]]],
+    pesos: Sequence[float],
+    origen: Hashable
+) -> Tuple[Dict[Hashable, float], Dict[Hashable, Tuple[Hashable, int]]]:
+    """Árbol de caminos mínimos: distancia y (nudo previo, tramo) de cada nudo"""
+    distancia = {origen: 0.0}
+    predecesor: Dict[Hashable, Tuple[Hashable, int]] = {}
+    cola = [(0.0, 0, origen)]
+    contador = 1
+    while cola:
+        d, _, u = heapq.heappop(cola)
+        if d > distancia[u]:
+            continue
+        for v, j in adyacencia[u]:
+            nueva = d + pesos[j]
+            if nueva < distancia.get(v, float("inf")):
+                distancia[v] = nueva
+                predecesor[v] = (u, j)
+                heapq.heappush(cola, (nueva, contador, v))
+                contador += 1
+    return distancia, predecesor
+
+
+def _ciclo_horton(
+    predecesor: Dict[Hashable, Tuple[Hashable, int]],
+    v: Hashable,
+    arista: Tuple[Hashable, Hashable],
+    j: int
+) -> Optional[Ciclo]:
+    """Ciclo v -> x -> y -> v si los caminos solo comparten el nudo v"""
+    x, y = arista
+
+    def camino(nudo):
+        nudos, tramos = [nudo], []
+        while nudo != v:
+            nudo, t = predecesor[nudo]
+            nudos.append(nudo)
+            tramos.append(t)
+        return nudos, tramos
+
+    nudos_x, tramos_x = camino(x)
+    nudos_y, tramos_y = camino(y)
+
+    if set(nudos_x) & set(nudos_y) != {v}:
+        return None
+
+    return nudos_x[::-1] + nudos_y[:-1], tramos_x[::-1] + [j] + tramos_y
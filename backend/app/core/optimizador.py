@@ -1,14 +1,88 @@
 """
 Optimizador de Diámetros - H-Redes Perú
-Implementación de Algoritmo Genético para optimización de costos
+Implementación de Algoritmo Genético para optimización de costos y
+solución exacta por programación lineal para redes abiertas
 """
 
 from dataclasses import dataclass
-from typing import List, Dict, Tuple, Optional
+from typing import Callable, List, Dict, Sequence, Tuple, Optional
 from uuid import UUID
-import random
+import hashlib
+import io
+import json
 import time
+import zipfile
 import numpy as np
+from scipy.optimize import linprog
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import depth_first_order
+
+from app.core.cache_resultados import CacheResultados
+from app.core.evaluacion_paralela import EvaluadorParalelo
+from app.core.hidraulico import EvaluadorDiametros, verificar_conexion_fuentes
+from app.core.red_compacta import RedCompacta
+
+
+# Estrategias para sembrar buenos individuos en la generación 0
+ESTRATEGIAS_SIEMBRA = ("actual", "velocidad", "critico")
+
+# Formato de los puntos de control de OptimizadorGA (ver `punto_control`)
+VERSION_PUNTO_CONTROL = 2
+
+
+def precios_unitarios(
+    diametros: np.ndarray,
+    n_tramos: int,
+    costo_por_metro: float,
+    precios: Optional[np.ndarray] = None
+) -> np.ndarray:
+    """
+    Precio por metro de cada diámetro en cada tramo (tramos × diámetros)
+    
+    Sin `precios` se usa el modelo paramétrico costo_por_metro · (D / D_min)^1.5.
+    `precios` da el precio por metro de cada diámetro, igual para todos los
+    tramos (diámetros,) o propio de cada tramo (tramos × diámetros), p. ej.
+    según su material.
+    """
+    if precios is None:
+        precios = costo_por_metro * (diametros / diametros[0]) ** 1.5
+    precios = np.asarray(precios, dtype=np.float64)
+    if precios.shape not in ((len(diametros),), (n_tramos, len(diametros))):
+        raise ValueError(
+            f"Tabla de precios de forma {precios.shape}: se esperaba "
+            f"({len(diametros)},) o ({n_tramos}, {len(diametros)})"
+        )
+    return np.array(np.broadcast_to(precios, (n_tramos, len(diametros))))
+
+
+def motivo_parada(
+    historial: List[Dict],
+    generaciones: int,
+    inicio: float,
+    paciencia: Optional[int] = None,
+    tolerancia_mejora: float = 1e-6,
+    tiempo_maximo: Optional[float] = None
+) -> Optional[str]:
+    """
+    Motivo para detener la evolución después de la última entrada del historial
+
+    - "generaciones": se completaron todas las generaciones
+    - "tiempo": se agotó `tiempo_maximo` (segundos desde `inicio`, time.time)
+    - "estancamiento": la mejor aptitud no mejoró más que `tolerancia_mejora`
+      (relativa) en las últimas `paciencia` generaciones
+
+    Retorna None si debe continuar.
+    """
+    generacion = historial[-1]["generacion"]
+    if generacion >= generaciones:
+        return "generaciones"
+    if tiempo_maximo is not None and time.time() - inicio >= tiempo_maximo:
+        return "tiempo"
+    if paciencia and len(historial) > paciencia:
+        referencia = historial[-1 - paciencia]["mejor_aptitud"]
+        if referencia - historial[-1]["mejor_aptitud"] <= tolerancia_mejora * abs(referencia):
+            return "estancamiento"
+    return None
 
 
 @dataclass
@@ -25,8 +99,14 @@ class OptimizadorGA:
     
     Objetivo: Minimizar el costo total de la red asegurando que todos
     los nudos cumplan con la presión mínima normativa.
+
+    Las presiones de cada candidato se obtienen resolviendo la red con el
+    Gradiente Global (EvaluadorDiametros): la topología y el patrón disperso
+    se preparan una sola vez y cada generación se resuelve en lotes.
     """
     
+    titulo = "ALGORITMO GENÉTICO"
+    
     def __init__(
         self,
         nudos: Dict[UUID, Dict],
@@ -39,7 +119,24 @@ class OptimizadorGA:
         generaciones: int = 50,
         crossover_rate: float = 0.8,
         mutation_rate: float = 0.1,
-        elitismo: int = 5
+        elitismo: int = 5,
+        al_generacion: Optional[Callable[[int, Dict], None]] = None,
+        semilla: Optional[int] = None,
+        red: Optional[RedCompacta] = None,
+        cache_aptitud: int = 10000,
+        workers: int = 1,
+        paciencia: Optional[int] = None,
+        tolerancia_mejora: float = 1e-6,
+        tiempo_maximo: Optional[float] = None,  # s
+        mutacion_adaptativa: bool = False,
+        diversidad_minima: float = 0.1,
+        siembra: Sequence[str] = ESTRATEGIAS_SIEMBRA,
+        fraccion_siembra: float = 0.2,
+        velocidad_objetivo: float = 1.0,  # m/s
+        coef_hazen_williams: float = 10.674,
+        precios: Optional[np.ndarray] = None,  # Soles por metro, ver `precios_unitarios`
+        punto_control_cada: Optional[int] = None,
+        al_punto_control: Optional[Callable[[int, bytes], None]] = None
     ):
         self.nudos = nudos
         self.tramos = tramos
@@ -52,270 +149,753 @@ class OptimizadorGA:
         self.crossover_rate = crossover_rate
         self.mutation_rate = mutation_rate
         self.elitismo = elitismo
+        # Se llama tras cada generación con su entrada del historial (progreso, cancelación)
+        self.al_generacion = al_generacion
+        
+        # Parada anticipada: estancamiento de la mejor aptitud o tiempo máximo
+        self.paciencia = paciencia
+        self.tolerancia_mejora = tolerancia_mejora
+        self.tiempo_maximo = tiempo_maximo
+        self.motivo_parada: Optional[str] = None
+        
+        # Mutación adaptativa: si la diversidad cae bajo `diversidad_minima`
+        # la tasa de mutación se duplica en cada generación (hasta 1) y
+        # vuelve a `mutation_rate` cuando se recupera
+        self.mutacion_adaptativa = mutacion_adaptativa
+        self.diversidad_minima = diversidad_minima
+        self._tasa_mutacion = mutation_rate
+        
+        # Siembra de la población inicial (ver `_individuos_sembrados`)
+        desconocidas = [e for e in siembra if e not in ESTRATEGIAS_SIEMBRA]
+        if desconocidas:
+            raise ValueError(f"Estrategia de siembra desconocida: {', '.join(desconocidas)}")
+        self.siembra = list(siembra)
+        self.fraccion_siembra = fraccion_siembra
+        self.velocidad_objetivo = velocidad_objetivo
+        self._sembrados: Optional[np.ndarray] = None
+        self.coef_hazen_williams = coef_hazen_williams
+        self.precios = precios
+        
+        self._rng = np.random.default_rng(semilla)
+        
+        # Cada `punto_control_cada` generaciones se entrega el estado de la
+        # evolución (`punto_control`) a `al_punto_control` para guardarlo
+        self.punto_control_cada = punto_control_cada
+        self.al_punto_control = al_punto_control
+        self._huella: Optional[Dict[str, str]] = None
+        
+        # Aptitud ya calculada por cromosoma (bytes de la fila de índices):
+        # (costo, penalización, excedente de presión, factible). Con
+        # elitismo, torneo y poca mutación muchos hijos repiten individuos
+        # anteriores
+        self._cache_aptitud = CacheResultados(capacidad=cache_aptitud, ttl=float("inf"))
+        self._contadores_previos = (0, 0)
+        
+        # Con workers > 1 las presiones de cada generación se reparten entre
+        # procesos durante `optimizar`
+        self.workers = max(1, workers)
+        self._paralelo: Optional[EvaluadorParalelo] = None
         
         # Métricas
         self.historial_aptitud: List[Dict] = []
         self.mejor_individuo: Optional[Individuo] = None
+        self._mejor_genes: Optional[np.ndarray] = None
         
-    def _inicializar_poblacion(self) -> List[Individuo]:
-        """Crea la población inicial"""
-        poblacion = []
+        # Población actual ordenada por aptitud (filas: individuos)
+        self._poblacion: Optional[np.ndarray] = None
+        self._aptitud: Optional[np.ndarray] = None
+        self._factible: Optional[np.ndarray] = None
         
-        for _ in range(self.poblacion_size):
-            cromosoma = [
-                random.choice(self.diametros_comerciales)
-                for _ in range(len(self.tramos))
-            ]
-            individuo = Individuo(cromosoma=cromosoma)
-            poblacion.append(individuo)
+        self._preparar_arreglos(red)
+    
+    @property
+    def n_tramos(self) -> int:
+        return len(self._ids_tramos)
+    
+    @property
+    def n_nudos(self) -> int:
+        return len(self._ids_nudos)
+    
+    def _preparar_arreglos(self, red: Optional[RedCompacta]):
+        """Arreglos por tramo y por diámetro que comparten todas las evaluaciones"""
+        self._ids_nudos = list(self.nudos.keys())
+        self._ids_tramos = list(self.tramos.keys())
+        self._longitud = np.array(
+            [t["longitud"] for t in self.tramos.values()], dtype=np.float64
+        )
+        
+        # Los genes son índices en la lista ordenada de diámetros comerciales
+        self._diametros = np.array(self.diametros_comerciales, dtype=np.float64)
+        self._dtype = np.uint8 if len(self._diametros) <= 256 else np.uint16
+        
+        # Costo de cada tramo con cada diámetro, aplanado: el costo de un
+        # individuo es la suma de un valor por tramo, tomado con un solo gather
+        self._tabla_costo = (
+            precios_unitarios(self._diametros, len(self._longitud), self.costo_por_metro, self.precios)
+            * self._longitud[:, None]
+        ).ravel()
+        self._desplazamiento_costo = np.arange(len(self._longitud)) * len(self._diametros)
+        
+        # Red compacta (mismo orden de nudos y tramos) para la evaluación
+        # hidráulica; la presión mínima solo se exige en los nudos que no son fuente
+        if red is None:
+            red = RedCompacta.construir(
+                (
+                    (nudo_id, n.get("codigo", ""), n.get("tipo", "consumo"),
+                     n.get("elevacion", 0.0), n.get("demanda", 0.0), None, None)
+                    for nudo_id, n in self.nudos.items()
+                ),
+                (
+                    (tramo_id, t.get("codigo", ""), t["nudo_origen"], t["nudo_destino"],
+                     t["longitud"], t.get("diametro_actual", 0.0),
+                     t.get("coef_hazen_williams", 150.0))
+                    for tramo_id, t in self.tramos.items()
+                ),
+            )
+        self.red = red
+        self._evaluador = EvaluadorDiametros(red, coef_hazen_williams=self.coef_hazen_williams)
+        self._consumo = ~red.es_fuente
+        self._elevacion_consumo = red.elevacion[self._consumo]
         
+    @classmethod
+    def desde_red(cls, red: RedCompacta, **kwargs) -> "OptimizadorGA":
+        """Crea el optimizador a partir de la red compacta (p. ej. en el pool de cómputo)"""
+        nudos = {
+            nudo_id: {
+                "codigo": codigo,
+                "tipo": "reservorio" if fuente else "consumo",
+                "elevacion": elevacion,
+                "demanda": demanda,
+            }
+            for nudo_id, codigo, fuente, elevacion, demanda in zip(
+                red.ids_nudos,
+                red.codigos_nudos,
+                red.es_fuente.tolist(),
+                red.elevacion.tolist(),
+                red.demanda.tolist(),
+            )
+        }
+        tramos = {
+            tramo_id: {
+                "codigo": codigo,
+                "nudo_origen": red.ids_nudos[origen],
+                "nudo_destino": red.ids_nudos[destino],
+                "longitud": longitud,
+                "diametro_actual": diametro,
+                "coef_hazen_williams": coef_hw,
+            }
+            for tramo_id, codigo, origen, destino, longitud, diametro, coef_hw in zip(
+                red.ids_tramos,
+                red.codigos_tramos,
+                red.origen.tolist(),
+                red.destino.tolist(),
+                red.longitud.tolist(),
+                red.diametro.tolist(),
+                red.coef_hw.tolist(),
+            )
+        }
+        return cls(nudos=nudos, tramos=tramos, red=red, **kwargs)
+
+    def _inicializar_poblacion(self) -> np.ndarray:
+        """
+        Crea la población inicial: matriz (individuos × tramos) de índices de diámetro
+        
+        Las primeras filas (hasta `fraccion_siembra` de la población) son los
+        individuos sembrados y variantes suyas con ~10% de los genes movidos
+        un diámetro arriba o abajo; el resto es aleatorio.
+        """
+        poblacion = self._rng.integers(
+            0, len(self._diametros), size=(self.poblacion_size, self.n_tramos), dtype=self._dtype
+        )
+        
+        if self._sembrados is None:
+            self._sembrados = self._individuos_sembrados()
+        semillas = self._sembrados
+        if not len(semillas):
+            return poblacion
+        
+        n = min(self.poblacion_size, max(len(semillas), round(self.fraccion_siembra * self.poblacion_size)))
+        sembrados = semillas[np.arange(n) % len(semillas)].astype(np.int64)
+        variantes = sembrados[len(semillas):]
+        paso = self._rng.choice((-1, 1), size=variantes.shape) * (self._rng.random(variantes.shape) < 0.1)
+        variantes += paso
+        poblacion[:n] = np.clip(sembrados, 0, len(self._diametros) - 1)
         return poblacion
     
-    def _calcular_costo(self, individuo: Individuo) -> float:
-        """Calcula el costo total de la red"""
-        costo_total = 0.0
+    # ============ SIEMBRA ============
+    
+    def _individuos_sembrados(self) -> np.ndarray:
+        """
+        Individuos de partida según `siembra` (sin repetir), forma (k, tramos)
         
-        for i, (tramo_id, tramo_data) in enumerate(self.tramos.items()):
-            diametro = individuo.cromosoma[i]
-            longitud = tramo_data["longitud"]
-            
-            # Costo proporcional al diámetro (mayor diámetro = mayor costo)
-            # Factor exponencial para penalizar diámetros grandes
-            factor_costo = (diametro / self.diametros_comerciales[0]) ** 1.5
-            costo_tramo = longitud * self.costo_por_metro * factor_costo
-            
-            costo_total += costo_tramo
+        - "actual": el diseño actual, cada diámetro al comercial más cercano
+        - "velocidad": el menor diámetro comercial que deja cada tramo a
+          `velocidad_objetivo` o menos con los caudales de la red
+        - "critico": el de velocidad, agrandando uno a uno los tramos del
+          camino hacia el nudo de menor presión mientras la presión mejore
+        """
+        filas = []
+        if "actual" in self.siembra and self.n_tramos and (self.red.diametro > 0).all():
+            filas.append(np.abs(self.red.diametro[:, None] - self._diametros[None, :]).argmin(axis=1))
+        
+        if "velocidad" in self.siembra or "critico" in self.siembra:
+            por_velocidad = self._dimensionar_por_velocidad()
+            if por_velocidad is not None:
+                if "velocidad" in self.siembra:
+                    filas.append(por_velocidad)
+                if "critico" in self.siembra:
+                    filas.append(self._reforzar_camino_critico(por_velocidad))
         
-        return costo_total
+        if not filas:
+            return np.empty((0, self.n_tramos), dtype=self._dtype)
+        filas = np.array(filas, dtype=self._dtype)
+        _, primeras = np.unique(filas, axis=0, return_index=True)
+        return filas[np.sort(primeras)]
+    
+    def _dimensionar_por_velocidad(self) -> Optional[np.ndarray]:
+        """Genes del dimensionamiento por velocidad (None si la red no converge)"""
+        # Caudales con un diámetro intermedio (en redes abiertas no dependen de él)
+        intermedio = np.full((1, self.n_tramos), self._diametros[len(self._diametros) // 2])
+        _, convergencia = self._evaluador.resolver(intermedio)
+        if not convergencia[0]:
+            return None
+        
+        caudal = np.abs(self._evaluador.caudales_arranque) / 1000.0  # m³/s
+        requerido = np.sqrt(4.0 * caudal / (np.pi * self.velocidad_objetivo)) * 1000.0  # mm
+        return np.minimum(np.searchsorted(self._diametros, requerido), len(self._diametros) - 1)
+    
+    def _estado_critico(self, genes: np.ndarray) -> Tuple[np.ndarray, float, int, bool]:
+        """Cargas, presión y posición del nudo de consumo más desfavorable, y convergencia"""
+        cargas, convergencia = self._evaluador.resolver(self._diametros[genes][None, :])
+        presiones = np.where(self._consumo, cargas[0] - self.red.elevacion, np.inf)
+        critico = int(np.argmin(presiones))
+        return cargas[0], float(presiones[critico]), critico, bool(convergencia[0])
     
-    def _evaluar_restricciones(self, individuo: Individuo) -> Tuple[bool, float]:
+    def _camino_aguas_arriba(self, cargas: np.ndarray, nudo: int) -> List[int]:
+        """Tramos desde `nudo` hacia una fuente siguiendo en cada paso la mayor subida de carga"""
+        adyacencia = self.red.adyacencia
+        camino, visitados = [], {nudo}
+        while not self.red.es_fuente[nudo] and len(camino) < self.n_nudos:
+            entrantes, salientes = adyacencia.entrantes(nudo), adyacencia.salientes(nudo)
+            tramos = np.concatenate((entrantes, salientes))
+            vecinos = np.concatenate((self.red.origen[entrantes], self.red.destino[salientes]))
+            subida = cargas[vecinos] - cargas[nudo]
+            subida[[v in visitados for v in vecinos.tolist()]] = -np.inf
+            if not len(subida) or subida.max() <= 0:
+                break
+            k = int(np.argmax(subida))
+            camino.append(int(tramos[k]))
+            nudo = int(vecinos[k])
+            visitados.add(nudo)
+        return camino
+    
+    def _reforzar_camino_critico(self, genes: np.ndarray, mejora_minima: float = 1e-3) -> np.ndarray:
         """
-        Evalúa las restricciones de presión
+        Agranda un diámetro por vez en el camino crítico hasta cumplir la presión mínima
         
-        Returns:
-        - factible: bool
-        - penalizacion: float (mayor = peor)
+        En cada paso sube un diámetro comercial el tramo con más pérdida del
+        camino hacia el nudo de menor presión; se detiene cuando ese nudo
+        cumple, cuando no queda tramo por agrandar o cuando la presión
+        mínima no mejora al menos `mejora_minima` (m).
         """
-        penalizacion = 0.0
-        factible = True
-        
-        # Simulación simplificada de presiones
-        # En producción, usaría el motor hidráulico real
-        presiones = self._simular_presiones(individuo.cromosoma)
-        
-        for nudo_id, presion in presiones.items():
-            if presion < self.presion_minima:
-                deficit = self.presion_minima - presion
-                # Penalización cuadrática severa
-                penalizacion += (deficit ** 2) * 1000
-                factible = False
+        genes = np.array(genes)
+        cargas, presion, critico, convergencia = self._estado_critico(genes)
+        
+        for _ in range(2 * self.n_tramos):
+            if not convergencia or presion >= self.presion_minima:
+                break
+            camino = np.array(self._camino_aguas_arriba(cargas, critico), dtype=np.intp)
+            camino = camino[genes[camino] < len(self._diametros) - 1]
+            if not len(camino):
+                break
+            perdida = np.abs(cargas[self.red.origen[camino]] - cargas[self.red.destino[camino]])
             
-            # Penalización suave para presiones muy por encima del mínimo
-            elif presion > self.presion_minima * 2:
-                exceso = presion - self.presion_minima * 2
-                penalizacion += exceso * 10
+            prueba = genes.copy()
+            prueba[camino[np.argmax(perdida)]] += 1
+            estado = self._estado_critico(prueba)
+            if not estado[3] or estado[1] < presion + mejora_minima:
+                break
+            genes = prueba
+            cargas, presion, critico, convergencia = estado
         
-        return factible, penalizacion
+        return genes
+    
+    def _individuo(self, genes: np.ndarray, aptitud: float, factible: bool) -> Individuo:
+        """Individuo con los diámetros (mm) de una fila de la población"""
+        return Individuo(
+            cromosoma=self._diametros[genes].tolist(),
+            aptitud=float(aptitud),
+            factible=bool(factible)
+        )
+    
+    def _calcular_costo(self, poblacion: np.ndarray) -> np.ndarray:
+        """Calcula el costo total de la red de cada individuo"""
+        return np.take(self._tabla_costo, self._desplazamiento_costo + poblacion).sum(axis=1)
     
-    def _simular_presiones(self, cromosoma: List[float]) -> Dict[UUID, float]:
+    def _evaluar_restricciones(self, poblacion: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
         """
-        Simula las presiones en los nudos basado en los diámetros propuestos
-        (Simplificación: usar distribución hidrostática)
+        Evalúa las restricciones de presión de cada individuo
+        
+        Returns:
+        - factible: arreglo bool por individuo
+        - penalizacion: arreglo float por individuo (mayor = peor)
+        - excedente: menor presión sobre la mínima en los nudos de consumo
+          (m, negativo si no cumple)
         """
-        presiones = {}
+        presiones, convergencia = self._simular_presiones(poblacion)
         
-        # Obtener nudo de referencia (reservorio/cisterna)
-        nudo_ref_id = None
-        for nudo_id, nudo_data in self.nudos.items():
-            if nudo_data.get("tipo") in ["reservorio", "cisterna", "tanque_elevado"]:
-                nudo_ref_id = nudo_id
-                break
+        # Penalización cuadrática severa bajo el mínimo y suave para
+        # presiones muy por encima del mínimo
+        deficit = np.maximum(self.presion_minima - presiones, 0.0)
+        exceso = np.maximum(presiones - self.presion_minima * 2, 0.0)
+        penalizacion = (deficit ** 2 * 1000 + exceso * 10).sum(axis=1)
+        factible = (presiones >= self.presion_minima).all(axis=1) & convergencia
+        excedente = presiones.min(axis=1, initial=np.inf) - self.presion_minima
         
-        if nudo_ref_id is None:
-            nudo_ref_id = list(self.nudos.keys())[0]
+        return factible, penalizacion, excedente
+    
+    def _simular_presiones(self, poblacion: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Presiones en los nudos de consumo, forma (individuos, nudos de consumo),
+        y convergencia de cada individuo
         
-        # Presión de referencia
-        presion_ref = self.nudos[nudo_ref_id].get("elevacion", 0) + 30  # 30m de columna
+        Resuelve la red con los diámetros de cada individuo. Si un individuo
+        no converge sus presiones se toman como 0 (penalización máxima).
+        """
+        if self._paralelo is not None:
+            cargas, convergencia = self._paralelo.resolver(poblacion)
+        else:
+            cargas, convergencia = self._evaluador.resolver(self._diametros[poblacion])
+        presiones = cargas[:, self._consumo] - self._elevacion_consumo
+        presiones[~convergencia] = 0.0
+        return presiones, convergencia
+    
+    def _evaluar(self, poblacion: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Calcula la aptitud (costo + penalización, menor es mejor) y la
+        factibilidad de toda una generación
+        """
+        costo, penalizacion, _, factible = self._evaluar_objetivos(poblacion)
+        return costo + penalizacion, factible
+    
+    def _evaluar_objetivos(self, poblacion: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Costo, penalización, excedente de presión y factibilidad de cada individuo
         
-        for nudo_id, nudo_data in self.nudos.items():
-            if nudo_id == nudo_ref_id:
-                presiones[nudo_id] = presion_ref
-                continue
-            
-            # Calcular distancia total desde referencia
-            distancia_total = 0.0
-            
-            # Simplificación: buscar camino más corto
-            # En producción, usaría BFS/Dijkstra
-            for i, (tramo_id, tramo_data) in enumerate(self.tramos.items()):
-                if (tramo_data.get("nudo_origen") == nudo_ref_id or
-                    tramo_data.get("nudo_destino") == nudo_ref_id):
-                    diametro = cromosoma[i]
-                    longitud = tramo_data["longitud"]
-                    
-                    # Pérdida de carga proporcional a longitud / diámetro^4.87
-                    perdida = longitud / (diametro ** 4.87) * 10000
-                    distancia_total += perdida
-            
-            presion = presion_ref - distancia_total
-            presiones[nudo_id] = max(presion, 0)
+        Solo se evalúan los cromosomas que no están en la cache de aptitud
+        (cada uno una vez, aunque se repita en la generación).
+        """
+        n = len(poblacion)
+        costo = np.empty(n)
+        penalizacion = np.empty(n)
+        excedente = np.empty(n)
+        factible = np.empty(n, dtype=bool)
         
-        return presiones
-    
-    def _calcular_aptitud(self, individuo: Individuo) -> float:
-        """Calcula la aptitud del individuo"""
-        costo = self._calcular_costo(individuo)
-        factible, penalizacion = self._evaluar_restricciones(individuo)
+        pendientes: Dict[bytes, List[int]] = {}
+        for i, fila in enumerate(poblacion):
+            clave = fila.tobytes()
+            valor = self._cache_aptitud.obtener(clave)
+            if valor is None and clave in pendientes:
+                pendientes[clave].append(i)
+                self._cache_aptitud.contar(True)
+                continue
+            self._cache_aptitud.contar(valor is not None)
+            if valor is None:
+                pendientes[clave] = [i]
+            else:
+                costo[i], penalizacion[i], excedente[i], factible[i] = valor
         
-        # Aptitud = costo + penalización
-        # Menor es mejor
-        individuo.aptitud = costo + penalizacion
-        individuo.factible = factible
+        if pendientes:
+            filas = np.array([indices[0] for indices in pendientes.values()])
+            nuevos = poblacion[filas]
+            costo_nuevos = self._calcular_costo(nuevos)
+            factible_nuevos, penalizacion_nuevos, excedente_nuevos = self._evaluar_restricciones(nuevos)
+            
+            for (clave, indices), c, p, e, f in zip(
+                pendientes.items(),
+                costo_nuevos.tolist(),
+                penalizacion_nuevos.tolist(),
+                excedente_nuevos.tolist(),
+                factible_nuevos.tolist()
+            ):
+                self._cache_aptitud.guardar(clave, (c, p, e, f))
+                costo[indices], penalizacion[indices], excedente[indices], factible[indices] = c, p, e, f
         
-        return individuo.aptitud
+        return costo, penalizacion, excedente, factible
     
-    def _seleccionar(self, poblacion: List[Individuo]) -> Individuo:
-        """Selección por tournament"""
-        tournament_size = 5
-        seleccionados = random.sample(poblacion, min(tournament_size, len(poblacion)))
+    def _seleccionar(self, aptitud: np.ndarray, n: int) -> np.ndarray:
+        """Selección por tournament: índices de `n` ganadores"""
+        tournament_size = min(5, len(aptitud))
+        # Participantes sin repetición dentro de cada torneo
+        participantes = np.argpartition(
+            self._rng.random((n, len(aptitud))), tournament_size - 1, axis=1
+        )[:, :tournament_size]
         
-        # Retornar el de menor aptitud (menor costo)
-        return min(seleccionados, key=lambda x: x.aptitud)
+        # Gana el de menor aptitud (menor costo)
+        ganador = np.argmin(aptitud[participantes], axis=1)
+        return participantes[np.arange(n), ganador]
     
-    def _cruce(self, padre1: Individuo, padre2: Individuo) -> Tuple[Individuo, Individuo]:
-        """Cruce de un punto"""
-        if random.random() > self.crossover_rate:
-            return padre1, padre2
+    def _cruce(self, padres1: np.ndarray, padres2: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Cruce de un punto de cada par de padres (filas)"""
+        n = len(padres1)
+        cruzar = self._rng.random(n) <= self.crossover_rate
+        if self.n_tramos < 2 or not cruzar.any():
+            return padres1.copy(), padres2.copy()
         
-        punto = random.randint(1, len(padre1.cromosoma) - 1)
+        puntos = self._rng.integers(1, self.n_tramos, size=n)
+        intercambio = (np.arange(self.n_tramos)[None, :] >= puntos[:, None]) & cruzar[:, None]
         
-        cromosoma1 = padre1.cromosoma[:punto] + padre2.cromosoma[punto:]
-        cromosoma2 = padre2.cromosoma[:punto] + padre1.cromosoma[punto:]
+        hijos1 = np.where(intercambio, padres2, padres1)
+        hijos2 = np.where(intercambio, padres1, padres2)
+        return hijos1, hijos2
+    
+    def _mutar(self, hijos: np.ndarray):
+        """Mutación de un gen en cada hijo elegido (en el lugar)"""
+        filas = np.flatnonzero(self._rng.random(len(hijos)) < self._tasa_mutacion)
+        genes = self._rng.integers(0, self.n_tramos, size=len(filas))
+        hijos[filas, genes] = self._rng.integers(0, len(self._diametros), size=len(filas))
+    
+    def _reproducir(self, poblacion: np.ndarray, aptitud: np.ndarray, n: int) -> np.ndarray:
+        """Genera `n` hijos por selección, cruce y mutación"""
+        n_pares = (n + 1) // 2
+        padres1 = poblacion[self._seleccionar(aptitud, n_pares)]
+        padres2 = poblacion[self._seleccionar(aptitud, n_pares)]
         
-        hijo1 = Individuo(cromosoma=cromosoma1)
-        hijo2 = Individuo(cromosoma=cromosoma2)
+        hijos1, hijos2 = self._cruce(padres1, padres2)
+        # Intercalar los hijos de cada par y recortar si excede
+        hijos = np.stack((hijos1, hijos2), axis=1).reshape(-1, self.n_tramos)[:n]
+        self._mutar(hijos)
+        return hijos
+    
+    def _registrar_generacion(self, generacion: int, aptitud: np.ndarray, factible: np.ndarray) -> Dict:
+        """Agrega la entrada de la generación (ya ordenada) al historial"""
+        # Aciertos de la cache de aptitud en las evaluaciones de esta generación
+        aciertos = self._cache_aptitud.aciertos - self._contadores_previos[0]
+        fallos = self._cache_aptitud.fallos - self._contadores_previos[1]
+        self._contadores_previos = (self._cache_aptitud.aciertos, self._cache_aptitud.fallos)
         
-        return hijo1, hijo2
+        entrada = {
+            "generacion": generacion,
+            "mejor_aptitud": float(aptitud[0]),
+            "peor_aptitud": float(aptitud[-1]),
+            "aptitud_promedio": float(aptitud.mean()),
+            "factibles": int(factible.sum()),
+            "tasa_aciertos_cache": aciertos / (aciertos + fallos) if aciertos + fallos else 0.0,
+            "diversidad": self._diversidad(),
+            "tasa_mutacion": self._tasa_mutacion
+        }
+        self.historial_aptitud.append(entrada)
+        return entrada
     
-    def _mutar(self, individuo: Individuo) -> Individuo:
-        """Mutación de un gen"""
-        if random.random() < self.mutation_rate:
-            punto = random.randint(0, len(individuo.cromosoma) - 1)
-            individuo.cromosoma[punto] = random.choice(self.diametros_comerciales)
+    def _diversidad(self) -> float:
+        """
+        Diversidad de la población actual, de 0 (todos iguales) a casi 1
         
-        return individuo
+        Promedio por tramo de la fracción de individuos que no tienen el
+        diámetro más frecuente en ese tramo.
+        """
+        if self._poblacion is None or not self.n_tramos:
+            return 0.0
+        frecuencia_maxima = np.zeros(self.n_tramos, dtype=np.int64)
+        for k in range(len(self._diametros)):
+            np.maximum(frecuencia_maxima, (self._poblacion == k).sum(axis=0), out=frecuencia_maxima)
+        return float(1.0 - frecuencia_maxima.mean() / len(self._poblacion))
+    
+    def _adaptar_mutacion(self, diversidad: float):
+        """Sube la tasa de mutación mientras la diversidad esté colapsada"""
+        if not self.mutacion_adaptativa:
+            return
+        if diversidad < self.diversidad_minima:
+            self._tasa_mutacion = min(1.0, max(self._tasa_mutacion, 0.01) * 2)
+        else:
+            self._tasa_mutacion = self.mutation_rate
     
     def optimizar(self) -> Dict:
         """
         Ejecuta el algoritmo genético
         
+        La población es una matriz (individuos × tramos) de índices en
+        `diametros_comerciales`; cada generación se evalúa completa con
+        operaciones de arreglos. Con `workers > 1` las presiones se
+        resuelven en un pool de procesos que comparte la red en memoria
+        compartida y se cierra al terminar.
+        
         Returns:
         - Dict con resultados de la optimización
         """
+        if self.workers == 1:
+            return self._evolucionar()
+        
+        with EvaluadorParalelo(
+            self.red,
+            self._diametros,
+            self.workers,
+            self._evaluador.caudales_arranque,
+            coef_hazen_williams=self.coef_hazen_williams
+        ) as paralelo:
+            self._paralelo = paralelo
+            try:
+                return self._evolucionar()
+            finally:
+                self._paralelo = None
+    
+    def _evolucionar(self) -> Dict:
+        """Bucle del algoritmo genético (ver `optimizar`)"""
         inicio = time.time()
         
         print("=" * 60)
-        print("OPTIMIZACIÓN DE DIÁMETROS - ALGORITMO GENÉTICO")
+        print(f"OPTIMIZACIÓN DE DIÁMETROS - {self.titulo}")
         print("=" * 60)
         print(f"Población: {self.poblacion_size}")
         print(f"Generaciones: {self.generaciones}")
         print(f"Tasa de cruce: {self.crossover_rate}")
         print(f"Tasa de mutación: {self.mutation_rate}")
         print(f"Diámetros disponibles: {self.diametros_comerciales}")
+        print(f"Procesos de evaluación: {self.workers}")
         print()
         
-        # Inicializar población
-        poblacion = self._inicializar_poblacion()
-        
-        # Evaluar población inicial
-        for ind in poblacion:
-            self._calcular_aptitud(ind)
-        
-        # Ordenar por aptitud (menor es mejor)
-        poblacion.sort(key=lambda x: x.aptitud)
-        self.mejor_individuo = poblacion[0]
+        if self._poblacion is None:
+            entrada = self.iniciar()
+            print(f"Generación 0: Mejor={entrada['mejor_aptitud']:.2f}, Factibles={entrada['factibles']}/{self.poblacion_size}")
+            self._notificar(entrada)
+        else:
+            # Restaurada desde un punto de control
+            entrada = self.historial_aptitud[-1]
+            print(f"Reanudada en la generación {entrada['generacion']}: Mejor={entrada['mejor_aptitud']:.2f}")
         
-        # Guardar historial
-        self.historial_aptitud.append({
-            "generacion": 0,
-            "mejor_aptitud": poblacion[0].aptitud,
-            "peor_aptitud": poblacion[-1].aptitud,
-            "aptitud_promedio": sum(i.aptitud for i in poblacion) / len(poblacion),
-            "factibles": sum(1 for i in poblacion if i.factible)
-        })
-        
-        print(f"Generación 0: Mejor={poblacion[0].aptitud:.2f}, Factibles={sum(1 for i in poblacion if i.factible)}/{len(poblacion)}")
-        
-        # Evolución
-        for gen in range(1, self.generaciones + 1):
-            nueva_poblacion = []
-            
-            # Elitismo
-            nueva_poblacion.extend(poblacion[:self.elitismo])
-            
-            # Generar nueva población
-            while len(nueva_poblacion) < self.poblacion_size:
-                # Selección
-                padre1 = self._seleccionar(poblacion)
-                padre2 = self._seleccionar(poblacion)
-                
-                # Cruce
-                hijo1, hijo2 = self._cruce(padre1, padre2)
-                
-                # Mutación
-                hijo1 = self._mutar(hijo1)
-                hijo2 = self._mutar(hijo2)
-                
-                # Evaluación
-                self._calcular_aptitud(hijo1)
-                self._calcular_aptitud(hijo2)
-                
-                nueva_poblacion.extend([hijo1, hijo2])
-            
-            # Recortar si excede tamaño
-            nueva_poblacion = nueva_poblacion[:self.poblacion_size]
-            
-            # Ordenar
-            nueva_poblacion.sort(key=lambda x: x.aptitud)
-            poblacion = nueva_poblacion
-            
-            # Actualizar mejor
-            if poblacion[0].aptitud < self.mejor_individuo.aptitud:
-                self.mejor_individuo = Individuo(
-                    cromosoma=poblacion[0].cromosoma.copy(),
-                    aptitud=poblacion[0].aptitud,
-                    factible=poblacion[0].factible
-                )
-            
-            # Guardar historial
-            factibles_count = sum(1 for i in poblacion if i.factible)
-            self.historial_aptitud.append({
-                "generacion": gen,
-                "mejor_aptitud": poblacion[0].aptitud,
-                "peor_aptitud": poblacion[-1].aptitud,
-                "aptitud_promedio": sum(i.aptitud for i in poblacion) / len(poblacion),
-                "factibles": factibles_count
-            })
+        # Evolución hasta completar las generaciones o detenerse antes
+        while True:
+            self.motivo_parada = motivo_parada(
+                self.historial_aptitud,
+                self.generaciones,
+                inicio,
+                self.paciencia,
+                self.tolerancia_mejora,
+                self.tiempo_maximo
+            )
+            if self.motivo_parada is not None:
+                break
             
+            entrada = self.evolucionar_generacion()
+            gen = entrada["generacion"]
             if gen % 10 == 0 or gen == self.generaciones:
-                print(f"Generación {gen}: Mejor={poblacion[0].aptitud:.2f}, Factibles={factibles_count}/{self.poblacion_size}")
+                print(f"Generación {gen}: Mejor={entrada['mejor_aptitud']:.2f}, Factibles={entrada['factibles']}/{self.poblacion_size}")
+            self._notificar(entrada)
+        
+        if self.motivo_parada != "generaciones":
+            print(f"Detenido en la generación {entrada['generacion']} ({self.motivo_parada})")
+        
+        resultado = self.resultado(time.time() - inicio)
+        cache = resultado["cache_aptitud"]
+        print(f"Cache de aptitud: {cache['aciertos']}/{cache['aciertos'] + cache['fallos']} aciertos")
+        return resultado
+    
+    def _notificar(self, entrada: Dict):
+        """Punto de control (si toca) y callback de la generación"""
+        generacion = entrada["generacion"]
+        if (
+            self.al_punto_control is not None
+            and self.punto_control_cada
+            and generacion % self.punto_control_cada == 0
+        ):
+            self.al_punto_control(generacion, self.punto_control())
+        if self.al_generacion is not None:
+            self.al_generacion(generacion, entrada)
+    
+    # ============ PASOS (también los usa el modelo de islas) ============
+    
+    def iniciar(self) -> Dict:
+        """Crea y evalúa la población inicial; retorna la entrada de la generación 0"""
+        poblacion = self._inicializar_poblacion()
+        aptitud, factible = self._evaluar(poblacion)
+        self._fijar_poblacion(poblacion, aptitud, factible)
+        return self._registrar_generacion(0, self._aptitud, self._factible)
+    
+    def evolucionar_generacion(self) -> Dict:
+        """Elitismo + hijos de la población actual; retorna la entrada de la nueva generación"""
+        elitismo = min(self.elitismo, self.poblacion_size)
+        hijos = self._reproducir(self._poblacion, self._aptitud, self.poblacion_size - elitismo)
+        aptitud_hijos, factible_hijos = self._evaluar(hijos)
         
-        tiempo_total = time.time() - inicio
+        self._fijar_poblacion(
+            np.concatenate((self._poblacion[:elitismo], hijos)),
+            np.concatenate((self._aptitud[:elitismo], aptitud_hijos)),
+            np.concatenate((self._factible[:elitismo], factible_hijos))
+        )
+        entrada = self._registrar_generacion(len(self.historial_aptitud), self._aptitud, self._factible)
+        self._adaptar_mutacion(entrada["diversidad"])
+        return entrada
+    
+    def mejores(self, n: int) -> np.ndarray:
+        """Genes de los `n` mejores individuos de la población actual"""
+        return self._poblacion[:n].copy()
+    
+    def recibir_migrantes(self, genes: np.ndarray):
+        """Reemplaza a los peores individuos por los migrantes de otra isla"""
+        n = min(len(genes), self.poblacion_size)
+        if n == 0:
+            return
+        genes = np.asarray(genes[:n], dtype=self._dtype)
+        aptitud, factible = self._evaluar(genes)
+        self._fijar_poblacion(
+            np.concatenate((self._poblacion[:-n], genes)),
+            np.concatenate((self._aptitud[:-n], aptitud)),
+            np.concatenate((self._factible[:-n], factible))
+        )
+    
+    def _fijar_poblacion(self, poblacion: np.ndarray, aptitud: np.ndarray, factible: np.ndarray):
+        """Ordena la población por aptitud (menor es mejor) y actualiza al mejor"""
+        orden = np.argsort(aptitud, kind="stable")
+        self._poblacion, self._aptitud, self._factible = poblacion[orden], aptitud[orden], factible[orden]
         
-        # Preparar respuesta
+        if self.mejor_individuo is None or self._aptitud[0] < self.mejor_individuo.aptitud:
+            self._mejor_genes = self._poblacion[0].copy()
+            self.mejor_individuo = self._individuo(self._mejor_genes, self._aptitud[0], self._factible[0])
+    
+    def resultado(self, tiempo_total: float) -> Dict:
+        """Resultado de la optimización con el mejor individuo encontrado"""
         return {
             "convergencia": self.mejor_individuo.factible,
-            "costo_total": self._calcular_costo(self.mejor_individuo),
-            "generaciones": self.generaciones,
+            "mejor_aptitud": self.mejor_individuo.aptitud,
+            "costo_total": float(self._calcular_costo(self._mejor_genes[None, :])[0]),
+            "generaciones": len(self.historial_aptitud) - 1,
             "tiempo_optimizacion": tiempo_total,
-            "diametros_propuestos": {
-                tramo_id: self.mejor_individuo.cromosoma[i]
-                for i, tramo_id in enumerate(self.tramos.keys())
-            },
+            "diametros_propuestos": dict(zip(self._ids_tramos, self.mejor_individuo.cromosoma)),
             "historial": self.historial_aptitud,
-            "mejora_porcentual": self._calcular_mejora()
+            "mejora_porcentual": self._calcular_mejora(),
+            "cache_aptitud": self._cache_aptitud.estadisticas,
+            "motivo_parada": self.motivo_parada or "generaciones",
+            "generaciones_ahorradas": max(0, self.generaciones - (len(self.historial_aptitud) - 1))
         }
     
+    # ============ PUNTOS DE CONTROL ============
+    
+    def punto_control(self) -> bytes:
+        """
+        Estado de la evolución en un blob binario compacto (npz comprimido)
+        
+        Guarda la población con su aptitud, el mejor individuo, el estado
+        del generador aleatorio, la tasa de mutación y el historial: tras
+        `restaurar`, `optimizar` continúa exactamente como si no se hubiera
+        interrumpido. La cache de aptitud no se guarda (solo acelera).
+        
+        El historial va como una matriz numérica (generaciones × claves) y
+        no como JSON: serializarlo y comprimirlo es varias veces más rápido
+        en corridas largas.
+        """
+        historial = self.historial_aptitud
+        claves = list(historial[0]) if historial else []
+        estado = {
+            "version": VERSION_PUNTO_CONTROL,
+            "algoritmo": type(self).__name__,
+            "problema": self._huella_problema(),
+            "rng": self._rng.bit_generator.state,
+            "tasa_mutacion": self._tasa_mutacion,
+            "mejor": [self.mejor_individuo.aptitud, self.mejor_individuo.factible],
+            "historial": claves,
+            "enteros": [clave for clave in claves if isinstance(historial[0][clave], int)],
+        }
+        buffer = io.BytesIO()
+        np.savez_compressed(
+            buffer,
+            estado=np.frombuffer(json.dumps(estado).encode("utf-8"), dtype=np.uint8),
+            historial=np.array(
+                [[entrada[clave] for clave in claves] for entrada in historial], dtype=np.float64
+            ).reshape(-1, len(claves)),
+            **self._arreglos_punto_control()
+        )
+        return buffer.getvalue()
+    
+    def restaurar(self, blob: bytes):
+        """
+        Retoma la evolución desde un `punto_control` del mismo problema
+        
+        La red (tramos y su orden, demandas, elevaciones, longitudes,
+        coeficientes), los precios y los parámetros que definen la aptitud
+        y la población deben ser los mismos: la aptitud guardada no se
+        recalcula. Si no corresponde o está dañado lanza ValueError.
+        """
+        try:
+            with np.load(io.BytesIO(blob), allow_pickle=False) as datos:
+                arreglos = {clave: datos[clave] for clave in datos.files}
+            estado = json.loads(arreglos.pop("estado").tobytes().decode("utf-8"))
+            historial = arreglos.pop("historial")
+        except (OSError, KeyError, ValueError, zipfile.BadZipFile) as e:
+            raise ValueError(f"Punto de control ilegible: {e}")
+        
+        if estado.get("version") != VERSION_PUNTO_CONTROL:
+            raise ValueError(f"Versión de punto de control no soportada: {estado.get('version')}")
+        if estado.get("algoritmo") != type(self).__name__:
+            raise ValueError(f"El punto de control es de otro algoritmo ({estado.get('algoritmo')})")
+        problema = estado.get("problema") or {}
+        huella = self._huella_problema()
+        if problema.get("red") != huella["red"]:
+            raise ValueError("El punto de control no corresponde a esta red (cambió desde que se guardó)")
+        if problema.get("precios") != huella["precios"]:
+            raise ValueError("El punto de control no corresponde a estos precios de tubería")
+        if problema.get("parametros") != huella["parametros"]:
+            raise ValueError("El punto de control no corresponde a estos parámetros de optimización")
+        
+        try:
+            self._restaurar_arreglos(arreglos)
+        except KeyError as e:
+            raise ValueError(f"Punto de control incompleto, falta {e}")
+        self._rng.bit_generator.state = estado["rng"]
+        self._tasa_mutacion = estado["tasa_mutacion"]
+        enteros = set(estado["enteros"])
+        self.historial_aptitud = [
+            {clave: int(valor) if clave in enteros else valor for clave, valor in zip(estado["historial"], fila)}
+            for fila in historial.tolist()
+        ]
+        self.mejor_individuo = self._individuo(self._mejor_genes, *estado["mejor"])
+        self._contadores_previos = (self._cache_aptitud.aciertos, self._cache_aptitud.fallos)
+    
+    def _huella_problema(self) -> Dict[str, str]:
+        """
+        Huellas de lo que da sentido a la población y su aptitud guardadas:
+        la red (contenido y orden de los tramos, que es el de los genes), la
+        tabla de costos por tramo y diámetro, y los parámetros de la
+        evaluación y de la población
+        """
+        if self._huella is None:
+            red = hashlib.sha1(self.red.huella().encode())
+            for tramo_id in self._ids_tramos:
+                red.update(tramo_id.bytes if isinstance(tramo_id, UUID) else str(tramo_id).encode())
+            parametros = {
+                "diametros": self.diametros_comerciales,
+                "costo_por_metro": self.costo_por_metro,
+                "presion_minima": self.presion_minima,
+                "tolerancia_presion": self.tolerancia_presion,
+                "coef_hazen_williams": self.coef_hazen_williams,
+                "poblacion_size": self.poblacion_size,
+                "crossover_rate": self.crossover_rate,
+                "mutation_rate": self.mutation_rate,
+                "elitismo": self.elitismo,
+                "mutacion_adaptativa": self.mutacion_adaptativa,
+                "diversidad_minima": self.diversidad_minima,
+            }
+            self._huella = {
+                "red": red.hexdigest(),
+                "precios": hashlib.sha1(self._tabla_costo.tobytes()).hexdigest(),
+                "parametros": hashlib.sha1(json.dumps(parametros, sort_keys=True).encode()).hexdigest(),
+            }
+        return self._huella
+    
+    def _arreglos_punto_control(self) -> Dict[str, np.ndarray]:
+        """Arreglos de la población que van en el punto de control"""
+        return {
+            "poblacion": self._poblacion,
+            "aptitud": self._aptitud,
+            "factible": self._factible,
+            "mejor_genes": self._mejor_genes,
+        }
+    
+    def _restaurar_arreglos(self, arreglos: Dict[str, np.ndarray]):
+        self._poblacion = arreglos["poblacion"].astype(self._dtype, copy=False)
+        self._aptitud = arreglos["aptitud"]
+        self._factible = arreglos["factible"]
+        self._mejor_genes = arreglos["mejor_genes"].astype(self._dtype, copy=False)
+    
     def _calcular_mejora(self) -> float:
         """Calcula el porcentaje de mejora vs. solución inicial"""
         if len(self.historial_aptitud) < 2:
@@ -336,8 +916,9 @@ class OptimizadorGA:
             return []
         
         recomendaciones = []
+        costo_estimado = float(self._calcular_costo(self._mejor_genes[None, :])[0])
         
-        for i, tramo_id in enumerate(self.tramos.keys()):
+        for i, tramo_id in enumerate(self._ids_tramos):
             diametro_actual = self.tramos[tramo_id].get("diametro_interior", 0)
             diametro_optimizado = self.mejor_individuo.cromosoma[i]
             
@@ -349,7 +930,241 @@ class OptimizadorGA:
                     "diametro_actual": diametro_actual,
                     "diametro_propuesto": diametro_optimizado,
                     "accion": cambio,
-                    "costo_estimado": self._calcular_costo(self.mejor_individuo)
+                    "costo_estimado": costo_estimado
                 })
         
         return recomendaciones
+
+
+class OptimizadorRamificado:
+    """
+    Diámetros de costo mínimo para redes abiertas ("lp_ramificada")
+
+    En un árbol con una sola fuente el caudal de cada tramo es la demanda
+    acumulada aguas abajo y no depende de los diámetros, así que la pérdida
+    por metro de cada diámetro comercial es conocida y el problema es lineal
+    (Karmeli): cada tramo se divide en longitudes x[j, d] de cada diámetro,
+    con
+
+    - sum_d x[j, d] = L[j]
+    - H[origen] - H[destino] = sum_d J[j, d] · x[j, d]
+    - H[nudo] >= elevación + presión mínima en los nudos de consumo
+
+    minimizando sum c[j, d] · x[j, d]. El óptimo usa a lo sumo dos diámetros
+    contiguos por tramo; como cada tramo lleva un solo diámetro, la
+    propuesta toma el mayor de ellos (sigue cumpliendo la presión mínima) y
+    luego baja al menor los tramos cuyo subárbol tiene holgura de presión
+    para ello, empezando por los de mayor ahorro. El costo del óptimo por
+    segmentos queda como cota inferior.
+    """
+
+    def __init__(
+        self,
+        red: RedCompacta,
+        diametros_comerciales: List[float],
+        costo_por_metro: float = 100.0,  # Soles por metro
+        presion_minima: float = 10.0,  # m.c.a.
+        coef_hazen_williams: float = 10.674,
+        exponente_hw: float = 1.852,
+        precios: Optional[np.ndarray] = None  # Soles por metro, ver `precios_unitarios`
+    ):
+        self.red = red
+        self.diametros_comerciales = sorted(diametros_comerciales)
+        self.costo_por_metro = costo_por_metro
+        self.presion_minima = presion_minima
+        
+        self._diametros = np.array(self.diametros_comerciales, dtype=np.float64)
+        self._costo_metro = precios_unitarios(self._diametros, red.n_tramos, costo_por_metro, precios)
+        
+        self._orden, self._padre, self._tramo_llegada, self._subarbol = self._arbol()
+        self._caudal = self._caudales()
+        
+        # Pérdida por metro (tramos × diámetros), Hazen-Williams como el motor
+        self._perdida_metro = (
+            coef_hazen_williams * np.power(np.abs(self._caudal), exponente_hw)
+            / np.power(red.coef_hw, exponente_hw)
+        )[:, None] / np.power(self._diametros, 4.8704)[None, :]
+    
+    def _arbol(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Recorrido en profundidad desde la fuente
+        
+        Retorna el orden (cada nudo después de su padre), el padre y el tramo
+        de llegada de cada nudo, y el tamaño de su subárbol: los nudos aguas
+        abajo de orden[k] son orden[k:k + subarbol[orden[k]]].
+        
+        Lanza ValueError si la red no es un árbol con una única fuente.
+        """
+        red = self.red
+        fuentes = np.flatnonzero(red.es_fuente)
+        if len(fuentes) != 1:
+            raise ValueError(
+                "La optimización exacta de redes abiertas requiere exactamente un nudo "
+                "de carga fija (cisterna, reservorio o tanque elevado)"
+            )
+        verificar_conexion_fuentes(red)
+        if red.n_tramos != red.n_nudos - 1:
+            raise ValueError(
+                "La red no es ramificada (tiene mallas o tramos en paralelo); "
+                "use el algoritmo genético"
+            )
+        
+        grafo = csr_matrix(
+            (np.ones(red.n_tramos), (red.origen, red.destino)),
+            shape=(red.n_nudos, red.n_nudos)
+        )
+        orden, padre = depth_first_order(grafo, int(fuentes[0]), directed=False)
+        
+        # Cada tramo llega al extremo cuyo padre es el otro extremo
+        hijo = np.where(padre[red.destino] == red.origen, red.destino, red.origen)
+        tramo_llegada = np.full(red.n_nudos, -1, dtype=np.int64)
+        tramo_llegada[hijo] = np.arange(red.n_tramos)
+        
+        subarbol = np.ones(red.n_nudos, dtype=np.int64)
+        for nudo in orden[:0:-1].tolist():
+            subarbol[padre[nudo]] += subarbol[nudo]
+        return orden, padre, tramo_llegada, subarbol
+    
+    def _caudales(self) -> np.ndarray:
+        """Caudal de cada tramo: demanda acumulada del subárbol aguas abajo (l/s)"""
+        acumulada = np.array(self.red.demanda, dtype=np.float64)
+        for nudo in self._orden[:0:-1].tolist():
+            acumulada[self._padre[nudo]] += acumulada[nudo]
+        
+        caudal = np.zeros(self.red.n_tramos)
+        hijos = self._orden[1:]
+        caudal[self._tramo_llegada[hijos]] = acumulada[hijos]
+        return caudal
+    
+    def _resolver_lp(self) -> Optional[np.ndarray]:
+        """Longitudes óptimas (tramos × diámetros), o None si ni el mayor diámetro cumple"""
+        red = self.red
+        n_tramos, n_diametros, n_nudos = red.n_tramos, len(self._diametros), red.n_nudos
+        n_x = n_tramos * n_diametros
+        
+        tramos = np.repeat(np.arange(n_tramos), n_diametros)
+        columnas_x = np.arange(n_x)
+        hijo = np.where(self._padre[red.destino] == red.origen, red.destino, red.origen)
+        padre = self._padre[hijo]
+        
+        # Filas 0..T-1: longitud; filas T..2T-1: balance de energía del tramo
+        filas = np.concatenate((tramos, n_tramos + tramos, n_tramos + np.arange(n_tramos), n_tramos + np.arange(n_tramos)))
+        columnas = np.concatenate((columnas_x, columnas_x, n_x + padre, n_x + hijo))
+        valores = np.concatenate((
+            np.ones(n_x), -self._perdida_metro.ravel(), np.ones(n_tramos), -np.ones(n_tramos)
+        ))
+        a_eq = csr_matrix((valores, (filas, columnas)), shape=(2 * n_tramos, n_x + n_nudos))
+        b_eq = np.concatenate((red.longitud, np.zeros(n_tramos)))
+        
+        # Cargas: la fuente fija, los demás nudos con la presión mínima
+        minimo = np.where(red.es_fuente, red.elevacion, red.elevacion + self.presion_minima)
+        maximo = np.where(red.es_fuente, red.elevacion, np.inf)
+        limites = np.concatenate((
+            np.column_stack((np.zeros(n_x), np.full(n_x, np.inf))),
+            np.column_stack((minimo, maximo)),
+        ))
+        
+        costo = np.concatenate((self._costo_metro.ravel(), np.zeros(n_nudos)))
+        resultado = linprog(costo, A_eq=a_eq, b_eq=b_eq, bounds=limites, method="highs")
+        if resultado.status != 0:
+            return None
+        return np.maximum(resultado.x[:n_x].reshape(n_tramos, n_diametros), 0.0)
+    
+    def _reducir(self, indices: np.ndarray, menores: np.ndarray) -> np.ndarray:
+        """
+        Baja a `menores` los tramos que pueden hacerlo sin violar la presión mínima
+
+        Bajar el tramo j aumenta su pérdida en Δ y reduce en Δ la presión de
+        todo su subárbol, así que es posible si Δ no supera la menor holgura
+        del subárbol. Se prueban de mayor a menor ahorro.
+        """
+        red = self.red
+        indices = indices.copy()
+        candidatos = np.flatnonzero(menores < indices)
+        if not len(candidatos):
+            return indices
+        
+        presiones = self.presiones(self._diametros[indices])
+        holgura = np.where(red.es_fuente, np.inf, presiones - self.presion_minima)[self._orden]
+        posicion = np.empty(red.n_nudos, dtype=np.int64)
+        posicion[self._orden] = np.arange(red.n_nudos)
+        hijo = np.where(self._padre[red.destino] == red.origen, red.destino, red.origen)
+        
+        longitud = red.longitud[candidatos]
+        ahorro = longitud * (
+            self._costo_metro[candidatos, indices[candidatos]]
+            - self._costo_metro[candidatos, menores[candidatos]]
+        )
+        aumento = longitud * (
+            self._perdida_metro[candidatos, menores[candidatos]]
+            - self._perdida_metro[candidatos, indices[candidatos]]
+        )
+        for k in np.argsort(-ahorro, kind="stable").tolist():
+            inicio = posicion[hijo[candidatos[k]]]
+            rango = slice(inicio, inicio + self._subarbol[hijo[candidatos[k]]])
+            if holgura[rango].min() >= aumento[k]:
+                holgura[rango] -= aumento[k]
+                indices[candidatos[k]] = menores[candidatos[k]]
+        return indices
+    
+    def presiones(self, diametros: np.ndarray) -> np.ndarray:
+        """Presión en cada nudo con un diámetro (mm) por tramo"""
+        red = self.red
+        perdida = (
+            self._perdida_metro[np.arange(red.n_tramos), np.searchsorted(self._diametros, diametros)]
+            * red.longitud
+        )
+        cargas = np.array(red.elevacion, dtype=np.float64)
+        for nudo in self._orden[1:].tolist():
+            cargas[nudo] = cargas[self._padre[nudo]] - perdida[self._tramo_llegada[nudo]]
+        return cargas - red.elevacion
+    
+    def optimizar(self) -> Dict:
+        """
+        Resuelve el programa lineal y propone un diámetro comercial por tramo
+
+        Returns:
+        - Dict con las claves de OptimizadorGA.optimizar (sin generaciones ni
+          historial), más `segmentos` (longitud de cada diámetro por tramo
+          en el óptimo) y `costo_segmentos` (su costo, cota inferior)
+        """
+        inicio = time.time()
+        red = self.red
+        
+        longitudes = self._resolver_lp()
+        if longitudes is None:
+            # Ni con el mayor diámetro en todos los tramos se cumple la presión mínima
+            indices = np.full(red.n_tramos, len(self._diametros) - 1)
+            segmentos, costo_segmentos = {}, None
+        else:
+            usados = longitudes > 1e-6 * np.maximum(red.longitud, 1.0)[:, None]
+            indices = len(self._diametros) - 1 - np.argmax(usados[:, ::-1], axis=1)
+            indices = self._reducir(indices, np.argmax(usados, axis=1))
+            segmentos = {
+                tramo_id: [
+                    {"diametro": float(self._diametros[d]), "longitud": float(fila[d])}
+                    for d in np.flatnonzero(uso).tolist()
+                ]
+                for tramo_id, fila, uso in zip(red.ids_tramos, longitudes, usados)
+            }
+            costo_segmentos = float((longitudes * self._costo_metro).sum())
+        
+        diametros = self._diametros[indices]
+        presiones = self.presiones(diametros)
+        factible = bool(longitudes is not None and (presiones[~red.es_fuente] >= self.presion_minima - 1e-6).all())
+        costo = float((red.longitud * self._costo_metro[np.arange(red.n_tramos), indices]).sum())
+        
+        return {
+            "convergencia": factible,
+            "mejor_aptitud": costo,
+            "costo_total": costo,
+            "costo_segmentos": costo_segmentos,
+            "generaciones": 0,
+            "tiempo_optimizacion": time.time() - inicio,
+            "diametros_propuestos": dict(zip(red.ids_tramos, diametros.tolist())),
+            "segmentos": segmentos,
+            "historial": [],
+            "mejora_porcentual": 0.0,
+            "motivo_parada": None,
+            "generaciones_ahorradas": 0
+        }
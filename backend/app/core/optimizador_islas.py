@@ -0,0 +1,264 @@
+"""
+Modelo de Islas del Algoritmo Genético - H-Redes Perú
+Varias subpoblaciones evolucionan en procesos separados e intercambian sus
+mejores individuos cada cierto número de generaciones
+"""
+
+import multiprocessing
+import time
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+from app.core.optimizador import OptimizadorGA, motivo_parada
+from app.core.red_compacta import RedCompacta
+
+
+def _proceso_isla(conexion, red: RedCompacta, parametros: Dict, semilla: int):
+    """
+    Bucle de una isla en su proceso
+
+    Órdenes que recibe por la conexión:
+    - ("evolucionar", generaciones, migrantes, n_mejores): integra los
+      migrantes (si hay), avanza y responde (entradas del historial, genes
+      de sus mejores individuos)
+    - ("resultado",): responde con el resultado de su OptimizadorGA
+    - None: termina
+
+    Cualquier excepción se responde como ("error", excepción).
+    """
+    try:
+        optimizador = OptimizadorGA.desde_red(red, semilla=semilla, **parametros)
+        conexion.send([optimizador.iniciar()])
+
+        while True:
+            orden = conexion.recv()
+            if orden is None:
+                break
+            if orden[0] == "evolucionar":
+                _, generaciones, migrantes, n_mejores = orden
+                if migrantes is not None:
+                    optimizador.recibir_migrantes(migrantes)
+                entradas = [optimizador.evolucionar_generacion() for _ in range(generaciones)]
+                conexion.send((entradas, optimizador.mejores(n_mejores)))
+            else:
+                conexion.send(optimizador.resultado(0.0))
+    except EOFError:
+        # El coordinador cerró la conexión (cancelación o error en otra isla)
+        pass
+    except Exception as e:
+        try:
+            conexion.send(("error", e))
+        except OSError:
+            pass
+    finally:
+        conexion.close()
+
+
+class OptimizadorIslas:
+    """
+    Algoritmo genético con modelo de islas ("ga_islas")
+
+    Cada isla es un OptimizadorGA con su propia población y semilla, en su
+    propio proceso. Cada `migracion_cada` generaciones las islas se detienen
+    y cada una envía sus `migrantes` mejores individuos a la siguiente
+    (topología de anillo), que reemplazan a sus peores. Con la misma
+    semilla el resultado es reproducible.
+    """
+
+    def __init__(
+        self,
+        red: RedCompacta,
+        islas: int = 4,
+        migracion_cada: int = 10,
+        migrantes: int = 2,
+        generaciones: int = 50,
+        semilla: Optional[int] = None,
+        al_generacion: Optional[Callable[[int, Dict], None]] = None,
+        paciencia: Optional[int] = None,
+        tolerancia_mejora: float = 1e-6,
+        tiempo_maximo: Optional[float] = None,
+        **parametros
+    ):
+        """
+        - parametros: argumentos de OptimizadorGA para cada isla
+          (diametros_comerciales, presion_minima, poblacion_size, ...)
+        - paciencia, tolerancia_mejora, tiempo_maximo: parada anticipada
+          sobre el historial combinado, revisada en cada migración
+        """
+        self.red = red
+        self.islas = max(1, islas)
+        self.migracion_cada = max(1, migracion_cada)
+        self.migrantes = max(0, migrantes)
+        self.generaciones = generaciones
+        self.al_generacion = al_generacion
+        self.paciencia = paciencia
+        self.tolerancia_mejora = tolerancia_mejora
+        self.tiempo_maximo = tiempo_maximo
+        self.motivo_parada: Optional[str] = None
+        self.parametros = {**parametros, "workers": 1}
+
+        # Una semilla independiente por isla
+        self.semillas = [
+            int(s.generate_state(1)[0]) for s in np.random.SeedSequence(semilla).spawn(self.islas)
+        ]
+
+        # Métricas
+        self.historiales: List[List[Dict]] = [[] for _ in range(self.islas)]
+        self.historial_aptitud: List[Dict] = []
+        self.migraciones = 0
+
+    def optimizar(self) -> Dict:
+        """
+        Ejecuta las islas hasta completar las generaciones
+
+        Returns:
+        - Dict con las mismas claves que OptimizadorGA.optimizar (la solución
+          es la del mejor individuo de todas las islas), más `islas` (semilla,
+          resultado e historial de cada una), `mejor_isla` y `migraciones`
+        """
+        inicio = time.time()
+
+        print("=" * 60)
+        print("OPTIMIZACIÓN DE DIÁMETROS - ALGORITMO GENÉTICO (ISLAS)")
+        print("=" * 60)
+        print(f"Islas: {self.islas}")
+        print(f"Población por isla: {self.parametros.get('poblacion_size', 100)}")
+        print(f"Generaciones: {self.generaciones}")
+        print(f"Migración: {self.migrantes} individuos cada {self.migracion_cada} generaciones")
+        print()
+
+        contexto = multiprocessing.get_context("spawn")
+        conexiones, procesos = [], []
+        completado = False
+        try:
+            for semilla in self.semillas:
+                conexion, extremo = contexto.Pipe()
+                proceso = contexto.Process(
+                    target=_proceso_isla,
+                    args=(extremo, self.red, self.parametros, semilla),
+                )
+                proceso.start()
+                extremo.close()
+                conexiones.append(conexion)
+                procesos.append(proceso)
+
+            self._registrar([self._recibir(c) for c in conexiones])
+
+            generacion = 0
+            migrantes: List[Optional[np.ndarray]] = [None] * self.islas
+            while True:
+                self.motivo_parada = motivo_parada(
+                    self.historial_aptitud,
+                    self.generaciones,
+                    inicio,
+                    self.paciencia,
+                    self.tolerancia_mejora,
+                    self.tiempo_maximo
+                )
+                if self.motivo_parada is not None:
+                    break
+
+                paso = min(self.migracion_cada, self.generaciones - generacion)
+                if migrantes[0] is not None:
+                    self.migraciones += 1
+                for conexion, llegan in zip(conexiones, migrantes):
+                    conexion.send(("evolucionar", paso, llegan, self.migrantes))
+                respuestas = [self._recibir(c) for c in conexiones]
+                generacion += paso
+
+                self._registrar([entradas for entradas, _ in respuestas])
+
+                # Anillo: la isla i recibe los mejores de la isla i - 1
+                if self.islas > 1 and self.migrantes:
+                    mejores = [genes for _, genes in respuestas]
+                    migrantes = [mejores[i - 1] for i in range(self.islas)]
+                else:
+                    migrantes = [None] * self.islas
+
+            for conexion in conexiones:
+                conexion.send(("resultado",))
+            resultados = [self._recibir(c) for c in conexiones]
+
+            for conexion in conexiones:
+                conexion.send(None)
+            completado = True
+        finally:
+            # Si se interrumpe (cancelación, error de una isla) no se espera a las demás
+            for conexion in conexiones:
+                conexion.close()
+            for proceso in procesos:
+                proceso.join(timeout=5 if completado else 0)
+                if proceso.is_alive():
+                    proceso.terminate()
+                    proceso.join()
+
+        return self._combinar(resultados, time.time() - inicio)
+
+    @staticmethod
+    def _recibir(conexion):
+        """Respuesta de una isla; relanza su excepción si falló"""
+        respuesta = conexion.recv()
+        if isinstance(respuesta, tuple) and len(respuesta) == 2 and respuesta[0] == "error":
+            raise respuesta[1]
+        return respuesta
+
+    def _registrar(self, entradas_por_isla: List[List[Dict]]):
+        """Agrega las entradas de cada isla y la entrada combinada de cada generación"""
+        for historial, entradas in zip(self.historiales, entradas_por_isla):
+            historial.extend(entradas)
+
+        for entradas in zip(*entradas_por_isla):
+            entrada = {
+                "generacion": entradas[0]["generacion"],
+                "mejor_aptitud": min(e["mejor_aptitud"] for e in entradas),
+                "peor_aptitud": max(e["peor_aptitud"] for e in entradas),
+                "aptitud_promedio": float(np.mean([e["aptitud_promedio"] for e in entradas])),
+                "factibles": sum(e["factibles"] for e in entradas),
+                "tasa_aciertos_cache": float(np.mean([e["tasa_aciertos_cache"] for e in entradas])),
+            }
+            self.historial_aptitud.append(entrada)
+
+            generacion = entrada["generacion"]
+            if generacion == 0 or generacion % 10 == 0 or generacion == self.generaciones:
+                print(f"Generación {generacion}: Mejor={entrada['mejor_aptitud']:.2f}, Factibles={entrada['factibles']}")
+            if self.al_generacion is not None:
+                self.al_generacion(generacion, entrada)
+
+    def _combinar(self, resultados: List[Dict], tiempo_total: float) -> Dict:
+        """Resultado global a partir del de cada isla"""
+        mejor_isla = min(range(self.islas), key=lambda i: resultados[i]["mejor_aptitud"])
+        mejor = resultados[mejor_isla]
+
+        inicial = self.historial_aptitud[0]["mejor_aptitud"]
+        final = self.historial_aptitud[-1]["mejor_aptitud"]
+        mejora = max(0.0, (inicial - final) / inicial * 100) if inicial else 0.0
+
+        cache = {
+            clave: sum(r["cache_aptitud"][clave] for r in resultados)
+            for clave in ("aciertos", "fallos", "entradas")
+        }
+
+        return {
+            **mejor,
+            "generaciones": len(self.historial_aptitud) - 1,
+            "tiempo_optimizacion": tiempo_total,
+            "historial": self.historial_aptitud,
+            "mejora_porcentual": mejora,
+            "cache_aptitud": cache,
+            "motivo_parada": self.motivo_parada,
+            "generaciones_ahorradas": max(0, self.generaciones - (len(self.historial_aptitud) - 1)),
+            "mejor_isla": mejor_isla,
+            "migraciones": self.migraciones,
+            "islas": [
+                {
+                    "isla": i,
+                    "semilla": self.semillas[i],
+                    "mejor_aptitud": resultado["mejor_aptitud"],
+                    "costo_total": resultado["costo_total"],
+                    "convergencia": resultado["convergencia"],
+                    "historial": self.historiales[i],
+                }
+                for i, resultado in enumerate(resultados)
+            ],
+        }
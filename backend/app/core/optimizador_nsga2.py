@@ -0,0 +1,209 @@
+"""
+Optimización Multiobjetivo NSGA-II - H-Redes Perú
+Frente de Pareto entre el costo de la red y el excedente de presión sobre
+la mínima normativa
+"""
+
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from app.core.optimizador import OptimizadorGA
+
+
+def ordenar_no_dominados(objetivos: np.ndarray, violacion: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Rango de no dominancia de cada individuo (0 = frente de Pareto)
+
+    - objetivos: (individuos, objetivos), todos a minimizar
+    - violacion: violación de restricciones (0 = factible). Con ella se usa
+      la dominancia con restricciones de Deb: un factible domina a cualquier
+      infactible y entre infactibles domina el de menor violación
+
+    La matriz de dominancia (individuos × individuos) se arma de una vez;
+    cada frente son los individuos que ya nadie domina tras descontar los
+    dominados por los frentes anteriores.
+    """
+    objetivos = np.asarray(objetivos, dtype=np.float64)
+    n = len(objetivos)
+    domina = (
+        (objetivos[:, None, :] <= objetivos[None, :, :]).all(axis=2)
+        & (objetivos[:, None, :] < objetivos[None, :, :]).any(axis=2)
+    )
+    if violacion is not None:
+        violacion = np.asarray(violacion, dtype=np.float64)
+        factible = violacion <= 0
+        domina = np.where(
+            factible[:, None] & factible[None, :], domina, violacion[:, None] < violacion[None, :]
+        )
+
+    dominadores = domina.sum(axis=0)
+    rango = np.full(n, -1, dtype=np.int64)
+    frente = np.flatnonzero(dominadores == 0)
+    k = 0
+    while len(frente):
+        rango[frente] = k
+        dominadores[frente] = -1
+        dominadores -= domina[frente].sum(axis=0)
+        frente = np.flatnonzero(dominadores == 0)
+        k += 1
+    return rango
+
+
+def distancia_hacinamiento(objetivos: np.ndarray, rango: np.ndarray) -> np.ndarray:
+    """
+    Distancia de hacinamiento de cada individuo dentro de su frente
+
+    Por objetivo, suma la separación normalizada entre los vecinos de cada
+    individuo en su frente; los extremos de cada frente reciben infinito.
+    Todos los frentes se procesan juntos ordenando por (rango, objetivo).
+    """
+    objetivos = np.asarray(objetivos, dtype=np.float64)
+    n = len(objetivos)
+    distancia = np.zeros(n)
+    if n == 0:
+        return distancia
+
+    for j in range(objetivos.shape[1]):
+        orden = np.lexsort((objetivos[:, j], rango))
+        valores = objetivos[orden, j]
+        frente = rango[orden]
+        inicio = np.r_[True, frente[1:] != frente[:-1]]
+        fin = np.r_[frente[1:] != frente[:-1], True]
+
+        grupo = np.cumsum(inicio) - 1
+        amplitud = (valores[fin] - valores[inicio])[grupo]
+        separacion = np.zeros(n)
+        separacion[1:-1] = valores[2:] - valores[:-2]
+
+        aporte = np.divide(separacion, amplitud, out=np.zeros(n), where=amplitud > 0)
+        aporte[inicio | fin] = np.inf
+        distancia[orden] += aporte
+    return distancia
+
+
+class OptimizadorNSGA2(OptimizadorGA):
+    """
+    Optimizador de diámetros multiobjetivo ("nsga2")
+
+    Minimiza el costo y maximiza el excedente de presión (la menor presión
+    sobre la mínima en los nudos de consumo), con la misma evaluación
+    hidráulica, cache y operadores de cruce y mutación que OptimizadorGA.
+    Cada generación une padres e hijos y conserva los mejores por rango de
+    no dominancia y distancia de hacinamiento; la población queda ordenada
+    así, de modo que el torneo por posición es el torneo de NSGA-II.
+
+    El resultado incluye el frente de Pareto final; la solución propuesta
+    es la más barata que cumple la presión mínima.
+    """
+
+    titulo = "NSGA-II (COSTO vs. EXCEDENTE DE PRESIÓN)"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._costo: Optional[np.ndarray] = None
+        self._excedente: Optional[np.ndarray] = None
+        self._rango: Optional[np.ndarray] = None
+
+    def iniciar(self) -> Dict:
+        """Crea y evalúa la población inicial; retorna la entrada de la generación 0"""
+        self._seleccionar_sobrevivientes(self._inicializar_poblacion())
+        return self._registrar_generacion(0, self._aptitud, self._factible)
+
+    def evolucionar_generacion(self) -> Dict:
+        """Padres + hijos, reducidos a la población por rango y hacinamiento"""
+        posicion = np.arange(len(self._poblacion), dtype=np.float64)
+        hijos = self._reproducir(self._poblacion, posicion, self.poblacion_size)
+        self._seleccionar_sobrevivientes(np.concatenate((self._poblacion, hijos)))
+
+        entrada = self._registrar_generacion(len(self.historial_aptitud), self._aptitud, self._factible)
+        self._adaptar_mutacion(entrada["diversidad"])
+        return entrada
+
+    def _seleccionar_sobrevivientes(self, candidatos: np.ndarray):
+        """
+        Conserva `poblacion_size` candidatos ordenados por (rango, -hacinamiento)
+
+        Los cromosomas repetidos solo se consideran una vez; si no alcanzan
+        para completar la población, las repeticiones van al final.
+        """
+        _, primeros = np.unique(candidatos, axis=0, return_index=True)
+        unicos = np.sort(primeros)
+        repetidos = np.setdiff1d(np.arange(len(candidatos)), unicos)
+
+        costo, penalizacion, excedente, factible = self._evaluar_objetivos(candidatos)
+        objetivos = np.column_stack((costo, -excedente))
+        # Violación: déficit de presión del nudo más desfavorable
+        violacion = np.where(factible, 0.0, np.maximum(-excedente, np.finfo(np.float64).eps))
+
+        rango = np.zeros(len(candidatos), dtype=np.int64)
+        distancia = np.zeros(len(candidatos))
+        rango[unicos] = ordenar_no_dominados(objetivos[unicos], violacion[unicos])
+        distancia[unicos] = distancia_hacinamiento(objetivos[unicos], rango[unicos])
+        orden = unicos[np.lexsort((-distancia[unicos], rango[unicos]))]
+        rango[repetidos] = rango[unicos].max(initial=0) + 1
+
+        elegidos = np.concatenate((orden, repetidos))[:self.poblacion_size]
+        self._poblacion = candidatos[elegidos]
+        self._aptitud = (costo + penalizacion)[elegidos]
+        self._factible = factible[elegidos]
+        self._costo = costo[elegidos]
+        self._excedente = excedente[elegidos]
+        self._rango = rango[elegidos]
+
+        # Propuesta: la más barata que cumple, o la de menor violación
+        if self._factible.any():
+            mejor = int(np.flatnonzero(self._factible)[np.argmin(self._costo[self._factible])])
+        else:
+            mejor = int(np.argmin(violacion[elegidos]))
+        self._mejor_genes = self._poblacion[mejor].copy()
+        self.mejor_individuo = self._individuo(self._mejor_genes, self._aptitud[mejor], self._factible[mejor])
+
+    def _registrar_generacion(self, generacion: int, aptitud: np.ndarray, factible: np.ndarray) -> Dict:
+        """Entrada del historial con la aptitud escalar ordenada y el tamaño del frente"""
+        entrada = super()._registrar_generacion(generacion, np.sort(aptitud), factible)
+        entrada["tamano_frente"] = int((self._rango == 0).sum())
+        return entrada
+
+    def _arreglos_punto_control(self) -> Dict[str, np.ndarray]:
+        """Además de la población, sus objetivos y rangos (el orden del torneo)"""
+        return {
+            **super()._arreglos_punto_control(),
+            "costo": self._costo,
+            "excedente": self._excedente,
+            "rango": self._rango,
+        }
+
+    def _restaurar_arreglos(self, arreglos: Dict[str, np.ndarray]):
+        super()._restaurar_arreglos(arreglos)
+        self._costo = arreglos["costo"]
+        self._excedente = arreglos["excedente"]
+        self._rango = arreglos["rango"]
+
+    def frente_pareto(self) -> List[Dict]:
+        """
+        Frente de Pareto de la población actual, ordenado por costo
+
+        Si hay soluciones factibles solo se incluyen ellas. Cada punto trae
+        su costo, su excedente de presión (m) y sus diámetros por tramo, para
+        graficar el frente y aplicar cualquiera de sus soluciones.
+        """
+        en_frente = self._rango == 0
+        if self._factible[en_frente].any():
+            en_frente &= self._factible
+        indices = np.flatnonzero(en_frente)
+        indices = indices[np.lexsort((-self._excedente[indices], self._costo[indices]))]
+
+        return [
+            {
+                "costo": float(self._costo[i]),
+                "excedente_presion": float(self._excedente[i]),
+                "factible": bool(self._factible[i]),
+                "diametros": dict(zip(self._ids_tramos, self._diametros[self._poblacion[i]].tolist())),
+            }
+            for i in indices.tolist()
+        ]
+
+    def resultado(self, tiempo_total: float) -> Dict:
+        """Resultado de OptimizadorGA más el frente de Pareto final"""
+        return {**super().resultado(tiempo_total), "frente_pareto": self.frente_pareto()}
@@ -0,0 +1,131 @@
+"""
+Puntos de Control de la Optimización - H-Redes Perú
+Almacén en archivos locales del último punto de control de cada proyecto,
+para reanudar una optimización interrumpida (reinicio del worker, tiempo
+agotado, cancelación)
+"""
+
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, Optional, Set, Tuple, Union
+from uuid import UUID
+
+
+def escribir_punto_control(ruta: Union[str, Path], blob: bytes):
+    """
+    Reemplaza el punto de control en `ruta` de forma atómica (archivo
+    temporal + os.replace): una interrupción a mitad de la escritura deja
+    el punto anterior. Se llama desde el proceso que optimiza.
+    """
+    ruta = Path(ruta)
+    temporal = ruta.with_name(f"{ruta.name}.{os.getpid()}.tmp")
+    temporal.write_bytes(blob)
+    os.replace(temporal, ruta)
+
+
+def leer_punto_control(ruta: Union[str, Path]) -> bytes:
+    """Blob del punto de control en `ruta`"""
+    try:
+        return Path(ruta).read_bytes()
+    except OSError:
+        raise ValueError("No hay punto de control para reanudar la optimización")
+
+
+class PuntoControlEnUso(Exception):
+    """Ya hay una optimización en curso que escribe ese punto de control"""
+
+
+class AlmacenPuntosControl:
+    """
+    Puntos de control de las optimizaciones de cada proyecto
+
+    Cada ejecución (identificada por su clave: huella de la red y de los
+    parámetros) tiene dos archivos en `directorio`/{proyecto_id}/:
+    - {ejecucion}.npz: estado de la evolución (OptimizadorGA.punto_control),
+      que escribe el proceso del pool de cómputo cada `cada` generaciones
+    - {ejecucion}.json: la solicitud de optimización, para reanudar con
+      los mismos parámetros
+
+    Así dos optimizaciones simultáneas del proyecto con distintos
+    parámetros no se pisan. Mientras una ejecución está en curso (entre
+    `iniciar` y `terminar`) su clave queda reservada en este proceso; al
+    terminar bien sus archivos se eliminan.
+    """
+
+    def __init__(self, directorio: Union[str, Path] = "./puntos_control", cada: int = 0):
+        self.directorio = Path(directorio)
+        self.cada = cada
+        self._en_curso: Set[Tuple[UUID, str]] = set()
+
+    def configurar(self, directorio: Union[str, Path], cada: int):
+        """Directorio y frecuencia (0 = sin puntos de control); se llama desde el lifespan"""
+        self.directorio = Path(directorio)
+        self.cada = max(0, cada)
+        if self.cada:
+            self.directorio.mkdir(parents=True, exist_ok=True)
+
+    @property
+    def activo(self) -> bool:
+        return self.cada > 0
+
+    def ruta(self, proyecto_id: UUID, ejecucion: str) -> Path:
+        """Archivo del punto de control de una ejecución"""
+        return self.directorio / str(proyecto_id) / f"{ejecucion}.npz"
+
+    def iniciar(self, proyecto_id: UUID, ejecucion: str, solicitud: Optional[Dict[str, Any]] = None):
+        """
+        Reserva la ejecución; con `solicitud` es una optimización nueva: la
+        registra y descarta su punto de control anterior (sin ella, se
+        reanuda y se conserva)
+
+        Lanza PuntoControlEnUso si la ejecución ya está en curso.
+        """
+        clave = (proyecto_id, ejecucion)
+        if clave in self._en_curso:
+            raise PuntoControlEnUso("Ya hay una optimización en curso con estos parámetros")
+        self._en_curso.add(clave)
+
+        if solicitud is not None:
+            ruta = self.ruta(proyecto_id, ejecucion)
+            ruta.parent.mkdir(parents=True, exist_ok=True)
+            ruta.unlink(missing_ok=True)
+            ruta = ruta.with_suffix(".json")
+            temporal = ruta.with_name(f"{ruta.name}.{os.getpid()}.tmp")
+            temporal.write_text(json.dumps(solicitud), encoding="utf-8")
+            os.replace(temporal, ruta)
+
+    def terminar(self, proyecto_id: UUID, ejecucion: str, completada: bool):
+        """Libera la ejecución; si se completó ya no hay nada que reanudar"""
+        self._en_curso.discard((proyecto_id, ejecucion))
+        if completada:
+            ruta = self.ruta(proyecto_id, ejecucion)
+            ruta.unlink(missing_ok=True)
+            ruta.with_suffix(".json").unlink(missing_ok=True)
+
+    def en_curso(self, proyecto_id: UUID, ejecucion: str) -> bool:
+        """Si la ejecución está reservada (entre `iniciar` y `terminar`)"""
+        return (proyecto_id, ejecucion) in self._en_curso
+
+    def ultima(self, proyecto_id: UUID) -> Optional[Tuple[str, Dict[str, Any]]]:
+        """
+        (ejecución, solicitud) del punto de control más reciente del
+        proyecto, si hay (puede estar en curso: ver `en_curso`)
+        """
+        directorio = self.directorio / str(proyecto_id)
+        candidatos = []
+        for ruta in directorio.glob("*.npz"):
+            try:
+                candidatos.append((ruta.stat().st_mtime, ruta))
+            except OSError:
+                continue
+        for _, ruta in sorted(candidatos, reverse=True):
+            try:
+                return ruta.stem, json.loads(ruta.with_suffix(".json").read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                continue
+        return None
+
+
+# Almacén de la aplicación
+puntos_control = AlmacenPuntosControl()
@@ -0,0 +1,361 @@
+"""
+Red Compacta - H-Redes Perú
+Representación de la red en arreglos contiguos (struct-of-arrays) para los solvers
+"""
+
+from dataclasses import dataclass, field
+from functools import cached_property
+import hashlib
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+from uuid import UUID
+import numpy as np
+
+
+TIPOS_FUENTE = ("cisterna", "reservorio", "tanque_elevado")
+
+
+@dataclass
+class IndiceAdyacencia:
+    """
+    Índice de adyacencia compacto (CSR) de la red
+
+    Los nudos y tramos se numeran con enteros; los tramos que salen del
+    nudo i son `salida_tramos[salida_ptr[i]:salida_ptr[i + 1]]` y los que
+    llegan, `entrada_tramos[entrada_ptr[i]:entrada_ptr[i + 1]]`, en el
+    orden original de los tramos.
+    """
+    origen: np.ndarray  # int32 por tramo
+    destino: np.ndarray  # int32 por tramo
+    salida_ptr: np.ndarray
+    salida_tramos: np.ndarray
+    entrada_ptr: np.ndarray
+    entrada_tramos: np.ndarray
+
+    @classmethod
+    def construir(cls, n_nudos: int, origen: np.ndarray, destino: np.ndarray) -> "IndiceAdyacencia":
+        origen = np.asarray(origen, dtype=np.int32)
+        destino = np.asarray(destino, dtype=np.int32)
+
+        def csr(claves):
+            ptr = np.zeros(n_nudos + 1, dtype=np.int32)
+            np.cumsum(np.bincount(claves, minlength=n_nudos), out=ptr[1:])
+            return ptr, np.argsort(claves, kind="stable").astype(np.int32)
+
+        salida_ptr, salida_tramos = csr(origen)
+        entrada_ptr, entrada_tramos = csr(destino)
+
+        return cls(origen, destino, salida_ptr, salida_tramos, entrada_ptr, entrada_tramos)
+
+    def salientes(self, nudo: int) -> np.ndarray:
+        return self.salida_tramos[self.salida_ptr[nudo]:self.salida_ptr[nudo + 1]]
+
+    def entrantes(self, nudo: int) -> np.ndarray:
+        return self.entrada_tramos[self.entrada_ptr[nudo]:self.entrada_ptr[nudo + 1]]
+
+    def grado_entrada(self) -> np.ndarray:
+        return np.diff(self.entrada_ptr)
+
+    def no_dirigida(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Vecindad sin sentido (sin tramos en bucle), en formato CSR
+
+        Retorna (ptr, vecinos, tramos): los vecinos del nudo i son
+        `vecinos[ptr[i]:ptr[i + 1]]`, alcanzados por `tramos[...]`, en el
+        orden original de los tramos.
+        """
+        n_nudos = len(self.salida_ptr) - 1
+        validos = np.flatnonzero(self.origen != self.destino)
+        claves = np.concatenate((self.origen[validos], self.destino[validos]))
+        vecinos = np.concatenate((self.destino[validos], self.origen[validos]))
+        tramos = np.concatenate((validos, validos))
+
+        orden = np.lexsort((tramos, claves))
+        ptr = np.zeros(n_nudos + 1, dtype=np.int32)
+        np.cumsum(np.bincount(claves, minlength=n_nudos), out=ptr[1:])
+
+        return ptr, vecinos[orden], tramos[orden].astype(np.int32)
+
+
+@dataclass
+class RedCompacta:
+    """
+    Red hidráulica como estructura de arreglos (struct-of-arrays)
+
+    Se construye una sola vez a partir de las filas de la base de datos (o de
+    los dataclasses Nudo/Tramo): cada atributo numérico es un arreglo denso
+    indexado por la posición entera del nudo o del tramo, y los tramos
+    guardan sus extremos como índices int32. Los UUID solo se usan para
+    traducir entradas y resultados (`indice_nudo`, `indice_tramo`).
+    """
+    # Nudos
+    ids_nudos: List[UUID]
+    codigos_nudos: List[str]
+    elevacion: np.ndarray  # float64, m.s.n.m.
+    demanda: np.ndarray  # float64, l/s
+    es_fuente: np.ndarray  # bool, carga fija (cisterna, reservorio, tanque elevado)
+    coordenadas: np.ndarray  # float64 (N, 2): longitud, latitud en grados (NaN si falta)
+
+    # Tramos
+    ids_tramos: List[UUID]
+    codigos_tramos: List[str]
+    origen: np.ndarray  # int32
+    destino: np.ndarray  # int32
+    longitud: np.ndarray  # float64, m
+    diametro: np.ndarray  # float64, mm
+    coef_hw: np.ndarray  # float64
+
+    indice_nudo: Dict[UUID, int] = field(default_factory=dict)
+    adyacencia: Optional[IndiceAdyacencia] = None
+
+    # Patrones de variación de demanda tal como vienen (posición del nudo ->
+    # lista o {"multiplicadores": [...]}): solo el periodo extendido los
+    # usa, así que se validan en `multiplicadores_demanda`
+    patrones_demanda: Dict[int, Any] = field(default_factory=dict)
+
+    def __post_init__(self):
+        if not self.indice_nudo:
+            self.indice_nudo = {nudo_id: i for i, nudo_id in enumerate(self.ids_nudos)}
+        if self.adyacencia is None:
+            self.adyacencia = IndiceAdyacencia.construir(self.n_nudos, self.origen, self.destino)
+
+    def __getstate__(self) -> Dict:
+        """
+        Estado compacto para serializar (p. ej. hacia el pool de cómputo)
+
+        Los UUID viajan como bloques de 16 bytes y los índices derivados se
+        reconstruyen al deserializar.
+        """
+        estado = dict(self.__dict__)
+        for derivado in ("indice_nudo", "adyacencia", "indice_tramo"):
+            estado.pop(derivado, None)
+        estado["ids_nudos"] = b"".join(u.bytes for u in self.ids_nudos)
+        estado["ids_tramos"] = b"".join(u.bytes for u in self.ids_tramos)
+        return estado
+
+    def __setstate__(self, estado: Dict):
+        for campo in ("ids_nudos", "ids_tramos"):
+            bloque = estado[campo]
+            estado[campo] = [UUID(bytes=bloque[k:k + 16]) for k in range(0, len(bloque), 16)]
+        self.__dict__.update(estado, indice_nudo={}, adyacencia=None)
+        self.__post_init__()
+
+    @cached_property
+    def indice_tramo(self) -> Dict[UUID, int]:
+        """UUID -> posición del tramo (se construye al primer uso)"""
+        return {tramo_id: j for j, tramo_id in enumerate(self.ids_tramos)}
+
+    @property
+    def n_nudos(self) -> int:
+        return len(self.ids_nudos)
+
+    @property
+    def n_tramos(self) -> int:
+        return len(self.ids_tramos)
+
+    @property
+    def tiene_coordenadas(self) -> bool:
+        """True si todos los nudos tienen longitud y latitud"""
+        return bool(np.isfinite(self.coordenadas).all())
+
+    def huella(self) -> str:
+        """
+        Hash SHA-256 del contenido hidráulico de la red
+
+        No depende del orden de nudos y tramos (las filas de la BD llegan sin
+        orden fijo): ambos se recorren ordenados por UUID y los extremos de
+        los tramos se traducen a esas posiciones. Las coordenadas y los
+        patrones de demanda no entran, porque no afectan el cálculo en
+        régimen permanente.
+        """
+        h = hashlib.sha256()
+        orden_nudos = sorted(range(self.n_nudos), key=self.ids_nudos.__getitem__)
+        orden_tramos = sorted(range(self.n_tramos), key=self.ids_tramos.__getitem__)
+        posicion = np.empty(self.n_nudos, dtype=np.int64)
+        posicion[orden_nudos] = np.arange(self.n_nudos)
+
+        h.update(b"".join(self.ids_nudos[i].bytes for i in orden_nudos))
+        h.update("\0".join(self.codigos_nudos[i] for i in orden_nudos).encode())
+        for arreglo in (self.elevacion, self.demanda, self.es_fuente):
+            h.update(np.ascontiguousarray(arreglo[orden_nudos]).tobytes())
+
+        h.update(b"".join(self.ids_tramos[j].bytes for j in orden_tramos))
+        h.update("\0".join(self.codigos_tramos[j] for j in orden_tramos).encode())
+        h.update(posicion[self.origen[orden_tramos]].tobytes())
+        h.update(posicion[self.destino[orden_tramos]].tobytes())
+        for arreglo in (self.longitud, self.diametro, self.coef_hw):
+            h.update(np.ascontiguousarray(arreglo[orden_tramos]).tobytes())
+        return h.hexdigest()
+
+    def multiplicadores_demanda(
+        self,
+        horas: np.ndarray,
+        patron_defecto: Optional[Sequence[float]] = None
+    ) -> np.ndarray:
+        """
+        Multiplicador de demanda de cada nudo en cada instante, forma (periodos, nudos)
+
+        Los patrones son horarios y cíclicos: en la hora t se aplica
+        `patron[floor(t) % len(patron)]`. Los nudos sin patrón propio usan
+        `patron_defecto` (o 1.0 si no se indica).
+
+        Lanza ValueError si algún patrón no es válido.
+        """
+        horas = np.floor(np.asarray(horas, dtype=np.float64)).astype(np.int64)
+        factores = np.ones((len(horas), self.n_nudos))
+
+        if patron_defecto is not None:
+            defecto = _multiplicadores(patron_defecto, "patrón por defecto")
+            factores[:] = defecto[horas % len(defecto)][:, None]
+
+        # Agrupar por longitud de patrón para indexar todos a la vez
+        por_longitud: Dict[int, List[Tuple[int, np.ndarray]]] = {}
+        for i, valor in self.patrones_demanda.items():
+            patron = _multiplicadores(valor, f"nudo {self.codigos_nudos[i]}")
+            if patron is not None:
+                por_longitud.setdefault(len(patron), []).append((i, patron))
+        for longitud, grupo in por_longitud.items():
+            nudos = [i for i, _ in grupo]
+            patrones = np.array([patron for _, patron in grupo])
+            factores[:, nudos] = patrones[:, horas % longitud].T
+
+        return factores
+
+    @classmethod
+    def construir(
+        cls,
+        nudos: Iterable[Tuple[UUID, str, str, float, float, Optional[float], Optional[float]]],
+        tramos: Iterable[Tuple[UUID, str, UUID, UUID, float, float, float]],
+        patrones: Optional[Dict[UUID, object]] = None
+    ) -> "RedCompacta":
+        """
+        Construye la red a partir de tuplas planas
+
+        - nudos: (id, codigo, tipo, elevacion, demanda, longitud, latitud)
+        - tramos: (id, codigo, nudo_origen_id, nudo_destino_id, longitud, diametro, C)
+        - patrones: id de nudo -> patrón de demanda (lista de multiplicadores
+          o {"multiplicadores": [...]}), solo para los nudos que lo tienen;
+          se guardan sin validar (ver `multiplicadores_demanda`)
+
+        Lanza ValueError si un tramo referencia un nudo inexistente.
+        """
+        ids_nudos, codigos_nudos, tipos, elevacion, demanda, lon, lat = (
+            _columnas(nudos, 7)
+        )
+        ids_tramos, codigos_tramos, origen_ids, destino_ids, longitud, diametro, coef_hw = (
+            _columnas(tramos, 7)
+        )
+
+        indice_nudo = {nudo_id: i for i, nudo_id in enumerate(ids_nudos)}
+        try:
+            origen = np.fromiter((indice_nudo[n] for n in origen_ids), np.int32, len(origen_ids))
+            destino = np.fromiter((indice_nudo[n] for n in destino_ids), np.int32, len(destino_ids))
+        except KeyError as e:
+            raise ValueError(f"Tramo conectado a un nudo inexistente: {e.args[0]}")
+
+        patrones_demanda = {indice_nudo[nudo_id]: valor for nudo_id, valor in (patrones or {}).items()}
+
+        return cls(
+            ids_nudos=ids_nudos,
+            codigos_nudos=codigos_nudos,
+            elevacion=np.array(elevacion, dtype=np.float64),
+            demanda=np.array(demanda, dtype=np.float64),
+            es_fuente=np.fromiter((t in TIPOS_FUENTE for t in tipos), bool, len(tipos)),
+            coordenadas=np.array(
+                [lon, lat], dtype=np.float64
+            ).T.reshape(len(ids_nudos), 2),
+            ids_tramos=ids_tramos,
+            codigos_tramos=codigos_tramos,
+            origen=origen,
+            destino=destino,
+            longitud=np.array(longitud, dtype=np.float64),
+            diametro=np.array(diametro, dtype=np.float64),
+            coef_hw=np.array(coef_hw, dtype=np.float64),
+            indice_nudo=indice_nudo,
+            patrones_demanda=patrones_demanda,
+        )
+
+    @classmethod
+    def desde_modelos(cls, nudos_db: Iterable, tramos_db: Iterable) -> "RedCompacta":
+        """Construye la red desde las filas ORM de nudos y tramos"""
+        nudos_db = list(nudos_db)
+        return cls.construir(
+            (
+                (
+                    n.id,
+                    n.codigo,
+                    n.tipo.value if hasattr(n.tipo, "value") else str(n.tipo),
+                    n.elevacion or 0.0,
+                    n.demanda_base or 0.0,
+                    n.longitud,
+                    n.latitud,
+                )
+                for n in nudos_db
+            ),
+            (
+                (
+                    t.id,
+                    t.codigo,
+                    t.nudo_origen_id,
+                    t.nudo_destino_id,
+                    t.longitud or 0.0,
+                    t.diametro_interior or 0.0,
+                    t.coef_hazen_williams or 150.0,
+                )
+                for t in tramos_db
+            ),
+            patrones={n.id: n.demanda_pattern for n in nudos_db if n.demanda_pattern},
+        )
+
+    @classmethod
+    def desde_dataclasses(cls, nudos: Dict, tramos: Dict) -> "RedCompacta":
+        """Construye la red desde los diccionarios de Nudo y Tramo del motor"""
+        return cls.construir(
+            (
+                (n.id, n.codigo, n.tipo, n.elevacion, n.demanda, n.longitud, n.latitud)
+                for n in nudos.values()
+            ),
+            (
+                (
+                    t.id,
+                    t.codigo,
+                    t.nudo_origen_id,
+                    t.nudo_destino_id,
+                    t.longitud,
+                    t.diametro,
+                    t.coef_hazen_williams,
+                )
+                for t in tramos.values()
+            ),
+            patrones={n.id: n.demanda_pattern for n in nudos.values() if n.demanda_pattern},
+        )
+
+
+def _columnas(filas: Iterable[Tuple], n_columnas: int) -> List[list]:
+    """Transpone filas de tuplas en listas por columna"""
+    columnas = list(zip(*filas))
+    if not columnas:
+        return [[] for _ in range(n_columnas)]
+    return [list(c) for c in columnas]
+
+
+def _multiplicadores(valor, origen: str) -> Optional[np.ndarray]:
+    """
+    Convierte un patrón de demanda (lista o {"multiplicadores": [...]}) en arreglo
+
+    Retorna None si el patrón está vacío. Lanza ValueError si contiene
+    valores no numéricos, negativos o no finitos.
+    """
+    if isinstance(valor, dict):
+        valor = valor.get("multiplicadores")
+    if not valor:
+        return None
+    try:
+        patron = np.array(valor, dtype=np.float64)
+    except (TypeError, ValueError):
+        raise ValueError(f"Patrón de demanda inválido ({origen}): se esperaba una lista de números")
+    if patron.ndim != 1 or not np.isfinite(patron).all() or (patron < 0).any():
+        raise ValueError(
+            f"Patrón de demanda inválido ({origen}): los multiplicadores deben ser "
+            "números finitos no negativos"
+        )
+    return patron
@@ -0,0 +1,329 @@
+"""
+Trabajos en Segundo Plano - H-Redes Perú
+Cálculos y optimizaciones que se envían al pool de cómputo sin bloquear la
+petición HTTP: el cliente recibe un id y consulta el estado, el progreso y
+el resultado hasta que el trabajo termina
+"""
+
+import asyncio
+import json
+import os
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+from uuid import UUID, uuid4
+
+from app.core.computo import CalculoCancelado, Tarea, TiempoAgotado, al_enviar_tarea
+
+
+ESTADOS_FINALES = ("completado", "error", "cancelado")
+
+
+def _ahora() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+@dataclass
+class Trabajo:
+    """Estado de un trabajo en segundo plano"""
+    id: UUID
+    tipo: str  # calculo | optimizacion
+    proyecto_id: UUID
+    usuario_id: UUID
+    estado: str = "pendiente"  # pendiente | en_curso | completado | error | cancelado
+    progreso: float = 0.0  # fracción de 0 a 1
+    resultado: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    created_at: datetime = field(default_factory=_ahora)
+    updated_at: datetime = field(default_factory=_ahora)
+
+    @property
+    def terminado(self) -> bool:
+        return self.estado in ESTADOS_FINALES
+
+    def a_dict(self) -> Dict[str, Any]:
+        """Representación JSON del trabajo (para brokers que persisten)"""
+        datos = asdict(self)
+        for clave in ("id", "proyecto_id", "usuario_id"):
+            datos[clave] = str(datos[clave])
+        for clave in ("created_at", "updated_at"):
+            datos[clave] = datos[clave].isoformat()
+        return datos
+
+    @classmethod
+    def desde_dict(cls, datos: Dict[str, Any]) -> "Trabajo":
+        datos = dict(datos)
+        for clave in ("id", "proyecto_id", "usuario_id"):
+            datos[clave] = UUID(datos[clave])
+        for clave in ("created_at", "updated_at"):
+            datos[clave] = datetime.fromisoformat(datos[clave])
+        return cls(**datos)
+
+
+# ============ BROKERS ============
+
+
+class BrokerTrabajos:
+    """
+    Almacén del estado de los trabajos
+
+    El gestor guarda aquí cada cambio de estado y consulta las solicitudes de
+    cancelación; las consultas de los clientes se responden desde aquí. Para
+    usar otro almacén basta con heredar de esta clase e implementar sus
+    métodos.
+    """
+
+    def guardar(self, trabajo: Trabajo):
+        raise NotImplementedError
+
+    def obtener(self, trabajo_id: UUID) -> Optional[Trabajo]:
+        raise NotImplementedError
+
+    def solicitar_cancelacion(self, trabajo_id: UUID):
+        raise NotImplementedError
+
+    def cancelacion_solicitada(self, trabajo_id: UUID) -> bool:
+        raise NotImplementedError
+
+    def purgar(self, retencion: float) -> int:
+        """Elimina los trabajos terminados hace más de `retencion` s; retorna cuántos"""
+        raise NotImplementedError
+
+
+class BrokerMemoria(BrokerTrabajos):
+    """Broker en memoria: los trabajos solo son visibles dentro del proceso del servidor"""
+
+    def __init__(self):
+        self._trabajos: Dict[UUID, Trabajo] = {}
+        self._cancelaciones: Set[UUID] = set()
+        self._lock = threading.Lock()
+
+    def guardar(self, trabajo: Trabajo):
+        with self._lock:
+            self._trabajos[trabajo.id] = trabajo
+
+    def obtener(self, trabajo_id: UUID) -> Optional[Trabajo]:
+        return self._trabajos.get(trabajo_id)
+
+    def solicitar_cancelacion(self, trabajo_id: UUID):
+        with self._lock:
+            self._cancelaciones.add(trabajo_id)
+
+    def cancelacion_solicitada(self, trabajo_id: UUID) -> bool:
+        return trabajo_id in self._cancelaciones
+
+    def purgar(self, retencion: float) -> int:
+        limite = _ahora().timestamp() - retencion
+        with self._lock:
+            vencidos = [
+                t.id for t in self._trabajos.values()
+                if t.terminado and t.updated_at.timestamp() < limite
+            ]
+            for trabajo_id in vencidos:
+                del self._trabajos[trabajo_id]
+                self._cancelaciones.discard(trabajo_id)
+        return len(vencidos)
+
+
+class BrokerArchivos(BrokerTrabajos):
+    """
+    Broker en archivos JSON de un directorio local
+
+    Permite que varios workers del servidor en el mismo host vean los mismos
+    trabajos: cualquiera responde el estado y registra la cancelación, que el
+    worker dueño del trabajo aplica en su siguiente revisión.
+    """
+
+    def __init__(self, directorio: Path):
+        self.directorio = Path(directorio)
+        self.directorio.mkdir(parents=True, exist_ok=True)
+
+    def _ruta(self, trabajo_id: UUID, extension: str = "json") -> Path:
+        return self.directorio / f"{trabajo_id}.{extension}"
+
+    def guardar(self, trabajo: Trabajo):
+        # Escritura atómica: quien lee nunca ve un archivo a medio escribir
+        temporal = self._ruta(trabajo.id, f"{os.getpid()}.tmp")
+        temporal.write_text(json.dumps(trabajo.a_dict()), encoding="utf-8")
+        os.replace(temporal, self._ruta(trabajo.id))
+
+    def obtener(self, trabajo_id: UUID) -> Optional[Trabajo]:
+        try:
+            datos = json.loads(self._ruta(trabajo_id).read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return None
+        return Trabajo.desde_dict(datos)
+
+    def solicitar_cancelacion(self, trabajo_id: UUID):
+        self._ruta(trabajo_id, "cancelar").touch()
+
+    def cancelacion_solicitada(self, trabajo_id: UUID) -> bool:
+        return self._ruta(trabajo_id, "cancelar").exists()
+
+    def purgar(self, retencion: float) -> int:
+        limite = time.time() - retencion
+        purgados = 0
+        for ruta in self.directorio.glob("*.json"):
+            try:
+                if ruta.stat().st_mtime >= limite:
+                    continue
+                trabajo = Trabajo.desde_dict(json.loads(ruta.read_text(encoding="utf-8")))
+            except (FileNotFoundError, ValueError):
+                continue
+            if trabajo.terminado:
+                ruta.unlink(missing_ok=True)
+                self._ruta(trabajo.id, "cancelar").unlink(missing_ok=True)
+                purgados += 1
+        return purgados
+
+
+def crear_broker(nombre: str, directorio: Optional[Path] = None) -> BrokerTrabajos:
+    """Crea el broker configurado: "memoria" o "archivos" """
+    if nombre == "memoria":
+        return BrokerMemoria()
+    elif nombre == "archivos":
+        return BrokerArchivos(directorio or Path("./trabajos"))
+    raise ValueError(f"Broker de trabajos desconocido: '{nombre}'")
+
+
+# ============ GESTOR ============
+
+
+class GestorTrabajos:
+    """
+    Ejecuta trabajos en segundo plano dentro del event loop del servidor
+
+    Cada trabajo es una corrutina que usa el pool de cómputo (y, al terminar,
+    la base de datos). Mientras corre, el gestor publica en el broker el
+    progreso que reporta la tarea del pool y revisa si se pidió cancelarlo.
+    """
+
+    def __init__(
+        self,
+        broker: Optional[BrokerTrabajos] = None,
+        intervalo: float = 0.5,
+        retencion: float = 3600.0,
+    ):
+        self.broker = broker or BrokerMemoria()
+        self.intervalo = intervalo
+        self.retencion = retencion
+        self._ejecuciones: Dict[UUID, asyncio.Task] = {}
+        self._principales: Dict[UUID, asyncio.Task] = {}
+
+    def configurar(
+        self,
+        broker: Optional[BrokerTrabajos] = None,
+        intervalo: Optional[float] = None,
+        retencion: Optional[float] = None,
+    ):
+        """Ajusta el gestor (se llama desde el lifespan de la aplicación)"""
+        if broker is not None:
+            self.broker = broker
+        if intervalo is not None:
+            self.intervalo = intervalo
+        if retencion is not None:
+            self.retencion = retencion
+
+    def enviar(
+        self,
+        tipo: str,
+        proyecto_id: UUID,
+        usuario_id: UUID,
+        funcion: Callable[[], Awaitable[Any]],
+    ) -> Trabajo:
+        """
+        Registra el trabajo y lanza funcion() en segundo plano
+
+        Debe llamarse desde el event loop. El resultado de funcion() (un
+        modelo Pydantic o un dict serializable) queda en `Trabajo.resultado`.
+        """
+        self.broker.purgar(self.retencion)
+
+        trabajo = Trabajo(id=uuid4(), tipo=tipo, proyecto_id=proyecto_id, usuario_id=usuario_id)
+        self.broker.guardar(trabajo)
+        self._ejecuciones[trabajo.id] = asyncio.create_task(self._ejecutar(trabajo, funcion))
+        return trabajo
+
+    def obtener(self, trabajo_id: UUID) -> Optional[Trabajo]:
+        return self.broker.obtener(trabajo_id)
+
+    def cancelar(self, trabajo_id: UUID) -> Optional[Trabajo]:
+        """
+        Pide cancelar el trabajo y retorna su estado actual
+
+        Si el trabajo corre en este proceso se cancela de inmediato; si no,
+        lo cancela el proceso dueño al revisar el broker.
+        """
+        trabajo = self.broker.obtener(trabajo_id)
+        if trabajo is None or trabajo.terminado:
+            return trabajo
+
+        self.broker.solicitar_cancelacion(trabajo_id)
+        principal = self._principales.get(trabajo_id)
+        if principal is not None:
+            principal.cancel()
+        return trabajo
+
+    async def esperar(self, trabajo_id: UUID) -> Optional[Trabajo]:
+        """Espera a que termine un trabajo de este proceso y retorna su estado final"""
+        ejecucion = self._ejecuciones.get(trabajo_id)
+        if ejecucion is not None:
+            await asyncio.shield(ejecucion)
+        return self.broker.obtener(trabajo_id)
+
+    async def cerrar(self):
+        """Cancela los trabajos en curso de este proceso y espera su cierre"""
+        for principal in list(self._principales.values()):
+            principal.cancel()
+        await asyncio.gather(*self._ejecuciones.values(), return_exceptions=True)
+
+    def _actualizar(self, trabajo: Trabajo, **cambios):
+        for clave, valor in cambios.items():
+            setattr(trabajo, clave, valor)
+        trabajo.updated_at = _ahora()
+        self.broker.guardar(trabajo)
+
+    async def _ejecutar(self, trabajo: Trabajo, funcion: Callable[[], Awaitable[Any]]):
+        # Las tareas que funcion() envíe al pool quedan registradas aquí para
+        # leer su progreso (la variable de contexto se copia a `principal`)
+        tareas: List[Tarea] = []
+        al_enviar_tarea.set(tareas.append)
+        principal = asyncio.create_task(funcion())
+        self._principales[trabajo.id] = principal
+        self._actualizar(trabajo, estado="en_curso")
+
+        try:
+            while not principal.done():
+                await asyncio.wait({principal}, timeout=self.intervalo)
+                if principal.done():
+                    break
+                if self.broker.cancelacion_solicitada(trabajo.id):
+                    principal.cancel()
+                    continue
+                progreso = tareas[-1].progreso if tareas else 0.0
+                if progreso != trabajo.progreso:
+                    self._actualizar(trabajo, progreso=progreso)
+            resultado = principal.result()
+        except (asyncio.CancelledError, CalculoCancelado) as e:
+            if not principal.done():
+                principal.cancel()
+            if isinstance(e, TiempoAgotado):
+                self._actualizar(trabajo, estado="error", error=str(e))
+            else:
+                self._actualizar(trabajo, estado="cancelado", error="Trabajo cancelado")
+        except Exception as e:
+            # HTTPException (p. ej. red inválida) trae el mensaje en `detail`
+            self._actualizar(trabajo, estado="error", error=str(getattr(e, "detail", e)))
+        else:
+            if hasattr(resultado, "model_dump"):
+                resultado = resultado.model_dump(mode="json")
+            self._actualizar(trabajo, estado="completado", progreso=1.0, resultado=resultado)
+        finally:
+            self._principales.pop(trabajo.id, None)
+            self._ejecuciones.pop(trabajo.id, None)
+
+
+gestor_trabajos = GestorTrabajos()
@@ -2,11 +2,11 @@
 from app.db.database import Base, get_async_session, init_db, close_db
 from app.db.models import (
     Proyecto, Nudo, Tramo, Calculo, Iteracion,
-    Optimizacion, Normativa, Alerta
+    Optimizacion, Normativa, Alerta, CacheCalculo
 )
 
 __all__ = [
     "Base", "get_async_session", "init_db", "close_db",
     "Proyecto", "Nudo", "Tramo", "Calculo", "Iteracion",
-    "Optimizacion", "Normativa", "Alerta"
+    "Optimizacion", "Normativa", "Alerta", "CacheCalculo"
 ]
@@ -259,7 +259,7 @@ class Calculo(Base):
     proyecto_id = Column(UUID(as_uuid=True), ForeignKey("proyectos.id"), nullable=False)
 
     # Método de cálculo
-    metodo = Column(String(50), nullable=False)  # hardy_cross, deterministico, hibrido
+    metodo = Column(String(50), nullable=False)  # hardy_cross, gradiente, deterministico, hibrido
     tolerancia = Column(Float, default=settings.HARDY_CROSS_TOLERANCE)
     max_iteraciones = Column(Integer, default=settings.MAX_ITERATIONS)
 
@@ -412,3 +412,23 @@ class Alerta(Base):
 
     # Metadatos
     created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+
+
+class CacheCalculo(Base):
+    """Respaldo en BD de la cache de resultados de /calcular (opcional)"""
+
+    __tablename__ = "cache_calculos"
+
+    __table_args__ = (Index("idx_cache_calculos_proyecto", "proyecto_id"),)
+
+    # Hash del proyecto, la red y los parámetros del cálculo
+    huella = Column(String(64), primary_key=True)
+    # Sin llave foránea: una entrada huérfana nunca se consulta, porque
+    # antes se verifica que el proyecto exista y sea del usuario
+    proyecto_id = Column(UUID(as_uuid=True), nullable=False)
+
+    # CalculoResponse serializada
+    respuesta = Column(JSONB, nullable=False)
+
+    # Metadatos
+    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
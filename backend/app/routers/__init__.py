@@ -5,6 +5,7 @@ from app.routers.optimizacion import router as optimizacion_router
 from app.routers.normativa import router as normativa_router
 from app.routers.gis import router as gis_router
 from app.routers.reportes import router as reportes_router
+from app.routers.trabajos import router as trabajos_router
 
 __all__ = [
     "proyectos_router",
@@ -12,5 +13,6 @@ __all__ = [
     "optimizacion_router",
     "normativa_router",
     "gis_router",
-    "reportes_router"
+    "reportes_router",
+    "trabajos_router",
 ]
@@ -3,51 +3,54 @@ Routers de Cálculos Hidráulicos - H-Redes Perú
 Endpoints para cálculos y validación con autenticación
 """
 
-from typing import List
+from typing import Dict, Iterator, List, Optional, Tuple
 from uuid import UUID
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, and_
 from sqlalchemy.orm import selectinload
+from datetime import datetime, timezone
+import json
 import time
 
-from app.db.database import get_async_session
-from app.db.models import Proyecto, Nudo, Tramo, Calculo, Iteracion, Alerta
+from app.db.database import AsyncSessionLocal, get_async_session
+from app.db.models import Proyecto, Nudo, Tramo, Calculo, Iteracion, Alerta, CacheCalculo
 from app.schemas.schemas import (
     CalculoRequest,
     CalculoResponse,
+    EscenarioItem,
+    EscenarioResultado,
+    EscenariosRequest,
+    EscenariosResponse,
     IteracionItem,
+    PeriodoExtendidoRequest,
+    TrabajoResponse,
     ValidacionResponse,
     AlertaItem,
 )
-from app.core.hidraulico import MotorHidraulico
+from app.core.cache_resultados import cache_calculos, huella_calculo
+from app.core.coalescencia import coalescedor
+from app.core.computo import (
+    pool_calculo,
+    tarea_calculo_hidraulico,
+    tarea_escenarios,
+    tarea_periodo_extendido,
+)
+from app.core.hidraulico import PasoSimulacion, resumen_presiones_velocidades
+from app.core.red_compacta import RedCompacta
+from app.core.trabajos import gestor_trabajos
 from app.core.auth import UserAuth, get_current_active_user
 from app.dependencies.auth import verify_project_owner
+from app.routers.trabajos import trabajo_aceptado
 from app.config.settings import settings
 
 
 router = APIRouter()
 
 
-@router.post("/{proyecto_id}/calcular", response_model=CalculoResponse)
-async def calcular_hidraulico(
-    proyecto_id: UUID,
-    request: CalculoRequest,
-    current_user: UserAuth = Depends(get_current_active_user),
-    session: AsyncSession = Depends(get_async_session),
-):
-    """
-    Ejecuta el cálculo hidráulico para un proyecto.
-
-    Verifica que el usuario sea propietario del proyecto.
-    Utiliza el método de Hardy Cross para redes cerradas,
-    cálculo determinístico para redes abiertas, o híbrido para redes mixtas.
-    """
-    # Verificar propiedad del proyecto
-    await verify_project_owner(proyecto_id, current_user, session)
-
-    start_time = time.time()
-
+async def _cargar_red(proyecto_id: UUID, session: AsyncSession) -> RedCompacta:
+    """Carga nudos y tramos del proyecto como red compacta del motor"""
     # Obtener proyecto
     proyecto_query = select(Proyecto).where(Proyecto.id == proyecto_id)
     proyecto_result = await session.execute(proyecto_query)
@@ -80,57 +83,113 @@ async def calcular_hidraulico(
             detail="El proyecto no tiene tramos definidos",
         )
 
-    # Convertir a estructuras del motor
-    nudos_dict = {
-        n.id: Nudo(
-            id=n.id,
-            codigo=n.codigo,
-            tipo=n.tipo.value if hasattr(n.tipo, "value") else str(n.tipo),
-            elevacion=n.elevacion or 0.0,
-            demanda=n.demanda_base or 0.0,
-        )
-        for n in nudos_db
+    # Convertir a la red compacta del motor
+    try:
+        return RedCompacta.desde_modelos(nudos_db, tramos_db)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
+@router.post(
+    "/{proyecto_id}/calcular",
+    response_model=CalculoResponse,
+    responses={202: {"model": TrabajoResponse}},
+)
+async def calcular_hidraulico(
+    proyecto_id: UUID,
+    request: CalculoRequest,
+    current_user: UserAuth = Depends(get_current_active_user),
+    session: AsyncSession = Depends(get_async_session),
+):
+    """
+    Ejecuta el cálculo hidráulico para un proyecto.
+
+    Verifica que el usuario sea propietario del proyecto.
+    Utiliza el método de Hardy Cross o el Gradiente Global para redes cerradas,
+    cálculo determinístico para redes abiertas, o híbrido para redes mixtas.
+
+    Con `asincrono` responde 202 con el trabajo en segundo plano, cuyo
+    estado y resultado se consultan en /trabajos/{id}.
+    """
+    # Verificar propiedad del proyecto
+    await verify_project_owner(proyecto_id, current_user, session)
+
+    red = await _cargar_red(proyecto_id, session)
+
+    parametros = {
+        **_parametros_motor(request),
+        "cobertura_minima": settings.COBERTURA_MINIMA_ARRANQUE,
+        "medir_ahorro": request.medir_ahorro,
     }
+    huella = huella_calculo(
+        proyecto_id, red, {**parametros, "arranque_en_caliente": request.arranque_en_caliente}
+    )
+    async def calcular(timeout: Optional[float] = None) -> CalculoResponse:
+        # Peticiones idénticas en curso comparten la ejecución, con su propia sesión
+        async def ejecucion():
+            async with AsyncSessionLocal() as sesion:
+                return await _ejecutar_calculo(
+                    proyecto_id, request, red, parametros, huella, sesion, timeout=timeout
+                )
+
+        return await coalescedor.ejecutar("calculo", huella, ejecucion)
 
-    tramos_dict = {
-        t.id: Tramo(
-            id=t.id,
-            codigo=t.codigo,
-            nudo_origen_id=t.nudo_origen_id,
-            nudo_destino_id=t.nudo_destino_id,
-            longitud=t.longitud,
-            diametro=t.diametro_interior,
-            material=t.material.value
-            if hasattr(t.material, "value")
-            else str(t.material),
-            coef_hazen_williams=t.coef_hazen_williams or 150.0,
-            n_origen=settings.HAZEN_WILLIAMS_EXPONENT,
+    # En segundo plano: el resultado se consulta en /trabajos/{id}
+    if request.asincrono:
+        return trabajo_aceptado(
+            gestor_trabajos.enviar(
+                "calculo",
+                proyecto_id,
+                current_user.id,
+                lambda: calcular(timeout=settings.TRABAJOS_TIMEOUT),
+            )
         )
-        for t in tramos_db
-    }
 
-    # Crear motor hidráulico
-    motor = MotorHidraulico(
-        nudos=nudos_dict,
-        tramos=tramos_dict,
-        tolerancia=request.tolerancia,
-        max_iteraciones=request.max_iteraciones,
-        coef_hazen_williams=settings.HAZEN_WILLIAMS_CONSTANT,
-        exponente_hw=settings.HAZEN_WILLIAMS_EXPONENT,
-    )
+    return await calcular()
+
+
+async def _ejecutar_calculo(
+    proyecto_id: UUID,
+    request: CalculoRequest,
+    red: RedCompacta,
+    parametros: dict,
+    huella: str,
+    session: AsyncSession,
+    timeout: Optional[float] = None,
+) -> CalculoResponse:
+    """
+    Ejecuta el cálculo en el pool de cómputo y lo guarda en BD
 
-    # Ejecutar cálculo según método
-    if request.metodo == "hardy_cross":
-        convergencia, error = motor.metodo_hardy_cross()
-    elif request.metodo == "deterministico":
-        motor.calcular_red_abierta()
-        convergencia, error = True, 0.0
-    else:  # hibrido
-        convergencia, error = motor.calcular_hibrido()
+    Si la misma red ya se calculó con los mismos parámetros, retorna la
+    respuesta de ese cálculo sin resolver ni guardar nada.
+    """
+    cacheada = await _respuesta_en_cache(huella, session)
+    if cacheada is not None:
+        return cacheada.model_copy(update={"desde_cache": True, **_contadores_cache()})
+
+    # Resultados del último cálculo para el arranque en caliente
+    caudales_previos, cotas_previas = {}, {}
+    if request.arranque_en_caliente:
+        caudales_previos, cotas_previas = await _resultados_previos(proyecto_id, session)
+
+    # Ejecutar cálculo según método en el pool de cómputo
+    try:
+        resultado = await pool_calculo.ejecutar(
+            tarea_calculo_hidraulico,
+            red,
+            parametros,
+            caudales_previos,
+            cotas_previas,
+            timeout=timeout,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
     # Obtener resultados
-    resumen = motor.obtener_resumen_resultados()
-    tabla_iteraciones = motor.generar_tabla_iteraciones()
+    convergencia, error = resultado["convergencia"], resultado["error"]
+    resumen = resultado["resumen"]
+    tabla_iteraciones = resultado["tabla_iteraciones"]
+    iteraciones_en_frio = resultado["iteraciones_en_frio"]
 
     # Guardar cálculo en BD
     calculo = Calculo(
@@ -141,12 +200,14 @@ async def calcular_hidraulico(
         convergencia=convergencia,
         error_final=error,
         iteraciones_realizadas=resumen["iteraciones_realizadas"],
-        tiempo_calculo=time.time() - start_time,
+        tiempo_calculo=resultado["tiempo_calculo"],
         presion_minima=resumen["presion_minima"],
         presion_maxima=resumen["presion_maxima"],
         velocidad_minima=resumen["velocidad_minima"],
         velocidad_maxima=resumen["velocidad_maxima"],
         iteraciones_data=tabla_iteraciones,
+        resultados_nudos=resultado["resultados_nudos"],
+        resultados_tramos=resultado["resultados_tramos"],
         validacion_passed=False,
     )
     session.add(calculo)
@@ -176,7 +237,7 @@ async def calcular_hidraulico(
         for i in tabla_iteraciones
     ]
 
-    return CalculoResponse(
+    respuesta = CalculoResponse(
         id=calculo.id,
         proyecto_id=proyecto_id,
         metodo=request.metodo,
@@ -185,6 +246,16 @@ async def calcular_hidraulico(
         error_final=error,
         iteraciones_realizadas=resumen["iteraciones_realizadas"],
         tiempo_calculo=calculo.tiempo_calculo,
+        modo_mallas=request.modo_mallas,
+        peso_base_mallas=resumen["peso_base_mallas"],
+        arranque_en_caliente=resultado["arranque_en_caliente"],
+        cobertura_arranque=resultado["cobertura_arranque"],
+        iteraciones_en_frio=iteraciones_en_frio,
+        iteraciones_ahorradas=(
+            iteraciones_en_frio - resumen["iteraciones_realizadas"]
+            if iteraciones_en_frio is not None
+            else None
+        ),
         presion_minima=resumen["presion_minima"],
         presion_maxima=resumen["presion_maxima"],
         velocidad_minima=resumen["velocidad_minima"],
@@ -194,6 +265,243 @@ async def calcular_hidraulico(
         alertas=[],
         created_at=calculo.created_at,
     )
+    await _guardar_en_cache(huella, proyecto_id, respuesta, session)
+
+    return respuesta.model_copy(update=_contadores_cache())
+
+
+async def _respuesta_en_cache(huella: str, session: AsyncSession) -> Optional[CalculoResponse]:
+    """Busca la respuesta en la cache en memoria y, si está habilitado, en la tabla de respaldo"""
+    respuesta = cache_calculos.obtener(huella)
+
+    if respuesta is None and settings.CACHE_CALCULOS_BD:
+        fila = await session.get(CacheCalculo, huella)
+        if fila is not None:
+            edad = time.time() - fila.created_at.replace(tzinfo=timezone.utc).timestamp()
+            if edad <= settings.CACHE_CALCULOS_TTL:
+                respuesta = CalculoResponse.model_validate(fila.respuesta)
+                cache_calculos.guardar(huella, respuesta)
+
+    cache_calculos.contar(respuesta is not None)
+    return respuesta
+
+
+async def _guardar_en_cache(
+    huella: str, proyecto_id: UUID, respuesta: CalculoResponse, session: AsyncSession
+):
+    cache_calculos.guardar(huella, respuesta)
+    if settings.CACHE_CALCULOS_BD:
+        await session.merge(
+            CacheCalculo(
+                huella=huella,
+                proyecto_id=proyecto_id,
+                respuesta=respuesta.model_dump(mode="json"),
+                created_at=datetime.now(timezone.utc),
+            )
+        )
+        await session.commit()
+
+
+def _contadores_cache() -> dict:
+    return {
+        "cache_aciertos": cache_calculos.aciertos,
+        "cache_fallos": cache_calculos.fallos,
+    }
+
+
+def _parametros_motor(request) -> dict:
+    """Parámetros del motor hidráulico para las tareas del pool de cómputo"""
+    return {
+        "metodo": request.metodo,
+        "tolerancia": request.tolerancia,
+        "max_iteraciones": request.max_iteraciones,
+        "modo_mallas": request.modo_mallas,
+        "coef_hazen_williams": settings.HAZEN_WILLIAMS_CONSTANT,
+        "exponente_hw": settings.HAZEN_WILLIAMS_EXPONENT,
+    }
+
+
+async def _resultados_previos(
+    proyecto_id: UUID, session: AsyncSession
+) -> Tuple[Dict[UUID, float], Dict[UUID, float]]:
+    """
+    Caudales por tramo y cotas por nudo del último cálculo convergido
+
+    Retorna diccionarios vacíos si no hay un cálculo previo con resultados.
+    """
+    calculo_query = (
+        select(Calculo)
+        .where(
+            and_(
+                Calculo.proyecto_id == proyecto_id,
+                Calculo.convergencia.is_(True),
+                Calculo.resultados_tramos.isnot(None),
+            )
+        )
+        .order_by(Calculo.created_at.desc())
+        .limit(1)
+    )
+    calculo_result = await session.execute(calculo_query)
+    calculo = calculo_result.scalar_one_or_none()
+    if calculo is None:
+        return {}, {}
+
+    return (
+        _valores_por_id(calculo.resultados_tramos, "caudal"),
+        _valores_por_id(calculo.resultados_nudos, "cota_agua"),
+    )
+
+
+def _valores_por_id(resultados, clave: str) -> Dict[UUID, float]:
+    """Extrae {id: valor} de una lista de resultados por elemento, ignorando entradas inválidas"""
+    valores = {}
+    for item in resultados or []:
+        try:
+            valores[UUID(str(item["id"]))] = float(item[clave])
+        except (KeyError, TypeError, ValueError):
+            continue
+    return valores
+
+
+@router.post("/{proyecto_id}/calcular-escenarios", response_model=EscenariosResponse)
+async def calcular_escenarios(
+    proyecto_id: UUID,
+    request: EscenariosRequest,
+    current_user: UserAuth = Depends(get_current_active_user),
+    session: AsyncSession = Depends(get_async_session),
+):
+    """
+    Calcula varios escenarios de demanda en una sola llamada.
+
+    Verifica que el usuario sea propietario del proyecto.
+    Cada escenario multiplica la demanda base por su factor (por defecto:
+    máximo diario K1, máximo horario K2 y mínimo nocturno). Todos comparten
+    la topología y la base de mallas y se resuelven juntos en el motor.
+    Los resultados no se guardan en BD.
+    """
+    # Verificar propiedad del proyecto
+    await verify_project_owner(proyecto_id, current_user, session)
+
+    start_time = time.time()
+
+    red = await _cargar_red(proyecto_id, session)
+
+    escenarios = request.escenarios or [
+        EscenarioItem(nombre="maximo_diario", factor=settings.FACTOR_MAXIMO_DIARIO),
+        EscenarioItem(nombre="maximo_horario", factor=settings.FACTOR_MAXIMO_HORARIO),
+        EscenarioItem(nombre="minimo_nocturno", factor=settings.FACTOR_MINIMO_NOCTURNO),
+    ]
+
+    try:
+        resumenes = await pool_calculo.ejecutar(
+            tarea_escenarios,
+            red,
+            _parametros_motor(request),
+            [e.factor for e in escenarios],
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    return EscenariosResponse(
+        proyecto_id=proyecto_id,
+        metodo=request.metodo,
+        tiempo_calculo=time.time() - start_time,
+        escenarios=[
+            EscenarioResultado(nombre=escenario.nombre, **resumen)
+            for escenario, resumen in zip(escenarios, resumenes)
+        ],
+    )
+
+
+@router.post("/{proyecto_id}/periodo-extendido")
+async def simular_periodo_extendido(
+    proyecto_id: UUID,
+    request: PeriodoExtendidoRequest,
+    current_user: UserAuth = Depends(get_current_active_user),
+    session: AsyncSession = Depends(get_async_session),
+):
+    """
+    Simulación en periodo extendido (por defecto 24 h en pasos de 1 h).
+
+    Verifica que el usuario sea propietario del proyecto.
+    Aplica a cada nudo los multiplicadores de su `demanda_pattern` (o el
+    `patron` del request si no tiene uno propio). La respuesta se transmite
+    como NDJSON: una línea de cabecera con el orden de nudos y tramos, una
+    línea por paso con arreglos compactos (caudales, presiones, velocidades)
+    y una línea final de resumen. La simulación corre en el pool de
+    cómputo, con el mismo tiempo máximo y límite de trabajos que /calcular.
+    Los resultados no se guardan en BD.
+    """
+    # Verificar propiedad del proyecto
+    await verify_project_owner(proyecto_id, current_user, session)
+
+    start_time = time.time()
+
+    red = await _cargar_red(proyecto_id, session)
+
+    try:
+        pasos = await pool_calculo.ejecutar(
+            tarea_periodo_extendido,
+            red,
+            _parametros_motor(request),
+            request.duracion_horas,
+            request.intervalo_horas,
+            request.patron,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    cabecera = {
+        "tipo": "red",
+        "proyecto_id": str(proyecto_id),
+        "metodo": request.metodo,
+        "intervalo_horas": request.intervalo_horas,
+        "nudos": red.codigos_nudos,
+        "tramos": red.codigos_tramos,
+    }
+
+    return StreamingResponse(
+        _lineas_periodo_extendido(cabecera, pasos, request.decimales, start_time),
+        media_type="application/x-ndjson",
+    )
+
+
+def _lineas_periodo_extendido(
+    cabecera: dict, pasos: List[PasoSimulacion], decimales: int, start_time: float
+) -> Iterator[str]:
+    """Serializa la simulación en periodo extendido como líneas NDJSON"""
+
+    def linea(datos: dict) -> str:
+        return json.dumps(datos, separators=(",", ":")) + "\n"
+
+    yield linea(cabecera)
+
+    n_pasos, convergencia, iteraciones = 0, True, 0
+    for paso in pasos:
+        n_pasos += 1
+        convergencia &= paso.convergencia
+        iteraciones += paso.iteraciones
+        yield linea({
+            "tipo": "paso",
+            "periodo": paso.periodo,
+            "hora": paso.hora,
+            "demanda_total": round(paso.demanda_total, decimales),
+            "convergencia": paso.convergencia,
+            "iteraciones": paso.iteraciones,
+            "error": paso.error,
+            **resumen_presiones_velocidades(paso.presiones, paso.velocidades),
+            "caudales": paso.caudales.round(decimales).tolist(),
+            "presiones": paso.presiones.round(decimales).tolist(),
+            "velocidades": paso.velocidades.round(decimales).tolist(),
+        })
+
+    yield linea({
+        "tipo": "fin",
+        "pasos": n_pasos,
+        "convergencia": convergencia,
+        "iteraciones_totales": iteraciones,
+        "tiempo_calculo": time.time() - start_time,
+    })
 
 
 @router.get("/{proyecto_id}/resultados")
@@ -3,25 +3,42 @@ Routers de Optimización - H-Redes Perú
 Endpoints para optimización de diámetros con Algoritmo Genético y autenticación
 """
 
-from typing import List
+from typing import List, Optional
 from uuid import UUID
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
-from app.db.database import get_async_session
+from app.db.database import AsyncSessionLocal, get_async_session
 from app.db.models import Proyecto, Tramo, Nudo, Optimizacion
-from app.schemas.schemas import OptimizacionRequest, OptimizacionResponse
-from app.core.optimizador import OptimizadorGA
+from app.schemas.schemas import OptimizacionRequest, OptimizacionResponse, TrabajoResponse
+from app.core.cache_resultados import huella_calculo
+from app.core.catalogo_precios import catalogo_precios
+from app.core.coalescencia import coalescedor
+from app.core.computo import (
+    pool_calculo,
+    tarea_optimizacion,
+    tarea_optimizacion_islas,
+    tarea_optimizacion_nsga2,
+    tarea_optimizacion_ramificada,
+)
+from app.core.puntos_control import PuntoControlEnUso, puntos_control
+from app.core.red_compacta import RedCompacta
+from app.core.trabajos import gestor_trabajos
 from app.core.auth import UserAuth, get_current_active_user
 from app.dependencies.auth import verify_project_owner
+from app.routers.trabajos import trabajo_aceptado
 from app.config.settings import settings
 
 
 router = APIRouter()
 
 
-@router.post("/{proyecto_id}/optimizar", response_model=OptimizacionResponse)
+@router.post(
+    "/{proyecto_id}/optimizar",
+    response_model=OptimizacionResponse,
+    responses={202: {"model": TrabajoResponse}},
+)
 async def optimizar_diametros(
     proyecto_id: UUID,
     request: OptimizacionRequest,
@@ -29,17 +46,80 @@ async def optimizar_diametros(
     session: AsyncSession = Depends(get_async_session),
 ):
     """
-    Ejecuta la optimización de diámetros usando Algoritmo Genético.
+    Ejecuta la optimización de diámetros usando Algoritmo Genético, NSGA-II
+    multiobjetivo (`nsga2`, con el frente de Pareto costo vs. excedente de
+    presión) o programación lineal exacta en redes abiertas (`lp_ramificada`).
 
     Verifica que el usuario sea propietario del proyecto.
 
     El algoritmo busca la combinación de diámetros comerciales que:
     1. Cumpla con todas las presiones mínimas normativas
     2. Minimice el costo total de la red
+
+    Con `asincrono` responde 202 con el trabajo en segundo plano, cuyo
+    progreso y resultado se consultan en /trabajos/{id}.
+
+    El AG y NSGA-II guardan un punto de control cada
+    `PUNTO_CONTROL_CADA` generaciones; si se interrumpen se continúan con
+    /optimizar/reanudar.
+    """
+    # Verificar propiedad del proyecto
+    await verify_project_owner(proyecto_id, current_user, session)
+
+    return await _optimizar(proyecto_id, request, current_user, session)
+
+
+@router.post(
+    "/{proyecto_id}/optimizar/reanudar",
+    response_model=OptimizacionResponse,
+    responses={202: {"model": TrabajoResponse}},
+)
+async def reanudar_optimizacion(
+    proyecto_id: UUID,
+    asincrono: bool = False,
+    current_user: UserAuth = Depends(get_current_active_user),
+    session: AsyncSession = Depends(get_async_session),
+):
+    """
+    Reanuda la última optimización del proyecto (AG o NSGA-II) desde su
+    último punto de control, con los mismos parámetros, hasta completar
+    sus generaciones.
+
+    Verifica que el usuario sea propietario del proyecto. Si la red cambió
+    desde el punto de control responde 400; si esa optimización sigue en
+    curso, 409.
     """
     # Verificar propiedad del proyecto
     await verify_project_owner(proyecto_id, current_user, session)
 
+    ultima = puntos_control.ultima(proyecto_id)
+    if ultima is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="No hay una optimización interrumpida para reanudar",
+        )
+    ejecucion, solicitud = ultima
+    if puntos_control.en_curso(proyecto_id, ejecucion):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="La última optimización del proyecto ya está en curso",
+        )
+    request = OptimizacionRequest(**{**solicitud, "asincrono": asincrono})
+    return await _optimizar(proyecto_id, request, current_user, session, reanudar=ejecucion)
+
+
+async def _optimizar(
+    proyecto_id: UUID,
+    request: OptimizacionRequest,
+    current_user: UserAuth,
+    session: AsyncSession,
+    reanudar: Optional[str] = None,
+):
+    """
+    Prepara la red del proyecto y ejecuta (o encola) la optimización
+
+    - reanudar: clave de la ejecución cuyo punto de control se continúa
+    """
     # Obtener proyecto
     proyecto_query = select(Proyecto).where(Proyecto.id == proyecto_id)
     proyecto_result = await session.execute(proyecto_query)
@@ -72,28 +152,11 @@ async def optimizar_diametros(
             detail="El proyecto no tiene tramos definidos",
         )
 
-    # Preparar datos para el optimizador
-    nudos_dict = {}
-    for nudo in nudos_db:
-        nudos_dict[nudo.id] = {
-            "codigo": nudo.codigo,
-            "tipo": nudo.tipo.value if hasattr(nudo.tipo, "value") else str(nudo.tipo),
-            "elevacion": nudo.elevacion or 0.0,
-            "demanda": nudo.demanda_base or 0.0,
-        }
-
-    tramos_dict = {}
-    for tramo in tramos_db:
-        tramos_dict[tramo.id] = {
-            "codigo": tramo.codigo,
-            "nudo_origen": tramo.nudo_origen_id,
-            "nudo_destino": tramo.nudo_destino_id,
-            "longitud": tramo.longitud,
-            "diametro_actual": tramo.diametro_interior,
-            "material": tramo.material.value
-            if hasattr(tramo.material, "value")
-            else str(tramo.material),
-        }
+    # Red compacta para el pool de cómputo
+    try:
+        red = RedCompacta.desde_modelos(nudos_db, tramos_db)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
     # Determinar presión mínima según ámbito
     if proyecto.ambito.value == "urbano":
@@ -101,40 +164,185 @@ async def optimizar_diametros(
     else:
         presion_minima = settings.PRESION_MINIMA_RURAL
 
-    # Crear optimizador
-    optimizador = OptimizadorGA(
-        nudos=nudos_dict,
-        tramos=tramos_dict,
-        diametros_comerciales=settings.DIAMETROS_COMERCIALES,
-        costo_por_metro=100.0,  # Soles por metro
-        presion_minima=presion_minima,
-        poblacion_size=request.poblacion_size,
-        generaciones=request.generaciones,
-        crossover_rate=request.crossover_rate,
-        mutation_rate=request.mutation_rate,
+    # Clave de coalescencia: proyecto, red y parámetros del algoritmo
+    parametros_huella = {**request.model_dump(exclude={"asincrono"}), "presion_minima": presion_minima}
+    huella = huella_calculo(proyecto_id, red, parametros_huella)
+
+    # Clave de los puntos de control de la ejecución (la reanudada conserva la suya)
+    clave_ejecucion = reanudar or huella
+    if reanudar is not None:
+        huella = huella_calculo(proyecto_id, red, {**parametros_huella, "reanudar": reanudar})
+
+    async def optimizar(timeout: Optional[float] = None) -> OptimizacionResponse:
+        # Peticiones idénticas en curso comparten la ejecución, con su propia sesión
+        async def ejecucion():
+            async with AsyncSessionLocal() as sesion:
+                return await _ejecutar_optimizacion(
+                    proyecto_id, request, red, presion_minima, sesion,
+                    timeout=timeout, ejecucion=clave_ejecucion, reanudar=reanudar is not None,
+                )
+
+        return await coalescedor.ejecutar("optimizacion", huella, ejecucion)
+
+    # En segundo plano: el resultado se consulta en /trabajos/{id}
+    if request.asincrono:
+        return trabajo_aceptado(
+            gestor_trabajos.enviar(
+                "optimizacion",
+                proyecto_id,
+                current_user.id,
+                lambda: optimizar(timeout=settings.TRABAJOS_TIMEOUT),
+            )
+        )
+
+    return await optimizar()
+
+
+async def _ejecutar_optimizacion(
+    proyecto_id: UUID,
+    request: OptimizacionRequest,
+    red: RedCompacta,
+    presion_minima: float,
+    session: AsyncSession,
+    timeout: Optional[float] = None,
+    ejecucion: Optional[str] = None,
+    reanudar: bool = False,
+) -> OptimizacionResponse:
+    """Ejecuta el algoritmo genético en el pool de cómputo y guarda la propuesta en BD"""
+    # Tramos a actualizar, en la sesión que guarda el resultado
+    tramos_query = select(Tramo).where(Tramo.proyecto_id == proyecto_id)
+    tramos_result = await session.execute(tramos_query)
+    tramos_db = tramos_result.scalars().all()
+
+    # Precio por metro de cada diámetro en cada tramo (orden de la red) según
+    # su material y clase; el optimizador solo hace gathers sobre esta tabla
+    por_id = {tramo.id: tramo for tramo in tramos_db}
+    tramos_red = [por_id.get(tramo_id) for tramo_id in red.ids_tramos]
+    precios = catalogo_precios.precios_tramos(
+        [getattr(tramo, "material", None) for tramo in tramos_red],
+        [getattr(tramo, "clase_tuberia", None) for tramo in tramos_red],
     )
 
-    # Ejecutar optimización
-    resultados = optimizador.optimizar()
+    parametros = {
+        "diametros_comerciales": settings.DIAMETROS_COMERCIALES,
+        "costo_por_metro": settings.COSTO_POR_METRO,
+        "precios": precios,
+        "presion_minima": presion_minima,
+        "poblacion_size": request.poblacion_size,
+        "generaciones": request.generaciones,
+        "crossover_rate": request.crossover_rate,
+        "mutation_rate": request.mutation_rate,
+        "paciencia": request.paciencia,
+        "tiempo_maximo": request.tiempo_maximo,
+        "mutacion_adaptativa": request.mutacion_adaptativa,
+        "siembra": [s.value for s in request.siembra],
+        "velocidad_objetivo": request.velocidad_objetivo,
+    }
+    if request.algoritmo == "lp_ramificada":
+        # Solución exacta para redes abiertas: solo catálogo, costo y presión
+        tarea = tarea_optimizacion_ramificada
+        parametros = {
+            clave: parametros[clave]
+            for clave in ("diametros_comerciales", "costo_por_metro", "precios", "presion_minima")
+        }
+    elif request.algoritmo == "ga_islas":
+        # Cada isla es un proceso: se limita igual que los workers de evaluación
+        tarea = tarea_optimizacion_islas
+        parametros.update(
+            islas=min(request.islas, settings.OPTIMIZACION_WORKERS_MAX),
+            migracion_cada=request.migracion_cada,
+            migrantes=request.migrantes,
+        )
+    else:
+        tarea = tarea_optimizacion_nsga2 if request.algoritmo == "nsga2" else tarea_optimizacion
+        parametros["workers"] = min(request.workers, settings.OPTIMIZACION_WORKERS_MAX)
+
+        # Puntos de control: el proceso del pool escribe el estado en el almacén
+        if ejecucion is not None and (reanudar or puntos_control.activo):
+            try:
+                puntos_control.iniciar(
+                    proyecto_id, ejecucion, None if reanudar else request.model_dump(mode="json")
+                )
+            except PuntoControlEnUso as e:
+                raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+            parametros.update(
+                punto_control=str(puntos_control.ruta(proyecto_id, ejecucion)),
+                punto_control_cada=puntos_control.cada,
+                reanudar=reanudar,
+            )
+
+    # Ejecutar optimización en el pool de cómputo
+    completada = False
+    try:
+        resultados = await pool_calculo.ejecutar(tarea, red, parametros, timeout=timeout)
+        completada = True
+    except ValueError as e:
+        # Red sin fuente de carga fija, nudos aislados o punto de control que no corresponde
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    finally:
+        # Si terminó ya no hay nada que reanudar; si no, el punto queda disponible
+        if "punto_control" in parametros:
+            puntos_control.terminar(proyecto_id, ejecucion, completada)
+
+    # Costo de la solución original, con el mismo catálogo de precios
+    costo_original = catalogo_precios.costo(
+        [tramo.material for tramo in tramos_db],
+        [tramo.clase_tuberia for tramo in tramos_db],
+        [tramo.longitud or 0.0 for tramo in tramos_db],
+        [tramo.diametro_interior or 0.0 for tramo in tramos_db],
+    )
 
-    # Calcular costo total de la solución original
-    costo_original = 0.0
-    for tramo in tramos_db:
-        factor_costo = (
-            tramo.diametro_interior / settings.DIAMETROS_COMERCIALES[0]
-        ) ** 1.5
-        costo_original += tramo.longitud * 100.0 * factor_costo
+    parametros_ga = {
+        "poblacion_size": request.poblacion_size,
+        "generaciones": request.generaciones,
+        "crossover_rate": request.crossover_rate,
+        "mutation_rate": request.mutation_rate,
+        "paciencia": request.paciencia,
+        "tiempo_maximo": request.tiempo_maximo,
+        "mutacion_adaptativa": request.mutacion_adaptativa,
+        "siembra": [s.value for s in request.siembra],
+        "velocidad_objetivo": request.velocidad_objetivo,
+        "motivo_parada": resultados["motivo_parada"],
+        "generaciones_ahorradas": resultados["generaciones_ahorradas"],
+        "reanudada": reanudar,
+    }
+    frente_pareto = [
+        {**punto, "diametros": {str(k): v for k, v in punto["diametros"].items()}}
+        for punto in resultados.get("frente_pareto", [])
+    ]
+    mejor_individuo = {
+        "aptitud": resultados["mejor_aptitud"],
+        "factible": resultados["convergencia"],
+    }
+    if request.algoritmo == "ga_islas":
+        # Historial de cada isla y su mejor individuo
+        parametros_ga.update(
+            islas=parametros["islas"],
+            migracion_cada=request.migracion_cada,
+            migrantes=request.migrantes,
+            migraciones=resultados["migraciones"],
+            historiales_islas=[isla["historial"] for isla in resultados["islas"]],
+        )
+        mejor_individuo["isla"] = resultados["mejor_isla"]
+        mejor_individuo["por_isla"] = [
+            {clave: isla[clave] for clave in ("isla", "semilla", "mejor_aptitud", "costo_total", "convergencia")}
+            for isla in resultados["islas"]
+        ]
+    elif request.algoritmo == "nsga2":
+        # Frente de Pareto para graficarlo sin volver a optimizar
+        parametros_ga["frente_pareto"] = frente_pareto
+    elif request.algoritmo == "lp_ramificada":
+        # Óptimo por segmentos (cota inferior) y longitud de cada diámetro por tramo
+        parametros_ga = {
+            "costo_segmentos": resultados["costo_segmentos"],
+            "segmentos": {str(k): v for k, v in resultados["segmentos"].items()},
+        }
 
     # Guardar resultado en BD
     optimizacion_db = Optimizacion(
         proyecto_id=proyecto_id,
         algoritmo=request.algoritmo,
-        parametros_ga={
-            "poblacion_size": request.poblacion_size,
-            "generaciones": request.generaciones,
-            "crossover_rate": request.crossover_rate,
-            "mutation_rate": request.mutation_rate,
-        },
+        parametros_ga=parametros_ga,
         costo_total=costo_original,
         costo_optimizado=resultados["costo_total"],
         ahorro_porcentaje=(
@@ -144,8 +352,9 @@ async def optimizar_diametros(
         else 0,
         convergencia=resultados["convergencia"],
         generaciones=resultados["generaciones"],
+        mejor_individuo=mejor_individuo,
         tiempo_optimizacion=resultados["tiempo_optimizacion"],
-        diametros_optimizados=resultados["diametros_propuestos"],
+        diametros_optimizados={str(k): v for k, v in resultados["diametros_propuestos"].items()},
     )
     session.add(optimizacion_db)
     await session.commit()
@@ -174,6 +383,9 @@ async def optimizar_diametros(
         generaciones=resultados["generaciones"],
         tiempo_optimizacion=resultados["tiempo_optimizacion"],
         diametros_propuestos={str(k): v for k, v in diametros_propuestos.items()},
+        motivo_parada=resultados["motivo_parada"],
+        generaciones_ahorradas=resultados["generaciones_ahorradas"],
+        frente_pareto=frente_pareto if request.algoritmo == "nsga2" else None,
         created_at=optimizacion_db.created_at,
     )
 
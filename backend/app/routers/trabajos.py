@@ -0,0 +1,79 @@
+"""
+Routers de Trabajos - H-Redes Perú
+Consulta y cancelación de cálculos y optimizaciones en segundo plano
+"""
+
+from uuid import UUID
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import JSONResponse
+
+from app.schemas.schemas import TrabajoResponse
+from app.core.trabajos import Trabajo, gestor_trabajos
+from app.core.auth import UserAuth, get_current_active_user
+
+
+router = APIRouter()
+
+
+def trabajo_response(trabajo: Trabajo) -> TrabajoResponse:
+    """Respuesta de un trabajo, con el progreso en porcentaje"""
+    return TrabajoResponse(
+        id=trabajo.id,
+        tipo=trabajo.tipo,
+        proyecto_id=trabajo.proyecto_id,
+        estado=trabajo.estado,
+        progreso=round(trabajo.progreso * 100, 1),
+        resultado=trabajo.resultado,
+        error=trabajo.error,
+        created_at=trabajo.created_at,
+        updated_at=trabajo.updated_at,
+    )
+
+
+def trabajo_aceptado(trabajo: Trabajo) -> JSONResponse:
+    """Respuesta 202 de los endpoints que envían un trabajo en segundo plano"""
+    return JSONResponse(
+        status_code=status.HTTP_202_ACCEPTED,
+        content=trabajo_response(trabajo).model_dump(mode="json"),
+        headers={"Location": f"/api/v1/trabajos/{trabajo.id}"},
+    )
+
+
+def _obtener_trabajo_propio(trabajo_id: UUID, current_user: UserAuth) -> Trabajo:
+    trabajo = gestor_trabajos.obtener(trabajo_id)
+
+    # Un trabajo ajeno se reporta igual que uno inexistente
+    if trabajo is None or trabajo.usuario_id != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Trabajo no encontrado"
+        )
+    return trabajo
+
+
+@router.get("/{trabajo_id}", response_model=TrabajoResponse)
+async def obtener_trabajo(
+    trabajo_id: UUID,
+    current_user: UserAuth = Depends(get_current_active_user),
+):
+    """
+    Obtiene el estado, el progreso y, al completarse, el resultado de un trabajo.
+
+    Solo el usuario que envió el trabajo puede consultarlo.
+    """
+    return trabajo_response(_obtener_trabajo_propio(trabajo_id, current_user))
+
+
+@router.post("/{trabajo_id}/cancelar", response_model=TrabajoResponse)
+async def cancelar_trabajo(
+    trabajo_id: UUID,
+    current_user: UserAuth = Depends(get_current_active_user),
+):
+    """
+    Cancela un trabajo pendiente o en curso.
+
+    El cálculo se detiene en su siguiente iteración; el estado pasa a
+    "cancelado" en cuanto termina de detenerse. Cancelar un trabajo ya
+    terminado no tiene efecto.
+    """
+    _obtener_trabajo_propio(trabajo_id, current_user)
+    return trabajo_response(gestor_trabajos.cancelar(trabajo_id))
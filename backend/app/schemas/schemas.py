@@ -4,7 +4,7 @@ Validación de datos para API REST
 """
 
 from datetime import datetime
-from typing import Optional, List, Dict, Any
+from typing import Annotated, Optional, List, Dict, Any
 from pydantic import BaseModel, Field, ConfigDict
 from uuid import UUID
 from enum import Enum
@@ -60,6 +60,14 @@ class MaterialEnum(str, Enum):
     COBRE = "cobre"
 
 
+class SiembraEnum(str, Enum):
+    """Estrategias de siembra de la población inicial del algoritmo genético"""
+
+    ACTUAL = "actual"  # diámetros existentes, al comercial más cercano
+    VELOCIDAD = "velocidad"  # dimensionamiento por velocidad objetivo
+    CRITICO = "critico"  # refuerzo del camino al nudo de menor presión
+
+
 # ============ PROYECTO ============
 
 
@@ -116,6 +124,9 @@ class ProyectoResponse(ProyectoBase):
 
 # ============ NUDO ============
 
+# Multiplicador de un patrón de demanda: número finito no negativo
+Multiplicador = Annotated[float, Field(ge=0, allow_inf_nan=False)]
+
 
 class NudoBase(BaseModel):
     """Base para Nudo"""
@@ -135,6 +146,8 @@ class NudoCreate(NudoBase):
     demanda_base: float = 0.0
     elevacion: float = 0.0
     es_critico: bool = False
+    # Multiplicadores horarios de la demanda base (periodo extendido)
+    demanda_pattern: Optional[List[Multiplicador]] = Field(None, min_length=1, max_length=168)
 
 
 class NudoUpdate(BaseModel):
@@ -147,6 +160,7 @@ class NudoUpdate(BaseModel):
     demanda_base: Optional[float] = None
     elevacion: Optional[float] = None
     es_critico: Optional[bool] = None
+    demanda_pattern: Optional[List[Multiplicador]] = Field(None, min_length=1, max_length=168)
 
 
 class NudoResponse(NudoBase):
@@ -164,6 +178,7 @@ class NudoResponse(NudoBase):
     elevacion: float
     presion_calc: Optional[float]
     es_critico: bool
+    demanda_pattern: Optional[Any] = None
     created_at: datetime
     updated_at: datetime
 
@@ -231,9 +246,16 @@ class TramoResponse(TramoBase):
 class CalculoRequest(BaseModel):
     """Request para cálculo hidráulico"""
 
-    metodo: str = Field("hardy_cross", pattern="^(hardy_cross|deterministico|hibrido)$")
+    metodo: str = Field("hardy_cross", pattern="^(hardy_cross|gradiente|deterministico|hibrido)$")
     tolerancia: float = Field(1e-7, gt=0, le=1e-3)
     max_iteraciones: int = Field(1000, ge=1, le=10000)
+    modo_mallas: str = Field("fundamental", pattern="^(fundamental|corta)$")
+    # Partir de los caudales del último cálculo convergido del proyecto
+    arranque_en_caliente: bool = False
+    # Repetir el cálculo en frío para reportar las iteraciones ahorradas
+    medir_ahorro: bool = False
+    # Responder de inmediato con un trabajo en segundo plano (202)
+    asincrono: bool = False
 
 
 class IteracionItem(BaseModel):
@@ -259,6 +281,21 @@ class CalculoResponse(BaseModel):
     iteraciones_realizadas: Optional[int]
     tiempo_calculo: Optional[float]
 
+    # Base de mallas
+    modo_mallas: Optional[str] = None
+    peso_base_mallas: Optional[float] = None
+
+    # Arranque en caliente
+    arranque_en_caliente: bool = False
+    cobertura_arranque: Optional[float] = None  # fracción de tramos con caudal previo
+    iteraciones_en_frio: Optional[int] = None  # solo con medir_ahorro
+    iteraciones_ahorradas: Optional[int] = None
+
+    # Cache de resultados
+    desde_cache: bool = False  # respuesta de un cálculo idéntico anterior
+    cache_aciertos: Optional[int] = None
+    cache_fallos: Optional[int] = None
+
     # Resultados resumidos
     presion_minima: Optional[float]
     presion_maxima: Optional[float]
@@ -275,6 +312,61 @@ class CalculoResponse(BaseModel):
     created_at: datetime
 
 
+class EscenarioItem(BaseModel):
+    """Escenario de demanda: multiplicador sobre la demanda base"""
+
+    nombre: str = Field(..., min_length=1, max_length=50)
+    factor: float = Field(..., ge=0, le=10)
+
+
+class EscenariosRequest(BaseModel):
+    """Request para cálculo de varios escenarios de demanda en lote"""
+
+    metodo: str = Field("gradiente", pattern="^(hardy_cross|gradiente|deterministico|hibrido)$")
+    tolerancia: float = Field(1e-7, gt=0, le=1e-3)
+    max_iteraciones: int = Field(1000, ge=1, le=10000)
+    modo_mallas: str = Field("fundamental", pattern="^(fundamental|corta)$")
+    # Si no se indica: máximo diario (K1), máximo horario (K2) y mínimo nocturno
+    escenarios: Optional[List[EscenarioItem]] = Field(None, min_length=1, max_length=24)
+
+
+class EscenarioResultado(BaseModel):
+    """Resumen de un escenario de demanda"""
+
+    nombre: str
+    factor: float
+    convergencia: bool
+    iteraciones_realizadas: int
+    error_final: Optional[float]
+    presion_minima: Optional[float]
+    presion_maxima: Optional[float]
+    velocidad_minima: Optional[float]
+    velocidad_maxima: Optional[float]
+
+
+class EscenariosResponse(BaseModel):
+    """Response de cálculo de escenarios"""
+
+    proyecto_id: UUID
+    metodo: str
+    tiempo_calculo: float
+    escenarios: List[EscenarioResultado]
+
+
+class PeriodoExtendidoRequest(BaseModel):
+    """Request para simulación en periodo extendido"""
+
+    metodo: str = Field("gradiente", pattern="^(hardy_cross|gradiente|deterministico|hibrido)$")
+    tolerancia: float = Field(1e-7, gt=0, le=1e-3)
+    max_iteraciones: int = Field(1000, ge=1, le=10000)
+    modo_mallas: str = Field("fundamental", pattern="^(fundamental|corta)$")
+    duracion_horas: float = Field(24.0, gt=0, le=168)
+    intervalo_horas: float = Field(1.0, gt=0, le=24)
+    # Patrón para los nudos sin demanda_pattern propio (por defecto, demanda constante)
+    patron: Optional[List[Multiplicador]] = Field(None, min_length=1, max_length=168)
+    decimales: int = Field(4, ge=0, le=10)
+
+
 # ============ OPTIMIZACIÓN ============
 
 
@@ -282,13 +374,35 @@ class OptimizacionRequest(BaseModel):
     """Request para optimización de diámetros"""
 
     algoritmo: str = Field(
-        "algoritmo_genetico", pattern="^(algoritmo_genetico|gradiente)$"
+        "algoritmo_genetico", pattern="^(algoritmo_genetico|ga_islas|nsga2|lp_ramificada|gradiente)$"
     )
+    # nsga2: frente de Pareto costo vs. excedente de presión (mismos parámetros del GA)
+    # lp_ramificada: solución exacta (programación lineal) para redes
+    # abiertas con una sola fuente; no usa los parámetros del GA
     poblacion_size: int = Field(100, ge=10, le=500)
     generaciones: int = Field(50, ge=10, le=200)
     crossover_rate: float = Field(0.8, ge=0, le=1)
     mutation_rate: float = Field(0.1, ge=0, le=1)
     costo_material: float = Field(1.0, ge=0)
+    # Procesos que reparten la evaluación de cada generación (tope:
+    # OPTIMIZACION_WORKERS_MAX); el resultado es reproducible para un mismo valor
+    workers: int = Field(1, ge=1, le=32)
+    # Modelo de islas (algoritmo="ga_islas"): subpoblaciones en procesos
+    # separados que intercambian sus mejores individuos (anillo)
+    islas: int = Field(4, ge=2, le=32)
+    migracion_cada: int = Field(10, ge=1, le=200)  # generaciones
+    migrantes: int = Field(2, ge=1, le=50)  # individuos por migración
+    # Parada anticipada: generaciones sin mejora de la mejor aptitud y
+    # tiempo máximo de reloj (s); None = sin límite
+    paciencia: Optional[int] = Field(None, ge=1, le=200)
+    tiempo_maximo: Optional[float] = Field(None, gt=0, le=3600)
+    # Subir la mutación cuando la diversidad de la población colapsa
+    mutacion_adaptativa: bool = False
+    # Individuos heurísticos en la generación 0 (lista vacía = población aleatoria)
+    siembra: List[SiembraEnum] = Field(default_factory=lambda: list(SiembraEnum))
+    velocidad_objetivo: float = Field(1.0, gt=0, le=5)  # m/s, para siembra "velocidad"
+    # Responder de inmediato con un trabajo en segundo plano (202)
+    asincrono: bool = False
 
 
 class OptimizacionResponse(BaseModel):
@@ -304,9 +418,31 @@ class OptimizacionResponse(BaseModel):
     generaciones: Optional[int]
     tiempo_optimizacion: Optional[float]
     diametros_propuestos: Dict[str, float]
+    # generaciones | estancamiento | tiempo
+    motivo_parada: Optional[str] = None
+    generaciones_ahorradas: int = 0
+    # Solo nsga2: puntos del frente (costo, excedente_presion, factible, diametros)
+    frente_pareto: Optional[List[Dict[str, Any]]] = None
     created_at: datetime
 
 
+# ============ TRABAJOS ============
+
+
+class TrabajoResponse(BaseModel):
+    """Estado de un cálculo u optimización en segundo plano"""
+
+    id: UUID
+    tipo: str
+    proyecto_id: UUID
+    estado: str  # pendiente | en_curso | completado | error | cancelado
+    progreso: float  # porcentaje
+    resultado: Optional[Dict[str, Any]] = None  # CalculoResponse u OptimizacionResponse
+    error: Optional[str] = None
+    created_at: datetime
+    updated_at: datetime
+
+
 # ============ GIS ============
 
 
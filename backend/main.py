@@ -13,7 +13,13 @@ from fastapi.responses import JSONResponse
 from contextlib import asynccontextmanager
 
 from app.config.settings import settings
-from app.routers import proyectos, calculos, gis, optimizacion, normativa, reportes
+from app.core.cache_resultados import cache_calculos
+from app.core.catalogo_precios import catalogo_precios
+from app.core.coalescencia import coalescedor
+from app.core.computo import CalculoCancelado, PoolOcupado, TiempoAgotado, pool_calculo
+from app.core.puntos_control import puntos_control
+from app.core.trabajos import crear_broker, gestor_trabajos
+from app.routers import proyectos, calculos, gis, optimizacion, normativa, reportes, trabajos
 from app.db.database import sync_engine as engine, Base
 from app.dependencies.auth import AuthorizationError, AuthenticationError
 
@@ -23,8 +29,35 @@ async def lifespan(app: FastAPI):
     """Gestiona el ciclo de vida de la aplicación"""
     # Startup: Crear tablas de base de datos
     Base.metadata.create_all(bind=engine)
+    # Pool de cómputo para cálculos y optimizaciones
+    pool_calculo.iniciar(
+        workers=settings.COMPUTO_WORKERS,
+        timeout=settings.COMPUTO_TIMEOUT,
+        max_tareas=settings.COMPUTO_MAX_TAREAS,
+    )
+    # Cache de resultados de /calcular
+    cache_calculos.configurar(
+        capacidad=settings.CACHE_CALCULOS_TAMANO, ttl=settings.CACHE_CALCULOS_TTL
+    )
+    # Catálogo de precios de tuberías (optimizador y costos)
+    catalogo_precios.configurar(
+        diametros=settings.DIAMETROS_COMERCIALES,
+        costo_por_metro=settings.COSTO_POR_METRO,
+        archivo=settings.CATALOGO_PRECIOS,
+    )
+    # Puntos de control para reanudar optimizaciones interrumpidas
+    puntos_control.configurar(
+        directorio=settings.PUNTOS_CONTROL_DIRECTORIO, cada=settings.PUNTO_CONTROL_CADA
+    )
+    # Trabajos en segundo plano sobre el pool
+    gestor_trabajos.configurar(
+        broker=crear_broker(settings.TRABAJOS_BROKER, settings.TRABAJOS_DIRECTORIO),
+        retencion=settings.TRABAJOS_RETENCION,
+    )
     yield
     # Shutdown: Limpieza
+    await gestor_trabajos.cerrar()
+    pool_calculo.cerrar()
 
 
 # Crear aplicación FastAPI
@@ -87,6 +120,25 @@ async def authentication_exception_handler(request: Request, exc: Authentication
     )
 
 
+@app.exception_handler(PoolOcupado)
+async def pool_ocupado_exception_handler(request: Request, exc: PoolOcupado):
+    """Maneja la saturación del pool de cómputo"""
+    return JSONResponse(
+        status_code=503,
+        content={"detail": str(exc), "error_type": "computo"},
+        headers={"Retry-After": "5"},
+    )
+
+
+@app.exception_handler(CalculoCancelado)
+async def calculo_cancelado_exception_handler(request: Request, exc: CalculoCancelado):
+    """Maneja cálculos cancelados o que superaron el tiempo máximo"""
+    return JSONResponse(
+        status_code=504 if isinstance(exc, TiempoAgotado) else 409,
+        content={"detail": str(exc), "error_type": "computo"},
+    )
+
+
 # Incluir routers
 app.include_router(proyectos.router, prefix="/api/v1/proyectos", tags=["Proyectos"])
 app.include_router(
@@ -98,6 +150,7 @@ app.include_router(
 )
 app.include_router(normativa.router, prefix="/api/v1/normativa", tags=["Normativa"])
 app.include_router(reportes.router, prefix="/api/v1/reportes", tags=["Reportes"])
+app.include_router(trabajos.router, prefix="/api/v1/trabajos", tags=["Trabajos"])
 
 
 @app.get("/", tags=["Inicio"])
@@ -114,7 +167,17 @@ async def root():
 @app.get("/health", tags=["Salud"])
 async def health_check():
     """Verificación de estado de la API"""
-    return {"estado": "saludable", "version": "1.0.0"}
+    return {
+        "estado": "saludable",
+        "version": "1.0.0",
+        "computo": {
+            "workers": pool_calculo.workers,
+            "en_curso": coalescedor.en_curso,
+            # Ejecuciones reales y ahorradas por coalescencia, por tipo
+            "coalescencia": coalescedor.estadisticas,
+            "cache_calculos": cache_calculos.estadisticas,
+        },
+    }
 
 
 if __name__ == "__main__":
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Benchmark - Costo de los Hijos del Algoritmo Genético
+
+Compara tres formas de obtener el costo de los hijos de una generación
+(cruce de un punto + mutación):
+
+- anterior: factor (D / D_min)^1.5 de cada gen por la longitud (producto
+  matricial), solo admite un precio por diámetro
+- tabla: gather sobre la tabla aplanada tramos × diámetros del optimizador
+  (admite precios por tramo, p. ej. por material)
+- delta: costo del primer padre más la diferencia en los genes que
+  cambian (los del segmento cruzado que difieren entre padres y los
+  mutados), acumulada por hijo
+
+`--convergencia` es la fracción de genes comunes a toda la población
+(poblaciones avanzadas), que reduce los genes que cambian en delta.
+Tiempos en ms por generación.
+
+Uso:
+    python benchmark_costo.py --tramos 100 500 3000 --poblacion 200 500
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.config.settings import settings
+from app.core.optimizador import OptimizadorGA
+from benchmark_optimizador import red_ramificada
+
+
+def costo_anterior(opt: OptimizadorGA, hijos: np.ndarray) -> np.ndarray:
+    factor = (opt._diametros / opt._diametros[0]) ** 1.5
+    return factor[hijos] @ opt._longitud * opt.costo_por_metro
+
+
+def costo_delta(opt: OptimizadorGA, padres1: np.ndarray, costo_padres1: np.ndarray, hijos: np.ndarray) -> np.ndarray:
+    """Costo del primer padre más la diferencia de los genes que cambian"""
+    filas, tramos = np.nonzero(hijos != padres1)
+    desplazamiento = opt._desplazamiento_costo[tramos]
+    diferencia = (
+        opt._tabla_costo[desplazamiento + hijos[filas, tramos]]
+        - opt._tabla_costo[desplazamiento + padres1[filas, tramos]]
+    )
+    return costo_padres1 + np.bincount(filas, diferencia, minlength=len(hijos))
+
+
+def medir(funcion, repeticiones: int) -> float:
+    mejor = float("inf")
+    for _ in range(repeticiones):
+        t0 = time.perf_counter()
+        funcion()
+        mejor = min(mejor, time.perf_counter() - t0)
+    return mejor * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark del costo de los hijos del algoritmo genético")
+    parser.add_argument("--tramos", type=int, nargs="+", default=[100, 500, 3000])
+    parser.add_argument("--poblacion", type=int, nargs="+", default=[200, 500])
+    parser.add_argument("--convergencia", type=float, nargs="+", default=[0.0, 0.9])
+    parser.add_argument("--repeticiones", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'tramos':>7} {'población':>10} {'converg.':>9} {'anterior':>9} {'tabla':>9} {'delta':>9}")
+    for n_tramos in args.tramos:
+        nudos, tramos = red_ramificada(n_tramos)
+        for poblacion_size in args.poblacion:
+            opt = OptimizadorGA(
+                nudos, tramos, settings.DIAMETROS_COMERCIALES,
+                poblacion_size=poblacion_size, semilla=0, siembra=(),
+            )
+            rng = np.random.default_rng(0)
+            for convergencia in args.convergencia:
+                comun = rng.integers(0, len(opt._diametros), n_tramos)
+                poblacion = opt._inicializar_poblacion()
+                poblacion = np.where(
+                    rng.random(poblacion.shape) < convergencia, comun, poblacion
+                ).astype(poblacion.dtype)
+                costo_poblacion = opt._calcular_costo(poblacion)
+
+                n_pares = poblacion_size // 2
+                i1 = rng.integers(0, poblacion_size, n_pares)
+                i2 = rng.integers(0, poblacion_size, n_pares)
+                padres1 = poblacion[i1]
+                hijos, _ = opt._cruce(padres1, poblacion[i2])
+                opt._mutar(hijos)
+
+                assert np.allclose(costo_anterior(opt, hijos), opt._calcular_costo(hijos))
+                assert np.allclose(
+                    costo_delta(opt, padres1, costo_poblacion[i1], hijos),
+                    opt._calcular_costo(hijos),
+                )
+
+                t_anterior = medir(lambda: costo_anterior(opt, hijos), args.repeticiones)
+                t_tabla = medir(lambda: opt._calcular_costo(hijos), args.repeticiones)
+                t_delta = medir(
+                    lambda: costo_delta(opt, padres1, costo_poblacion[i1], hijos),
+                    args.repeticiones,
+                )
+                print(
+                    f"{n_tramos:>7} {poblacion_size:>10} {convergencia:>9.1f} "
+                    f"{t_anterior:>9.3f} {t_tabla:>9.3f} {t_delta:>9.3f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Benchmark - Algoritmo Genético con Modelo de Islas
+
+Para cada número de islas ejecuta OptimizadorIslas con la misma población
+por isla y las mismas generaciones, y lo compara con una sola población
+(OptimizadorGA) del mismo tamaño:
+
+- tiempo total y aceleración respecto a ejecutar las islas una tras otra
+  (escalamiento con los núcleos disponibles)
+- mejor costo encontrado con el mismo tiempo de reloj por isla
+
+Todos los tiempos en segundos.
+
+Uso:
+    python benchmark_islas.py --tramos 200 --islas 1 2 4 --poblacion 100 --generaciones 40
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.config.settings import settings
+from app.core.optimizador import OptimizadorGA
+from app.core.optimizador_islas import OptimizadorIslas
+from benchmark_optimizador import red_ramificada
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark del modelo de islas")
+    parser.add_argument("--tramos", type=int, default=200)
+    parser.add_argument("--islas", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--poblacion", type=int, default=100)
+    parser.add_argument("--generaciones", type=int, default=40)
+    parser.add_argument("--migracion-cada", type=int, default=10)
+    parser.add_argument("--presion-minima", type=float, default=10.0)
+    args = parser.parse_args()
+
+    print(f"Núcleos disponibles: {len(os.sched_getaffinity(0))}")
+    nudos, tramos = red_ramificada(args.tramos)
+    parametros = dict(
+        diametros_comerciales=settings.DIAMETROS_COMERCIALES,
+        presion_minima=args.presion_minima,
+        poblacion_size=args.poblacion,
+        generaciones=args.generaciones,
+        semilla=0,
+    )
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        t0 = time.perf_counter()
+        unica = OptimizadorGA(nudos, tramos, **parametros)
+        resultado = unica.optimizar()
+        t_unica = time.perf_counter() - t0
+    print(f"{'islas':>6} {'tiempo':>10} {'escalamiento':>13} {'mejor costo':>14} {'factible':>9}")
+    print(f"{'GA':>6} {t_unica:>10.3f} {'-':>13} {resultado['costo_total']:>14.0f} {str(resultado['convergencia']):>9}")
+
+    for islas in args.islas:
+        with contextlib.redirect_stdout(io.StringIO()):
+            t0 = time.perf_counter()
+            resultado = OptimizadorIslas(
+                unica.red, islas=islas, migracion_cada=args.migracion_cada, **parametros
+            ).optimizar()
+            t_islas = time.perf_counter() - t0
+
+        # Escalamiento: islas · (tiempo de una población) / tiempo con islas
+        print(
+            f"{islas:>6} {t_islas:>10.3f} {islas * t_unica / t_islas:>12.2f}x "
+            f"{resultado['costo_total']:>14.0f} {str(resultado['convergencia']):>9}"
+        )
+
+
+if __name__ == "__main__":
+    main()
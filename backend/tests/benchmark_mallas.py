@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Benchmark - Identificación de Mallas
+
+Compara la base fundamental de ciclos (árbol generador BFS) de
+MotorHidraulico._identificar_mallas con la rutina DFS anterior, sobre
+redes en cuadrícula y redes planares aleatorias (triangulación de Delaunay).
+
+Uso:
+    python benchmark_mallas.py --tamanos 100 400 1600 4900 --max-legado 2500
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import random
+import sys
+import time
+from collections import defaultdict
+from typing import Dict, List, Tuple
+from uuid import UUID
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.core.hidraulico import MotorHidraulico, Nudo, Tramo, Malla
+from app.core.red_compacta import RedCompacta
+
+
+def red_cuadricula(n_nudos: int, semilla: int = 0) -> Tuple[Dict, Dict]:
+    """Red en cuadrícula lado x lado con un reservorio en una esquina"""
+    rnd = random.Random(semilla)
+    lado = max(2, int(round(n_nudos ** 0.5)))
+    posiciones = [(i, j) for i in range(lado) for j in range(lado)]
+    aristas = []
+    for i, j in posiciones:
+        if i + 1 < lado:
+            aristas.append(((i, j), (i + 1, j)))
+        if j + 1 < lado:
+            aristas.append(((i, j), (i, j + 1)))
+    return _construir_red(posiciones, aristas, rnd)
+
+
+def red_planar_aleatoria(n_nudos: int, semilla: int = 0) -> Tuple[Dict, Dict]:
+    """Red planar aleatoria: triangulación de Delaunay con 30% de aristas eliminadas"""
+    from scipy.spatial import Delaunay
+
+    rnd = random.Random(semilla)
+    puntos = np.random.default_rng(semilla).random((n_nudos, 2))
+    triangulacion = Delaunay(puntos)
+
+    aristas = set()
+    for a, b, c in triangulacion.simplices.tolist():
+        for u, v in ((a, b), (b, c), (a, c)):
+            aristas.add((min(u, v), max(u, v)))
+
+    # Eliminar aristas al azar sin desconectar la red (árbol BFS protegido)
+    vecinos = defaultdict(list)
+    for u, v in aristas:
+        vecinos[u].append(v)
+        vecinos[v].append(u)
+    protegidas, visitados, cola = set(), {0}, [0]
+    while cola:
+        u = cola.pop()
+        for v in vecinos[u]:
+            if v not in visitados:
+                visitados.add(v)
+                protegidas.add((min(u, v), max(u, v)))
+                cola.append(v)
+    aristas = [e for e in sorted(aristas) if e in protegidas or rnd.random() > 0.3]
+
+    return _construir_red(list(range(n_nudos)), aristas, rnd)
+
+
+def _construir_red(posiciones: List, aristas: List, rnd: random.Random) -> Tuple[Dict, Dict]:
+    ids = {p: UUID(int=k + 1) for k, p in enumerate(posiciones)}
+    nudos = {}
+    for k, p in enumerate(posiciones):
+        tipo = "reservorio" if k == 0 else "consumo"
+        nudos[ids[p]] = Nudo(
+            id=ids[p],
+            codigo=f"N-{k}",
+            tipo=tipo,
+            elevacion=100.0 if k == 0 else rnd.uniform(40, 60),
+            demanda=0.0 if k == 0 else rnd.uniform(0.1, 2.0),
+        )
+    tramos = {}
+    for k, (a, b) in enumerate(aristas):
+        tramo_id = UUID(int=10_000_000 + k)
+        tramos[tramo_id] = Tramo(
+            id=tramo_id,
+            codigo=f"T-{k}",
+            nudo_origen_id=ids[a],
+            nudo_destino_id=ids[b],
+            longitud=rnd.uniform(50, 300),
+            diametro=rnd.choice([50, 63, 75, 90, 110]),
+        )
+    return nudos, tramos
+
+
+def identificar_mallas_dfs(nudos: Dict, tramos: Dict) -> List[Malla]:
+    """Rutina DFS anterior de MotorHidraulico._identificar_mallas (referencia)"""
+    grafo = defaultdict(list)
+    for tramo in tramos.values():
+        grafo[tramo.nudo_origen_id].append(tramo.nudo_destino_id)
+        grafo[tramo.nudo_destino_id].append(tramo.nudo_origen_id)
+
+    visitados = set()
+    mallas = []
+    malla_id = 0
+
+    def dfs(vertice, padre, camino):
+        nonlocal malla_id
+        visitados.add(vertice)
+        camino.append(vertice)
+
+        for vecino in grafo[vertice]:
+            if vecino == padre:
+                continue
+            if vecino in camino:
+                idx_inicio = camino.index(vecino)
+                ciclo = camino[idx_inicio:]
+
+                if len(ciclo) >= 3:
+                    codigos_tramos = []
+                    for i in range(len(ciclo)):
+                        origen = ciclo[i]
+                        destino = ciclo[(i + 1) % len(ciclo)]
+                        for t in tramos.values():
+                            if (t.nudo_origen_id == origen and t.nudo_destino_id == destino) or \
+                               (t.nudo_destino_id == origen and t.nudo_origen_id == destino):
+                                codigos_tramos.append(t.codigo)
+                                break
+
+                    mallas.append(Malla(
+                        id=f"M-{malla_id}",
+                        tramos=codigos_tramos,
+                        nudos_circunferenciales=ciclo
+                    ))
+                    malla_id += 1
+            elif vecino not in visitados:
+                dfs(vecino, vertice, camino)
+
+        camino.pop()
+
+    for nudo in nudos.keys():
+        if nudo not in visitados:
+            dfs(nudo, None, [])
+
+    return mallas
+
+
+def medir(funcion, repeticiones: int = 3) -> Tuple[float, object]:
+    """Mejor tiempo de varias repeticiones"""
+    mejor, resultado = float("inf"), None
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            resultado = funcion()
+        mejor = min(mejor, time.perf_counter() - inicio)
+    return mejor, resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de identificación de mallas")
+    parser.add_argument("--tamanos", type=int, nargs="+", default=[100, 400, 1600, 4900])
+    parser.add_argument("--max-legado", type=int, default=2500,
+                        help="No ejecutar la rutina DFS por encima de este número de nudos")
+    parser.add_argument("--repeticiones", type=int, default=3)
+    args = parser.parse_args()
+
+    sys.setrecursionlimit(100_000)
+
+    print(f"{'red':<10} {'nudos':>7} {'tramos':>7} {'E-N+1':>7} "
+          f"{'mallas':>7} {'t_base(s)':>10} {'mallas_dfs':>10} {'t_dfs(s)':>10} {'aceleración':>11}")
+    print("-" * 88)
+
+    for generador, nombre in ((red_cuadricula, "cuadrícula"), (red_planar_aleatoria, "planar")):
+        for n in args.tamanos:
+            nudos, tramos = generador(n)
+            esperado = len(tramos) - len(nudos) + 1
+
+            motor = MotorHidraulico.__new__(MotorHidraulico)
+            motor.red = RedCompacta.desde_dataclasses(nudos, tramos)
+            t_base, mallas = medir(motor._base_mallas_fundamental, args.repeticiones)
+
+            if len(nudos) <= args.max_legado:
+                t_dfs, mallas_dfs = medir(
+                    lambda: identificar_mallas_dfs(nudos, tramos), 1
+                )
+                columnas_dfs = f"{len(mallas_dfs):>10} {t_dfs:>10.4f} {t_dfs / t_base:>10.1f}x"
+            else:
+                columnas_dfs = f"{'-':>10} {'-':>10} {'-':>11}"
+
+            print(f"{nombre:<10} {len(nudos):>7} {len(tramos):>7} {esperado:>7} "
+                  f"{len(mallas):>7} {t_base:>10.4f} {columnas_dfs}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Benchmark - Evaluación de la Población del Algoritmo Genético
+
+Compara dos formas de obtener las presiones reales (Gradiente Global) de
+cada individuo de una generación:
+
+- anterior: un MotorHidraulico por individuo, con arranque en frío y su
+  propia topología, como haría cualquier cálculo de /calcular
+- evaluador: EvaluadorDiametros del optimizador, que prepara la topología
+  y el patrón disperso una sola vez y resuelve la generación en lotes
+  diagonales por bloques con arranque en caliente
+
+Se reporta el tiempo por generación y por candidato, la verificación de que
+ambas dan la misma aptitud y factibilidad, el tiempo de la misma generación
+repartida entre `--workers` procesos (EvaluadorParalelo) y el de una
+optimización completa. Todos los tiempos en segundos salvo "ms/cand".
+
+Uso:
+    python benchmark_optimizador.py --tramos 50 100 200 --poblacion 200 --generaciones 20 --workers 4
+"""
+
+import argparse
+import contextlib
+import dataclasses
+import io
+import os
+import random
+import sys
+import time
+from typing import Dict, List, Tuple
+from uuid import uuid4
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.config.settings import settings
+from app.core.evaluacion_paralela import EvaluadorParalelo
+from app.core.hidraulico import MotorHidraulico
+from app.core.optimizador import OptimizadorGA
+
+
+def red_ramificada(n_tramos: int, semilla: int = 0) -> Tuple[Dict, Dict]:
+    """Red abierta aleatoria de `n_tramos` tramos con un reservorio, en el formato del optimizador"""
+    rnd = random.Random(semilla)
+    ids = [uuid4() for _ in range(n_tramos + 1)]
+    nudos = {ids[0]: {"codigo": "R-1", "tipo": "reservorio", "elevacion": 120.0, "demanda": 0.0}}
+    tramos = {}
+    for i in range(1, n_tramos + 1):
+        nudos[ids[i]] = {
+            "codigo": f"N-{i}",
+            "tipo": "consumo",
+            "elevacion": rnd.uniform(60, 100),
+            "demanda": rnd.uniform(0.1, 1.0),
+        }
+        tramos[uuid4()] = {
+            "codigo": f"T-{i}",
+            "nudo_origen": ids[rnd.randrange(i)],
+            "nudo_destino": ids[i],
+            "longitud": rnd.uniform(50, 300),
+            "diametro_actual": 110.0,
+        }
+    return nudos, tramos
+
+
+# ============ EVALUACIÓN ANTERIOR (un motor por individuo) ============
+
+
+def presiones_motor(opt: OptimizadorGA, cromosoma: List[float]) -> Tuple[np.ndarray, bool]:
+    """Presiones de los nudos de consumo resolviendo la red completa con el motor"""
+    red = dataclasses.replace(opt.red, diametro=np.array(cromosoma, dtype=np.float64))
+    motor = MotorHidraulico(red=red)
+    with contextlib.redirect_stdout(io.StringIO()):
+        convergencia, _ = motor.metodo_gradiente()
+    return motor.presiones[~red.es_fuente], convergencia
+
+
+def aptitud_motor(opt: OptimizadorGA, cromosoma: List[float]) -> Tuple[float, bool]:
+    presiones, convergencia = presiones_motor(opt, cromosoma)
+    deficit = np.maximum(opt.presion_minima - presiones, 0.0)
+    exceso = np.maximum(presiones - opt.presion_minima * 2, 0.0)
+    penalizacion = float((deficit ** 2 * 1000 + exceso * 10).sum())
+    costo = sum(
+        t["longitud"] * opt.costo_por_metro * (d / opt.diametros_comerciales[0]) ** 1.5
+        for t, d in zip(opt.tramos.values(), cromosoma)
+    )
+    return costo + penalizacion, bool(convergencia and (presiones >= opt.presion_minima).all())
+
+
+def medir(funcion, repeticiones: int) -> Tuple[float, object]:
+    mejor, resultado = float("inf"), None
+    for _ in range(repeticiones):
+        t0 = time.perf_counter()
+        resultado = funcion()
+        mejor = min(mejor, time.perf_counter() - t0)
+    return mejor, resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de la evaluación del algoritmo genético")
+    parser.add_argument("--tramos", type=int, nargs="+", default=[50, 100, 200])
+    parser.add_argument("--poblacion", type=int, default=200)
+    parser.add_argument("--generaciones", type=int, default=20)
+    parser.add_argument("--repeticiones", type=int, default=3)
+    parser.add_argument("--workers", type=int, default=2)
+    args = parser.parse_args()
+
+    print(
+        f"{'tramos':>8} {'anterior':>10} {'evaluador':>10} {'ms/cand':>8} "
+        f"{'aceleración':>12} {'paralelo':>10} {'optimizar':>10}"
+    )
+    for n_tramos in args.tramos:
+        nudos, tramos = red_ramificada(n_tramos)
+        opt = OptimizadorGA(
+            nudos, tramos, settings.DIAMETROS_COMERCIALES,
+            poblacion_size=args.poblacion, generaciones=args.generaciones, semilla=0,
+        )
+        poblacion = opt._inicializar_poblacion()
+        cromosomas = [opt._diametros[fila].tolist() for fila in poblacion]
+
+        t_anterior, anteriores = medir(
+            lambda: [aptitud_motor(opt, c) for c in cromosomas], 1
+        )
+
+        def evaluar():
+            # Sin aciertos de la cache de aptitud de la repetición anterior
+            opt._cache_aptitud.limpiar()
+            return opt._evaluar(poblacion)
+
+        t_vector, (aptitud, factible) = medir(evaluar, args.repeticiones)
+
+        assert np.allclose(aptitud, [a for a, _ in anteriores], rtol=1e-6)
+        assert factible.tolist() == [f for _, f in anteriores]
+
+        with EvaluadorParalelo(
+            opt.red, opt._diametros, args.workers, opt._evaluador.caudales_arranque
+        ) as paralelo:
+            paralelo.resolver(poblacion)  # arranque de los procesos
+            t_paralelo, _ = medir(lambda: paralelo.resolver(poblacion), args.repeticiones)
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            t_optimizar, _ = medir(opt.optimizar, 1)
+
+        print(
+            f"{n_tramos:>8} {t_anterior:>10.4f} {t_vector:>10.4f} "
+            f"{t_vector / len(poblacion) * 1000:>8.3f} "
+            f"{t_anterior / t_vector:>11.0f}x {t_paralelo:>10.4f} {t_optimizar:>10.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Benchmark - Puntos de Control del Algoritmo Genético
+
+Mide cuánto cuesta guardar el estado de la evolución mientras se optimiza:
+
+- anterior: la optimización sin puntos de control
+- cada N: la misma optimización escribiendo el punto de control (npz
+  comprimido, reemplazo atómico del archivo) cada N generaciones, como lo
+  hace el pool de cómputo
+
+Se reporta el tiempo por generación de cada variante, el sobrecosto
+porcentual, el tiempo de serializar y escribir un punto de control y su
+tamaño, y se verifica que reanudar desde la mitad termine con el mismo
+resultado que la corrida continua. Tiempos en milisegundos.
+
+Uso:
+    python benchmark_puntos_control.py --tramos 50 200 500 --poblacion 100 --generaciones 40 --cada 1 10
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.config.settings import settings
+from app.core.optimizador import OptimizadorGA
+from app.core.puntos_control import escribir_punto_control, leer_punto_control
+from benchmark_optimizador import red_ramificada
+
+
+# Constante de Hazen-Williams para caudales en l/s y diámetros en mm: así los
+# diámetros importan y la evolución no converge en pocas generaciones
+COEF_HW = 10.674 * 1000 ** 4.8704 / 1000 ** 1.852
+
+
+def optimizar(red, args, **kwargs):
+    """Optimización completa en silencio; retorna (resultado, ms por generación)"""
+    optimizador = OptimizadorGA(
+        *red, settings.DIAMETROS_COMERCIALES,
+        poblacion_size=args.poblacion, generaciones=args.generaciones, semilla=0,
+        presion_minima=10.0, coef_hazen_williams=COEF_HW, **kwargs
+    )
+    with contextlib.redirect_stdout(io.StringIO()):
+        inicio = time.perf_counter()
+        resultado = optimizador.optimizar()
+        tiempo = time.perf_counter() - inicio
+    return optimizador, resultado, tiempo / (resultado["generaciones"] + 1) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de los puntos de control del algoritmo genético")
+    parser.add_argument("--tramos", type=int, nargs="+", default=[50, 200, 500])
+    parser.add_argument("--poblacion", type=int, default=100)
+    parser.add_argument("--generaciones", type=int, default=40)
+    parser.add_argument("--cada", type=int, nargs="+", default=[1, 10])
+    args = parser.parse_args()
+
+    columnas = "".join(f"{f'cada {n}':>10} {'+%':>6}" for n in args.cada)
+    print(f"{'tramos':>8} {'anterior':>10}{columnas} {'guardar':>9} {'KB':>7} {'reanuda':>8}")
+
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta = Path(directorio) / "punto.npz"
+        for n_tramos in args.tramos:
+            red = red_ramificada(n_tramos)
+            _, continuo, t_anterior = optimizar(red, args)
+
+            celdas = ""
+            for cada in args.cada:
+                _, _, t_cada = optimizar(
+                    red, args,
+                    punto_control_cada=cada,
+                    al_punto_control=lambda _, blob: escribir_punto_control(ruta, blob),
+                )
+                celdas += f"{t_cada:>10.2f} {(t_cada / t_anterior - 1) * 100:>+6.1f}"
+
+            # Costo aislado de un punto de control a mitad de la optimización
+            mitad = args.generaciones // 2
+            optimizador, _, _ = optimizar(
+                red, args,
+                punto_control_cada=mitad,
+                al_punto_control=lambda g, blob: escribir_punto_control(ruta, blob) if g == mitad else None,
+            )
+            blob = leer_punto_control(ruta)
+            repeticiones = 20
+            inicio = time.perf_counter()
+            for _ in range(repeticiones):
+                escribir_punto_control(ruta, optimizador.punto_control())
+            t_guardar = (time.perf_counter() - inicio) / repeticiones * 1000
+
+            # Reanudar desde la mitad termina igual que la corrida continua
+            reanudado = OptimizadorGA(
+                *red, settings.DIAMETROS_COMERCIALES,
+                poblacion_size=args.poblacion, generaciones=args.generaciones, semilla=0,
+                presion_minima=10.0, coef_hazen_williams=COEF_HW
+            )
+            reanudado.restaurar(blob)
+            with contextlib.redirect_stdout(io.StringIO()):
+                resultado = reanudado.optimizar()
+            igual = resultado["diametros_propuestos"] == continuo["diametros_propuestos"]
+
+            print(
+                f"{n_tramos:>8} {t_anterior:>10.2f}{celdas} {t_guardar:>9.3f} "
+                f"{len(blob) / 1024:>7.1f} {'sí' if igual else 'NO':>8}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Benchmark - Optimización de Redes Abiertas: Algoritmo Genético vs. Programación Lineal
+
+Para redes abiertas aleatorias compara:
+
+- ga: OptimizadorGA con la población y generaciones indicadas
+- lp: OptimizadorRamificado ("lp_ramificada"), óptimo por segmentos y
+  propuesta de un diámetro por tramo
+
+Se reporta el tiempo (s), el costo de la propuesta, si cumple la presión
+mínima y, para lp, el costo del óptimo por segmentos (cota inferior de
+cualquier diseño). Como en benchmark_siembra, se usa la constante de
+Hazen-Williams correspondiente a l/s y mm para que el diámetro influya en
+las presiones, y las demandas se escalan con --escala-demanda para que el
+catálogo alcance en redes grandes.
+
+Uso:
+    python benchmark_ramificada.py --tramos 50 200 1000 --generaciones 50
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.config.settings import settings
+from app.core.optimizador import OptimizadorGA, OptimizadorRamificado
+from benchmark_optimizador import red_ramificada
+
+
+COEF_HW_L_S_MM = 10.674 * 1000 ** 4.8704 / 1000 ** 1.852
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark GA vs. programación lineal en redes abiertas")
+    parser.add_argument("--tramos", type=int, nargs="+", default=[50, 200, 1000])
+    parser.add_argument("--poblacion", type=int, default=100)
+    parser.add_argument("--generaciones", type=int, default=50)
+    parser.add_argument("--presion-minima", type=float, default=10.0)
+    parser.add_argument("--escala-demanda", type=float, default=0.1)
+    args = parser.parse_args()
+
+    print(
+        f"{'tramos':>7} {'ga (s)':>9} {'costo ga':>13} {'factible':>9} "
+        f"{'lp (s)':>8} {'costo lp':>13} {'factible':>9} {'segmentos':>13}"
+    )
+    for n_tramos in args.tramos:
+        nudos, tramos = red_ramificada(n_tramos)
+        for nudo in nudos.values():
+            nudo["demanda"] *= args.escala_demanda
+
+        ga = OptimizadorGA(
+            nudos, tramos, settings.DIAMETROS_COMERCIALES,
+            presion_minima=args.presion_minima,
+            poblacion_size=args.poblacion,
+            generaciones=args.generaciones,
+            semilla=0,
+            coef_hazen_williams=COEF_HW_L_S_MM,
+        )
+        with contextlib.redirect_stdout(io.StringIO()):
+            resultado_ga = ga.optimizar()
+
+        t0 = time.perf_counter()
+        resultado_lp = OptimizadorRamificado(
+            ga.red, settings.DIAMETROS_COMERCIALES,
+            presion_minima=args.presion_minima,
+            coef_hazen_williams=COEF_HW_L_S_MM,
+        ).optimizar()
+        t_lp = time.perf_counter() - t0
+
+        segmentos = resultado_lp["costo_segmentos"]
+        print(
+            f"{n_tramos:>7} {resultado_ga['tiempo_optimizacion']:>9.2f} "
+            f"{resultado_ga['costo_total']:>13.0f} {str(resultado_ga['convergencia']):>9} "
+            f"{t_lp:>8.3f} {resultado_lp['costo_total']:>13.0f} {str(resultado_lp['convergencia']):>9} "
+            f"{segmentos if segmentos is None else round(segmentos):>13}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""
+Benchmark - Red Compacta
+
+Compara la representación con diccionarios de dataclasses Nudo/Tramo
+indexados por UUID con la RedCompacta (arreglos por nudo y por tramo)
+construida directamente desde filas tipo ORM:
+
+- memoria de la representación (tracemalloc, sin contar las filas)
+- tiempo de construcción
+- base fundamental de mallas sobre diccionarios UUID (rutina anterior)
+  frente al índice CSR entero de la red compacta
+- preparación de arreglos que el motor anterior repetía en cada cálculo
+- tiempo de cálculo (gradiente global con un número fijo de iteraciones y
+  red abierta) sobre la red compacta, y volcado opcional a los dataclasses
+
+Todos los tiempos en segundos.
+
+Uso:
+    python benchmark_red_compacta.py --elementos 1000 10000 100000 --max-iteraciones 20
+"""
+
+import argparse
+import contextlib
+import gc
+import io
+import os
+import random
+import sys
+import time
+import tracemalloc
+from types import SimpleNamespace
+from typing import Callable, List, Tuple
+from uuid import uuid4
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.core.hidraulico import MotorHidraulico, Nudo, Tramo
+from app.core.red_compacta import RedCompacta, TIPOS_FUENTE
+
+
+def filas_cuadricula(n_elementos: int, semilla: int = 0) -> Tuple[List, List]:
+    """Filas de nudos y tramos (como las del ORM) de una cuadrícula con ~n_elementos"""
+    rnd = random.Random(semilla)
+    lado = max(2, int(round((n_elementos / 3) ** 0.5)))
+
+    ids = {}
+    nudos = []
+    for i in range(lado):
+        for j in range(lado):
+            es_fuente = (i, j) == (0, 0)
+            ids[(i, j)] = uuid4()
+            nudos.append(SimpleNamespace(
+                id=ids[(i, j)],
+                codigo=f"N-{i}-{j}",
+                tipo=SimpleNamespace(value="reservorio" if es_fuente else "consumo"),
+                elevacion=150.0 if es_fuente else rnd.uniform(40, 60),
+                demanda_base=0.0 if es_fuente else rnd.uniform(0.1, 1.0),
+                longitud=-77.0 + 0.001 * i,
+                latitud=-12.0 + 0.001 * j,
+            ))
+
+    tramos = []
+    for (i, j), nudo_id in ids.items():
+        for vecino in ((i + 1, j), (i, j + 1)):
+            if vecino in ids:
+                tramos.append(SimpleNamespace(
+                    id=uuid4(),
+                    codigo=f"T-{len(tramos) + 1}",
+                    nudo_origen_id=nudo_id,
+                    nudo_destino_id=ids[vecino],
+                    longitud=rnd.uniform(50, 300),
+                    diametro_interior=rnd.choice([100.0, 150.0, 200.0, 250.0]),
+                    material=SimpleNamespace(value="pvc"),
+                    coef_hazen_williams=150.0,
+                ))
+
+    return nudos, tramos
+
+
+def dataclasses_desde_filas(nudos_db: List, tramos_db: List) -> Tuple[dict, dict]:
+    """Representación con diccionarios UUID -> dataclass"""
+    nudos = {
+        n.id: Nudo(
+            id=n.id,
+            codigo=n.codigo,
+            tipo=n.tipo.value,
+            elevacion=n.elevacion,
+            demanda=n.demanda_base,
+            longitud=n.longitud,
+            latitud=n.latitud,
+        )
+        for n in nudos_db
+    }
+    tramos = {
+        t.id: Tramo(
+            id=t.id,
+            codigo=t.codigo,
+            nudo_origen_id=t.nudo_origen_id,
+            nudo_destino_id=t.nudo_destino_id,
+            longitud=t.longitud,
+            diametro=t.diametro_interior,
+            material=t.material.value,
+            coef_hazen_williams=t.coef_hazen_williams,
+        )
+        for t in tramos_db
+    }
+    return nudos, tramos
+
+
+def memoria(funcion: Callable) -> Tuple[int, object]:
+    """Bytes retenidos por el resultado de funcion()"""
+    gc.collect()
+    tracemalloc.start()
+    resultado = funcion()
+    gc.collect()
+    retenidos, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return retenidos, resultado
+
+
+def medir(funcion: Callable, repeticiones: int = 3) -> Tuple[float, object]:
+    """Mejor tiempo de varias repeticiones"""
+    mejor, resultado = float("inf"), None
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            resultado = funcion()
+        mejor = min(mejor, time.perf_counter() - inicio)
+    return mejor, resultado
+
+
+def base_fundamental_uuid(nudos: dict, tramos: dict) -> int:
+    """Base fundamental de mallas sobre diccionarios UUID (rutina anterior del motor)"""
+    from collections import deque
+
+    lista = list(tramos.values())
+    adyacencia = {n: [] for n in nudos}
+    for j, tramo in enumerate(lista):
+        if tramo.nudo_origen_id == tramo.nudo_destino_id:
+            continue
+        adyacencia[tramo.nudo_origen_id].append((tramo.nudo_destino_id, j))
+        adyacencia[tramo.nudo_destino_id].append((tramo.nudo_origen_id, j))
+
+    padre, tramo_padre, profundidad = {}, {}, {}
+    en_arbol = [False] * len(lista)
+    for raiz in adyacencia:
+        if raiz in padre:
+            continue
+        padre[raiz], profundidad[raiz] = None, 0
+        cola = deque([raiz])
+        while cola:
+            vertice = cola.popleft()
+            for vecino, j in adyacencia[vertice]:
+                if vecino not in padre:
+                    padre[vecino] = vertice
+                    tramo_padre[vecino] = j
+                    profundidad[vecino] = profundidad[vertice] + 1
+                    en_arbol[j] = True
+                    cola.append(vecino)
+
+    mallas = 0
+    for j, tramo in enumerate(lista):
+        if en_arbol[j] or tramo.nudo_origen_id == tramo.nudo_destino_id:
+            continue
+        u, v = [tramo.nudo_origen_id], [tramo.nudo_destino_id]
+        codigos = []
+        while u[-1] != v[-1]:
+            if profundidad[u[-1]] >= profundidad[v[-1]]:
+                codigos.append(lista[tramo_padre[u[-1]]].codigo)
+                u.append(padre[u[-1]])
+            else:
+                codigos.append(lista[tramo_padre[v[-1]]].codigo)
+                v.append(padre[v[-1]])
+        mallas += 1
+    return mallas
+
+
+def reunir_arreglos_dict(nudos: dict, tramos: dict) -> Tuple:
+    """Arreglos que el motor anterior reconstruía desde los diccionarios en cada cálculo"""
+    ids = list(nudos.keys())
+    indice = {nudo_id: i for i, nudo_id in enumerate(ids)}
+    lista = list(tramos.values())
+    return (
+        np.array([indice[t.nudo_origen_id] for t in lista], dtype=np.int32),
+        np.array([indice[t.nudo_destino_id] for t in lista], dtype=np.int32),
+        np.array([t.longitud for t in lista]),
+        np.array([t.diametro for t in lista]),
+        np.array([t.coef_hazen_williams for t in lista]),
+        np.array([nudos[i].demanda for i in ids]),
+        np.array([nudos[i].elevacion for i in ids]),
+        np.array([nudos[i].tipo in TIPOS_FUENTE for i in ids]),
+    )
+
+
+def calcular(motor: MotorHidraulico) -> MotorHidraulico:
+    """Ejecuta gradiente global y red abierta sobre el motor"""
+    motor.metodo_gradiente()
+    motor.calcular_red_abierta()
+    return motor
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de la red compacta")
+    parser.add_argument("--elementos", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--repeticiones", type=int, default=3)
+    parser.add_argument("--max-iteraciones", type=int, default=20,
+                        help="Iteraciones del gradiente global en cada cálculo")
+    args = parser.parse_args()
+
+    print(f"{'elementos':>9} | {'B/elem dict':>11} {'B/elem red':>10} | {'crear dict':>10} "
+          f"{'crear red':>9} | {'mallas uuid':>11} {'mallas red':>10} | {'reunir dict':>11} "
+          f"| {'cálculo':>8} {'volcado':>8}")
+    print("-" * 118)
+
+    for n in args.elementos:
+        nudos_db, tramos_db = filas_cuadricula(n)
+        elementos = len(nudos_db) + len(tramos_db)
+
+        # Memoria retenida por cada representación (las filas ya existen)
+        bytes_dict, _ = memoria(lambda: dataclasses_desde_filas(nudos_db, tramos_db))
+        bytes_red, _ = memoria(lambda: RedCompacta.desde_modelos(nudos_db, tramos_db))
+
+        t_dict, (nudos, tramos) = medir(
+            lambda: dataclasses_desde_filas(nudos_db, tramos_db), args.repeticiones
+        )
+        t_red, red = medir(
+            lambda: RedCompacta.desde_modelos(nudos_db, tramos_db), args.repeticiones
+        )
+
+        # Base fundamental de mallas: diccionarios UUID vs CSR entero
+        t_mallas_uuid, _ = medir(lambda: base_fundamental_uuid(nudos, tramos), args.repeticiones)
+        motor = MotorHidraulico.__new__(MotorHidraulico)
+        motor.red = red
+        t_mallas_red, _ = medir(motor._base_mallas_fundamental, args.repeticiones)
+
+        # Preparación que el motor anterior repetía en cada cálculo
+        t_reunir, _ = medir(lambda: reunir_arreglos_dict(nudos, tramos), args.repeticiones)
+
+        # Cálculo sobre la red compacta y volcado opcional a los dataclasses
+        t_calc, motor = medir(
+            lambda: calcular(MotorHidraulico(red=red, max_iteraciones=args.max_iteraciones)), 1
+        )
+        motor.nudos, motor.tramos = nudos, tramos
+        t_volcado, _ = medir(motor._volcar_resultados, args.repeticiones)
+
+        print(f"{elementos:>9} | {bytes_dict / elementos:>11.0f} {bytes_red / elementos:>10.0f} | "
+              f"{t_dict:>10.4f} {t_red:>9.4f} | {t_mallas_uuid:>11.4f} {t_mallas_red:>10.4f} | "
+              f"{t_reunir:>11.4f} | {t_calc:>8.3f} {t_volcado:>8.4f}")
+
+
+if __name__ == "__main__":
+    main()
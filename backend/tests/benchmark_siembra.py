@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Benchmark - Siembra de la Población Inicial del Algoritmo Genético
+
+Compara la población inicial aleatoria (siembra=()) con la sembrada
+(diseño actual, dimensionamiento por velocidad y refuerzo del camino
+crítico) en redes abiertas aleatorias:
+
+- generación en que aparece el primer individuo factible (mediana de
+  varias semillas; "-" si no aparece)
+- aptitud del mejor individuo al terminar (mediana) y cuántas corridas
+  terminan con un mejor individuo factible
+- tiempo de la siembra
+
+El motor trabaja con caudales en l/s y diámetros en mm; para que los
+diámetros influyan en las presiones se usa la constante de Hazen-Williams
+correspondiente a esas unidades (10.674 · 1000^4.8704 / 1000^1.852).
+
+Uso:
+    python benchmark_siembra.py --tramos 50 100 200 --generaciones 60 --repeticiones 5
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.config.settings import settings
+from app.core.optimizador import OptimizadorGA
+from benchmark_optimizador import red_ramificada
+
+
+COEF_HW_L_S_MM = 10.674 * 1000 ** 4.8704 / 1000 ** 1.852
+
+
+def ejecutar(nudos, tramos, siembra, semilla: int, args) -> dict:
+    optimizador = OptimizadorGA(
+        nudos, tramos, settings.DIAMETROS_COMERCIALES,
+        presion_minima=args.presion_minima,
+        poblacion_size=args.poblacion,
+        generaciones=args.generaciones,
+        semilla=semilla,
+        siembra=siembra,
+        coef_hazen_williams=COEF_HW_L_S_MM,
+    )
+    t0 = time.perf_counter()
+    optimizador._inicializar_poblacion()
+    t_siembra = time.perf_counter() - t0
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        resultado = optimizador.optimizar()
+
+    factibles = [h["generacion"] for h in resultado["historial"] if h["factibles"]]
+    return {
+        "primera_factible": factibles[0] if factibles else None,
+        "aptitud": resultado["mejor_aptitud"],
+        "factible": resultado["convergencia"],
+        "t_siembra": t_siembra,
+    }
+
+
+def mediana(valores) -> str:
+    valores = [v for v in valores if v is not None]
+    return f"{np.median(valores):.0f}" if valores else "-"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de la siembra del algoritmo genético")
+    parser.add_argument("--tramos", type=int, nargs="+", default=[50, 100, 200])
+    parser.add_argument("--poblacion", type=int, default=100)
+    parser.add_argument("--generaciones", type=int, default=60)
+    parser.add_argument("--repeticiones", type=int, default=5)
+    parser.add_argument("--presion-minima", type=float, default=10.0)
+    args = parser.parse_args()
+
+    print(
+        f"{'tramos':>7} {'inicio':>10} {'1ª factible':>12} {'sin factible':>13} "
+        f"{'aptitud final':>14} {'final factible':>15} {'siembra (s)':>12}"
+    )
+    for n_tramos in args.tramos:
+        nudos, tramos = red_ramificada(n_tramos)
+        for nombre, siembra in (("aleatorio", ()), ("sembrado", ("actual", "velocidad", "critico"))):
+            corridas = [ejecutar(nudos, tramos, siembra, s, args) for s in range(args.repeticiones)]
+            print(
+                f"{n_tramos:>7} {nombre:>10} "
+                f"{mediana(c['primera_factible'] for c in corridas):>12} "
+                f"{sum(c['primera_factible'] is None for c in corridas):>13} "
+                f"{mediana(c['aptitud'] for c in corridas):>14} "
+                f"{sum(c['factible'] for c in corridas):>15} "
+                f"{np.median([c['t_siembra'] for c in corridas]):>12.3f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -112,6 +112,7 @@ def register_sqlite_functions(dbapi_connection, connection_record):
         create_fn("DisableSpatialIndex", -1, lambda *a: 1)
         create_fn("ST_AsText", 1, lambda *a: str(a[0]) if a[0] else None)
         create_fn("ST_GeomFromText", -1, lambda *a: a[0] if a else None)
+        create_fn("GeomFromEWKT", -1, lambda *a: a[0] if a else None)
         create_fn("AsEWKB", 1, lambda *a: a[0] if a else None)
         create_fn("AsEWKT", 1, lambda *a: str(a[0]) if a[0] else None)
         create_fn("ST_AsBinary", 1, lambda *a: a[0] if a else None)
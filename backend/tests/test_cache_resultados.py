@@ -0,0 +1,79 @@
+"""
+Tests Unitarios - Cache de Resultados
+"""
+
+import time
+from uuid import uuid4
+
+from app.core.cache_resultados import CacheResultados, huella_calculo
+from app.core.red_compacta import RedCompacta
+from test_hidraulico import crear_red_mallada
+
+
+PARAMETROS = {"metodo": "gradiente", "tolerancia": 1e-7, "coef_hazen_williams": 10.674}
+
+
+class TestHuella:
+    """Tests para la clave de cache por contenido"""
+
+    def test_no_depende_del_orden_de_las_filas(self):
+        """Test que la misma red con nudos y tramos en otro orden dé la misma huella"""
+        nudos, tramos = crear_red_mallada()
+        red = RedCompacta.desde_dataclasses(nudos, tramos)
+        invertida = RedCompacta.desde_dataclasses(
+            dict(reversed(list(nudos.items()))), dict(reversed(list(tramos.items())))
+        )
+        assert invertida.huella() == red.huella()
+
+    def test_cambia_con_la_red_y_los_parametros(self):
+        """Test que un cambio de demanda, diámetro, parámetro o proyecto cambie la clave"""
+        nudos, tramos = crear_red_mallada()
+        proyecto_id = uuid4()
+        base = huella_calculo(proyecto_id, RedCompacta.desde_dataclasses(nudos, tramos), PARAMETROS)
+
+        claves = {base}
+        next(iter(tramos.values())).diametro += 5
+        claves.add(huella_calculo(proyecto_id, RedCompacta.desde_dataclasses(nudos, tramos), PARAMETROS))
+        list(nudos.values())[1].demanda += 0.5
+        red = RedCompacta.desde_dataclasses(nudos, tramos)
+        claves.add(huella_calculo(proyecto_id, red, PARAMETROS))
+        claves.add(huella_calculo(proyecto_id, red, {**PARAMETROS, "tolerancia": 1e-6}))
+        claves.add(huella_calculo(uuid4(), red, PARAMETROS))
+
+        assert len(claves) == 5
+
+
+class TestCacheResultados:
+    """Tests para la cache LRU con vencimiento"""
+
+    def test_descarta_la_menos_usada(self):
+        """Test que al llenarse se descarte la entrada usada hace más tiempo"""
+        cache = CacheResultados(capacidad=2)
+        cache.guardar("a", 1)
+        cache.guardar("b", 2)
+        assert cache.obtener("a") == 1
+        cache.guardar("c", 3)
+
+        assert cache.obtener("b") is None
+        assert cache.obtener("a") == 1
+        assert cache.obtener("c") == 3
+
+    def test_vencimiento_y_desactivada(self):
+        """Test que las entradas venzan con el TTL y que capacidad 0 no guarde nada"""
+        cache = CacheResultados(capacidad=4, ttl=0.01)
+        cache.guardar("a", 1)
+        time.sleep(0.02)
+        assert cache.obtener("a") is None
+        assert len(cache) == 0
+
+        desactivada = CacheResultados(capacidad=0)
+        desactivada.guardar("a", 1)
+        assert desactivada.obtener("a") is None
+
+    def test_contadores(self):
+        """Test que las estadísticas reflejen aciertos, fallos y entradas"""
+        cache = CacheResultados()
+        cache.guardar("a", 1)
+        for clave in ("a", "a", "b"):
+            cache.contar(cache.obtener(clave) is not None)
+        assert cache.estadisticas == {"aciertos": 2, "fallos": 1, "entradas": 1}
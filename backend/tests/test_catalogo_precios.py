@@ -0,0 +1,110 @@
+"""
+Tests Unitarios - Catálogo de Precios de Tuberías
+"""
+
+import json
+
+import numpy as np
+import pytest
+
+from app.core.catalogo_precios import CatalogoPrecios
+from app.db.models import MaterialTuberia
+from test_optimizador import DIAMETROS, crear_optimizador
+
+
+REGISTROS = [
+    {"material": "pvc", "clase_tuberia": "CL-10", "diametro": 63, "precio": 21.5},
+    {"material": "PVC", "clase_tuberia": "cl-7.5", "diametro": 63, "precio": 18.0},
+    {"material": "hdpe", "clase_tuberia": "PN-10", "diametro": 110, "precio": 80.0},
+]
+
+
+def parametrico(diametro: float, costo_por_metro: float = 100.0) -> float:
+    return costo_por_metro * (diametro / DIAMETROS[0]) ** 1.5
+
+
+class TestCatalogoPrecios:
+    """Tests para la carga y compilación del catálogo"""
+
+    def test_sin_registros_es_parametrico(self):
+        """Sin archivo, el precio es el del modelo paramétrico de siempre"""
+        catalogo = CatalogoPrecios(DIAMETROS, 100.0)
+        tabla = catalogo.precios_tramos(["pvc", "acero"], ["CL-10", "CL-15"])
+
+        assert tabla.shape == (2, len(DIAMETROS))
+        assert np.allclose(tabla, [parametrico(d) for d in DIAMETROS])
+
+    def test_precios_por_material_y_clase(self):
+        """Cada registro fija su precio; el resto de la fila queda paramétrica"""
+        catalogo = CatalogoPrecios(DIAMETROS, 100.0, REGISTROS)
+        tabla = catalogo.precios_tramos(
+            [MaterialTuberia.PVC, "pvc", "hdpe", "concreto"],
+            ["CL-10", "CL-7.5", "PN-10", "CL-10"],
+        )
+
+        k63, k110 = DIAMETROS.index(63.0), DIAMETROS.index(110.0)
+        assert tabla[0, k63] == 21.5
+        assert tabla[1, k63] == 18.0
+        assert tabla[2, k110] == 80.0
+        assert tabla[0, k110] == pytest.approx(parametrico(110.0))
+        # Material sin precios en el catálogo
+        assert np.allclose(tabla[3], [parametrico(d) for d in DIAMETROS])
+
+    def test_leer_csv_y_json(self, tmp_path):
+        """CSV con cabecera y JSON con lista de registros compilan igual"""
+        csv = tmp_path / "precios.csv"
+        csv.write_text(
+            "material,clase_tuberia,diametro,precio\n"
+            + "".join(f"{r['material']},{r['clase_tuberia']},{r['diametro']},{r['precio']}\n" for r in REGISTROS),
+            encoding="utf-8",
+        )
+        archivo_json = tmp_path / "precios.json"
+        archivo_json.write_text(json.dumps(REGISTROS), encoding="utf-8")
+
+        desde_csv, desde_json = CatalogoPrecios(), CatalogoPrecios()
+        desde_csv.configurar(DIAMETROS, 100.0, csv)
+        desde_json.configurar(DIAMETROS, 100.0, archivo_json)
+
+        assert desde_csv.materiales == desde_json.materiales == ["hdpe", "pvc"]
+        assert np.array_equal(desde_csv.precios, desde_json.precios)
+
+    @pytest.mark.parametrize("registro, mensaje", [
+        ({"material": "pvc", "clase_tuberia": "CL-10", "diametro": 64, "precio": 20.0}, "comercial"),
+        ({"material": "pvc", "clase_tuberia": "CL-10", "diametro": 63, "precio": -1.0}, "negativo"),
+        ({"material": "pvc", "diametro": 63, "precio": 20.0}, "inválido"),
+        ({"material": "pvc", "clase_tuberia": "CL-10", "diametro": 63, "precio": "caro"}, "inválido"),
+    ])
+    def test_registros_invalidos(self, registro, mensaje):
+        """Diámetros no comerciales, precios negativos o campos faltantes se rechazan"""
+        with pytest.raises(ValueError, match=mensaje):
+            CatalogoPrecios(DIAMETROS, 100.0, [registro])
+
+    def test_formato_no_soportado(self, tmp_path):
+        archivo = tmp_path / "precios.xlsx"
+        archivo.write_bytes(b"")
+        with pytest.raises(ValueError, match="no soportado"):
+            CatalogoPrecios.leer(archivo)
+
+    def test_costo_al_diametro_comercial_mas_cercano(self):
+        """El costo de la red existente usa el comercial más cercano; sin diámetro no suma"""
+        catalogo = CatalogoPrecios(DIAMETROS, 100.0, REGISTROS)
+        costo = catalogo.costo(
+            ["pvc", "hdpe", "pvc"], ["CL-10", "PN-10", "CL-10"], [10.0, 5.0, 7.0], [61.4, 113.0, 0.0]
+        )
+        assert costo == pytest.approx(10.0 * 21.5 + 5.0 * 80.0)
+        assert catalogo.costo([], [], [], []) == 0.0
+
+    def test_optimizador_usa_la_tabla(self):
+        """El costo de cada individuo es la suma de precio × longitud de la tabla del catálogo"""
+        catalogo = CatalogoPrecios(DIAMETROS, 100.0, REGISTROS)
+        n_tramos = 12
+        materiales = ["pvc" if i % 2 else "hdpe" for i in range(n_tramos)]
+        clases = ["CL-10" if i % 2 else "PN-10" for i in range(n_tramos)]
+        precios = catalogo.precios_tramos(materiales, clases)
+
+        optimizador = crear_optimizador(n_tramos=n_tramos, precios=precios)
+        poblacion = optimizador._inicializar_poblacion()
+        longitudes = np.array([t["longitud"] for t in optimizador.tramos.values()])
+
+        esperado = (precios[np.arange(n_tramos), poblacion] * longitudes).sum(axis=1)
+        assert np.allclose(optimizador._calcular_costo(poblacion), esperado)
@@ -0,0 +1,95 @@
+"""
+Tests Unitarios - Coalescencia de Cálculos
+"""
+
+import asyncio
+
+import pytest
+
+from app.core.coalescencia import Coalescedor
+
+
+def contador_lento(segundos: float = 0.05):
+    """Función asíncrona que cuenta sus ejecuciones reales"""
+    ejecuciones = []
+
+    async def funcion():
+        ejecuciones.append(1)
+        await asyncio.sleep(segundos)
+        return len(ejecuciones)
+
+    return funcion, ejecuciones
+
+
+class TestCoalescedor:
+    """Tests para la ejecución única por clave"""
+
+    @pytest.mark.asyncio
+    async def test_peticiones_identicas_comparten_ejecucion(self):
+        """Test que peticiones simultáneas con la misma clave ejecuten una sola vez"""
+        coalescedor = Coalescedor()
+        funcion, ejecuciones = contador_lento()
+
+        resultados = await asyncio.gather(
+            *(coalescedor.ejecutar("calculo", "h1", funcion) for _ in range(5))
+        )
+
+        assert resultados == [1] * 5
+        assert len(ejecuciones) == 1
+        assert coalescedor.estadisticas == {"calculo": {"ejecutados": 1, "ahorrados": 4}}
+        assert coalescedor.en_curso == 0
+
+    @pytest.mark.asyncio
+    async def test_claves_y_tipos_distintos_no_se_mezclan(self):
+        """Test que otra clave u otro tipo ejecuten por separado"""
+        coalescedor = Coalescedor()
+        funcion, ejecuciones = contador_lento()
+
+        await asyncio.gather(
+            coalescedor.ejecutar("calculo", "h1", funcion),
+            coalescedor.ejecutar("calculo", "h2", funcion),
+            coalescedor.ejecutar("optimizacion", "h1", funcion),
+        )
+
+        assert len(ejecuciones) == 3
+        assert coalescedor.estadisticas["calculo"] == {"ejecutados": 2, "ahorrados": 0}
+
+    @pytest.mark.asyncio
+    async def test_error_compartido_y_nueva_ejecucion(self):
+        """Test que el error llegue a todas las peticiones y que luego se pueda reintentar"""
+        coalescedor = Coalescedor()
+
+        async def falla():
+            await asyncio.sleep(0.01)
+            raise ValueError("Red sin fuentes")
+
+        resultados = await asyncio.gather(
+            coalescedor.ejecutar("calculo", "h1", falla),
+            coalescedor.ejecutar("calculo", "h1", falla),
+            return_exceptions=True,
+        )
+        assert all(isinstance(r, ValueError) for r in resultados)
+
+        funcion, _ = contador_lento(0.0)
+        assert await coalescedor.ejecutar("calculo", "h1", funcion) == 1
+
+    @pytest.mark.asyncio
+    async def test_cancelacion(self):
+        """Test que cancelar una petición no afecte a las demás, y cancelar todas detenga la ejecución"""
+        coalescedor = Coalescedor()
+        funcion, _ = contador_lento(0.1)
+
+        primera = asyncio.ensure_future(coalescedor.ejecutar("calculo", "h1", funcion))
+        segunda = asyncio.ensure_future(coalescedor.ejecutar("calculo", "h1", funcion))
+        await asyncio.sleep(0.01)
+        primera.cancel()
+        assert await segunda == 1
+
+        lenta, _ = contador_lento(30.0)
+        unica = asyncio.ensure_future(coalescedor.ejecutar("calculo", "h2", lenta))
+        await asyncio.sleep(0.01)
+        unica.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await unica
+        await asyncio.sleep(0)
+        assert coalescedor.en_curso == 0
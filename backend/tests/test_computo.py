@@ -0,0 +1,258 @@
+"""
+Tests Unitarios - Capa de Cómputo (pool de procesos)
+"""
+
+import pickle
+import time
+from uuid import uuid4
+
+import numpy as np
+import pytest
+
+from app.core.computo import (
+    PoolCalculo,
+    PoolOcupado,
+    TiempoAgotado,
+    tarea_calculo_hidraulico,
+    tarea_optimizacion,
+    tarea_periodo_extendido,
+    verificar_cancelacion,
+)
+from app.core.hidraulico import MotorHidraulico
+from app.core.puntos_control import (
+    AlmacenPuntosControl,
+    PuntoControlEnUso,
+    escribir_punto_control,
+    leer_punto_control,
+)
+from app.core.red_compacta import RedCompacta
+from test_hidraulico import crear_red_cuadricula, crear_red_mallada
+
+
+PARAMETROS = {
+    "metodo": "gradiente",
+    "tolerancia": 1e-7,
+    "max_iteraciones": 100,
+    "modo_mallas": "fundamental",
+    "coef_hazen_williams": 10.674,
+    "exponente_hw": 1.852,
+    "cobertura_minima": 0.5,
+    "medir_ahorro": False,
+}
+
+
+def bucle_cancelable(segundos: float) -> str:
+    """Trabajo que solo termina si no se cancela antes de `segundos`"""
+    limite = time.time() + segundos
+    while time.time() < limite:
+        verificar_cancelacion()
+        time.sleep(0.01)
+    return "terminado"
+
+
+def esperar_cupos(pool: PoolCalculo, cupos: int, espera: float = 5.0):
+    """Espera a que el pool libere todos sus cupos"""
+    limite = time.time() + espera
+    while len(pool._libres) < cupos and time.time() < limite:
+        time.sleep(0.01)
+    return len(pool._libres)
+
+
+@pytest.fixture
+def pool_hilos():
+    pool = PoolCalculo()
+    pool.iniciar(workers=0, timeout=30, max_tareas=4)
+    yield pool
+    pool.cerrar()
+
+
+@pytest.fixture(scope="module")
+def pool_procesos():
+    pool = PoolCalculo()
+    pool.iniciar(workers=1, timeout=60, max_tareas=4)
+    yield pool
+    pool.cerrar()
+
+
+class TestRedSerializable:
+    """Tests para el envío de la red compacta a otros procesos"""
+
+    def test_ida_y_vuelta(self):
+        """Test que la red se reconstruya igual, con sus índices derivados"""
+        nudos, tramos = crear_red_cuadricula(lado=5)
+        red = RedCompacta.desde_dataclasses(nudos, tramos)
+        copia = pickle.loads(pickle.dumps(red))
+
+        assert copia.ids_nudos == red.ids_nudos
+        assert copia.ids_tramos == red.ids_tramos
+        assert copia.indice_nudo == red.indice_nudo
+        assert copia.indice_tramo == red.indice_tramo
+        assert np.array_equal(copia.adyacencia.salida_tramos, red.adyacencia.salida_tramos)
+        assert np.array_equal(copia.coordenadas, red.coordenadas)
+
+
+class TestPoolCalculo:
+    """Tests para la ejecución, el tiempo máximo y la cancelación de trabajos"""
+
+    @pytest.mark.asyncio
+    async def test_calculo_en_hilos(self, pool_hilos):
+        """Test que el cálculo en el pool iguale al del motor directo"""
+        nudos, tramos = crear_red_mallada()
+        red = RedCompacta.desde_dataclasses(nudos, tramos)
+        resultado = await pool_hilos.ejecutar(tarea_calculo_hidraulico, red, PARAMETROS)
+
+        motor = MotorHidraulico(nudos, tramos, max_iteraciones=100)
+        convergencia, error = motor.metodo_gradiente()
+        assert resultado["convergencia"] == convergencia
+        assert resultado["error"] == error
+        assert [t["caudal"] for t in resultado["resultados_tramos"]] == motor.caudales.tolist()
+
+    @pytest.mark.asyncio
+    async def test_calculo_y_optimizacion_en_procesos(self, pool_procesos):
+        """Test que la red viaje al proceso hijo y vuelvan los resultados"""
+        nudos, tramos = crear_red_mallada()
+        red = RedCompacta.desde_dataclasses(nudos, tramos)
+
+        resultado = await pool_procesos.ejecutar(tarea_calculo_hidraulico, red, PARAMETROS)
+        assert resultado["convergencia"]
+        assert len(resultado["resultados_nudos"]) == len(nudos)
+
+        optimizacion = await pool_procesos.ejecutar(
+            tarea_optimizacion,
+            red,
+            {"diametros_comerciales": [50.0, 75.0, 110.0], "poblacion_size": 10, "generaciones": 3},
+        )
+        assert set(optimizacion["diametros_propuestos"]) == set(tramos)
+        assert len(optimizacion["historial"]) == 4
+
+    @pytest.mark.asyncio
+    async def test_periodo_extendido_en_procesos(self, pool_procesos):
+        """Test que los pasos del periodo extendido vuelvan del proceso hijo y los errores lleguen como ValueError"""
+        nudos, tramos = crear_red_mallada()
+        red = RedCompacta.desde_dataclasses(nudos, tramos)
+
+        pasos = await pool_procesos.ejecutar(tarea_periodo_extendido, red, PARAMETROS, 24.0, 1.0)
+        assert len(pasos) == 24
+        assert all(p.convergencia for p in pasos)
+        assert pasos[-1].caudales.shape == (len(tramos),)
+
+        with pytest.raises(ValueError, match="positivos"):
+            await pool_procesos.ejecutar(tarea_periodo_extendido, red, PARAMETROS, 0.0, 1.0)
+
+    @pytest.mark.asyncio
+    async def test_tiempo_agotado_cancela_en_procesos(self, pool_procesos):
+        """Test que al agotar el tiempo el trabajo en curso se detenga y libere su cupo"""
+        with pytest.raises(TiempoAgotado):
+            await pool_procesos.ejecutar(bucle_cancelable, 30.0, timeout=0.5)
+
+        assert esperar_cupos(pool_procesos, 4) == 4
+        assert await pool_procesos.ejecutar(bucle_cancelable, 0.0) == "terminado"
+
+    @pytest.mark.asyncio
+    async def test_cancelacion_y_cupos(self, pool_hilos):
+        """Test que se rechacen trabajos sin cupo y que cancelar los libere"""
+        tareas = [pool_hilos.enviar(bucle_cancelable, 30.0) for _ in range(4)]
+        with pytest.raises(PoolOcupado):
+            pool_hilos.enviar(bucle_cancelable, 0.0)
+
+        for tarea in tareas:
+            tarea.cancelar()
+        assert esperar_cupos(pool_hilos, 4) == 4
+        assert await pool_hilos.ejecutar(bucle_cancelable, 0.0) == "terminado"
+
+
+class TestCancelacionTardia:
+    """Tests para cancelar una tarea cuyo cupo ya reutiliza otro trabajo"""
+
+    def test_no_cancela_al_trabajo_del_cupo(self):
+        """Test que cancelar una tarea terminada no cancele al trabajo que reutiliza su cupo"""
+        pool = PoolCalculo()
+        pool.iniciar(workers=0, timeout=30, max_tareas=1)
+        try:
+            vieja = pool.enviar(bucle_cancelable, 0.0)
+            assert vieja.future.result(timeout=5) == "terminado"
+            assert esperar_cupos(pool, 1) == 1
+
+            nueva = pool.enviar(bucle_cancelable, 0.3)
+            assert nueva.cupo == vieja.cupo
+            vieja.cancelar()
+            assert nueva.future.result(timeout=5) == "terminado"
+        finally:
+            pool.cerrar()
+
+
+class TestPuntosControl:
+    """Tests para los puntos de control de la optimización en el pool"""
+
+    def test_tarea_escribe_y_reanuda(self, tmp_path):
+        """Test que la tarea escriba su punto de control y que reanudar desde él termine igual"""
+        nudos, tramos = crear_red_mallada()
+        red = RedCompacta.desde_dataclasses(nudos, tramos)
+        parametros = {
+            "diametros_comerciales": [50.0, 75.0, 110.0],
+            "poblacion_size": 10,
+            "generaciones": 6,
+            "semilla": 4,
+        }
+        ruta = tmp_path / "punto.npz"
+
+        continuo = tarea_optimizacion(red, parametros)
+        tarea_optimizacion(red, {**parametros, "generaciones": 4, "punto_control": str(ruta), "punto_control_cada": 2})
+        assert ruta.exists()
+        assert not list(tmp_path.glob("*.tmp"))
+
+        reanudado = tarea_optimizacion(red, {**parametros, "punto_control": str(ruta), "reanudar": True})
+        assert reanudado["mejor_aptitud"] == continuo["mejor_aptitud"]
+        assert [h["mejor_aptitud"] for h in reanudado["historial"]] == [
+            h["mejor_aptitud"] for h in continuo["historial"]
+        ]
+
+    def test_reanudar_sin_punto_control(self, tmp_path):
+        nudos, tramos = crear_red_mallada()
+        red = RedCompacta.desde_dataclasses(nudos, tramos)
+        with pytest.raises(ValueError, match="No hay punto de control"):
+            tarea_optimizacion(
+                red,
+                {"diametros_comerciales": [50.0, 75.0], "punto_control": str(tmp_path / "x.npz"), "reanudar": True},
+            )
+
+    def test_almacen(self, tmp_path):
+        """Test que el almacén guarde la solicitud mientras haya punto de control"""
+        almacen = AlmacenPuntosControl()
+        assert not almacen.activo
+        almacen.configurar(tmp_path / "puntos", cada=5)
+        proyecto_id = uuid4()
+
+        almacen.iniciar(proyecto_id, "a", {"algoritmo": "nsga2", "generaciones": 200})
+        escribir_punto_control(almacen.ruta(proyecto_id, "a"), b"estado")
+        # En curso se ofrece, pero marcada como tal
+        assert almacen.ultima(proyecto_id) == ("a", {"algoritmo": "nsga2", "generaciones": 200})
+        assert almacen.en_curso(proyecto_id, "a")
+
+        almacen.terminar(proyecto_id, "a", completada=False)
+        assert not almacen.en_curso(proyecto_id, "a")
+        assert leer_punto_control(almacen.ruta(proyecto_id, "a")) == b"estado"
+
+        almacen.iniciar(proyecto_id, "a")
+        almacen.terminar(proyecto_id, "a", completada=True)
+        assert almacen.ultima(proyecto_id) is None
+        assert not list((tmp_path / "puntos" / str(proyecto_id)).iterdir())
+
+    def test_ejecuciones_simultaneas(self, tmp_path):
+        """Test que dos ejecuciones del proyecto no se pisen y que una misma no corra dos veces"""
+        almacen = AlmacenPuntosControl()
+        almacen.configurar(tmp_path, cada=5)
+        proyecto_id = uuid4()
+
+        almacen.iniciar(proyecto_id, "a", {"generaciones": 100})
+        almacen.iniciar(proyecto_id, "b", {"generaciones": 200})
+        with pytest.raises(PuntoControlEnUso):
+            almacen.iniciar(proyecto_id, "a", {"generaciones": 100})
+        escribir_punto_control(almacen.ruta(proyecto_id, "a"), b"a")
+        escribir_punto_control(almacen.ruta(proyecto_id, "b"), b"b")
+
+        # La que termina bien solo borra lo suyo
+        almacen.terminar(proyecto_id, "b", completada=True)
+        almacen.terminar(proyecto_id, "a", completada=False)
+        assert almacen.ultima(proyecto_id) == ("a", {"generaciones": 100})
+        assert leer_punto_control(almacen.ruta(proyecto_id, "a")) == b"a"
@@ -0,0 +1,644 @@
+"""
+Tests Unitarios - Motor de Cálculo Hidráulico
+"""
+
+import pytest
+from uuid import UUID, uuid4
+import time
+import numpy as np
+from pydantic import ValidationError
+import sys
+import os
+
+# Add backend directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.core.hidraulico import MotorHidraulico, Nudo, Tramo
+from app.core.mallas import base_horton
+from app.core.red_compacta import RedCompacta
+from app.schemas.schemas import NudoCreate, NudoUpdate
+
+
+def crear_red_mallada():
+    """Red con un reservorio y dos mallas (5 nudos, 6 tramos)"""
+    ids = [uuid4() for _ in range(5)]
+    nudos = {ids[0]: Nudo(id=ids[0], codigo="R-1", tipo="reservorio", elevacion=100.0)}
+    for i, nudo_id in enumerate(ids[1:], start=1):
+        nudos[nudo_id] = Nudo(
+            id=nudo_id, codigo=f"N-{i}", tipo="consumo", elevacion=50.0, demanda=2.0 * i
+        )
+
+    conexiones = [(0, 1), (1, 2), (2, 3), (3, 4), (4, 1), (1, 3)]
+    tramos = {}
+    for j, (o, d) in enumerate(conexiones):
+        tramo_id = uuid4()
+        tramos[tramo_id] = Tramo(
+            id=tramo_id,
+            codigo=f"T-{j + 1}",
+            nudo_origen_id=ids[o],
+            nudo_destino_id=ids[d],
+            longitud=200.0 + 10 * j,
+            diametro=50.0 + 5 * j,
+        )
+
+    return nudos, tramos
+
+
+def hardy_cross_referencia(motor, iteraciones):
+    """Hardy Cross escalar (tramo por tramo) para contrastar la tabla académica"""
+    por_codigo = {}
+    for tramo in motor.tramos.values():
+        por_codigo.setdefault(tramo.codigo, tramo)
+
+    total_demanda = sum(n.demanda for n in motor.nudos.values())
+    caudales = {codigo: total_demanda / len(motor.tramos) for codigo in por_codigo}
+    tabla = []
+
+    for _ in range(iteraciones):
+        correcciones = {}
+        for malla in motor.mallas:
+            suma_hf, suma_den = 0.0, 0.0
+            for codigo in malla.tramos:
+                t = por_codigo[codigo]
+                Q = abs(caudales[codigo])
+                suma_hf += motor.calcular_perdida_hazen_williams(
+                    Q, t.diametro, t.longitud, t.coef_hazen_williams
+                )
+                K = t.longitud / (t.coef_hazen_williams ** 1.852 * t.diametro ** 4.8704)
+                suma_den += motor.exponente_hw * Q ** (motor.exponente_hw - 1) * K
+            correcciones[malla.id] = -suma_hf / suma_den if suma_den else 0.0
+
+        for malla in motor.mallas:
+            for codigo in malla.tramos:
+                caudales[codigo] += correcciones[malla.id]
+        tabla.append(correcciones)
+
+    return caudales, tabla
+
+
+class TestIdentificacionMallas:
+    """Tests para la base fundamental de mallas"""
+
+    def test_numero_de_mallas(self):
+        """Test que se generen exactamente E - N + C mallas"""
+        nudos, tramos = crear_red_mallada()
+        motor = MotorHidraulico(nudos, tramos)
+
+        assert len(motor.mallas) == len(tramos) - len(nudos) + 1
+
+    def test_mallas_cerradas_e_independientes(self):
+        """Test que cada malla sea un ciclo cerrado y la base sea independiente"""
+        nudos, tramos = crear_red_mallada()
+        motor = MotorHidraulico(nudos, tramos)
+        por_codigo = {t.codigo: t for t in tramos.values()}
+
+        for malla in motor.mallas:
+            ciclo = malla.nudos_circunferenciales
+            assert len(ciclo) == len(malla.tramos)
+            for k, codigo in enumerate(malla.tramos):
+                extremos = {por_codigo[codigo].nudo_origen_id, por_codigo[codigo].nudo_destino_id}
+                assert extremos == {ciclo[k], ciclo[(k + 1) % len(ciclo)]}
+
+        incidencia = motor._incidencia_mallas.toarray()
+        assert np.linalg.matrix_rank(incidencia) == len(motor.mallas)
+
+    def test_red_ramificada_sin_mallas(self):
+        """Test que un árbol no genere mallas"""
+        nudos, tramos = crear_red_mallada()
+        for tramo_id in [k for k, t in tramos.items() if t.codigo in ("T-5", "T-6")]:
+            del tramos[tramo_id]
+        motor = MotorHidraulico(nudos, tramos)
+
+        assert motor.mallas == []
+
+
+def crear_red_cuadricula(lado=4, con_coordenadas=True):
+    """Cuadrícula lado x lado con reservorio en una esquina"""
+    ids = {(i, j): uuid4() for i in range(lado) for j in range(lado)}
+    nudos = {}
+    for (i, j), nudo_id in ids.items():
+        es_fuente = (i, j) == (0, 0)
+        nudos[nudo_id] = Nudo(
+            id=nudo_id,
+            codigo=f"N-{i}-{j}",
+            tipo="reservorio" if es_fuente else "consumo",
+            elevacion=100.0 if es_fuente else 50.0,
+            demanda=0.0 if es_fuente else 1.0,
+            longitud=-77.0 + 0.001 * i if con_coordenadas else None,
+            latitud=-12.0 + 0.001 * j if con_coordenadas else None,
+        )
+
+    tramos = {}
+    for (i, j), nudo_id in ids.items():
+        for vecino in ((i + 1, j), (i, j + 1)):
+            if vecino in ids:
+                tramo_id = uuid4()
+                tramos[tramo_id] = Tramo(
+                    id=tramo_id,
+                    codigo=f"T-{len(tramos) + 1}",
+                    nudo_origen_id=nudo_id,
+                    nudo_destino_id=ids[vecino],
+                    longitud=100.0,
+                    diametro=75.0,
+                )
+
+    return nudos, tramos
+
+
+class TestMallasCortas:
+    """Tests para el modo de base de mallas cortas"""
+
+    def test_caras_planares_en_cuadricula(self):
+        """Test que con coordenadas cada malla sea una celda de la cuadrícula"""
+        nudos, tramos = crear_red_cuadricula(lado=4)
+        motor = MotorHidraulico(nudos, tramos, modo_mallas="corta")
+
+        assert motor.base_mallas == "caras_planares"
+        assert len(motor.mallas) == len(tramos) - len(nudos) + 1
+        assert all(len(m.tramos) == 4 for m in motor.mallas)
+
+    def test_horton_sin_coordenadas(self):
+        """Test base de Horton de peso mínimo cuando faltan coordenadas"""
+        nudos, tramos = crear_red_cuadricula(lado=4, con_coordenadas=False)
+        corta = MotorHidraulico(nudos, tramos, modo_mallas="corta")
+        fundamental = MotorHidraulico(nudos, tramos)
+
+        assert corta.base_mallas == "horton"
+        assert len(corta.mallas) == len(fundamental.mallas)
+        assert corta.peso_mallas == pytest.approx(9 * 400.0)
+        assert corta.peso_mallas <= fundamental.peso_mallas
+        assert np.linalg.matrix_rank(corta._incidencia_mallas.toarray()) == len(corta.mallas)
+
+    def test_horton_grande_usa_fundamental(self):
+        """Test que en redes grandes sin coordenadas no se calcule Horton"""
+        nudos, tramos = crear_red_cuadricula(lado=30, con_coordenadas=False)
+        inicio = time.perf_counter()
+        motor = MotorHidraulico(nudos, tramos, modo_mallas="corta")
+
+        assert time.perf_counter() - inicio < 2.0
+        assert motor.base_mallas == "fundamental"
+        assert len(motor.mallas) == len(tramos) - len(nudos) + 1
+        assert base_horton([(0, 1), (1, 2), (2, 0)], [1.0] * 3, 1, trabajo_maximo=8) is None
+
+    def test_resumen_reporta_base(self):
+        """Test que el resumen incluya modo y peso de la base"""
+        nudos, tramos = crear_red_cuadricula(lado=3)
+        motor = MotorHidraulico(nudos, tramos, modo_mallas="corta")
+        motor.metodo_hardy_cross()
+
+        resumen = motor.obtener_resumen_resultados()
+        assert resumen["modo_mallas"] == "corta"
+        assert resumen["base_mallas"] == "caras_planares"
+        assert resumen["peso_base_mallas"] == pytest.approx(4 * 400.0)
+
+
+def crear_red_ramificada():
+    """Árbol: R-1 -> N-1 -> {N-2 -> N-4, N-3}"""
+    ids = [uuid4() for _ in range(5)]
+    nudos = {ids[0]: Nudo(id=ids[0], codigo="R-1", tipo="reservorio", elevacion=120.0)}
+    for i, nudo_id in enumerate(ids[1:], start=1):
+        nudos[nudo_id] = Nudo(
+            id=nudo_id, codigo=f"N-{i}", tipo="consumo", elevacion=80.0, demanda=float(i)
+        )
+
+    tramos = {}
+    for j, (o, d) in enumerate([(0, 1), (1, 2), (1, 3), (2, 4)]):
+        tramo_id = uuid4()
+        tramos[tramo_id] = Tramo(
+            id=tramo_id,
+            codigo=f"T-{j + 1}",
+            nudo_origen_id=ids[o],
+            nudo_destino_id=ids[d],
+            longitud=150.0,
+            diametro=40.0,
+        )
+
+    return nudos, tramos
+
+
+class TestRedAbierta:
+    """Tests para el cálculo de redes abiertas sobre el índice CSR"""
+
+    def test_caudal_igual_a_demanda_aguas_abajo(self):
+        """Test que cada tramo conduzca la demanda de su subárbol"""
+        nudos, tramos = crear_red_ramificada()
+        motor = MotorHidraulico(nudos, tramos)
+        motor.calcular_red_abierta()
+
+        caudales = {t.codigo: t.caudal for t in tramos.values()}
+        assert caudales == pytest.approx({"T-1": 10.0, "T-2": 6.0, "T-3": 3.0, "T-4": 4.0})
+
+    def test_cotas_descienden_por_perdidas(self):
+        """Test que la cota piezométrica baje exactamente h_f en cada tramo"""
+        nudos, tramos = crear_red_ramificada()
+        motor = MotorHidraulico(nudos, tramos)
+        resultados = motor.calcular_red_abierta()
+
+        assert len(resultados) == len(nudos)
+        for tramo in tramos.values():
+            origen = nudos[tramo.nudo_origen_id]
+            destino = nudos[tramo.nudo_destino_id]
+            hf = motor.calcular_perdida_hazen_williams(
+                tramo.caudal, tramo.diametro, tramo.longitud, tramo.coef_hazen_williams
+            )
+            assert destino.cota_agua == pytest.approx(origen.cota_agua - hf)
+            assert destino.presion_calc == pytest.approx(destino.cota_agua - destino.elevacion)
+
+    def test_indice_adyacencia(self):
+        """Test entradas y salidas del índice CSR"""
+        nudos, tramos = crear_red_ramificada()
+        motor = MotorHidraulico(nudos, tramos)
+        red = motor.red
+
+        for i, nudo_id in enumerate(red.ids_nudos):
+            salientes = {t.codigo for t in tramos.values() if t.nudo_origen_id == nudo_id}
+            entrantes = {t.codigo for t in tramos.values() if t.nudo_destino_id == nudo_id}
+            assert {red.codigos_tramos[j] for j in motor.adyacencia.salientes(i)} == salientes
+            assert {red.codigos_tramos[j] for j in motor.adyacencia.entrantes(i)} == entrantes
+        assert red.indice_nudo[motor._ordenar_nudos_bfs()[0]] == 0
+
+
+class TestHardyCross:
+    """Tests para el Método de Hardy Cross vectorizado"""
+
+    def test_tabla_coincide_con_calculo_escalar(self):
+        """Test que las correcciones por malla coincidan con el cálculo tramo a tramo"""
+        nudos, tramos = crear_red_mallada()
+        motor = MotorHidraulico(nudos, tramos, max_iteraciones=20)
+        motor.metodo_hardy_cross()
+
+        n = len(motor.historial_iteraciones)
+        caudales, tabla = hardy_cross_referencia(motor, n)
+
+        for resultado, esperado in zip(motor.historial_iteraciones, tabla):
+            for malla_id, delta_q in esperado.items():
+                assert resultado.correcciones_por_malla[malla_id] == pytest.approx(
+                    delta_q, rel=1e-9
+                )
+
+        for tramo in tramos.values():
+            if any(tramo.codigo in m.tramos for m in motor.mallas):
+                assert tramo.caudal == pytest.approx(caudales[tramo.codigo], rel=1e-9)
+
+    def test_incidencia_mallas(self):
+        """Test dimensiones y signos de la incidencia malla-tramo"""
+        nudos, tramos = crear_red_mallada()
+        motor = MotorHidraulico(nudos, tramos)
+
+        incidencia = motor._incidencia_mallas.toarray()
+        signos = motor._signos_mallas.toarray()
+
+        assert incidencia.shape == (len(motor.mallas), len(tramos))
+        assert np.array_equal(np.abs(signos), incidencia)
+        for i, malla in enumerate(motor.mallas):
+            assert incidencia[i].sum() == len(malla.tramos)
+
+
+class TestMetodoGradiente:
+    """Tests para el Método del Gradiente Global"""
+
+    def test_convergencia_cuadratica(self):
+        """Test convergencia en pocas iteraciones"""
+        nudos, tramos = crear_red_mallada()
+        motor = MotorHidraulico(nudos, tramos)
+
+        convergencia, error = motor.metodo_gradiente()
+
+        assert convergencia
+        assert error < motor.tolerancia
+        assert len(motor.historial_iteraciones) < 15
+
+    def test_continuidad_en_nudos(self):
+        """Test balance de masa en cada nudo de consumo"""
+        nudos, tramos = crear_red_mallada()
+        motor = MotorHidraulico(nudos, tramos)
+        motor.metodo_gradiente()
+
+        for nudo in nudos.values():
+            if nudo.tipo == "reservorio":
+                continue
+            entrada = sum(t.caudal for t in tramos.values() if t.nudo_destino_id == nudo.id)
+            salida = sum(t.caudal for t in tramos.values() if t.nudo_origen_id == nudo.id)
+            assert entrada - salida == pytest.approx(nudo.demanda, abs=1e-6)
+
+    def test_energia_en_tramos(self):
+        """Test que la diferencia de cargas iguale la pérdida en cada tramo"""
+        nudos, tramos = crear_red_mallada()
+        motor = MotorHidraulico(nudos, tramos)
+        motor.metodo_gradiente()
+
+        for tramo in tramos.values():
+            dh = nudos[tramo.nudo_origen_id].cota_agua - nudos[tramo.nudo_destino_id].cota_agua
+            assert abs(dh) == pytest.approx(tramo.perdida_carga, rel=1e-6)
+            assert np.sign(dh) == np.sign(tramo.caudal)
+
+    def test_resultados_compatibles(self):
+        """Test que el resumen y la tabla tengan el formato de Hardy Cross"""
+        nudos, tramos = crear_red_mallada()
+        motor = MotorHidraulico(nudos, tramos)
+        motor.metodo_gradiente()
+
+        resumen = motor.obtener_resumen_resultados()
+        tabla = motor.generar_tabla_iteraciones()
+
+        assert resumen["convergencia_final"]
+        assert resumen["iteraciones_realizadas"] == len(tabla)
+        assert {"iteracion", "delta_q_total", "error_maximo", "convergencia"} <= set(tabla[0])
+
+    def test_sin_fuente_lanza_error(self):
+        """Test error cuando no hay nudo de carga fija"""
+        nudos, tramos = crear_red_mallada()
+        for nudo in nudos.values():
+            nudo.tipo = "union"
+        motor = MotorHidraulico(nudos, tramos)
+
+        with pytest.raises(ValueError):
+            motor.metodo_gradiente()
+
+
+class TestRedCompacta:
+    """Tests para la representación en arreglos de la red"""
+
+    def test_arreglos_alineados_con_dataclasses(self):
+        """Test tipos, dimensiones e índices de la red compacta"""
+        nudos, tramos = crear_red_mallada()
+        red = RedCompacta.desde_dataclasses(nudos, tramos)
+
+        assert red.n_nudos == len(nudos) and red.n_tramos == len(tramos)
+        assert red.elevacion.dtype == np.float64 and red.origen.dtype == np.int32
+        assert red.es_fuente.tolist() == [n.tipo == "reservorio" for n in nudos.values()]
+        for j, tramo in enumerate(tramos.values()):
+            assert red.indice_tramo[tramo.id] == j
+            assert red.ids_nudos[red.origen[j]] == tramo.nudo_origen_id
+            assert red.ids_nudos[red.destino[j]] == tramo.nudo_destino_id
+            assert red.diametro[j] == tramo.diametro
+        assert not red.tiene_coordenadas
+
+    def test_tramo_con_nudo_inexistente(self):
+        """Test error cuando un tramo referencia un nudo que no existe"""
+        nudos, tramos = crear_red_mallada()
+        next(iter(tramos.values())).nudo_destino_id = uuid4()
+
+        with pytest.raises(ValueError):
+            RedCompacta.desde_dataclasses(nudos, tramos)
+
+    def test_motor_sin_dataclasses(self):
+        """Test que el motor resuelva directamente sobre la red compacta"""
+        nudos, tramos = crear_red_mallada()
+        red = RedCompacta.desde_dataclasses(nudos, tramos)
+        con_red = MotorHidraulico(red=red)
+        con_dataclasses = MotorHidraulico(nudos, tramos)
+
+        con_red.metodo_gradiente()
+        con_dataclasses.metodo_gradiente()
+
+        assert np.array_equal(con_red.caudales, con_dataclasses.caudales)
+        assert [t.caudal for t in tramos.values()] == con_red.caudales.tolist()
+        assert [n.cota_agua for n in nudos.values()] == con_red.cotas.tolist()
+        assert con_red.obtener_resumen_resultados()["numero_tramos"] == len(tramos)
+
+
+def motor_con_factor(nudos, tramos, factor, **kwargs):
+    """Motor individual con la demanda escalada por un factor"""
+    red = RedCompacta.desde_dataclasses(nudos, tramos)
+    red.demanda = red.demanda * factor
+    return MotorHidraulico(red=red, **kwargs)
+
+
+class TestEscenarios:
+    """Tests para el cálculo de varios escenarios de demanda en lote"""
+
+    FACTORES = [1.0, 1.3, 2.0, 0.5]
+
+    @pytest.mark.parametrize("metodo", ["gradiente", "hardy_cross", "hibrido"])
+    def test_coincide_con_calculo_individual(self, metodo):
+        """Test que cada escenario iguale al método individual con demanda escalada"""
+        nudos, tramos = crear_red_mallada()
+        lote = MotorHidraulico(nudos, tramos, max_iteraciones=50).calcular_escenarios(
+            self.FACTORES, metodo
+        )
+
+        for s, factor in enumerate(self.FACTORES):
+            motor = motor_con_factor(nudos, tramos, factor, max_iteraciones=50)
+            if metodo == "gradiente":
+                motor.metodo_gradiente()
+            elif metodo == "hardy_cross":
+                motor.metodo_hardy_cross()
+            else:
+                motor.calcular_hibrido()
+
+            resumen = motor.obtener_resumen_resultados()
+            resumen_lote = lote.resumen(s)
+            assert resumen_lote["iteraciones_realizadas"] == resumen["iteraciones_realizadas"]
+            assert resumen_lote["convergencia"] == resumen["convergencia_final"]
+            assert np.allclose(lote.caudales[s], motor.caudales, rtol=1e-9, atol=1e-12)
+            assert np.allclose(lote.presiones[s], motor.presiones, rtol=1e-9, atol=1e-9)
+            assert np.allclose(lote.velocidades[s], motor.velocidades, rtol=1e-9, atol=1e-12)
+
+    def test_red_abierta_escala_con_factor(self):
+        """Test que los caudales de la red abierta escalen con el factor"""
+        nudos, tramos = crear_red_ramificada()
+        motor = MotorHidraulico(nudos, tramos)
+        lote = motor.calcular_escenarios([1.0, 2.0], "deterministico")
+        motor.calcular_red_abierta()
+
+        assert np.array_equal(lote.caudales[0], motor.caudales)
+        assert np.allclose(lote.caudales[1], 2 * motor.caudales)
+        assert np.array_equal(lote.presiones[0], motor.presiones)
+        assert (lote.presiones[1] <= lote.presiones[0]).all()
+
+    def test_no_modifica_resultados_del_motor(self):
+        """Test que el cálculo en lote no altere el estado del motor"""
+        nudos, tramos = crear_red_mallada()
+        motor = MotorHidraulico(nudos, tramos)
+        motor.calcular_escenarios(self.FACTORES)
+
+        assert motor.historial_iteraciones == []
+        assert not motor.caudales.any()
+
+    def test_factores_invalidos(self):
+        """Test errores con factores vacíos o negativos"""
+        nudos, tramos = crear_red_mallada()
+        motor = MotorHidraulico(nudos, tramos)
+
+        with pytest.raises(ValueError):
+            motor.calcular_escenarios([])
+        with pytest.raises(ValueError):
+            motor.calcular_escenarios([1.0, -0.5])
+
+
+class TestPeriodoExtendido:
+    """Tests para la simulación en periodo extendido con patrones de demanda"""
+
+    PATRON = [0.6, 0.8, 1.0, 1.4, 1.8, 1.2]
+
+    def test_multiplicadores_por_nudo(self):
+        """Test patrones propios, patrón por defecto y repetición cíclica"""
+        nudos, tramos = crear_red_mallada()
+        con_patron = [n for n in nudos.values() if n.tipo == "consumo"]
+        con_patron[0].demanda_pattern = [2.0, 0.5]
+        con_patron[1].demanda_pattern = {"multiplicadores": [0.0, 1.0, 3.0]}
+
+        red = RedCompacta.desde_dataclasses(nudos, tramos)
+        i, k = red.indice_nudo[con_patron[0].id], red.indice_nudo[con_patron[1].id]
+        factores = red.multiplicadores_demanda(np.arange(0, 6, 1.5), patron_defecto=[1.0, 0.7])
+
+        assert factores.shape == (4, len(nudos))
+        assert factores[:, i].tolist() == [2.0, 0.5, 0.5, 2.0]
+        assert factores[:, k].tolist() == [0.0, 1.0, 0.0, 1.0]
+        otro = red.indice_nudo[con_patron[2].id]
+        assert factores[:, otro].tolist() == [1.0, 0.7, 0.7, 1.0]
+        assert (red.multiplicadores_demanda(np.arange(3))[:, otro] == 1.0).all()
+
+    def test_patron_invalido(self):
+        """Test que un patrón con valores negativos solo falle en el periodo extendido"""
+        nudos, tramos = crear_red_mallada()
+        sin_patron = RedCompacta.desde_dataclasses(nudos, tramos)
+        next(n for n in nudos.values() if n.tipo == "consumo").demanda_pattern = [1.0, -1.0]
+
+        red = RedCompacta.desde_dataclasses(nudos, tramos)
+        assert MotorHidraulico(red=red).metodo_gradiente()[0]
+        # Los patrones no cambian la huella del régimen permanente
+        assert red.huella() == sin_patron.huella()
+        with pytest.raises(ValueError, match="Patrón de demanda inválido"):
+            red.multiplicadores_demanda(np.arange(3))
+        with pytest.raises(ValueError, match="Patrón de demanda inválido"):
+            MotorHidraulico(red=red).simular_periodo_extendido(duracion=3)
+
+    def test_esquema_rechaza_patrones_invalidos(self):
+        """Test que la API no acepte multiplicadores negativos o no finitos"""
+        for patron in ([1.0, -1.0], [1.0, float("inf")], [float("nan")]):
+            with pytest.raises(ValidationError):
+                NudoCreate(codigo="N-1", demanda_pattern=patron)
+            with pytest.raises(ValidationError):
+                NudoUpdate(demanda_pattern=patron)
+        assert NudoCreate(codigo="N-1", demanda_pattern=[0.0, 1.5]).demanda_pattern == [0.0, 1.5]
+
+    def test_gradiente_arranque_en_caliente(self):
+        """Test que cada paso iguale un cálculo en frío y necesite menos iteraciones"""
+        nudos, tramos = crear_red_mallada()
+        motor = MotorHidraulico(nudos, tramos, tolerancia=1e-10)
+        pasos = list(motor.simular_periodo_extendido(
+            duracion=len(self.PATRON), metodo="gradiente", patron_defecto=self.PATRON
+        ))
+
+        assert [p.hora for p in pasos] == [float(h) for h in range(len(self.PATRON))]
+        for paso, factor in zip(pasos, self.PATRON):
+            frio = motor_con_factor(nudos, tramos, factor, tolerancia=1e-10)
+            frio.metodo_gradiente()
+
+            assert paso.convergencia
+            assert np.isclose(paso.demanda_total, frio.red.demanda.sum())
+            assert np.allclose(paso.caudales, frio.caudales, rtol=1e-6, atol=1e-9)
+            assert np.allclose(paso.presiones, frio.presiones, rtol=1e-6, atol=1e-6)
+            if paso.periodo:
+                assert paso.iteraciones < len(frio.historial_iteraciones)
+
+        # No altera el estado del motor
+        assert motor.historial_iteraciones == []
+        assert not motor.caudales.any()
+
+    def test_red_abierta_por_periodo(self):
+        """Test que en la red abierta el caudal de salida siga a la demanda de cada paso"""
+        nudos, tramos = crear_red_ramificada()
+        motor = MotorHidraulico(nudos, tramos)
+        motor.calcular_red_abierta()
+        pasos = list(motor.simular_periodo_extendido(
+            duracion=12, intervalo=2, metodo="deterministico", patron_defecto=self.PATRON
+        ))
+
+        assert len(pasos) == 6
+        for paso in pasos:
+            factor = self.PATRON[int(paso.hora) % len(self.PATRON)]
+            assert np.allclose(paso.caudales, factor * motor.caudales)
+
+    def test_parametros_invalidos(self):
+        """Test que los errores se detecten al llamar, antes de iterar los pasos"""
+        nudos, tramos = crear_red_mallada()
+        motor = MotorHidraulico(nudos, tramos)
+
+        with pytest.raises(ValueError):
+            motor.simular_periodo_extendido(duracion=0)
+        with pytest.raises(ValueError):
+            motor.simular_periodo_extendido(metodo="newton")
+
+
+class TestArranqueEnCaliente:
+    """Tests para el arranque desde los resultados de un cálculo anterior"""
+
+    def resultados_previos(self, motor):
+        """Caudales y cotas exportados, indexados por UUID como en el router"""
+        nudos, tramos = motor.exportar_resultados()
+        return (
+            {UUID(t["id"]): t["caudal"] for t in tramos},
+            {UUID(n["id"]): n["cota_agua"] for n in nudos},
+        )
+
+    def test_gradiente_tras_cambio_de_demanda(self):
+        """Test misma solución que en frío con menos iteraciones"""
+        nudos, tramos = crear_red_cuadricula(lado=6)
+        previo = MotorHidraulico(nudos, tramos)
+        previo.metodo_gradiente()
+        caudales, cotas = self.resultados_previos(previo)
+
+        next(n for n in nudos.values() if n.demanda > 0).demanda *= 1.1
+        frio = MotorHidraulico(nudos, tramos)
+        frio.metodo_gradiente()
+        caliente = MotorHidraulico(nudos, tramos)
+        assert caliente.arranque_en_caliente(caudales, cotas) == 1.0
+        caliente.metodo_gradiente()
+
+        assert caliente.obtener_resumen_resultados()["convergencia_final"]
+        assert len(caliente.historial_iteraciones) < len(frio.historial_iteraciones)
+        assert np.allclose(caliente.caudales, frio.caudales, rtol=1e-9, atol=1e-9)
+        assert np.allclose(caliente.presiones, frio.presiones, rtol=1e-9, atol=1e-9)
+
+    def test_hardy_cross_solo_corrige_mallas(self):
+        """Test que el punto de partida difiera del reparto uniforme solo en mallas"""
+        nudos, tramos = crear_red_mallada()
+        motor = MotorHidraulico(nudos, tramos)
+        motor._distribuir_caudales_iniciales()
+        uniforme = motor.caudales.copy()
+
+        # Caudales previos = uniforme + circulación en mallas + componente no circulante
+        circulacion = motor._incidencia_mallas.T @ np.array([0.7, -1.3])
+        ajeno = np.zeros(len(tramos))
+        ajeno[0] = 5.0  # T-1 (reservorio) no pertenece a ninguna malla
+        previos = dict(zip(motor.red.ids_tramos, (uniforme + circulacion + ajeno).tolist()))
+
+        motor.arranque_en_caliente(previos)
+        motor._distribuir_caudales_iniciales(solo_mallas=True)
+        assert np.allclose(motor.caudales, uniforme + circulacion)
+
+        motor._distribuir_caudales_iniciales()
+        assert np.allclose(motor.caudales, uniforme + circulacion + ajeno)
+
+    def test_cobertura_parcial(self):
+        """Test que los ids desconocidos se ignoren y se respete la cobertura mínima"""
+        nudos, tramos = crear_red_mallada()
+        motor = MotorHidraulico(nudos, tramos)
+        motor._distribuir_caudales_iniciales()
+        uniforme = motor.caudales.copy()
+
+        primeros = dict(zip(motor.red.ids_tramos[:2], [9.0, 8.0]))
+        previos = {**primeros, uuid4(): 1.0}
+        assert motor.arranque_en_caliente(previos, cobertura_minima=0.5) == pytest.approx(2 / 6)
+        motor._distribuir_caudales_iniciales()
+        assert np.array_equal(motor.caudales, uniforme)
+
+        motor.arranque_en_caliente(previos)
+        motor._distribuir_caudales_iniciales()
+        assert motor.caudales[:2].tolist() == [9.0, 8.0]
+        assert np.array_equal(motor.caudales[2:], uniforme[2:])
+
+    def test_exportar_resultados_sin_valores_no_finitos(self):
+        """Test que los resultados divergentes se exporten como None"""
+        nudos, tramos = crear_red_mallada()
+        motor = MotorHidraulico(nudos, tramos)
+        motor.metodo_gradiente()
+        motor.caudales[0] = np.nan
+
+        resultados_nudos, resultados_tramos = motor.exportar_resultados()
+        assert len(resultados_nudos) == len(nudos)
+        assert resultados_tramos[0]["caudal"] is None
+        assert resultados_tramos[1]["caudal"] == motor.caudales[1]
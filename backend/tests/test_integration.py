@@ -5,9 +5,15 @@ Endpoints de Proyectos con Autenticación JWT
 Usa aiosqlite + AsyncSession para compatibilidad con el backend async.
 """
 
+import asyncio
+import io
+import threading
+from pathlib import Path
+
+import numpy as np
 import pytest
 import pytest_asyncio
-from uuid import uuid4
+from uuid import UUID, uuid4
 from datetime import datetime, timezone, timedelta
 
 from httpx import AsyncClient, ASGITransport
@@ -23,8 +29,16 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")
 
 from main import app
 from app.db.database import Base, get_async_session
-from app.db.models import Proyecto
+from app.db.models import Nudo, Proyecto, Tramo
+from app.config.settings import settings
+from app.core import computo
 from app.core.auth import UserAuth
+from app.core.catalogo_precios import CatalogoPrecios
+from app.core.computo import pool_calculo
+from app.core.puntos_control import puntos_control
+from app.core.trabajos import gestor_trabajos
+from app.routers import optimizacion as router_optimizacion
+from test_computo import esperar_cupos
 
 # ============================================================
 # CONFIGURACIÓN DE BASE DE DATOS DE TEST (ASÍNCRONA)
@@ -296,3 +310,116 @@ class TestNestedEndpoints:
             headers=_auth_headers(mock_token_user_a),
         )
         assert response.status_code in [403, 404]
+
+
+# ============================================================
+# TEST: REANUDAR OPTIMIZACIÓN
+# ============================================================
+
+
+@pytest_asyncio.fixture
+async def red_user_a(db_session, proyecto_user_a):
+    """Red mallada con un reservorio (5 nudos, 6 tramos) en el proyecto del usuario A"""
+    nudos = [
+        Nudo(proyecto_id=proyecto_user_a.id, codigo="R-1", tipo="reservorio", elevacion=100.0)
+    ] + [
+        Nudo(proyecto_id=proyecto_user_a.id, codigo=f"N-{i}", tipo="consumo", elevacion=50.0, demanda_base=2.0 * i)
+        for i in range(1, 5)
+    ]
+    db_session.add_all(nudos)
+    await db_session.flush()
+
+    conexiones = [(0, 1), (1, 2), (2, 3), (3, 4), (4, 1), (1, 3)]
+    db_session.add_all([
+        Tramo(
+            proyecto_id=proyecto_user_a.id,
+            codigo=f"T-{j + 1}",
+            nudo_origen_id=nudos[o].id,
+            nudo_destino_id=nudos[d].id,
+            longitud=200.0 + 10 * j,
+            diametro_interior=50.0 + 5 * j,
+        )
+        for j, (o, d) in enumerate(conexiones)
+    ])
+    await db_session.commit()
+    return proyecto_user_a
+
+
+class TestReanudarOptimizacion:
+    """Tests de /optimizar/reanudar sobre el punto de control de una optimización interrumpida"""
+
+    @pytest.mark.asyncio
+    async def test_reanuda_desde_el_punto_control(
+        self, async_client, red_user_a, mock_token_user_a, tmp_path, monkeypatch
+    ):
+        """Test que la reanudación continúe desde el .npz guardado y que otra simultánea reciba 409"""
+        # Cada punto de control escrito se registra y detiene la tarea hasta `continuar`
+        escribir = computo.escribir_punto_control
+        escritos, escrito, continuar = [], threading.Event(), threading.Event()
+
+        def escribir_y_esperar(ruta, blob):
+            escribir(ruta, blob)
+            with np.load(io.BytesIO(blob)) as datos:
+                escritos.append((ruta, len(datos["historial"])))
+            escrito.set()
+            continuar.wait(10)
+
+        monkeypatch.setattr(computo, "escribir_punto_control", escribir_y_esperar)
+        monkeypatch.setattr(router_optimizacion, "AsyncSessionLocal", TestingSessionLocal)
+        monkeypatch.setattr(
+            router_optimizacion,
+            "catalogo_precios",
+            CatalogoPrecios(settings.DIAMETROS_COMERCIALES, settings.COSTO_POR_METRO),
+        )
+        directorio, cada = puntos_control.directorio, puntos_control.cada
+        puntos_control.configurar(tmp_path, cada=5)
+        pool_calculo.iniciar(workers=0, timeout=60)
+
+        url = f"/api/v1/optimizacion/{red_user_a.id}/optimizar"
+        encabezados = _auth_headers(mock_token_user_a)
+        try:
+            # Optimización interrumpida (cancelada) tras su punto de control de la generación 0
+            respuesta = await async_client.post(
+                url,
+                json={"poblacion_size": 10, "generaciones": 20, "asincrono": True},
+                headers=encabezados,
+            )
+            assert respuesta.status_code == 202
+            trabajo_id = UUID(respuesta.json()["id"])
+            assert await asyncio.to_thread(escrito.wait, 10)
+            respuesta = await async_client.post(f"/api/v1/trabajos/{trabajo_id}/cancelar", headers=encabezados)
+            assert respuesta.status_code == 200
+            assert (await gestor_trabajos.esperar(trabajo_id)).estado == "cancelado"
+            continuar.set()
+            assert await asyncio.to_thread(esperar_cupos, pool_calculo, 64) == 64
+
+            # Un solo punto, bajo la clave de la ejecución
+            (ruta, filas), = escritos
+            assert list(tmp_path.rglob("*.npz")) == [Path(ruta)]
+            assert Path(ruta).parent == tmp_path / str(red_user_a.id) and "function" not in ruta
+
+            # La reanudación escribe su primer punto en la generación 5, no en la 0
+            escrito.clear()
+            continuar.clear()
+            respuesta = await async_client.post(f"{url}/reanudar", params={"asincrono": True}, headers=encabezados)
+            assert respuesta.status_code == 202
+            trabajo_id = UUID(respuesta.json()["id"])
+            assert await asyncio.to_thread(escrito.wait, 10)
+            assert escritos[1] == (ruta, filas + 5)
+
+            # Mientras sigue en curso, otra reanudación se rechaza
+            respuesta = await async_client.post(f"{url}/reanudar", headers=encabezados)
+            assert respuesta.status_code == 409
+
+            continuar.set()
+            trabajo = await gestor_trabajos.esperar(trabajo_id)
+            assert trabajo.estado == "completado", trabajo.error
+            assert [filas for _, filas in escritos] == [1, 6, 11, 16, 21]
+            # Completada: ya no queda nada que reanudar
+            assert not list(tmp_path.rglob("*.npz"))
+            respuesta = await async_client.post(f"{url}/reanudar", headers=encabezados)
+            assert respuesta.status_code == 404
+        finally:
+            continuar.set()
+            pool_calculo.cerrar()
+            puntos_control.configurar(directorio, cada)
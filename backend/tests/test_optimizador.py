@@ -0,0 +1,594 @@
+"""
+Tests Unitarios - Optimizador de Diámetros (Algoritmo Genético)
+"""
+
+import contextlib
+import dataclasses
+import io
+import itertools
+import time
+
+import numpy as np
+import pytest
+
+from app.core.evaluacion_paralela import RedCompartida
+from app.core.hidraulico import EvaluadorDiametros
+from app.core.optimizador import OptimizadorGA, OptimizadorRamificado, motivo_parada
+from app.core.optimizador_islas import OptimizadorIslas
+from app.core.optimizador_nsga2 import OptimizadorNSGA2, distancia_hacinamiento, ordenar_no_dominados
+from app.core.red_compacta import RedCompacta
+from benchmark_optimizador import aptitud_motor, presiones_motor, red_ramificada
+from test_hidraulico import crear_red_cuadricula
+
+
+DIAMETROS = [50.0, 63.0, 75.0, 90.0, 110.0, 160.0]
+
+
+def crear_optimizador(n_tramos: int = 12, red=None, **kwargs) -> OptimizadorGA:
+    nudos, tramos = red or red_ramificada(n_tramos)
+    parametros = {"poblacion_size": 20, "generaciones": 10, "semilla": 1, **kwargs}
+    return OptimizadorGA(nudos, tramos, DIAMETROS, **parametros)
+
+
+def optimizar_en_silencio(optimizador: OptimizadorGA) -> dict:
+    with contextlib.redirect_stdout(io.StringIO()):
+        return optimizador.optimizar()
+
+
+class TestEvaluacionVectorizada:
+    """Tests para la evaluación de la generación completa"""
+
+    def test_igual_a_la_evaluacion_por_individuo(self):
+        """Test que aptitud y factibilidad coincidan con resolver cada individuo con el motor"""
+        optimizador = crear_optimizador(presion_minima=40.0)
+        poblacion = optimizador._inicializar_poblacion()
+        aptitud, factible = optimizador._evaluar(poblacion)
+
+        for fila, a, f in zip(poblacion, aptitud, factible):
+            esperado, factible_esperado = aptitud_motor(optimizador, optimizador._diametros[fila].tolist())
+            assert np.isclose(a, esperado, rtol=1e-6)
+            assert f == factible_esperado
+
+    def test_tabla_de_precios(self):
+        """Test que el costo use los precios por diámetro o por tramo y rechace tablas de otra forma"""
+        optimizador = crear_optimizador()
+        poblacion = optimizador._inicializar_poblacion()
+        longitud = optimizador._longitud
+        parametrico = (100.0 * (optimizador._diametros[poblacion] / DIAMETROS[0]) ** 1.5) @ longitud
+        assert np.allclose(optimizador._calcular_costo(poblacion), parametrico)
+
+        # Precio por tramo: los tramos pares cuestan el doble
+        precios = np.tile(np.linspace(10.0, 60.0, len(DIAMETROS)), (optimizador.n_tramos, 1))
+        precios[::2] *= 2
+        con_precios = crear_optimizador(precios=precios)
+        esperado = (precios[np.arange(optimizador.n_tramos), poblacion] * longitud).sum(axis=1)
+        assert np.allclose(con_precios._calcular_costo(poblacion), esperado)
+
+        with pytest.raises(ValueError, match="precios"):
+            crear_optimizador(precios=np.ones(3))
+
+    def test_operadores_conservan_forma_y_genes(self):
+        """Test que selección, cruce y mutación produzcan hijos válidos"""
+        optimizador = crear_optimizador(mutation_rate=1.0)
+        poblacion = optimizador._inicializar_poblacion()
+        aptitud, _ = optimizador._evaluar(poblacion)
+
+        hijos = optimizador._reproducir(poblacion, aptitud, 15)
+        assert hijos.shape == (15, optimizador.n_tramos)
+        assert hijos.dtype == np.uint8
+        assert hijos.max() < len(DIAMETROS)
+
+        # El cruce de un punto solo reordena genes de ambos padres
+        h1, h2 = optimizador._cruce(poblacion[:1], poblacion[1:2])
+        assert np.array_equal(np.sort(np.concatenate((h1, h2)), axis=0), np.sort(poblacion[:2], axis=0))
+
+
+class TestEvaluacionHidraulica:
+    """Tests para las presiones reales de los candidatos"""
+
+    def test_red_mallada_igual_al_motor(self):
+        """Test que en una red con mallas las presiones coincidan con el motor por individuo"""
+        red = RedCompacta.desde_dataclasses(*crear_red_cuadricula(lado=5, con_coordenadas=False))
+        optimizador = OptimizadorGA.desde_red(red, diametros_comerciales=DIAMETROS, poblacion_size=12, semilla=3)
+        poblacion = optimizador._inicializar_poblacion()
+
+        presiones, convergencia = optimizador._simular_presiones(poblacion)
+
+        assert convergencia.all()
+        for fila, obtenidas in zip(poblacion, presiones):
+            esperadas, _ = presiones_motor(optimizador, optimizador._diametros[fila].tolist())
+            assert np.allclose(obtenidas, esperadas, atol=1e-6)
+
+    def test_arranque_en_caliente(self):
+        """Test que los lotes siguientes arranquen desde la solución anterior y necesiten menos iteraciones"""
+        # En una red abierta los caudales no dependen de los diámetros
+        red = crear_optimizador(30).red
+        diametros = np.random.default_rng(0).choice(DIAMETROS, size=(8, red.n_tramos))
+
+        evaluador = EvaluadorDiametros(red, lote=8)
+        evaluador.resolver(diametros)
+        en_frio = evaluador.iteraciones
+        evaluador.resolver(diametros)
+
+        assert evaluador.variantes == 16
+        assert evaluador.iteraciones - en_frio < en_frio
+
+    def test_red_sin_fuente(self):
+        """Test que una red sin nudo de carga fija se rechace al crear el optimizador"""
+        nudos, tramos = red_ramificada(4)
+        for nudo in nudos.values():
+            nudo["tipo"] = "consumo"
+        with pytest.raises(ValueError, match="carga fija"):
+            OptimizadorGA(nudos, tramos, DIAMETROS)
+
+
+class TestOptimizar:
+    """Tests para la ejecución completa del algoritmo"""
+
+    def test_resultado_y_reproducibilidad(self):
+        """Test que con la misma semilla se obtenga el mismo resultado y que el elitismo no empeore al mejor"""
+        red = red_ramificada(12)
+        resultado = optimizar_en_silencio(crear_optimizador(red=red))
+        repetido = optimizar_en_silencio(crear_optimizador(red=red))
+
+        assert resultado["diametros_propuestos"] == repetido["diametros_propuestos"]
+        assert set(resultado["diametros_propuestos"].values()) <= set(DIAMETROS)
+        assert len(resultado["historial"]) == 11
+
+        mejores = [h["mejor_aptitud"] for h in resultado["historial"]]
+        assert all(b <= a for a, b in zip(mejores, mejores[1:]))
+
+
+class TestCacheAptitud:
+    """Tests para la memoización de la aptitud por cromosoma"""
+
+    def test_repetidos_no_se_reevaluan(self):
+        """Test que un cromosoma repetido (en la misma o en otra generación) use la cache"""
+        optimizador = crear_optimizador(presion_minima=40.0, siembra=())
+        poblacion = optimizador._inicializar_poblacion()
+        duplicada = np.concatenate((poblacion, poblacion[:5]))
+
+        aptitud, factible = optimizador._evaluar(duplicada)
+        assert optimizador._evaluador.variantes == len(poblacion)
+        assert np.array_equal(aptitud[-5:], aptitud[:5])
+
+        otra, factible_otra = optimizador._evaluar(poblacion)
+        assert optimizador._evaluador.variantes == len(poblacion)
+        assert np.array_equal(otra, aptitud[:len(poblacion)])
+        assert np.array_equal(factible_otra, factible[:len(poblacion)])
+        assert optimizador._cache_aptitud.estadisticas["aciertos"] == 5 + len(poblacion)
+
+    def test_tasa_en_historial_y_mismo_resultado(self):
+        """Test que el historial reporte la tasa de aciertos y que la cache no cambie el resultado"""
+        red = red_ramificada(12)
+        con_cache = optimizar_en_silencio(crear_optimizador(red=red, generaciones=20, siembra=()))
+        sin_cache = optimizar_en_silencio(
+            crear_optimizador(red=red, generaciones=20, siembra=(), cache_aptitud=0)
+        )
+
+        assert con_cache["diametros_propuestos"] == sin_cache["diametros_propuestos"]
+        tasas = [h["tasa_aciertos_cache"] for h in con_cache["historial"]]
+        assert tasas[0] == 0.0 and max(tasas) > 0.0
+        # Sin cache solo se ahorran los repetidos dentro de una misma generación
+        assert sin_cache["cache_aptitud"]["aciertos"] < con_cache["cache_aptitud"]["aciertos"]
+
+
+class TestEvaluacionParalela:
+    """Tests para la evaluación repartida entre procesos"""
+
+    def test_red_compartida(self):
+        """Test que la red abierta desde la memoria compartida tenga los mismos arreglos"""
+        red = crear_optimizador(8).red
+        compartida = RedCompartida(red)
+        try:
+            memoria, abierta = RedCompartida.abrir(compartida.descriptor)
+            for campo in ("elevacion", "demanda", "longitud", "coef_hw", "origen", "destino", "es_fuente"):
+                assert np.array_equal(getattr(abierta, campo), getattr(red, campo))
+            del abierta
+            memoria.close()
+        finally:
+            compartida.cerrar()
+
+    def test_reproducible_y_coincide_con_un_proceso(self):
+        """Test que con la misma semilla y workers el resultado se repita y coincida con la evaluación local"""
+        red = red_ramificada(20)
+        paralelo = optimizar_en_silencio(crear_optimizador(red=red, workers=2))
+        repetido = optimizar_en_silencio(crear_optimizador(red=red, workers=2))
+        local = optimizar_en_silencio(crear_optimizador(red=red))
+
+        assert paralelo["diametros_propuestos"] == repetido["diametros_propuestos"]
+        assert paralelo["historial"] == repetido["historial"]
+        assert paralelo["diametros_propuestos"] == local["diametros_propuestos"]
+        assert np.isclose(paralelo["costo_total"], local["costo_total"])
+
+
+class TestModeloIslas:
+    """Tests para el algoritmo genético con islas y migración"""
+
+    def test_migrantes_reemplazan_a_los_peores(self):
+        """Test que los migrantes entren a la población en lugar de los peores individuos"""
+        optimizador = crear_optimizador()
+        optimizador.iniciar()
+        migrante = np.zeros((1, optimizador.n_tramos), dtype=np.uint8)
+
+        optimizador.recibir_migrantes(migrante)
+
+        assert len(optimizador._poblacion) == optimizador.poblacion_size
+        assert any(np.array_equal(fila, migrante[0]) for fila in optimizador._poblacion)
+        assert np.all(np.diff(optimizador._aptitud) >= 0)
+
+    def test_islas_reproducibles_con_historial_por_isla(self):
+        """Test que con la misma semilla se repita el resultado y que cada isla tenga su historial"""
+        red = crear_optimizador(15).red
+        parametros = dict(
+            diametros_comerciales=DIAMETROS, poblacion_size=16, generaciones=6,
+            islas=2, migracion_cada=2, migrantes=2, semilla=5,
+        )
+
+        resultado = optimizar_en_silencio(OptimizadorIslas(red, **parametros))
+        repetido = optimizar_en_silencio(OptimizadorIslas(red, **parametros))
+
+        assert resultado["diametros_propuestos"] == repetido["diametros_propuestos"]
+        assert resultado["historial"] == repetido["historial"]
+        assert resultado["migraciones"] == 2
+        assert [len(isla["historial"]) for isla in resultado["islas"]] == [7, 7]
+        assert len(resultado["historial"]) == 7
+
+        mejor = min(resultado["islas"], key=lambda isla: isla["mejor_aptitud"])
+        assert resultado["mejor_isla"] == mejor["isla"]
+        assert resultado["costo_total"] == mejor["costo_total"]
+        assert resultado["historial"][-1]["mejor_aptitud"] == mejor["mejor_aptitud"]
+
+    def test_error_de_una_isla(self):
+        """Test que el error de una isla llegue al coordinador"""
+        red = crear_optimizador(6).red
+        red.es_fuente[:] = False
+        with pytest.raises(ValueError, match="carga fija"):
+            optimizar_en_silencio(OptimizadorIslas(red, diametros_comerciales=DIAMETROS, islas=2, generaciones=2))
+
+
+class TestParadaAnticipada:
+    """Tests para la parada por estancamiento o tiempo y la mutación adaptativa"""
+
+    def test_motivo_parada(self):
+        """Test que se detecte estancamiento con la ventana y el tiempo máximo"""
+        historial = [{"generacion": g, "mejor_aptitud": a} for g, a in enumerate([10.0, 8.0, 8.0, 8.0])]
+        assert motivo_parada(historial, 50, time.time(), paciencia=3) is None
+        assert motivo_parada(historial, 50, time.time(), paciencia=2) == "estancamiento"
+        assert motivo_parada(historial, 3, time.time(), paciencia=2) == "generaciones"
+        assert motivo_parada(historial, 50, time.time() - 10, tiempo_maximo=5) == "tiempo"
+
+    def test_se_detiene_y_reporta_generaciones_ahorradas(self):
+        """Test que la optimización termine antes por estancamiento y reporte el ahorro"""
+        resultado = optimizar_en_silencio(crear_optimizador(n_tramos=6, generaciones=200, paciencia=5))
+
+        assert resultado["motivo_parada"] == "estancamiento"
+        assert resultado["generaciones"] + resultado["generaciones_ahorradas"] == 200
+        assert len(resultado["historial"]) == resultado["generaciones"] + 1
+        mejores = [h["mejor_aptitud"] for h in resultado["historial"][-6:]]
+        assert mejores[0] == mejores[-1]
+
+        completo = optimizar_en_silencio(crear_optimizador(n_tramos=6, generaciones=20))
+        assert completo["motivo_parada"] == "generaciones"
+        assert completo["generaciones_ahorradas"] == 0
+
+    def test_tiempo_maximo(self):
+        """Test que se respete el presupuesto de tiempo"""
+        resultado = optimizar_en_silencio(crear_optimizador(generaciones=100000, tiempo_maximo=0.2))
+        assert resultado["motivo_parada"] == "tiempo"
+        assert resultado["tiempo_optimizacion"] < 2.0
+
+    def test_mutacion_adaptativa(self):
+        """Test que la tasa de mutación suba cuando la diversidad colapsa"""
+        optimizador = crear_optimizador(mutacion_adaptativa=True, diversidad_minima=0.5, mutation_rate=0.05)
+        optimizador.iniciar()
+        optimizador._poblacion[:] = optimizador._poblacion[0]
+        entrada = optimizador.evolucionar_generacion()
+
+        assert entrada["diversidad"] < 0.5
+        assert optimizador._tasa_mutacion == 0.1
+        assert 0.0 <= optimizador.historial_aptitud[0]["diversidad"] <= 1.0
+
+
+class TestSiembra:
+    """Tests para la siembra heurística de la población inicial"""
+
+    # Constante de Hazen-Williams para l/s y mm: con ella el diámetro sí
+    # cambia las presiones (con 10.674 las pérdidas son despreciables)
+    COEF_HW = 10.674 * 1000 ** 4.8704 / 1000 ** 1.852
+
+    def test_actual_y_velocidad(self):
+        """Test que 'actual' tome el comercial más cercano y 'velocidad' no supere la velocidad objetivo"""
+        optimizador = crear_optimizador(n_tramos=20, siembra=("actual", "velocidad"))
+        actual, velocidad = optimizador._individuos_sembrados()
+
+        assert (optimizador._diametros[actual] == 110.0).all()
+
+        caudal = np.abs(optimizador._evaluador.caudales_arranque) / 1000.0
+        area = np.pi * (optimizador._diametros[velocidad] / 1000.0) ** 2 / 4
+        mayor = velocidad == len(DIAMETROS) - 1
+        assert (caudal / area <= 1.0 + 1e-9)[~mayor].all()
+        # Un diámetro menor ya superaría la velocidad objetivo
+        menor = velocidad > 0
+        area_menor = np.pi * (optimizador._diametros[velocidad[menor] - 1] / 1000.0) ** 2 / 4
+        assert (caudal[menor] / area_menor > 1.0).all()
+
+    def test_critico_mejora_la_presion_minima(self):
+        """Test que el refuerzo del camino crítico suba la presión del nudo más desfavorable"""
+        optimizador = crear_optimizador(
+            n_tramos=30, presion_minima=30.0, coef_hazen_williams=self.COEF_HW, siembra=("velocidad", "critico")
+        )
+        velocidad, critico = optimizador._individuos_sembrados()
+
+        assert (critico >= velocidad).all()
+        _, presion_velocidad, _, _ = optimizador._estado_critico(velocidad)
+        _, presion_critico, _, convergencia = optimizador._estado_critico(critico)
+        assert convergencia
+        assert presion_critico > presion_velocidad
+
+    def test_poblacion_inicial_sembrada(self):
+        """Test que los sembrados y sus variantes ocupen las primeras filas"""
+        optimizador = crear_optimizador(n_tramos=20, poblacion_size=30, coef_hazen_williams=self.COEF_HW)
+        semillas = optimizador._individuos_sembrados()
+        poblacion = optimizador._inicializar_poblacion()
+
+        assert 1 <= len(semillas) <= 3
+        assert (poblacion[:len(semillas)] == semillas).all()
+        variantes = poblacion[len(semillas):6].astype(int) - semillas[np.arange(len(semillas), 6) % len(semillas)]
+        assert (np.abs(variantes) <= 1).all()
+
+        aleatoria = crear_optimizador(n_tramos=20, poblacion_size=30, siembra=())._inicializar_poblacion()
+        assert not (aleatoria[:1] == semillas[:1]).all()
+
+    def test_estrategia_desconocida(self):
+        """Test que una estrategia de siembra desconocida sea un error de datos"""
+        with pytest.raises(ValueError, match="siembra"):
+            crear_optimizador(siembra=("aleatoria",))
+
+
+class TestOptimizadorRamificado:
+    """Tests para la optimización exacta de redes abiertas (lp_ramificada)"""
+
+    COEF_HW = 10.674 * 1000 ** 4.8704 / 1000 ** 1.852
+
+    def crear(self, n_tramos: int, holgura: float = 3.0, **kwargs) -> OptimizadorRamificado:
+        """Optimizador con la presión mínima `holgura` m bajo la presión estática del nudo más alto"""
+        red = crear_optimizador(n_tramos=n_tramos, siembra=()).red
+        estatica = red.elevacion[red.es_fuente].max() - red.elevacion[~red.es_fuente].max()
+        return OptimizadorRamificado(
+            red, DIAMETROS, presion_minima=estatica - holgura, coef_hazen_williams=self.COEF_HW, **kwargs
+        )
+
+    def test_optimo_frente_a_enumeracion(self):
+        """Test que la propuesta sea factible y esté entre el óptimo por segmentos y el mejor diseño enumerado"""
+        optimizador = self.crear(5)
+        resultado = optimizador.optimizar()
+
+        # Mejor diseño de un diámetro por tramo, por enumeración completa
+        diametros = np.array(DIAMETROS)
+        costo_metro = 100.0 * (diametros / DIAMETROS[0]) ** 1.5
+        consumo = ~optimizador.red.es_fuente
+        mejor = np.inf
+        for combinacion in itertools.product(range(len(DIAMETROS)), repeat=5):
+            indices = list(combinacion)
+            if (optimizador.presiones(diametros[indices])[consumo] >= optimizador.presion_minima).all():
+                mejor = min(mejor, (optimizador.red.longitud * costo_metro[indices]).sum())
+
+        assert resultado["convergencia"]
+        assert resultado["costo_segmentos"] <= mejor + 1e-6
+        assert resultado["costo_total"] == pytest.approx(mejor)
+        for tramo_id, segmentos in resultado["segmentos"].items():
+            assert len(segmentos) <= 2
+            assert sum(s["longitud"] for s in segmentos) == pytest.approx(
+                optimizador.red.longitud[optimizador.red.ids_tramos.index(tramo_id)]
+            )
+
+    def test_presiones_iguales_al_evaluador(self):
+        """Test que las presiones del árbol coincidan con el gradiente global"""
+        optimizador = self.crear(40)
+        resultado = optimizador.optimizar()
+        diametros = np.array(list(resultado["diametros_propuestos"].values()))
+
+        cargas, convergencia = EvaluadorDiametros(optimizador.red, coef_hazen_williams=self.COEF_HW).resolver(diametros)
+        assert convergencia[0]
+        assert np.allclose(cargas[0] - optimizador.red.elevacion, optimizador.presiones(diametros), atol=1e-4)
+        assert resultado["convergencia"]
+
+    def test_infactible_y_red_mallada(self):
+        """Test que sin diseño factible se proponga el mayor diámetro y que una red mallada se rechace"""
+        resultado = self.crear(30, holgura=-1.0).optimizar()
+        assert not resultado["convergencia"]
+        assert resultado["costo_segmentos"] is None
+        assert set(resultado["diametros_propuestos"].values()) == {DIAMETROS[-1]}
+
+        red = RedCompacta.desde_dataclasses(*crear_red_cuadricula(lado=3, con_coordenadas=False))
+        with pytest.raises(ValueError, match="ramificada"):
+            OptimizadorRamificado(red, DIAMETROS)
+
+    def test_precios_por_tramo(self):
+        """Test que el programa lineal use la tabla de precios de cada tramo"""
+        optimizador = self.crear(10)
+        precios = np.tile(np.linspace(60.0, 10.0, len(DIAMETROS)), (10, 1))  # el mayor es el más barato
+        precios[0] = np.linspace(10.0, 60.0, len(DIAMETROS))
+        resultado = OptimizadorRamificado(
+            optimizador.red, DIAMETROS, presion_minima=optimizador.presion_minima,
+            coef_hazen_williams=self.COEF_HW, precios=precios
+        ).optimizar()
+
+        diametros = list(resultado["diametros_propuestos"].values())
+        assert diametros[1:] == [DIAMETROS[-1]] * 9
+        assert resultado["costo_total"] == pytest.approx(
+            float((optimizador.red.longitud * precios[np.arange(10), np.searchsorted(DIAMETROS, diametros)]).sum())
+        )
+
+    def test_red_grande(self):
+        """Test que miles de tramos se resuelvan en pocos segundos"""
+        red = crear_optimizador(n_tramos=3000, siembra=()).red
+        # Demandas de red rural: con las del generador ningún diámetro del catálogo alcanza
+        red = dataclasses.replace(red, demanda=red.demanda / 100)
+        optimizador = OptimizadorRamificado(red, DIAMETROS, presion_minima=10.0, coef_hazen_williams=self.COEF_HW)
+        inicio = time.perf_counter()
+        resultado = optimizador.optimizar()
+
+        assert time.perf_counter() - inicio < 5.0
+        assert resultado["convergencia"]
+        assert resultado["costo_segmentos"] <= resultado["costo_total"]
+
+
+def rango_por_fuerza_bruta(objetivos: np.ndarray, violacion: np.ndarray) -> np.ndarray:
+    """Rangos de no dominancia (con restricciones) comparando cada par en Python"""
+    def domina(i, j):
+        if violacion[i] > 0 or violacion[j] > 0:
+            return violacion[i] < violacion[j]
+        return (objetivos[i] <= objetivos[j]).all() and (objetivos[i] < objetivos[j]).any()
+
+    pendientes, rango, k = set(range(len(objetivos))), np.full(len(objetivos), -1), 0
+    while pendientes:
+        frente = {j for j in pendientes if not any(domina(i, j) for i in pendientes)}
+        rango[list(frente)] = k
+        pendientes -= frente
+        k += 1
+    return rango
+
+
+class TestNSGA2:
+    """Tests para la optimización multiobjetivo (frente de Pareto)"""
+
+    COEF_HW = 10.674 * 1000 ** 4.8704 / 1000 ** 1.852
+
+    def test_ordenamiento_no_dominado(self):
+        """Test que los rangos coincidan con la comparación par a par, con empates e infactibles"""
+        rng = np.random.default_rng(0)
+        objetivos = rng.integers(0, 8, size=(120, 2)).astype(float)
+        violacion = np.where(rng.random(120) < 0.3, rng.integers(1, 4, size=120), 0).astype(float)
+
+        assert (ordenar_no_dominados(objetivos, violacion) == rango_por_fuerza_bruta(objetivos, violacion)).all()
+        assert (ordenar_no_dominados(objetivos) == rango_por_fuerza_bruta(objetivos, np.zeros(120))).all()
+
+    def test_distancia_hacinamiento(self):
+        """Test que los extremos de cada frente sean infinitos y los interiores la suma normalizada"""
+        objetivos = np.array([[0.0, 4.0], [1.0, 2.0], [3.0, 1.0], [4.0, 0.0], [5.0, 5.0], [6.0, 6.0]])
+        rango = np.array([0, 0, 0, 0, 1, 2])
+        distancia = distancia_hacinamiento(objetivos, rango)
+
+        assert np.isinf(distancia[[0, 3, 4, 5]]).all()
+        assert distancia[1] == pytest.approx(3 / 4 + 3 / 4)
+        assert distancia[2] == pytest.approx(3 / 4 + 2 / 4)
+
+    def test_ordenamiento_poblacion_500(self):
+        """Test que ordenar padres + hijos de una población de 500 sea rápido"""
+        rng = np.random.default_rng(1)
+        costo = rng.random(1000)
+        objetivos = np.column_stack((costo, -(costo + 0.3 * rng.random(1000))))
+        violacion = np.maximum(rng.normal(size=1000), 0.0)
+
+        inicio = time.perf_counter()
+        rango = ordenar_no_dominados(objetivos, violacion)
+        distancia_hacinamiento(objetivos, rango)
+        assert time.perf_counter() - inicio < 1.0
+
+    def test_frente_pareto(self):
+        """Test que el frente sea no dominado, factible y que la propuesta sea su punto más barato"""
+        nudos, tramos = red_ramificada(15)
+        optimizador = OptimizadorNSGA2(
+            nudos, tramos, DIAMETROS, poblacion_size=40, generaciones=15, semilla=2,
+            presion_minima=10.0, coef_hazen_williams=self.COEF_HW
+        )
+        resultado = optimizar_en_silencio(optimizador)
+        frente = resultado["frente_pareto"]
+
+        assert len(frente) >= 2
+        assert all(p["factible"] for p in frente)
+        costos = [p["costo"] for p in frente]
+        excedentes = [p["excedente_presion"] for p in frente]
+        assert costos == sorted(costos)
+        # A mayor costo, mayor excedente (ningún punto domina a otro)
+        assert all(b > a for a, b in zip(excedentes, excedentes[1:]))
+        assert resultado["convergencia"]
+        assert resultado["costo_total"] == pytest.approx(costos[0])
+        assert resultado["diametros_propuestos"] == frente[0]["diametros"]
+        assert all(h["tamano_frente"] >= 1 for h in resultado["historial"])
+
+
+class TestPuntosControl:
+    """Tests para guardar y reanudar la evolución desde un punto de control"""
+
+    @staticmethod
+    def crear(clase=OptimizadorGA, red=None, **kwargs):
+        nudos, tramos = red or red_ramificada(15)
+        parametros = {"poblacion_size": 20, "generaciones": 12, "semilla": 3, "mutacion_adaptativa": True, **kwargs}
+        return clase(nudos, tramos, DIAMETROS, **parametros)
+
+    @pytest.mark.parametrize("clase", [OptimizadorGA, OptimizadorNSGA2])
+    def test_reanudar_es_exacto(self, clase):
+        """Test que reanudar desde la generación 5 termine igual que sin interrupción"""
+        red = red_ramificada(15)
+        continuo = optimizar_en_silencio(self.crear(clase, red))
+
+        puntos = {}
+        optimizar_en_silencio(
+            self.crear(clase, red, punto_control_cada=5, al_punto_control=puntos.__setitem__)
+        )
+        assert sorted(puntos) == [0, 5, 10]
+
+        reanudado = self.crear(clase, red)
+        reanudado.restaurar(puntos[5])
+        assert len(reanudado.historial_aptitud) == 6
+        resultado = optimizar_en_silencio(reanudado)
+
+        assert resultado["mejor_aptitud"] == continuo["mejor_aptitud"]
+        assert resultado["diametros_propuestos"] == continuo["diametros_propuestos"]
+        assert [h["mejor_aptitud"] for h in resultado["historial"]] == [
+            h["mejor_aptitud"] for h in continuo["historial"]
+        ]
+        assert [h["tasa_mutacion"] for h in resultado["historial"]] == [
+            h["tasa_mutacion"] for h in continuo["historial"]
+        ]
+
+    def test_punto_control_compacto(self):
+        """Test que el punto de control ocupe pocos KB"""
+        puntos = {}
+        optimizar_en_silencio(
+            self.crear(red=red_ramificada(100), poblacion_size=100, punto_control_cada=12,
+                       al_punto_control=puntos.__setitem__)
+        )
+        assert len(puntos[12]) < 32 * 1024
+
+    def test_rechaza_otro_problema(self):
+        """Test que no se restaure un punto de otra red, otro algoritmo o dañado"""
+        puntos = {}
+        red = red_ramificada(15)
+        optimizar_en_silencio(self.crear(red=red, punto_control_cada=12, al_punto_control=puntos.__setitem__))
+        blob = puntos[12]
+
+        with pytest.raises(ValueError, match="no corresponde"):
+            self.crear(red=red_ramificada(16)).restaurar(blob)
+        with pytest.raises(ValueError, match="otro algoritmo"):
+            self.crear(OptimizadorNSGA2, red).restaurar(blob)
+        with pytest.raises(ValueError, match="ilegible"):
+            self.crear(red=red).restaurar(blob[: len(blob) // 2])
+
+    def test_rechaza_cambios_de_la_red_precios_o_parametros(self):
+        """Test que la aptitud guardada no se reutilice si cambió lo que la determina"""
+        puntos = {}
+        nudos, tramos = red_ramificada(15)
+        optimizar_en_silencio(
+            self.crear(red=(nudos, tramos), punto_control_cada=12, al_punto_control=puntos.__setitem__)
+        )
+        blob = puntos[12]
+
+        mas_demanda = {i: {**n, "demanda": n["demanda"] * 5} for i, n in nudos.items()}
+        with pytest.raises(ValueError, match="esta red"):
+            self.crear(red=(mas_demanda, tramos)).restaurar(blob)
+        mas_largos = {i: {**t, "longitud": t["longitud"] * 2} for i, t in tramos.items()}
+        with pytest.raises(ValueError, match="esta red"):
+            self.crear(red=(nudos, mas_largos)).restaurar(blob)
+        with pytest.raises(ValueError, match="precios"):
+            self.crear(red=(nudos, tramos), costo_por_metro=120.0).restaurar(blob)
+        with pytest.raises(ValueError, match="parámetros"):
+            self.crear(red=(nudos, tramos), poblacion_size=60).restaurar(blob)
+        with pytest.raises(ValueError, match="parámetros"):
+            self.crear(red=(nudos, tramos), presion_minima=15.0).restaurar(blob)
+
+        # Otra semilla u otras generaciones sí pueden reanudarse
+        self.crear(red=(nudos, tramos), semilla=9, generaciones=30).restaurar(blob)
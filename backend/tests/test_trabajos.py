@@ -0,0 +1,222 @@
+"""
+Tests Unitarios - Trabajos en Segundo Plano
+"""
+
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+import jwt
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+from app.config.settings import settings
+from app.core.coalescencia import Coalescedor
+from app.core.computo import PoolCalculo, reportar_progreso, verificar_cancelacion
+from app.core.trabajos import BrokerArchivos, BrokerMemoria, GestorTrabajos, Trabajo, gestor_trabajos
+from main import app
+from test_computo import esperar_cupos
+
+
+def bucle_con_progreso(segundos: float) -> str:
+    """Trabajo cancelable que reporta su avance"""
+    inicio = time.time()
+    while time.time() < inicio + segundos:
+        verificar_cancelacion()
+        reportar_progreso((time.time() - inicio) / segundos)
+        time.sleep(0.01)
+    return "terminado"
+
+
+def red_invalida(_):
+    raise ValueError("La red no tiene fuentes")
+
+
+@pytest.fixture
+def pool_hilos():
+    pool = PoolCalculo()
+    pool.iniciar(workers=0, timeout=30, max_tareas=4)
+    yield pool
+    pool.cerrar()
+
+
+@pytest.fixture(params=["memoria", "archivos"])
+def broker(request, tmp_path):
+    if request.param == "memoria":
+        return BrokerMemoria()
+    return BrokerArchivos(tmp_path / "trabajos")
+
+
+def nuevo_trabajo(**campos) -> Trabajo:
+    return Trabajo(id=uuid4(), tipo="calculo", proyecto_id=uuid4(), usuario_id=uuid4(), **campos)
+
+
+class TestBrokers:
+    """Tests para el almacenamiento del estado de los trabajos"""
+
+    def test_guardar_y_obtener(self, broker):
+        """Test que el trabajo se recupere con sus campos"""
+        trabajo = nuevo_trabajo(estado="completado", progreso=1.0, resultado={"convergencia": True})
+        broker.guardar(trabajo)
+
+        recuperado = broker.obtener(trabajo.id)
+        assert recuperado == trabajo
+        assert broker.obtener(uuid4()) is None
+
+    def test_cancelacion(self, broker):
+        """Test que la solicitud de cancelación quede registrada por trabajo"""
+        trabajo = nuevo_trabajo()
+        broker.guardar(trabajo)
+        assert not broker.cancelacion_solicitada(trabajo.id)
+
+        broker.solicitar_cancelacion(trabajo.id)
+        assert broker.cancelacion_solicitada(trabajo.id)
+
+    def test_purgar_solo_terminados(self, broker):
+        """Test que se purguen los trabajos terminados y se conserven los en curso"""
+        terminado, en_curso = nuevo_trabajo(estado="error"), nuevo_trabajo(estado="en_curso")
+        broker.guardar(terminado)
+        broker.guardar(en_curso)
+
+        assert broker.purgar(retencion=-60) == 1
+        assert broker.obtener(terminado.id) is None
+        assert broker.obtener(en_curso.id) is not None
+
+
+class TestGestorTrabajos:
+    """Tests para la ejecución, el progreso y la cancelación de trabajos"""
+
+    @pytest.mark.asyncio
+    async def test_completa_con_progreso(self, pool_hilos):
+        """Test que el progreso se publique durante el trabajo y el resultado al final"""
+        gestor = GestorTrabajos(intervalo=0.02)
+
+        async def funcion():
+            return {"valor": await pool_hilos.ejecutar(bucle_con_progreso, 0.5)}
+
+        trabajo = gestor.enviar("calculo", uuid4(), uuid4(), funcion)
+        progresos = []
+        while not gestor.obtener(trabajo.id).terminado:
+            progresos.append(gestor.obtener(trabajo.id).progreso)
+            await asyncio.sleep(0.02)
+
+        final = gestor.obtener(trabajo.id)
+        assert final.estado == "completado"
+        assert final.progreso == 1.0
+        assert final.resultado == {"valor": "terminado"}
+        assert any(0 < p < 1 for p in progresos)
+
+    @pytest.mark.asyncio
+    async def test_progreso_de_trabajos_coalescidos(self, pool_hilos):
+        """Test que un trabajo unido a una ejecución en curso también vea su progreso"""
+        gestor = GestorTrabajos(intervalo=0.02)
+        coalescedor = Coalescedor()
+
+        async def funcion():
+            async def ejecucion():
+                return {"valor": await pool_hilos.ejecutar(bucle_con_progreso, 0.6)}
+            return await coalescedor.ejecutar("optimizacion", "h1", ejecucion)
+
+        primero = gestor.enviar("optimizacion", uuid4(), uuid4(), funcion)
+        await asyncio.sleep(0.1)
+        segundo = gestor.enviar("optimizacion", uuid4(), uuid4(), funcion)
+
+        progresos = []
+        while not gestor.obtener(segundo.id).terminado:
+            progresos.append(gestor.obtener(segundo.id).progreso)
+            await asyncio.sleep(0.02)
+
+        assert coalescedor.estadisticas["optimizacion"] == {"ejecutados": 1, "ahorrados": 1}
+        assert any(0 < p < 1 for p in progresos)
+        assert (await gestor.esperar(primero.id)).resultado == {"valor": "terminado"}
+        assert gestor.obtener(segundo.id).resultado == {"valor": "terminado"}
+
+    @pytest.mark.asyncio
+    async def test_cancelar_libera_el_pool(self, pool_hilos):
+        """Test que cancelar detenga el cálculo en el pool y marque el trabajo"""
+        gestor = GestorTrabajos(intervalo=0.02)
+
+        async def funcion():
+            return await pool_hilos.ejecutar(bucle_con_progreso, 30.0)
+
+        trabajo = gestor.enviar("optimizacion", uuid4(), uuid4(), funcion)
+        await asyncio.sleep(0.1)
+        assert gestor.cancelar(trabajo.id).estado == "en_curso"
+
+        final = await gestor.esperar(trabajo.id)
+        assert final.estado == "cancelado"
+        assert esperar_cupos(pool_hilos, 4) == 4
+
+    @pytest.mark.asyncio
+    async def test_cancelacion_desde_otro_proceso(self, pool_hilos, tmp_path):
+        """Test que se aplique la cancelación registrada en el broker por otro worker"""
+        gestor = GestorTrabajos(broker=BrokerArchivos(tmp_path), intervalo=0.02)
+
+        async def funcion():
+            return await pool_hilos.ejecutar(bucle_con_progreso, 30.0)
+
+        trabajo = gestor.enviar("calculo", uuid4(), uuid4(), funcion)
+        BrokerArchivos(tmp_path).solicitar_cancelacion(trabajo.id)
+
+        final = await gestor.esperar(trabajo.id)
+        assert final.estado == "cancelado"
+
+    @pytest.mark.asyncio
+    async def test_error_del_calculo(self, pool_hilos):
+        """Test que un error del cálculo quede en el trabajo con su mensaje"""
+        gestor = GestorTrabajos(intervalo=0.02)
+
+        async def funcion():
+            return await pool_hilos.ejecutar(red_invalida, None)
+
+        trabajo = gestor.enviar("calculo", uuid4(), uuid4(), funcion)
+        final = await gestor.esperar(trabajo.id)
+        assert final.estado == "error"
+        assert final.error == "La red no tiene fuentes"
+
+
+def _encabezados(usuario_id) -> dict:
+    token = jwt.encode(
+        {
+            "sub": str(usuario_id),
+            "email": "usuario@example.com",
+            "role": "authenticated",
+            "exp": datetime.now(timezone.utc) + timedelta(hours=1),
+        },
+        settings.SUPABASE_JWT_SECRET,
+        algorithm="HS256",
+    )
+    return {"Authorization": f"Bearer {token}"}
+
+
+class TestEndpointsTrabajos:
+    """Tests para la consulta y cancelación de trabajos por HTTP"""
+
+    @pytest.mark.asyncio
+    async def test_consulta_y_cancelacion_del_propietario(self):
+        """Test que solo quien envió el trabajo pueda consultarlo y cancelarlo"""
+        usuario, otro = uuid4(), uuid4()
+        evento = asyncio.Event()
+
+        async def funcion():
+            await evento.wait()
+
+        trabajo = gestor_trabajos.enviar("optimizacion", uuid4(), usuario, funcion)
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test") as cliente:
+            url = f"/api/v1/trabajos/{trabajo.id}"
+
+            respuesta = await cliente.get(url, headers=_encabezados(usuario))
+            assert respuesta.status_code == 200
+            assert respuesta.json()["tipo"] == "optimizacion"
+            assert respuesta.json()["estado"] in ("pendiente", "en_curso")
+
+            assert (await cliente.get(url, headers=_encabezados(otro))).status_code == 404
+            assert (await cliente.post(f"{url}/cancelar", headers=_encabezados(otro))).status_code == 404
+            assert (await cliente.get(f"/api/v1/trabajos/{uuid4()}", headers=_encabezados(usuario))).status_code == 404
+
+            respuesta = await cliente.post(f"{url}/cancelar", headers=_encabezados(usuario))
+            assert respuesta.status_code == 200
+
+        assert (await gestor_trabajos.esperar(trabajo.id)).estado == "cancelado"
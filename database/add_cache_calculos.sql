@@ -0,0 +1,15 @@
+-- =====================================================
+-- Migration: Tabla de respaldo de la cache de /calcular
+-- (solo se usa con CACHE_CALCULOS_BD=true)
+-- =====================================================
+
+CREATE TABLE IF NOT EXISTS cache_calculos (
+    huella VARCHAR(64) PRIMARY KEY,
+    proyecto_id UUID NOT NULL,
+    respuesta JSONB NOT NULL,
+    created_at TIMESTAMP DEFAULT now()
+);
+
+CREATE INDEX IF NOT EXISTS idx_cache_calculos_proyecto ON cache_calculos (proyecto_id);
+
+COMMENT ON TABLE cache_calculos IS 'Respuestas de cálculo hidráulico por hash de la red y los parámetros';
@@ -4,7 +4,15 @@
  */
 
 import { api } from "./api-client"
-import type { Proyecto, Nudo, Tramo, Calculo } from "@/types/models"
+import type {
+    Proyecto,
+    Nudo,
+    Tramo,
+    Calculo,
+    EscenarioItem,
+    ResultadoEscenarios,
+    Trabajo
+} from "@/types/models"
 
 // ============== PROYECTOS ==============
 
@@ -141,7 +149,7 @@ export async function eliminarTramo(proyectoId: string, tramoId: string): Promis
  */
 export async function calcularHidraulico(
     proyectoId: string,
-    metodo: "hardy_cross" | "deterministico" | "hibrido" = "hardy_cross",
+    metodo: "hardy_cross" | "gradiente" | "deterministico" | "hibrido" = "hardy_cross",
     tolerancia = 1e-7,
     maxIteraciones = 1000
 ): Promise<Calculo> {
@@ -152,6 +160,42 @@ export async function calcularHidraulico(
     })
 }
 
+/**
+ * Calcula varios escenarios de demanda (por defecto K1, K2 y mínimo nocturno)
+ */
+export async function calcularEscenarios(
+    proyectoId: string,
+    metodo: "hardy_cross" | "gradiente" | "deterministico" | "hibrido" = "gradiente",
+    escenarios?: EscenarioItem[],
+    tolerancia = 1e-7,
+    maxIteraciones = 1000
+): Promise<ResultadoEscenarios> {
+    return api.post(`/calculos/${proyectoId}/calcular-escenarios`, {
+        metodo,
+        escenarios,
+        tolerancia,
+        max_iteraciones: maxIteraciones
+    })
+}
+
+/**
+ * Envía el cálculo hidráulico como trabajo en segundo plano
+ * (consultar su estado con obtenerTrabajo)
+ */
+export async function enviarCalculoHidraulico(
+    proyectoId: string,
+    metodo: "hardy_cross" | "gradiente" | "deterministico" | "hibrido" = "hardy_cross",
+    tolerancia = 1e-7,
+    maxIteraciones = 1000
+): Promise<Trabajo> {
+    return api.post(`/calculos/${proyectoId}/calcular`, {
+        metodo,
+        tolerancia,
+        max_iteraciones: maxIteraciones,
+        asincrono: true
+    })
+}
+
 /**
  * Obtiene los resultados del último cálculo
  */
@@ -266,6 +310,14 @@ export async function optimizarDiametros(
     generaciones: number
     tiempo_optimizacion: number
     diametros_propuestos: Record<string, number>
+    motivo_parada: "generaciones" | "estancamiento" | "tiempo" | null
+    generaciones_ahorradas: number
+    frente_pareto: Array<{
+        costo: number
+        excedente_presion: number
+        factible: boolean
+        diametros: Record<string, number>
+    }> | null
 }> {
     return api.post(`/optimizacion/${proyectoId}/optimizar`, {
         algoritmo,
@@ -276,6 +328,36 @@ export async function optimizarDiametros(
     })
 }
 
+/**
+ * Envía la optimización de diámetros como trabajo en segundo plano
+ * (consultar su progreso con obtenerTrabajo)
+ */
+export async function enviarOptimizacion(
+    proyectoId: string,
+    algoritmo = "algoritmo_genetico",
+    poblacionSize = 100,
+    generaciones = 50,
+    crossoverRate = 0.8,
+    mutationRate = 0.1
+): Promise<Trabajo> {
+    return api.post(`/optimizacion/${proyectoId}/optimizar`, {
+        algoritmo,
+        poblacion_size: poblacionSize,
+        generaciones,
+        crossover_rate: crossoverRate,
+        mutation_rate: mutationRate,
+        asincrono: true
+    })
+}
+
+/**
+ * Reanuda en segundo plano la última optimización interrumpida desde su
+ * punto de control (consultar su progreso con obtenerTrabajo)
+ */
+export async function reanudarOptimizacion(proyectoId: string): Promise<Trabajo> {
+    return api.post(`/optimizacion/${proyectoId}/optimizar/reanudar?asincrono=true`, {})
+}
+
 /**
  * Obtiene resultados de optimización
  */
@@ -424,3 +506,19 @@ export async function obtenerLimitesNormativos(
 }> {
     return api.get(`/normativa/limites/${ambito}`)
 }
+
+// ============== TRABAJOS ==============
+
+/**
+ * Obtiene el estado, el progreso y el resultado de un trabajo en segundo plano
+ */
+export async function obtenerTrabajo(trabajoId: string): Promise<Trabajo> {
+    return api.get(`/trabajos/${trabajoId}`)
+}
+
+/**
+ * Cancela un trabajo pendiente o en curso
+ */
+export async function cancelarTrabajo(trabajoId: string): Promise<Trabajo> {
+    return api.post(`/trabajos/${trabajoId}/cancelar`, {})
+}
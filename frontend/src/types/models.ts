@@ -263,6 +263,30 @@ export interface Calculo {
     version_modelo: string
 }
 
+export interface EscenarioItem {
+    nombre: string
+    factor: number
+}
+
+export interface EscenarioResultado {
+    nombre: string
+    factor: number
+    convergencia: boolean
+    iteraciones_realizadas: number
+    error_final?: number
+    presion_minima?: number
+    presion_maxima?: number
+    velocidad_minima?: number
+    velocidad_maxima?: number
+}
+
+export interface ResultadoEscenarios {
+    proyecto_id: string
+    metodo: string
+    tiempo_calculo: number
+    escenarios: EscenarioResultado[]
+}
+
 // ============ OPTIMIZACION ============
 
 export interface Optimizacion {
@@ -282,6 +306,20 @@ export interface Optimizacion {
     created_at: string
 }
 
+// ============ TRABAJOS ============
+
+export interface Trabajo {
+    id: string
+    tipo: "calculo" | "optimizacion"
+    proyecto_id: string
+    estado: "pendiente" | "en_curso" | "completado" | "error" | "cancelado"
+    progreso: number  // porcentaje
+    resultado?: Record<string, unknown> | null
+    error?: string | null
+    created_at: string
+    updated_at: string
+}
+
 // ============ ALERTA ============
 
 export interface Alerta {